@@ -12,6 +12,9 @@ import asyncio
 from src.services.database import AdminTypes, UserType
 from src.services.database_manager import DatabaseManager
 from src.services.database import AdminTypes
+from src.services.activity_logger import ActivityLogger
+from src.services.prewarm import CachePrewarmer
+from src.analysis.technical import TechnicalAnalyzer
 from src.utils.formatters import TelegramFormatter
 import logging
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -31,6 +34,13 @@ formatter = TelegramFormatter()
 db = DatabaseManager()
 db.init_db()
 
+# Keeps popular coins warm in the OHLCV and analysis caches; shares the handler's analyzer
+prewarmer = CachePrewarmer(db, analysis_handler.analyzer)
+
+# Upcoming partitions and retention are maintained daily; init_db did it at startup
+SCHEMA_MAINTENANCE_INTERVAL = 24 * 3600
+maintenance_task = None
+
 # Share user_states between handlers
 callback_handler.user_states = user_states
 message_handler.user_states = user_states
@@ -129,6 +139,38 @@ async def print_id(update,context):
 
 #     # Start the bot
 #     await application.run_polling()
+async def maintain_database():
+    """Schema maintenance loop; runs until cancelled."""
+    while True:
+        await asyncio.sleep(SCHEMA_MAINTENANCE_INTERVAL)
+        try:
+            await asyncio.to_thread(db.maintain_schema)
+        except Exception as e:
+            logging.error(f"Schema maintenance failed: {str(e)}")
+
+
+async def start_background_tasks(application):
+    """Start background tasks once the bot's event loop is running."""
+    # Analysis worker processes (ANALYSIS_WORKERS) are forked before the prewarmer's threads start
+    TechnicalAnalyzer.pool.start()
+    prewarmer.start()
+    analysis_handler.screener.start()
+    analysis_handler.news_ingestor.start()
+    global maintenance_task
+    maintenance_task = asyncio.get_running_loop().create_task(maintain_database(), name="schema-maintenance")
+
+
+async def stop_background_tasks(application):
+    await prewarmer.stop()
+    await analysis_handler.screener.stop()
+    await analysis_handler.news_ingestor.stop()
+    if maintenance_task is not None:
+        maintenance_task.cancel()
+    TechnicalAnalyzer.pool.shutdown()
+    # Drop queued agent jobs so exit does not wait on them
+    message_handler.agent.gateway.shutdown()
+
+
 def create_first_admins(admins):
     for admin_name in admins:
         new_admin = db.get_admin_by_user_id(admin_name)
@@ -147,7 +189,13 @@ def main():
  
     """Main function to run the bot"""
     # Create application
-    application = Application.builder().token(os.getenv("TELEGRAM_BOT_TOKEN")).build()
+    application = (
+        Application.builder()
+        .token(os.getenv("TELEGRAM_BOT_TOKEN"))
+        .post_init(start_background_tasks)
+        .post_shutdown(stop_background_tasks)
+        .build()
+    )
 
     # Add command handlers
     application.add_handler(CommandHandler('start', start_command))
@@ -155,6 +203,7 @@ def main():
     application.add_handler(CommandHandler('quick', analysis_handler.cmd_quick))
     application.add_handler(CommandHandler('news', analysis_handler.cmd_news))
     application.add_handler(CommandHandler('chart', analysis_handler.cmd_chart))
+    application.add_handler(CommandHandler('screen', analysis_handler.cmd_screen))
     application.add_handler(CommandHandler('admin', admin_command))
 # DEBUGGING
     application.add_handler(CommandHandler('id', print_id))
@@ -176,6 +225,9 @@ def main():
     # Start the bot
     print('Starting bot...')
     application.run_polling()
+
+    # Write out any user activities still waiting in the logging queue
+    ActivityLogger(db).close()
     
     
     
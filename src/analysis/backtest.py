@@ -0,0 +1,239 @@
+"""
+Backtests of the analysis summary's signal rules.
+
+`sentiment()` reproduces the vote of
+`TechnicalAnalyzer._generate_enhanced_summary` over whole indicator
+arrays. At every candle, MACD, moving averages, RSI, stochastic, OBV and
+VWAP vote Bullish, Bearish or Neutral; MACD without a crossover,
+"Moderately" moving-average readings and a missing VWAP do not vote. The
+sentiment is Bullish or Bearish when more than `consensus` percent of
+the votes agree. All indicators are causal, so the sentiment at a candle
+is what the analysis would have reported at that candle.
+
+Positions follow the sentiment: long when Bullish, short when Bearish
+(or flat unless `allow_short`), flat when Neutral (or held until the
+opposite signal with `hold`). They are entered at the close of the signal
+candle. Entries, exits, PnL, drawdown and the per-trade hit rate come
+from array operations only. A parameter grid is evaluated as the rows of
+one (parameter sets x candles) array per chunk, and chunks can run in
+worker processes.
+
+Usage:
+    backtester = Backtester.from_cache('bitcoin', days=90)
+    backtester.run()
+    backtester.sweep({'rsi_oversold': [20, 25, 30], 'consensus': [50, 60]}, workers=4)
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..data.processor import DataProcessor
+from .indicators import IndicatorEngine
+
+# Rule parameters; the defaults are the thresholds the analysis uses
+DEFAULT_PARAMETERS = {
+    'rsi_oversold': 30.0,
+    'rsi_overbought': 70.0,
+    'stoch_oversold': 20.0,
+    'stoch_overbought': 80.0,
+    'consensus': 60.0,       # percent of votes needed for a Bullish/Bearish sentiment
+    'allow_short': False,
+    'hold': False,           # keep the position through Neutral candles
+    'fee': 0.001,            # per unit of position change
+}
+
+# Parameter sets evaluated together as one 2-D array
+CHUNK_SIZE = 64
+
+
+def _votes(bullish: np.ndarray, bearish: np.ndarray, counted: np.ndarray) -> np.ndarray:
+    """(bullish, bearish, neutral) vote counts for one rule."""
+    return np.stack([bullish & counted, bearish & counted, ~bullish & ~bearish & counted]).astype(np.int16)
+
+
+def _fixed_votes(indicators: Dict[str, np.ndarray]) -> np.ndarray:
+    """Votes of the parameter-free rules (MACD, moving averages, OBV, VWAP), summed."""
+    close = indicators['close']
+    macd, macd_signal, macd_hist = indicators['macd'], indicators['macd_signal'], indicators['macd_hist']
+    ma20, ma50, ema20 = indicators['ma20'], indicators['ma50'], indicators['ema20']
+    obv, vwap = indicators['obv'], indicators['vwap']
+
+    macd_bullish = (macd > macd_signal) & (macd_hist > 0)
+    macd_bearish = (macd < macd_signal) & (macd_hist < 0)
+    macd_votes = _votes(macd_bullish, macd_bearish, macd_bullish | macd_bearish)
+
+    # Only exact Bullish/Bearish/Neutral moving-average readings vote
+    ma_bullish = (close > ma20) & (ma20 > ma50) & (ma50 > ema20)
+    ma_bearish = (close < ma20) & (ma20 < ma50) & (ma50 < ema20)
+    moderate = ((close > ma50) & (ma50 > ema20)) | ((close < ma50) & (ma50 < ema20))
+    ma_votes = _votes(ma_bullish, ma_bearish, ma_bullish | ma_bearish | ~moderate)
+
+    # OBV change over the last three candles
+    obv_change = np.full(obv.shape, np.nan)
+    obv_change[2:] = obv[2:] - obv[:-2]
+    obv_votes = _votes(obv_change > 0, obv_change < 0, np.ones(obv.shape, dtype=bool))
+
+    vwap_votes = _votes(close > vwap, close < vwap, ~np.isnan(vwap))
+    return macd_votes + ma_votes + obv_votes + vwap_votes
+
+
+def sentiment(indicators: Dict[str, np.ndarray], parameters: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Summary sentiment per parameter set and candle: 1 Bullish, -1 Bearish, 0 Neutral.
+
+    `parameters` maps names to (parameter sets x 1) arrays.
+    """
+    rsi, slowk, slowd = indicators['rsi'], indicators['slowk'], indicators['slowd']
+    rsi_votes = _votes(rsi < parameters['rsi_oversold'], rsi > parameters['rsi_overbought'], np.ones(rsi.shape, dtype=bool))
+
+    overbought = (slowk > parameters['stoch_overbought']) & (slowd > parameters['stoch_overbought'])
+    oversold = (slowk < parameters['stoch_oversold']) & (slowd < parameters['stoch_oversold'])
+    stoch_bullish = ~overbought & (oversold | (slowk > slowd))
+    stoch_bearish = overbought | (~oversold & (slowd > slowk))
+    stoch_votes = _votes(stoch_bullish, stoch_bearish, np.ones(stoch_bullish.shape, dtype=bool))
+
+    bullish, bearish, neutral = _fixed_votes(indicators)[:, np.newaxis] + rsi_votes + stoch_votes
+    total = np.maximum(bullish + bearish + neutral, 1)
+    return np.select(
+        [bullish / total * 100 > parameters['consensus'], bearish / total * 100 > parameters['consensus']], [1, -1], 0
+    )
+
+
+def positions(signals: np.ndarray, parameters: Dict[str, np.ndarray], start: int) -> np.ndarray:
+    """Position per parameter set and candle (1 long, -1 short, 0 flat), flat before `start`."""
+    target = np.where(signals < 0, np.where(parameters['allow_short'], -1.0, 0.0), signals.astype(float))
+    target = np.where((signals == 0) & parameters['hold'], np.nan, target)
+    target[:, :start] = 0.0
+    # Forward-fill held positions through Neutral candles
+    candles = np.arange(target.shape[1])
+    last_set = np.maximum.accumulate(np.where(np.isnan(target), 0, candles), axis=1)
+    return np.take_along_axis(target, last_set, axis=1)
+
+
+def _evaluate(indicators: Dict[str, np.ndarray], parameter_sets: List[Dict], start: int) -> List[Dict]:
+    """Backtest metrics for each parameter set, computed as one 2-D array."""
+    parameters = {
+        name: np.array([parameter_set[name] for parameter_set in parameter_sets])[:, np.newaxis]
+        for name in DEFAULT_PARAMETERS
+    }
+    position = positions(sentiment(indicators, parameters), parameters, start)
+    sets, candles = position.shape
+    close = indicators['close']
+
+    # Returns earned at candle t by the position held since candle t - 1, minus fees for changing it at t
+    previous = np.zeros(position.shape)
+    previous[:, 1:] = position[:, :-1]
+    price_change = np.zeros(candles)
+    price_change[1:] = close[1:] / close[:-1] - 1
+    returns = previous * price_change - parameters['fee'] * np.abs(position - previous)
+
+    equity = np.cumprod(1 + returns, axis=1)
+    drawdown = 1 - equity / np.maximum.accumulate(equity, axis=1)
+
+    # Trades: each entry into a non-zero position (including flips) starts a new one
+    entries = (position != 0) & (position != previous)
+    trade = np.cumsum(entries, axis=1)
+    # A candle's return belongs to the trade held into it, or to the one it opens from flat
+    owner = np.where(previous != 0, np.concatenate((np.zeros((sets, 1), dtype=int), trade[:, :-1]), axis=1), trade)
+    owner = np.where((previous != 0) | (position != 0), owner, 0)
+    ids = owner + np.arange(sets)[:, np.newaxis] * (candles + 1)
+    trade_returns = np.bincount(
+        ids.ravel(), weights=np.log1p(returns).ravel(), minlength=sets * (candles + 1)
+    ).reshape(sets, candles + 1)[:, 1:]
+    trades = entries.sum(axis=1)
+    wins = (trade_returns > 0).sum(axis=1)
+    exits = ((previous != 0) & (position != previous)).sum(axis=1)
+
+    held = position[:, start:] != 0
+    return [{
+        "parameters": parameter_set,
+        "total_return": float(equity[row, -1] - 1) * 100,
+        "max_drawdown": float(drawdown[row].max()) * 100,
+        "trades": int(trades[row]),
+        "exits": int(exits[row]),
+        "hit_rate": float(wins[row] / trades[row]) * 100 if trades[row] else 0.0,
+        "exposure": float(held[row].mean()) * 100 if held.shape[1] else 0.0,
+    } for row, parameter_set in enumerate(parameter_sets)]
+
+
+def _evaluate_chunk(task) -> List[Dict]:
+    return _evaluate(*task)
+
+
+class Backtester:
+    """
+    Backtest the analysis signal rules over one OHLCV series.
+
+    Indicators are computed once, with the analysis' own settings, and
+    shared by every parameter set.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        engine = IndicatorEngine(df)
+        macd, macd_signal, macd_hist = engine.macd()
+        slowk, slowd = engine.stochastic(14, 3, 3)
+        self.indicators = {
+            'close': engine.close,
+            'macd': macd, 'macd_signal': macd_signal, 'macd_hist': macd_hist,
+            'ma20': engine.sma(engine.ma_short), 'ma50': engine.sma(engine.ma_long), 'ema20': engine.ema(engine.ma_short),
+            'rsi': engine.rsi(14),
+            'slowk': slowk, 'slowd': slowd,
+            'obv': engine.obv(),
+            'vwap': engine.vwap(),
+        }
+        # No trading before every indicator has warmed up
+        valid = np.ones(len(engine), dtype=bool)
+        for name in ('macd', 'ma20', 'ma50', 'ema20', 'rsi', 'slowk', 'slowd'):
+            if self.indicators[name].shape == valid.shape:
+                valid &= ~np.isnan(self.indicators[name])
+        self.start = int(np.argmax(valid)) if valid.any() else len(engine)
+        self.buy_and_hold = (
+            float(engine.close[-1] / engine.close[self.start] - 1) * 100 if self.start < len(engine) else 0.0
+        )
+
+    @classmethod
+    def from_cache(
+        cls,
+        coin_id: str,
+        vs_currency: str = 'usd',
+        days: int = 90,
+        data_processor: Optional[DataProcessor] = None
+    ) -> Optional['Backtester']:
+        """Backtester over the cached OHLCV data of a coin (fetched if the cache is empty); None without data."""
+        df = (data_processor or DataProcessor()).get_ohlcv_data(coin_id, vs_currency, days)
+        if df is None or df.empty:
+            return None
+        return cls(df)
+
+    def run(self, **parameters) -> Dict:
+        """Backtest one parameter set (defaults from DEFAULT_PARAMETERS)."""
+        return self.sweep({name: [value] for name, value in parameters.items()})[0]
+
+    def sweep(self, grid: Dict[str, Sequence], workers: int = 0) -> List[Dict]:
+        """
+        Backtest every combination of the values in `grid`, in grid order.
+
+        Parameters missing from `grid` keep their defaults. With `workers`,
+        chunks of CHUNK_SIZE parameter sets run in that many processes.
+        """
+        unknown = set(grid) - set(DEFAULT_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown backtest parameters: {sorted(unknown)}")
+        names = list(grid)
+        parameter_sets = [
+            {**DEFAULT_PARAMETERS, **dict(zip(names, values))}
+            for values in itertools.product(*(grid[name] for name in names))
+        ]
+        tasks = [
+            (self.indicators, parameter_sets[offset:offset + CHUNK_SIZE], self.start)
+            for offset in range(0, len(parameter_sets), CHUNK_SIZE)
+        ]
+        if workers and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunks = list(executor.map(_evaluate_chunk, tasks))
+        else:
+            chunks = [_evaluate_chunk(task) for task in tasks]
+        return [result for chunk in chunks for result in chunk]
@@ -0,0 +1,291 @@
+"""
+Indicator engine with shared intermediates.
+
+`IndicatorEngine` wraps one OHLCV series as contiguous float64 arrays and
+computes indicators on demand. Every indicator is a memoized node; nodes
+that share inputs call each other instead of recomputing them, so within
+one analysis:
+
+    true_range        -> atr, adx
+    rolling high/low  -> stochastic, williams_r
+    sma / stddev      -> moving averages, bollinger_bands
+    accumulation/distribution -> chaikin oscillator
+    mfi               -> momentum and volume sections
+
+Callers only pay for the nodes they ask for, e.g.
+`IndicatorEngine(df).compute(['rsi', 'macd'])`.
+
+Standalone indicators come from the selected backend (`ta_backend`);
+indicators built from shared intermediates use the `ta_numpy` building
+blocks directly, whichever backend is active.
+"""
+import functools
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import ta_numpy
+from .ta_backend import ta
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Candles MACD needs for a first value (26-candle slow EMA plus the 9-candle signal);
+# shorter series get zero placeholders
+MACD_MIN_CANDLES = 33
+
+# Moving-average periods; shorter series get shortened periods (see IndicatorEngine)
+MA_SHORT_PERIOD = 20
+MA_LONG_PERIOD = 50
+
+# Named indicators available through IndicatorEngine.compute()
+INDICATORS = {
+    'sma_short': lambda e: e.sma(e.ma_short),
+    'sma_long': lambda e: e.sma(e.ma_long),
+    'ema_short': lambda e: e.ema(e.ma_short),
+    'macd': lambda e: e.macd(),
+    'adx': lambda e: e.adx(14),
+    'sar': lambda e: e.sar(),
+    'rsi': lambda e: e.rsi(14),
+    'stochastic': lambda e: e.stochastic(14, 3, 3),
+    'williams_r': lambda e: e.williams_r(14),
+    'mfi': lambda e: e.mfi(14),
+    'cci': lambda e: e.cci(20),
+    'roc': lambda e: e.roc(10),
+    'obv': lambda e: e.obv(),
+    'volume_sma': lambda e: e.sma(20, 'volume'),
+    'vwap': lambda e: e.vwap(),
+    'ad': lambda e: e.ad(),
+    'adosc': lambda e: e.adosc(3, 10),
+    'bollinger_bands': lambda e: e.bollinger_bands(20, 2.0),
+    'atr': lambda e: e.atr(14),
+    'stddev': lambda e: e.stddev(20),
+}
+
+
+def data_version(df: pd.DataFrame) -> Tuple:
+    """Cheap fingerprint of an OHLCV frame: changes whenever a candle is added or revised."""
+    last = df[list(OHLCV_COLUMNS)].iloc[-1].fillna(-1.0)
+    return (len(df), df.index[-1], tuple(last.tolist()))
+
+
+def stack_frames(frames: Sequence[pd.DataFrame]) -> np.ndarray:
+    """Equally long OHLCV frames as one (column x series x candles) float64 array."""
+    if len({len(df) for df in frames}) > 1:
+        raise ValueError("Frames must have the same number of candles")
+    # Converting whole frames is far cheaper than selecting columns frame by frame;
+    # column positions are looked up once per column layout
+    positions = {}
+    stacked = []
+    for df in frames:
+        columns = tuple(df.columns)
+        if columns not in positions:
+            positions[columns] = [columns.index(column) for column in OHLCV_COLUMNS]
+        stacked.append(df.to_numpy(dtype=np.float64)[:, positions[columns]])
+    # (series x candles x columns) -> (columns x series x candles)
+    return np.moveaxis(np.stack(stacked), -1, 0)
+
+
+def _node(method):
+    """Memoize an engine method on its arguments for the lifetime of the engine."""
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        key = (method.__name__,) + args
+        if key not in self._results:
+            self._results[key] = method(self, *args)
+        return self._results[key]
+    return wrapper
+
+
+class IndicatorEngine:
+    """
+    Lazily evaluated indicator graph over one OHLCV series.
+
+    `IndicatorEngine.from_frames()` builds the same graph over several
+    equally long series stacked into (series x candles) arrays; every node
+    then returns one row per series.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._load(*(df[column].to_numpy(dtype=np.float64) for column in OHLCV_COLUMNS))
+
+    @classmethod
+    def from_frames(cls, frames: Sequence[pd.DataFrame]) -> 'IndicatorEngine':
+        """Engine over equally long OHLCV frames, one row per frame."""
+        return cls.from_arrays(*stack_frames(frames))
+
+    @classmethod
+    def from_arrays(cls, open, high, low, close, volume) -> 'IndicatorEngine':
+        """Engine over OHLCV arrays: one series, or (series x candles) arrays."""
+        engine = cls.__new__(cls)
+        engine._load(open, high, low, close, volume)
+        return engine
+
+    def _load(self, open, high, low, close, volume) -> None:
+        self.open = np.ascontiguousarray(open)
+        self.high = np.ascontiguousarray(high)
+        self.low = np.ascontiguousarray(low)
+        self.close = np.ascontiguousarray(close)
+        self.volume = np.ascontiguousarray(volume)
+        self._results = {}
+        # TA-Lib only takes single series; stacked series use the NumPy backend
+        self._ta = ta if self.close.ndim == 1 else ta_numpy
+
+        # Moving-average periods shrink for short histories (min 10 candles)
+        self.ma_period = MA_LONG_PERIOD if len(self) >= MA_LONG_PERIOD else len(self) - 1
+        self.ma_short = min(MA_SHORT_PERIOD, self.ma_period)
+        self.ma_long = min(MA_LONG_PERIOD, self.ma_period)
+
+    def __len__(self) -> int:
+        """Number of candles per series."""
+        return self.close.shape[-1]
+
+    def compute(self, names: Iterable[str]) -> Dict[str, object]:
+        """Compute the named indicators (see INDICATORS), sharing intermediates."""
+        return {name: INDICATORS[name](self) for name in names}
+
+    def _source(self, name: str) -> np.ndarray:
+        return getattr(self, name)
+
+    # Shared intermediates
+
+    @_node
+    def typical_price(self) -> np.ndarray:
+        return ta_numpy.typical_price(self.high, self.low, self.close)
+
+    @_node
+    def true_range(self) -> np.ndarray:
+        """max(high - low, |high - prev close|, |low - prev close|); undefined for the first candle."""
+        return ta_numpy.true_range(self.high, self.low, self.close)
+
+    @_node
+    def directional_movement(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(+DM, -DM) per candle as used by ADX; undefined for the first candle."""
+        return ta_numpy.directional_movement(self.high, self.low)
+
+    @_node
+    def rolling_high(self, period: int) -> np.ndarray:
+        return ta_numpy.rolling_max(self.high, period)
+
+    @_node
+    def rolling_low(self, period: int) -> np.ndarray:
+        return ta_numpy.rolling_min(self.low, period)
+
+    @_node
+    def sma(self, period: int, source: str = 'close') -> np.ndarray:
+        return self._ta.SMA(self._source(source), timeperiod=period)
+
+    @_node
+    def ema(self, period: int, source: str = 'close') -> np.ndarray:
+        return self._ta.EMA(self._source(source), timeperiod=period)
+
+    @_node
+    def stddev(self, period: int, source: str = 'close') -> np.ndarray:
+        return self._ta.STDDEV(self._source(source), timeperiod=period)
+
+    # Trend
+
+    @_node
+    def macd(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if len(self) < MACD_MIN_CANDLES:
+            zeros = np.zeros(self.close.shape[:-1] + (1,))
+            return zeros, zeros, zeros
+        return self._ta.MACD(self.close)
+
+    @_node
+    def atr(self, period: int) -> np.ndarray:
+        return ta_numpy.atr_from_true_range(self.true_range(), period)
+
+    @_node
+    def directional_index(self, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Wilder-smoothed (true range, +DM, -DM) and the resulting DX."""
+        return ta_numpy.directional_index(self.true_range(), *self.directional_movement(), period)
+
+    @_node
+    def adx(self, period: int) -> np.ndarray:
+        """Average Directional Index from the shared true range and directional movement."""
+        if len(self) < 2 * period:
+            return np.full(self.close.shape, np.nan)
+        return ta_numpy.adx_from_dx(self.directional_index(period)[3], period)
+
+    @_node
+    def sar(self) -> np.ndarray:
+        return self._ta.SAR(self.high, self.low)
+
+    # Momentum
+
+    @_node
+    def rsi(self, period: int) -> np.ndarray:
+        return self._ta.RSI(self.close, timeperiod=period)
+
+    @_node
+    def stochastic(self, fastk_period: int, slowk_period: int, slowd_period: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Slow stochastic (%K, %D) from the shared rolling high/low."""
+        return ta_numpy.stoch_from_extremes(
+            self.close, self.rolling_high(fastk_period), self.rolling_low(fastk_period), slowk_period, slowd_period
+        )
+
+    @_node
+    def williams_r(self, period: int) -> np.ndarray:
+        return ta_numpy.willr_from_extremes(self.close, self.rolling_high(period), self.rolling_low(period))
+
+    @_node
+    def mfi(self, period: int) -> np.ndarray:
+        return self._ta.MFI(self.high, self.low, self.close, self.volume, timeperiod=period)
+
+    @_node
+    def cci(self, period: int) -> np.ndarray:
+        return self._ta.CCI(self.high, self.low, self.close, timeperiod=period)
+
+    @_node
+    def roc(self, period: int) -> np.ndarray:
+        return self._ta.ROC(self.close, timeperiod=period)
+
+    # Volume
+
+    @_node
+    def obv(self) -> np.ndarray:
+        return self._ta.OBV(self.close, self.volume)
+
+    @_node
+    def vwap(self) -> np.ndarray:
+        # Missing volumes are skipped, as pandas' cumsum does
+        return np.nancumsum(self.typical_price() * self.volume, axis=-1) / np.nancumsum(self.volume, axis=-1)
+
+    @_node
+    def ad(self) -> np.ndarray:
+        return self._ta.AD(self.high, self.low, self.close, self.volume)
+
+    @_node
+    def adosc(self, fast_period: int, slow_period: int) -> np.ndarray:
+        """Chaikin A/D oscillator from the shared accumulation/distribution line."""
+        return ta_numpy.adosc_from_ad(self.ad(), fast_period, slow_period)
+
+    # Patterns
+
+    def pattern_functions(self) -> List[str]:
+        """Names of the candlestick functions the backend offers, e.g. 'CDLHAMMER'."""
+        return sorted(name for name in dir(ta) if name.startswith('CDL'))
+
+    @_node
+    def candle_pattern(self, function: str, window: int = 0) -> np.ndarray:
+        """
+        TA-Lib candlestick function by name, e.g. 'CDLHAMMER': +/-100 where the pattern completes.
+
+        A non-zero `window` evaluates only the last `window` candles.
+        """
+        tail = slice(-window, None) if window else slice(None)
+        inputs = (self.open[..., tail], self.high[..., tail], self.low[..., tail], self.close[..., tail])
+        if self.close.ndim == 1 or ta is ta_numpy:
+            return getattr(self._ta, function)(*inputs)
+        # Most TA-Lib patterns have no NumPy equivalent; run them series by series
+        return np.stack([getattr(ta, function)(*series) for series in zip(*inputs)])
+
+    # Volatility
+
+    @_node
+    def bollinger_bands(self, period: int, nbdev: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(upper, middle, lower) from the shared SMA and standard deviation."""
+        middle = self.sma(period)
+        deviation = nbdev * self.stddev(period)
+        return middle + deviation, middle, middle - deviation
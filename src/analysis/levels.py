@@ -0,0 +1,143 @@
+"""
+Support and resistance zones from swing points.
+
+A swing high is a candle whose high is the highest of the `swing`
+candles on either side; a swing low likewise with lows. Pivots come out
+of one vectorized pass over the engine's rolling extremes, and a run of
+equal extremes counts once, at its first candle.
+
+Nearby pivots, highs and lows alike, are then merged into price zones
+at most `tolerance` times the current ATR wide: pivots are sorted by
+price and each zone boundary is found by bisection, O(n log n) overall.
+Each zone records its price (the mean of its pivots), bounds, touch
+count and last touch.
+
+`LevelMap` keeps the zones sorted by price and answers nearest
+support/resistance queries by bisection.
+
+Usage:
+    level_map = detect_levels(IndicatorEngine(df))[0]
+    level_map.nearest_support(price)
+"""
+import bisect
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .indicators import IndicatorEngine
+
+# ATR period for the zone width
+ATR_PERIOD = 14
+
+
+class LevelMap:
+    """Price zones of one series, sorted by price."""
+
+    def __init__(self, zones: List[Dict]):
+        self.zones = zones
+        self._prices = [zone["price"] for zone in zones]
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def supports(self, price: float, count: int = 3) -> List[Dict]:
+        """The `count` nearest zones below `price`, in ascending price order."""
+        below = bisect.bisect_left(self._prices, price)
+        return self.zones[max(0, below - count):below]
+
+    def resistances(self, price: float, count: int = 3) -> List[Dict]:
+        """The `count` nearest zones above `price`, in ascending price order."""
+        above = bisect.bisect_right(self._prices, price)
+        return self.zones[above:above + count]
+
+    def nearest_support(self, price: float) -> Optional[Dict]:
+        supports = self.supports(price, 1)
+        return supports[0] if supports else None
+
+    def nearest_resistance(self, price: float) -> Optional[Dict]:
+        resistances = self.resistances(price, 1)
+        return resistances[0] if resistances else None
+
+
+def _rows(values: np.ndarray) -> np.ndarray:
+    return np.atleast_2d(values)
+
+
+def swing_points(engine: IndicatorEngine, swing: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Boolean (series x candles) masks of swing highs and swing lows.
+
+    The last `swing` candles are never pivots: their right side is not complete yet.
+    """
+    high, low = _rows(engine.high), _rows(engine.low)
+    candles = high.shape[1]
+
+    def centered(trailing: np.ndarray) -> np.ndarray:
+        # A trailing window of 2 * swing + 1 candles ending `swing` candles later
+        values = np.full(trailing.shape, np.nan)
+        values[:, :candles - swing] = trailing[:, swing:]
+        return values
+
+    def before(trailing: np.ndarray) -> np.ndarray:
+        # Extreme of the `swing` candles before each candle
+        values = np.full(trailing.shape, np.nan)
+        values[:, 1:] = trailing[:, :-1]
+        return values
+
+    with np.errstate(invalid='ignore'):
+        highs = (high == centered(_rows(engine.rolling_high(2 * swing + 1)))) & ~(
+            high <= before(_rows(engine.rolling_high(swing)))
+        )
+        lows = (low == centered(_rows(engine.rolling_low(2 * swing + 1)))) & ~(
+            low >= before(_rows(engine.rolling_low(swing)))
+        )
+    return highs, lows
+
+
+def _cluster(prices: np.ndarray, positions: np.ndarray, width: float) -> List[Dict]:
+    """Group pivots into zones spanning at most `width` in price."""
+    if len(prices) == 0:
+        return []
+    order = np.argsort(prices, kind='stable')
+    prices, positions = prices[order], positions[order]
+    # Each zone takes every pivot within `width` of its lowest one; the next starts after it
+    starts = [0]
+    while True:
+        end = int(np.searchsorted(prices, prices[starts[-1]] + width, side='right'))
+        if end == len(prices):
+            break
+        starts.append(end)
+    starts = np.array(starts)
+    ends = np.concatenate((starts[1:], [len(prices)]))
+    touches = ends - starts
+    columns = (
+        np.add.reduceat(prices, starts) / touches,
+        prices[starts],
+        prices[ends - 1],
+        touches,
+        np.maximum.reduceat(positions, starts),
+    )
+    return [
+        {"price": price, "low": low, "high": high, "touches": count, "last_touch": last}
+        for price, low, high, count, last in zip(*(column.tolist() for column in columns))
+    ]
+
+
+def detect_levels(engine: IndicatorEngine, swing: int = 10, tolerance: float = 1.0) -> List[LevelMap]:
+    """
+    Support/resistance zones of every series in the engine.
+
+    `swing` is the number of candles on each side of a pivot. Zones span
+    at most `tolerance` times the latest ATR; without an ATR (short
+    histories) only equal prices share a zone.
+    """
+    highs, lows = swing_points(engine, swing)
+    atr = _rows(engine.atr(ATR_PERIOD))[:, -1]
+    level_maps = []
+    for row, (high_mask, low_mask) in enumerate(zip(highs, lows)):
+        high_positions, low_positions = np.flatnonzero(high_mask), np.flatnonzero(low_mask)
+        prices = np.concatenate((_rows(engine.high)[row, high_positions], _rows(engine.low)[row, low_positions]))
+        positions = np.concatenate((high_positions, low_positions))
+        width = tolerance * atr[row] if np.isfinite(atr[row]) else 0.0
+        level_maps.append(LevelMap(_cluster(prices, positions, width)))
+    return level_maps
@@ -0,0 +1,155 @@
+"""
+Process-pool execution of technical analysis.
+
+Indicator calculations and their interpretation are CPU-bound and hold
+the GIL, so analyses running in threads share one core. `AnalysisPool`
+runs them in worker processes instead.
+
+OHLCV data reaches the workers through one shared-memory block per call
+rather than as pickled DataFrames: the parent copies each group of
+equally long frames into the block as (column x series x candles)
+float64 arrays and sends every worker only the block name and the
+position of its slice. Workers send back the analysis dicts.
+
+Configuration (environment variables):
+    ANALYSIS_WORKERS: Number of worker processes; 0 analyzes in the calling
+        process (default: 0)
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import OHLCV_COLUMNS, IndicatorEngine, stack_frames
+
+logger = logging.getLogger(__name__)
+
+# Analyzer running the section builders in this process (see _analyzer)
+_block_analyzer = None
+
+
+def _analyzer():
+    global _block_analyzer
+    if _block_analyzer is None:
+        # Imported here because technical imports this module
+        from .technical import TechnicalAnalyzer
+        # Section builders only need the engine, not a data processor
+        _block_analyzer = TechnicalAnalyzer.__new__(TechnicalAnalyzer)
+    return _block_analyzer
+
+
+def _analyze_block(name: str, offset: int, shape: Tuple[int, int, int], sections: Tuple[str, ...]) -> List[Dict]:
+    """Analyze the (column x series x candles) slice at `offset` bytes into shared block `name`."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        view = np.ndarray(shape, dtype=np.float64, buffer=block.buf, offset=offset)
+        arrays = view.copy()
+        del view
+    finally:
+        block.close()
+    # A lone series is analyzed as one, exactly like analyze_dataframe
+    engine = IndicatorEngine.from_arrays(*(arrays if shape[1] > 1 else arrays[:, 0]))
+    return _analyzer()._analyze_engine(engine, sections)
+
+
+class AnalysisPool:
+    """
+    Worker processes for TechnicalAnalyzer.
+
+    The pool starts with the first analysis (or `start()`) and lives until
+    `shutdown()`. If a worker dies, the analyses of that call run in the
+    calling process and the pool is restarted on the next call.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self._workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        # Read lazily so values loaded from .env after import still apply
+        if self._workers is None:
+            return int(os.getenv('ANALYSIS_WORKERS', 0))
+        return self._workers
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Workers must inherit the parent's tracker; one of their own would
+                # report the parent's blocks as leaked when they exit
+                resource_tracker.ensure_running()
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def start(self) -> None:
+        """Start the worker processes now rather than on the first analysis."""
+        if self.enabled:
+            executor = self._get_executor()
+            for future in [executor.submit(int) for _ in range(self.workers)]:
+                future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def analyze(self, frames: Sequence[pd.DataFrame], sections: Tuple[str, ...]) -> List[Dict]:
+        """
+        Analyze non-empty OHLCV frames in the workers; one analysis per frame, in order.
+
+        Frames with the same number of candles are split into one stacked
+        chunk per worker, so a multi-coin scan uses every worker while a
+        single frame costs one task.
+        """
+        if not frames:
+            return []
+        groups: Dict[int, List[int]] = {}
+        for position, df in enumerate(frames):
+            groups.setdefault(len(df), []).append(position)
+
+        chunks = []
+        for positions in groups.values():
+            for chunk in np.array_split(positions, min(self.workers, len(positions))):
+                chunks.append(chunk.tolist())
+
+        size = sum(len(OHLCV_COLUMNS) * len(chunk) * len(frames[chunk[0]]) for chunk in chunks) * 8
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            tasks = []
+            offset = 0
+            for chunk in chunks:
+                stacked = stack_frames([frames[position] for position in chunk])
+                np.ndarray(stacked.shape, dtype=np.float64, buffer=block.buf, offset=offset)[...] = stacked
+                tasks.append((offset, stacked.shape))
+                offset += stacked.nbytes
+
+            try:
+                executor = self._get_executor()
+                futures = [executor.submit(_analyze_block, block.name, offset, shape, sections) for offset, shape in tasks]
+                chunk_results = [future.result() for future in futures]
+            except BrokenProcessPool:
+                logger.error("Analysis worker died, analyzing in-process")
+                self.shutdown()
+                chunk_results = [_analyze_block(block.name, offset, shape, sections) for offset, shape in tasks]
+        finally:
+            block.close()
+            block.unlink()
+
+        results = [None] * len(frames)
+        for chunk, analyses in zip(chunks, chunk_results):
+            for position, analysis in zip(chunk, analyses):
+                results[position] = analysis
+        return results
+
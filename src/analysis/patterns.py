@@ -0,0 +1,153 @@
+"""
+Candlestick pattern events over the full price history.
+
+Every candlestick function of the indicator backend (all of TA-Lib's
+pattern recognition group, or the `ta_numpy` subset) runs over the series
+in one pass, and only the candles where a pattern completed are kept: a
+sparse index of timestamp, pattern and direction instead of one mostly
+zero array per pattern.
+
+`PatternScanner.scan()` builds that index for charts, cached per key and
+data version. `recent_patterns()` reports the last few candles of every
+series in an engine, which is what the analysis summary uses.
+
+Usage:
+    events = PatternScanner().scan(df, key=('bitcoin', 'usd', 30))
+    events.recent(10)
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import IndicatorEngine, data_version
+
+EVENT_COLUMNS = ('timestamp', 'position', 'pattern', 'direction', 'strength')
+
+# Indecision patterns: their sign carries no direction (doji-like patterns are always +100)
+NEUTRAL_PATTERNS = {'CDLDOJI', 'CDLLONGLEGGEDDOJI', 'CDLRICKSHAWMAN', 'CDLSPINNINGTOP', 'CDLHIGHWAVE'}
+
+
+def pattern_name(function: str) -> str:
+    """Pattern name for a candlestick function: 'CDLMORNINGSTAR' -> 'morningstar'."""
+    return function[3:].lower()
+
+
+def _scan(engine: IndicatorEngine, window: int = 0) -> Tuple[List[str], np.ndarray]:
+    """
+    Run every candlestick function of the engine's backend.
+
+    Returns the function names and a (series x patterns x candles) array
+    of their outputs; a non-zero `window` covers only the last candles.
+    """
+    functions = engine.pattern_functions()
+    values = np.stack([engine.candle_pattern(function, window) for function in functions], axis=-2)
+    return functions, values if values.ndim == 3 else values[np.newaxis]
+
+
+def _directions(functions: List[str], patterns: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """'Bullish', 'Bearish' or 'Neutral' for each hit of pattern index `patterns` with output `values`."""
+    neutral = np.array([function in NEUTRAL_PATTERNS for function in functions], dtype=bool)
+    return np.select([neutral[patterns], values > 0], ['Neutral', 'Bullish'], 'Bearish')
+
+
+def recent_patterns(engine: IndicatorEngine, candles: int, lookback: int) -> List[List[Dict]]:
+    """
+    Patterns completed on the last `candles` candles of every series, most recent first.
+
+    Only the last `candles + lookback` candles are evaluated, where
+    `lookback` covers the history the patterns need. Returns one list of
+    {"pattern", "direction", "candles_ago"} per series.
+    """
+    functions, values = _scan(engine, candles + lookback)
+    names = np.array([pattern_name(function) for function in functions])
+    # Latest candle first
+    values = values[..., :-candles - 1:-1]
+    recent = []
+    for series in values:
+        candles_ago, patterns = np.nonzero(series.T)
+        directions = _directions(functions, patterns, series[patterns, candles_ago])
+        recent.append([
+            {"pattern": pattern, "direction": direction, "candles_ago": ago}
+            for pattern, direction, ago in zip(names[patterns].tolist(), directions.tolist(), candles_ago.tolist())
+        ])
+    return recent
+
+
+class PatternEvents:
+    """
+    Completed candlestick patterns over one OHLCV series.
+
+    `events` has one row per candle and pattern that fired, in candle
+    order, with the columns of EVENT_COLUMNS: candle timestamp and
+    position, pattern name, direction ('Bullish', 'Bearish', or 'Neutral'
+    for indecision patterns) and strength (the absolute backend output,
+    200 for confirmed patterns).
+    """
+
+    def __init__(self, events: pd.DataFrame, length: int):
+        self.events = events
+        self.length = length
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def recent(self, candles: int) -> pd.DataFrame:
+        """Events of the last `candles` candles, with a candles_ago column."""
+        recent = self.events[self.events['position'] >= self.length - candles]
+        return recent.assign(candles_ago=self.length - 1 - recent['position'])
+
+    def last_seen(self) -> Dict[str, int]:
+        """Candles since each pattern last completed."""
+        last = self.events.groupby('pattern', sort=False)['position'].max()
+        return {pattern: self.length - 1 - position for pattern, position in last.items()}
+
+
+class PatternScanner:
+    """
+    Full-history pattern scans, cached per key and data version.
+
+    Scans for a key (e.g. (coin_id, vs_currency, days)) are reused while
+    the OHLCV data is unchanged. The cache is shared by all scanners.
+    """
+    CACHE_SIZE = 256
+    _cache: "OrderedDict[Hashable, Tuple[Tuple, PatternEvents]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def scan(self, df: pd.DataFrame, key: Optional[Hashable] = None) -> PatternEvents:
+        """Index every completed pattern in `df`; cached when a key is given."""
+        version = data_version(df)
+        if key is not None:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] == version:
+                    self._cache.move_to_end(key)
+                    return cached[1]
+
+        events = self._index(df)
+
+        if key is not None:
+            with self._cache_lock:
+                self._cache[key] = (version, events)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return events
+
+    @staticmethod
+    def _index(df: pd.DataFrame) -> PatternEvents:
+        functions, values = _scan(IndicatorEngine(df))
+        names = np.array([pattern_name(function) for function in functions])
+        # Candle-major order, patterns of a candle in name order
+        positions, patterns = np.nonzero(values[0].T)
+        hits = values[0][patterns, positions]
+        events = pd.DataFrame({
+            'timestamp': df.index[positions],
+            'position': positions,
+            'pattern': names[patterns],
+            'direction': _directions(functions, patterns, hits),
+            'strength': np.abs(hits),
+        }, columns=list(EVENT_COLUMNS))
+        return PatternEvents(events, len(df))
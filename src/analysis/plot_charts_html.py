@@ -200,8 +200,35 @@ def create_rsi_chart(df, rsi_data, style):
     )
     return fig
 
-def create_support_resistance_chart(df, support_levels, resistance_levels, style):
-    """Create a support and resistance chart using plotly."""
+def create_pattern_chart(df, pattern_events, style):
+    """Create a candlestick chart annotated with candlestick pattern events."""
+    fig = create_candlestick_chart(df, style)
+
+    # Bullish patterns below the candle, bearish above, indecision at the close
+    markers = {
+        'Bullish': ('low', 'triangle-up', 'green'),
+        'Bearish': ('high', 'triangle-down', 'red'),
+        'Neutral': ('close', 'circle', 'gray'),
+    }
+    for direction, (anchor, symbol, color) in markers.items():
+        events = pattern_events[pattern_events['direction'] == direction]
+        if events.empty:
+            continue
+        fig.add_trace(go.Scatter(
+            x=events['timestamp'],
+            y=df[anchor].to_numpy()[events['position'].to_numpy()],
+            mode='markers',
+            marker=dict(symbol=symbol, color=color, size=8),
+            text=events['pattern'],
+            hoverinfo='text+x',
+            name=f'{direction} patterns'
+        ))
+
+    fig.update_layout(title='Candlestick Patterns', xaxis_rangeslider_visible=False)
+    return fig
+
+def create_support_resistance_chart(df, support_levels, resistance_levels, style, zones=None):
+    """Create a support and resistance chart using plotly; `zones` are shaded with their touch counts."""
     fig = go.Figure()
     
     fig.add_trace(
@@ -221,6 +248,13 @@ def create_support_resistance_chart(df, support_levels, resistance_levels, style
     # Add resistance levels
     for level in resistance_levels:
         fig.add_hline(y=level, line_dash="dash", line_color="red")
+
+    # Shade the price zones the levels were clustered from
+    for zone in zones or []:
+        fig.add_hrect(
+            y0=zone['low'], y1=zone['high'], fillcolor="gray", opacity=0.15, line_width=0,
+            annotation_text=f"{zone['touches']} touches", annotation_position="right"
+        )
     
     fig.update_layout(
         title='Support & Resistance',
@@ -366,7 +400,7 @@ def create_technical_cards(df, ma_data=None, rsi_data=None):
         return dp.Text("Error creating technical cards")
 
 async def save_charts_to_pdf(directory,filename, df, ma_data=None, macd_data=None, rsi_data=None, 
-                      support_levels=None, resistance_levels=None, style=None, 
+                      support_levels=None, resistance_levels=None, zones=None, pattern_events=None, style=None, 
                       charts_to_include=None, labels=None, intro_text=None, 
                       max_lines_per_page=7):
     """
@@ -445,8 +479,13 @@ async def save_charts_to_pdf(directory,filename, df, ma_data=None, macd_data=Non
                     image_path =  f"{directory}/plot_image.png"
                     pio.write_image(fig, image_path, format="png", width=800, height=600)
                     blocks.append(dp.Media(file=image_path))
-                elif chart == "support_resistance" and support_levels and resistance_levels:
-                    fig = create_support_resistance_chart(df, support_levels, resistance_levels, style)
+                elif chart == "patterns" and pattern_events is not None and not pattern_events.empty:
+                    fig = create_pattern_chart(df, pattern_events, style)
+                    image_path =  f"{directory}/plot_image.png"
+                    pio.write_image(fig, image_path, format="png", width=800, height=600)
+                    blocks.append(dp.Media(file=image_path))
+                elif chart == "support_resistance" and (support_levels or resistance_levels):
+                    fig = create_support_resistance_chart(df, support_levels or [], resistance_levels or [], style, zones)
                     image_path =  f"{directory}/plot_image.png"
                     pio.write_image(fig, image_path, format="png", width=800, height=600)
                     blocks.append(dp.Media(file=image_path))
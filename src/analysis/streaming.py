@@ -0,0 +1,485 @@
+"""
+Incremental indicator state for continuous monitoring.
+
+Each state object holds a constant amount of data (a few running values,
+plus a window of at most `period` candles for Bollinger Bands and the
+Stochastic) and advances by one candle with `update(candle)` instead of
+recomputing the whole history.
+
+States are seeded from a batch `IndicatorEngine` run over the cached
+history with `StreamingIndicators.from_dataframe(df)`, and serialize with
+`to_dict()` / `from_dict()` so they are stored next to the OHLCV cache:
+every refresh of a cached series resumes the saved state with the new
+candles (see `DataProcessor.update_streaming_indicators`). RSI, ATR and ADX seeded from too
+short a history keep their few candles and seed themselves once enough
+have arrived, so their values match a batch run over the whole series.
+
+Only closed candles are folded into the states. The newest candle of a
+frame may still be forming, so `StreamingIndicators` holds it apart and
+applies it to a copy of the states when reporting values; a later frame
+with the revised candle replaces it.
+
+A candle is any mapping with 'open', 'high', 'low', 'close' and 'volume'.
+"""
+from collections import deque
+from typing import Deque, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import IndicatorEngine
+
+
+def _last_valid(values: np.ndarray) -> Optional[float]:
+    valid = values[~np.isnan(values)]
+    return float(valid[-1]) if len(valid) else None
+
+
+def _recent_candles(engine: IndicatorEngine, count: int) -> List[List[float]]:
+    """[high, low, close] of the last `count` candles, for states still warming up."""
+    return np.column_stack((engine.high, engine.low, engine.close))[-count:].tolist()
+
+
+class IndicatorState:
+    """Base class: subclasses define `update`, `value`, `seed` and the serialized fields."""
+    name = ''
+    fields: Tuple[str, ...] = ()
+
+    def update(self, candle: Mapping[str, float]):
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        raise NotImplementedError
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine) -> 'IndicatorState':
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict:
+        state = {}
+        for field in self.fields:
+            value = getattr(self, field)
+            state[field] = list(value) if isinstance(value, deque) else value
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'IndicatorState':
+        obj = cls.__new__(cls)
+        for field in cls.fields:
+            setattr(obj, field, state.get(field))
+        obj._restore()
+        return obj
+
+    def _restore(self) -> None:
+        """Rebuild derived attributes (e.g. deques) after `from_dict`."""
+
+    def warmup_candles(self) -> int:
+        """Candles `seed` needs to produce a value (states that warm up only)."""
+        raise NotImplementedError
+
+    def _warm_up(self, candle: Mapping[str, float]) -> None:
+        """Keep `candle` until there are enough to seed from, then seed from them."""
+        self.warmup = (self.warmup or []) + [[candle['high'], candle['low'], candle['close']]]
+        if len(self.warmup) >= self.warmup_candles():
+            high, low, close = np.array(self.warmup, dtype=np.float64).T
+            engine = IndicatorEngine.from_arrays(close, high, low, close, np.zeros_like(close))
+            self.__dict__.update(self.seed(engine, self.period).__dict__)
+
+
+class EMAState(IndicatorState):
+    name = 'ema'
+    fields = ('period', 'ema')
+
+    def __init__(self, period: int, ema: Optional[float] = None):
+        self.period = period
+        self.ema = ema
+
+    def update(self, candle: Mapping[str, float]) -> Optional[float]:
+        return self.update_value(candle['close'])
+
+    def update_value(self, x: float) -> Optional[float]:
+        if self.ema is None:
+            self.ema = x
+        else:
+            self.ema += 2.0 / (self.period + 1) * (x - self.ema)
+        return self.ema
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.ema
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine, period: int = 20) -> 'EMAState':
+        return cls(period, _last_valid(engine.ema(period)))
+
+
+class RSIState(IndicatorState):
+    name = 'rsi'
+    fields = ('period', 'avg_gain', 'avg_loss', 'prev_close', 'warmup')
+
+    def __init__(self, period: int = 14, avg_gain: Optional[float] = None,
+                 avg_loss: Optional[float] = None, prev_close: Optional[float] = None, warmup=None):
+        self.period = period
+        self.avg_gain = avg_gain
+        self.avg_loss = avg_loss
+        self.prev_close = prev_close
+        self.warmup = warmup
+
+    def warmup_candles(self) -> int:
+        return self.period + 1
+
+    def update(self, candle: Mapping[str, float]) -> Optional[float]:
+        if self.avg_gain is None:
+            self._warm_up(candle)
+            return self.value
+        change = candle['close'] - self.prev_close
+        self.avg_gain += (max(change, 0.0) - self.avg_gain) / self.period
+        self.avg_loss += (max(-change, 0.0) - self.avg_loss) / self.period
+        self.prev_close = candle['close']
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.avg_gain is None:
+            return None
+        total = self.avg_gain + self.avg_loss
+        return 100.0 * self.avg_gain / total if total != 0 else 0.0
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine, period: int = 14) -> 'RSIState':
+        close = engine.close
+        if len(close) <= period:
+            return cls(period, warmup=_recent_candles(engine, period + 1))
+        change = np.diff(close)
+        gains = pd.Series(np.clip(change, 0, None))
+        losses = pd.Series(np.clip(-change, 0, None))
+        # Same Wilder seeding as TA-Lib: simple mean of the first `period` changes
+        avg_gain = gains.iloc[:period].mean()
+        avg_loss = losses.iloc[:period].mean()
+        smoothed_gain = pd.Series(np.concatenate(([avg_gain], gains.iloc[period:].to_numpy())))
+        smoothed_loss = pd.Series(np.concatenate(([avg_loss], losses.iloc[period:].to_numpy())))
+        alpha = 1.0 / period
+        return cls(
+            period,
+            float(smoothed_gain.ewm(alpha=alpha, adjust=False).mean().iloc[-1]),
+            float(smoothed_loss.ewm(alpha=alpha, adjust=False).mean().iloc[-1]),
+            float(close[-1])
+        )
+
+
+class MACDState(IndicatorState):
+    """MACD from running 12/26 EMAs of the close and a 9-period EMA signal line."""
+    name = 'macd'
+    fields = ('fast', 'slow', 'signal')
+
+    def __init__(self, fast: EMAState = None, slow: EMAState = None, signal: EMAState = None):
+        self.fast = fast or EMAState(12)
+        self.slow = slow or EMAState(26)
+        self.signal = signal or EMAState(9)
+
+    def update(self, candle: Mapping[str, float]) -> Optional[Tuple[float, float, float]]:
+        self.fast.update(candle)
+        self.slow.update(candle)
+        self.signal.update_value(self.fast.ema - self.slow.ema)
+        return self.value
+
+    @property
+    def value(self) -> Optional[Tuple[float, float, float]]:
+        if self.fast.ema is None or self.slow.ema is None or self.signal.ema is None:
+            return None
+        macd = self.fast.ema - self.slow.ema
+        return macd, self.signal.ema, macd - self.signal.ema
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine) -> 'MACDState':
+        fast = engine.ema(12)
+        slow = engine.ema(26)
+        line = fast - slow
+        valid = line[~np.isnan(line)]
+        signal = pd.Series(valid).ewm(span=9, adjust=False).mean().iloc[-1] if len(valid) else None
+        return cls(EMAState(12, _last_valid(fast)), EMAState(26, _last_valid(slow)),
+                   EMAState(9, None if signal is None else float(signal)))
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name).to_dict() for name in self.fields}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'MACDState':
+        return cls(*(EMAState.from_dict(state[name]) for name in cls.fields))
+
+
+class ATRState(IndicatorState):
+    name = 'atr'
+    fields = ('period', 'atr', 'prev_close', 'warmup')
+
+    def __init__(self, period: int = 14, atr: Optional[float] = None, prev_close: Optional[float] = None,
+                 warmup=None):
+        self.period = period
+        self.atr = atr
+        self.prev_close = prev_close
+        self.warmup = warmup
+
+    def warmup_candles(self) -> int:
+        return self.period + 1
+
+    def update(self, candle: Mapping[str, float]) -> Optional[float]:
+        if self.atr is None:
+            self._warm_up(candle)
+            return self.atr
+        true_range = max(
+            candle['high'] - candle['low'],
+            abs(candle['high'] - self.prev_close),
+            abs(candle['low'] - self.prev_close)
+        )
+        self.atr += (true_range - self.atr) / self.period
+        self.prev_close = candle['close']
+        return self.atr
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.atr
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine, period: int = 14) -> 'ATRState':
+        atr = _last_valid(engine.atr(period)) if len(engine) else None
+        if atr is None:
+            return cls(period, warmup=_recent_candles(engine, period + 1))
+        return cls(period, atr, float(engine.close[-1]))
+
+
+class OBVState(IndicatorState):
+    name = 'obv'
+    fields = ('obv', 'prev_close')
+
+    def __init__(self, obv: float = 0.0, prev_close: Optional[float] = None):
+        self.obv = obv
+        self.prev_close = prev_close
+
+    def update(self, candle: Mapping[str, float]) -> float:
+        if self.prev_close is None:
+            self.obv = candle['volume']
+        elif candle['close'] > self.prev_close:
+            self.obv += candle['volume']
+        elif candle['close'] < self.prev_close:
+            self.obv -= candle['volume']
+        self.prev_close = candle['close']
+        return self.obv
+
+    @property
+    def value(self) -> float:
+        return self.obv
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine) -> 'OBVState':
+        if not len(engine):
+            return cls()
+        return cls(_last_valid(engine.obv()) or 0.0, float(engine.close[-1]))
+
+
+class BollingerState(IndicatorState):
+    """Bollinger Bands over a fixed window of the last `period` closes."""
+    name = 'bollinger_bands'
+    fields = ('period', 'nbdev', 'window')
+
+    def __init__(self, period: int = 20, nbdev: float = 2.0, window=None):
+        self.period = period
+        self.nbdev = nbdev
+        self.window = window
+        self._restore()
+
+    def _restore(self) -> None:
+        self.window: Deque[float] = deque(self.window or [], maxlen=self.period)
+
+    def update(self, candle: Mapping[str, float]) -> Optional[Tuple[float, float, float]]:
+        self.window.append(candle['close'])
+        return self.value
+
+    @property
+    def value(self) -> Optional[Tuple[float, float, float]]:
+        if len(self.window) < self.period:
+            return None
+        # Recomputed from the window (O(period)) rather than running sums, which drift
+        closes = np.fromiter(self.window, dtype=np.float64, count=self.period)
+        middle = float(closes.mean())
+        deviation = self.nbdev * float(closes.std())
+        return middle + deviation, middle, middle - deviation
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine, period: int = 20, nbdev: float = 2.0) -> 'BollingerState':
+        return cls(period, nbdev, engine.close[-period:].tolist())
+
+
+class StochasticState(IndicatorState):
+    """Slow stochastic: windows of highs/lows for %K and short windows for the two SMAs."""
+    name = 'stochastic'
+    fields = ('fastk_period', 'slowk_period', 'slowd_period', 'highs', 'lows', 'fastk', 'slowk')
+
+    def __init__(self, fastk_period: int = 14, slowk_period: int = 3, slowd_period: int = 3,
+                 highs=None, lows=None, fastk=None, slowk=None):
+        self.fastk_period = fastk_period
+        self.slowk_period = slowk_period
+        self.slowd_period = slowd_period
+        self.highs, self.lows, self.fastk, self.slowk = highs, lows, fastk, slowk
+        self._restore()
+
+    def _restore(self) -> None:
+        self.highs = deque(self.highs or [], maxlen=self.fastk_period)
+        self.lows = deque(self.lows or [], maxlen=self.fastk_period)
+        self.fastk = deque(self.fastk or [], maxlen=self.slowk_period)
+        self.slowk = deque(self.slowk or [], maxlen=self.slowd_period)
+
+    def update(self, candle: Mapping[str, float]) -> Optional[Tuple[float, float]]:
+        self.highs.append(candle['high'])
+        self.lows.append(candle['low'])
+        if len(self.highs) == self.fastk_period:
+            highest, lowest = max(self.highs), min(self.lows)
+            spread = highest - lowest
+            self.fastk.append(100.0 * (candle['close'] - lowest) / spread if spread != 0 else 0.0)
+            if len(self.fastk) == self.slowk_period:
+                self.slowk.append(sum(self.fastk) / self.slowk_period)
+        return self.value
+
+    @property
+    def value(self) -> Optional[Tuple[float, float]]:
+        if len(self.slowk) < self.slowd_period:
+            return None
+        return self.slowk[-1], sum(self.slowk) / self.slowd_period
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine, fastk_period: int = 14, slowk_period: int = 3,
+             slowd_period: int = 3) -> 'StochasticState':
+        highest = engine.rolling_high(fastk_period)
+        lowest = engine.rolling_low(fastk_period)
+        spread = highest - lowest
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fastk = np.where(spread != 0, 100.0 * (engine.close - lowest) / spread, 0.0)
+        fastk = fastk[~np.isnan(spread)]
+        slowk = pd.Series(fastk).rolling(slowk_period).mean().dropna().to_numpy()
+        return cls(
+            fastk_period, slowk_period, slowd_period,
+            engine.high[-fastk_period:].tolist(), engine.low[-fastk_period:].tolist(),
+            fastk[-slowk_period:].tolist(), slowk[-slowd_period:].tolist()
+        )
+
+
+class ADXState(IndicatorState):
+    name = 'adx'
+    fields = ('period', 'tr', 'plus_dm', 'minus_dm', 'adx', 'prev_high', 'prev_low', 'prev_close', 'warmup')
+
+    def __init__(self, period: int = 14, tr: Optional[float] = None, plus_dm: Optional[float] = None,
+                 minus_dm: Optional[float] = None, adx: Optional[float] = None,
+                 prev_high: Optional[float] = None, prev_low: Optional[float] = None,
+                 prev_close: Optional[float] = None, warmup=None):
+        self.period = period
+        self.tr, self.plus_dm, self.minus_dm, self.adx = tr, plus_dm, minus_dm, adx
+        self.prev_high, self.prev_low, self.prev_close = prev_high, prev_low, prev_close
+        self.warmup = warmup
+
+    def warmup_candles(self) -> int:
+        return 2 * self.period
+
+    def update(self, candle: Mapping[str, float]) -> Optional[float]:
+        if self.adx is None:
+            self._warm_up(candle)
+            return self.adx
+        high, low = candle['high'], candle['low']
+        up = high - self.prev_high
+        down = self.prev_low - low
+        minus = down if down > 0 and up < down else 0.0
+        plus = up if up > 0 and up > down else 0.0
+        true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.tr += (true_range - self.tr) / self.period
+        self.plus_dm += (plus - self.plus_dm) / self.period
+        self.minus_dm += (minus - self.minus_dm) / self.period
+        if abs(self.tr) >= 1e-8:
+            plus_di = 100.0 * self.plus_dm / self.tr
+            minus_di = 100.0 * self.minus_dm / self.tr
+            di_sum = plus_di + minus_di
+            if abs(di_sum) >= 1e-8:
+                dx = 100.0 * abs(minus_di - plus_di) / di_sum
+                self.adx += (dx - self.adx) / self.period
+        self.prev_high, self.prev_low, self.prev_close = high, low, candle['close']
+        return self.adx
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.adx
+
+    @classmethod
+    def seed(cls, engine: IndicatorEngine, period: int = 14) -> 'ADXState':
+        adx = _last_valid(engine.adx(period)) if len(engine) else None
+        if adx is None:
+            return cls(period, warmup=_recent_candles(engine, 2 * period))
+        tr, plus_dm, minus_dm, _ = engine.directional_index(period)
+        last = (float(engine.high[-1]), float(engine.low[-1]), float(engine.close[-1]))
+        return cls(period, float(tr[-1]), float(plus_dm[-1]), float(minus_dm[-1]), adx, *last)
+
+
+# Indicators tracked by StreamingIndicators, in report order
+STATE_TYPES = (RSIState, EMAState, MACDState, ATRState, OBVState, BollingerState, StochasticState, ADXState)
+
+
+class StreamingIndicators:
+    """
+    A set of indicator states advanced together, one closed candle at a time.
+
+    `pending` is the newest candle seen, which may still be forming: it is
+    reflected in `values()` but not folded into the states, so the states
+    (and `to_dict()`) cover candles up to `last_timestamp` only.
+    """
+
+    def __init__(self, states: Dict[str, IndicatorState], last_timestamp: Optional[pd.Timestamp] = None):
+        self.states = states
+        self.last_timestamp = last_timestamp
+        self.pending: Optional[Dict[str, float]] = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'StreamingIndicators':
+        """Seed every state from one batch computation over the closed candles of `df`."""
+        closed = df.iloc[:-1]
+        engine = IndicatorEngine(closed)
+        indicators = cls({state_type.name: state_type.seed(engine) for state_type in STATE_TYPES},
+                         closed.index[-1] if len(closed) else None)
+        if len(df):
+            indicators.pending = df.iloc[-1].to_dict()
+        return indicators
+
+    def update(self, candle: Mapping[str, float], timestamp: Optional[pd.Timestamp] = None) -> Dict[str, object]:
+        """Fold one closed candle into every state and return the new values."""
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+        self.pending = None
+        return {name: state.update(candle) for name, state in self.states.items()}
+
+    def update_many(self, df: pd.DataFrame) -> Dict[str, object]:
+        """
+        Fold the closed candles of `df` newer than the last one folded in; return the latest values.
+
+        The last candle of `df` becomes `pending`, replacing any earlier
+        (possibly since revised) version of it.
+        """
+        if self.last_timestamp is not None:
+            df = df[df.index > self.last_timestamp]
+        if df.empty:
+            return self.values()
+        for timestamp, candle in zip(df.index[:-1], df.iloc[:-1].to_dict('records')):
+            self.update(candle, timestamp)
+        self.pending = df.iloc[-1].to_dict()
+        return self.values()
+
+    def values(self) -> Dict[str, object]:
+        """Latest values, including the pending candle."""
+        if self.pending is None:
+            return {name: state.value for name, state in self.states.items()}
+        preview = StreamingIndicators.from_dict(self.to_dict())
+        return preview.update(self.pending)
+
+    def to_dict(self) -> Dict:
+        """Serialized states of the closed candles (the pending candle is not included)."""
+        return {name: state.to_dict() for name, state in self.states.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict, last_timestamp: Optional[pd.Timestamp] = None) -> 'StreamingIndicators':
+        types = {state_type.name: state_type for state_type in STATE_TYPES}
+        return cls({name: types[name].from_dict(state) for name, state in data.items()}, last_timestamp)
@@ -0,0 +1,37 @@
+"""
+Technical-analysis backend selection.
+
+`ta` is either the `talib` module or `ta_numpy`, which implements the
+subset of TA-Lib the analyzer uses with the same names and semantics.
+The choice is made once, at import time:
+
+    TA_BACKEND=talib   require TA-Lib (import fails if it is missing)
+    TA_BACKEND=numpy   always use the NumPy implementation
+    unset / "auto"     TA-Lib when it is installed, NumPy otherwise
+
+Usage:
+    from .ta_backend import ta
+    ta.RSI(close, timeperiod=14)
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+_requested = os.getenv('TA_BACKEND', 'auto').strip().lower()
+
+if _requested not in ('auto', 'talib', 'numpy'):
+    raise ValueError(f"Unknown TA_BACKEND {_requested!r}; expected 'auto', 'talib' or 'numpy'")
+
+if _requested == 'numpy':
+    from . import ta_numpy as ta
+else:
+    try:
+        import talib as ta
+    except ImportError:
+        if _requested == 'talib':
+            raise
+        from . import ta_numpy as ta
+
+BACKEND = 'talib' if ta.__name__ == 'talib' else 'numpy'
+logger.debug(f"Using the {BACKEND} technical-analysis backend")
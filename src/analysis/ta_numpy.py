@@ -0,0 +1,626 @@
+"""
+Pure-NumPy implementations of the TA-Lib functions used by the analyzer.
+
+Functions use TA-Lib's names, argument names and defaults, and follow
+TA-Lib's seeding and warm-up rules, so they can stand in for `talib` when
+it is not installed (see `ta_backend`). Undefined leading values are NaN;
+candlestick functions return int32 arrays of 0/±100 like TA-Lib.
+
+All functions work along the last axis, so a 2-D array of equally long
+series (one row per coin) is processed in one call.
+
+The lowercase helpers (`true_range`, `wilder`, `rolling_max`, ...) are the
+building blocks of the TA-Lib functions; `IndicatorEngine` calls them
+directly to share intermediates between indicators.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# TA-Lib's TA_IS_ZERO / TA_IS_ZERO_OR_NEG tolerance
+EPSILON = 1e-8
+
+# Candles per block in the batched EWM
+EWM_BLOCK = 64
+
+# TA-Lib's default candle settings: (range type, average period, factor)
+CANDLE_SETTINGS = {
+    'BodyLong': ('real_body', 10, 1.0),
+    'BodyShort': ('real_body', 10, 1.0),
+    'ShadowLong': ('real_body', 0, 1.0),
+    'ShadowVeryShort': ('high_low', 10, 0.1),
+    'Near': ('high_low', 5, 0.2),
+}
+
+
+def _as_float(*arrays) -> Tuple[np.ndarray, ...]:
+    return tuple(np.asarray(values, dtype=np.float64) for values in arrays)
+
+
+def _nan_like(values: np.ndarray) -> np.ndarray:
+    return np.full(values.shape, np.nan)
+
+
+def _is_zero(values: np.ndarray) -> np.ndarray:
+    return np.abs(values) < EPSILON
+
+
+def _length(values: np.ndarray) -> int:
+    return values.shape[-1]
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Shift along the last axis by `periods` candles, filling with NaN."""
+    out = _nan_like(values)
+    if 0 < periods < _length(values):
+        out[..., periods:] = values[..., :-periods]
+    elif periods == 0:
+        out[...] = values
+    return out
+
+
+def _ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Recursive smoothing out[i] = out[i-1] + alpha * (values[i] - out[i-1]) along the last axis."""
+    if values.ndim == 2 and not np.isnan(values).any():
+        return _ewm_blocks(values, alpha)
+    frame = pd.DataFrame(np.atleast_2d(values).T)
+    smoothed = frame.ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy(copy=True).T
+    return smoothed.reshape(values.shape)
+
+
+def _ewm_blocks(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    `_ewm` for NaN-free (series x candles) arrays.
+
+    Pandas smooths a DataFrame one column at a time. Here each block of
+    EWM_BLOCK candles is smoothed for all series at once with a
+    lower-triangular matrix product, and only the last value of each block
+    is carried forward in a short Python loop.
+    """
+    decay = 1.0 - alpha
+    rows, length = values.shape
+    block = min(EWM_BLOCK, length)
+    blocks = -(-length // block)
+    padded = np.zeros((rows, blocks * block))
+    padded[:, :length] = values
+    i, j = np.indices((block, block))
+    weights = np.where(i >= j, alpha * decay ** np.maximum(i - j, 0), 0.0)
+    out = padded.reshape(rows, blocks, block) @ weights.T
+    # Carry the previous block's last value (the first value seeds the first block)
+    carry_weights = decay ** np.arange(1, block + 1)
+    carry = values[:, 0]
+    for b in range(blocks):
+        out[:, b] += carry[:, None] * carry_weights
+        carry = out[:, b, -1]
+    return out.reshape(rows, -1)[:, :length]
+
+
+def _rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """Sums of each full window of `period` candles (NaN if the window has a NaN)."""
+    missing = np.isnan(values)
+    has_missing = missing.any()
+    totals = np.cumsum(np.where(missing, 0.0, values) if has_missing else values, axis=-1)
+    sums = totals[..., period - 1:].copy()
+    sums[..., 1:] -= totals[..., :-period]
+    if has_missing:
+        counts = np.cumsum(missing, axis=-1)
+        gaps = counts[..., period - 1:].copy()
+        gaps[..., 1:] -= counts[..., :-period]
+        sums[gaps > 0] = np.nan
+    return sums
+
+
+# Building blocks
+
+def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    out = _nan_like(values)
+    if _length(values) >= period:
+        out[..., period - 1:] = _rolling_sum(values, period) / period
+    return out
+
+
+def _rolling_extreme(values: np.ndarray, period: int, ufunc, identity: float) -> np.ndarray:
+    """
+    Rolling max/min in O(n) (van Herk/Gil-Werman).
+
+    The series is cut into blocks of `period` candles; each window spans the
+    tail of one block and the head of the next, so its extreme is the
+    combination of a running suffix and a running prefix.
+    """
+    out = _nan_like(values)
+    length = _length(values)
+    if length < period:
+        return out
+    blocks = -(-length // period)
+    padded = np.full(values.shape[:-1] + (blocks * period,), identity)
+    padded[..., :length] = values
+    shaped = padded.reshape(values.shape[:-1] + (blocks, period))
+    prefix = ufunc.accumulate(shaped, axis=-1).reshape(padded.shape)
+    suffix = np.flip(ufunc.accumulate(np.flip(shaped, axis=-1), axis=-1), axis=-1).reshape(padded.shape)
+    out[..., period - 1:] = ufunc(suffix[..., :length - period + 1], prefix[..., period - 1:length])
+    return out
+
+
+def rolling_max(values: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_extreme(values, period, np.maximum, -np.inf)
+
+
+def rolling_min(values: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_extreme(values, period, np.minimum, np.inf)
+
+
+def smooth(values: np.ndarray, seed, start: int, alpha: float) -> np.ndarray:
+    """
+    out[start] = seed, then out[i] = out[i-1] + alpha * (values[i] - out[i-1]).
+
+    NaN inputs after `start` leave the previous value unchanged.
+    """
+    out = _nan_like(values)
+    if start >= _length(values):
+        return out
+    seed = np.asarray(seed, dtype=np.float64)[..., None]
+    out[..., start:] = _ewm(np.concatenate((seed, values[..., start + 1:]), axis=-1), alpha)
+    return out
+
+
+def wilder(values: np.ndarray, seed, start: int, period: int) -> np.ndarray:
+    """Wilder smoothing: out[i] = (out[i-1] * (period - 1) + values[i]) / period."""
+    return smooth(values, seed, start, 1.0 / period)
+
+
+def ema(values: np.ndarray, period: int, start: int = 0) -> np.ndarray:
+    """EMA seeded with the mean of values[start:start + period], as TA-Lib does."""
+    first = start + period - 1
+    if first >= _length(values):
+        return _nan_like(values)
+    seed = values[..., start:first + 1].mean(axis=-1)
+    return smooth(values, seed, first, 2.0 / (period + 1))
+
+
+def ema_seeded_first(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA seeded with the first value, without a warm-up gap (as TA-Lib's ADOSC uses)."""
+    return _ewm(values, 2.0 / (period + 1))
+
+
+def stddev(values: np.ndarray, period: int) -> np.ndarray:
+    """Population standard deviation over `period` candles, zero for flat windows."""
+    out = _nan_like(values)
+    if _length(values) >= period:
+        mean = _rolling_sum(values, period) / period
+        variance = _rolling_sum(values * values, period) / period - mean * mean
+        out[..., period - 1:] = np.where(variance < EPSILON, 0.0, np.sqrt(np.maximum(variance, 0.0)))
+    return out
+
+
+def typical_price(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    return (high + low + close) / 3.0
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """max(high - low, |high - prev close|, |low - prev close|); undefined for the first candle."""
+    out = _nan_like(close)
+    if _length(close) > 1:
+        prev_close = close[..., :-1]
+        out[..., 1:] = np.maximum.reduce([
+            high[..., 1:] - low[..., 1:],
+            np.abs(high[..., 1:] - prev_close),
+            np.abs(low[..., 1:] - prev_close),
+        ])
+    return out
+
+
+def directional_movement(high: np.ndarray, low: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(+DM, -DM) per candle as used by ADX; undefined for the first candle."""
+    plus_dm = _nan_like(high)
+    minus_dm = _nan_like(high)
+    if _length(high) > 1:
+        up = high[..., 1:] - high[..., :-1]
+        down = low[..., :-1] - low[..., 1:]
+        minus_dm[..., 1:] = np.where((down > 0) & (up < down), down, 0.0)
+        plus_dm[..., 1:] = np.where((up > 0) & (up > down), up, 0.0)
+    return plus_dm, minus_dm
+
+
+def atr_from_true_range(tr: np.ndarray, period: int) -> np.ndarray:
+    if _length(tr) <= period:
+        return _nan_like(tr)
+    return wilder(tr, tr[..., 1:period + 1].mean(axis=-1), period, period)
+
+
+def directional_index(
+    tr: np.ndarray,
+    plus_dm: np.ndarray,
+    minus_dm: np.ndarray,
+    period: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Wilder-smoothed (true range, +DM, -DM) and the resulting DX.
+
+    TA-Lib keeps running sums seeded with period - 1 values; these are the
+    same sums divided by `period`, which leaves the DI ratios unchanged.
+    """
+    smoothed_tr, smoothed_plus, smoothed_minus = [
+        wilder(values, values[..., 1:period].sum(axis=-1) / period, period - 1, period)
+        for values in (tr, plus_dm, minus_dm)
+    ]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100.0 * smoothed_plus / smoothed_tr
+        minus_di = 100.0 * smoothed_minus / smoothed_tr
+        di_sum = plus_di + minus_di
+        dx = 100.0 * np.abs(minus_di - plus_di) / di_sum
+    dx[_is_zero(smoothed_tr) | _is_zero(di_sum)] = np.nan
+    return smoothed_tr, smoothed_plus, smoothed_minus, dx
+
+
+def adx_from_dx(dx: np.ndarray, period: int) -> np.ndarray:
+    if _length(dx) < 2 * period:
+        return _nan_like(dx)
+    first = 2 * period - 1
+    seed = np.nansum(dx[..., period:first + 1], axis=-1) / period
+    return wilder(dx, seed, first, period)
+
+
+def stoch_from_extremes(
+    close: np.ndarray,
+    highest: np.ndarray,
+    lowest: np.ndarray,
+    slowk_period: int,
+    slowd_period: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Slow stochastic (%K, %D) from rolling highs and lows."""
+    spread = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fastk = np.where(spread != 0, 100.0 * (close - lowest) / spread, 0.0)
+    fastk[np.isnan(spread)] = np.nan
+    slowk = rolling_mean(fastk, slowk_period)
+    slowd = rolling_mean(slowk, slowd_period)
+    # TA-Lib reports both lines from the first candle where %D exists
+    slowk[np.isnan(slowd)] = np.nan
+    return slowk, slowd
+
+
+def willr_from_extremes(close: np.ndarray, highest: np.ndarray, lowest: np.ndarray) -> np.ndarray:
+    spread = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        willr = np.where(spread != 0, -100.0 * (highest - close) / spread, 0.0)
+    willr[np.isnan(spread)] = np.nan
+    return willr
+
+
+def adosc_from_ad(ad: np.ndarray, fastperiod: int, slowperiod: int) -> np.ndarray:
+    out = ema_seeded_first(ad, fastperiod) - ema_seeded_first(ad, slowperiod)
+    out[..., :max(fastperiod, slowperiod) - 1] = np.nan
+    return out
+
+
+# Overlap studies
+
+def SMA(real, timeperiod=30):
+    real, = _as_float(real)
+    return rolling_mean(real, timeperiod)
+
+
+def EMA(real, timeperiod=30):
+    real, = _as_float(real)
+    return ema(real, timeperiod)
+
+
+def BBANDS(real, timeperiod=5, nbdevup=2.0, nbdevdn=2.0, matype=0):
+    real, = _as_float(real)
+    middle = rolling_mean(real, timeperiod)
+    deviation = stddev(real, timeperiod)
+    return middle + nbdevup * deviation, middle, middle - nbdevdn * deviation
+
+
+def SAR(high, low, acceleration=0.02, maximum=0.2):
+    """Parabolic SAR; inherently sequential, so each series is walked in a loop."""
+    high, low = _as_float(high, low)
+    if high.ndim > 1:
+        return np.stack([SAR(h, l, acceleration, maximum) for h, l in zip(high, low)])
+    out = _nan_like(high)
+    if len(high) < 2:
+        return out
+
+    # The initial direction follows the first candle's -DM, as in TA-Lib
+    up = high[1] - high[0]
+    down = low[0] - low[1]
+    is_long = not (down > 0 and up < down)
+    af = acceleration
+    if is_long:
+        ep, sar = high[1], low[0]
+    else:
+        ep, sar = low[1], high[0]
+    new_high, new_low = high[1], low[1]
+
+    for i in range(1, len(high)):
+        prev_high, prev_low = new_high, new_low
+        new_high, new_low = high[i], low[i]
+        if is_long:
+            if new_low <= sar:
+                # Reverse to short: the SAR becomes the extreme point
+                is_long = False
+                sar = max(ep, prev_high, new_high)
+                out[i] = sar
+                af = acceleration
+                ep = new_low
+                sar = max(sar + af * (ep - sar), prev_high, new_high)
+            else:
+                out[i] = sar
+                if new_high > ep:
+                    ep = new_high
+                    af = min(af + acceleration, maximum)
+                sar = min(sar + af * (ep - sar), prev_low, new_low)
+        else:
+            if new_high >= sar:
+                # Reverse to long
+                is_long = True
+                sar = min(ep, prev_low, new_low)
+                out[i] = sar
+                af = acceleration
+                ep = new_high
+                sar = min(sar + af * (ep - sar), prev_low, new_low)
+            else:
+                out[i] = sar
+                if new_low < ep:
+                    ep = new_low
+                    af = min(af + acceleration, maximum)
+                sar = max(sar + af * (ep - sar), prev_high, new_high)
+    return out
+
+
+# Momentum
+
+def MACD(real, fastperiod=12, slowperiod=26, signalperiod=9):
+    real, = _as_float(real)
+    if slowperiod < fastperiod:
+        fastperiod, slowperiod = slowperiod, fastperiod
+    # The fast EMA is seeded on the candles just before the slow EMA's first value
+    slow = ema(real, slowperiod)
+    fast = ema(real, fastperiod, start=slowperiod - fastperiod)
+    macd = fast - slow
+    signal = ema(macd, signalperiod, start=slowperiod - 1)
+    macd[np.isnan(signal)] = np.nan
+    return macd, signal, macd - signal
+
+
+def RSI(real, timeperiod=14):
+    real, = _as_float(real)
+    out = _nan_like(real)
+    if _length(real) <= timeperiod:
+        return out
+    change = np.diff(real, axis=-1)
+    gain = np.concatenate((np.full(real.shape[:-1] + (1,), np.nan), np.maximum(change, 0.0)), axis=-1)
+    loss = np.concatenate((np.full(real.shape[:-1] + (1,), np.nan), np.maximum(-change, 0.0)), axis=-1)
+    avg_gain = wilder(gain, gain[..., 1:timeperiod + 1].mean(axis=-1), timeperiod, timeperiod)
+    avg_loss = wilder(loss, loss[..., 1:timeperiod + 1].mean(axis=-1), timeperiod, timeperiod)
+    total = avg_gain + avg_loss
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(_is_zero(total), 0.0, 100.0 * avg_gain / total)
+    out[..., timeperiod:] = rsi[..., timeperiod:]
+    return out
+
+
+def STOCH(high, low, close, fastk_period=5, slowk_period=3, slowk_matype=0, slowd_period=3, slowd_matype=0):
+    high, low, close = _as_float(high, low, close)
+    return stoch_from_extremes(
+        close, rolling_max(high, fastk_period), rolling_min(low, fastk_period), slowk_period, slowd_period
+    )
+
+
+def WILLR(high, low, close, timeperiod=14):
+    high, low, close = _as_float(high, low, close)
+    return willr_from_extremes(close, rolling_max(high, timeperiod), rolling_min(low, timeperiod))
+
+
+def MFI(high, low, close, volume, timeperiod=14):
+    high, low, close, volume = _as_float(high, low, close, volume)
+    out = _nan_like(close)
+    if _length(close) <= timeperiod:
+        return out
+    price = typical_price(high, low, close)
+    flow = price[..., 1:] * volume[..., 1:]
+    change = np.diff(price, axis=-1)
+    positive = _rolling_sum(np.where(change > 0, flow, 0.0), timeperiod)
+    negative = _rolling_sum(np.where(change < 0, flow, 0.0), timeperiod)
+    total = positive + negative
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[..., timeperiod:] = np.where(total < 1.0, 0.0, 100.0 * positive / total)
+    return out
+
+
+def CCI(high, low, close, timeperiod=14):
+    high, low, close = _as_float(high, low, close)
+    out = _nan_like(close)
+    if _length(close) < timeperiod:
+        return out
+    price = typical_price(high, low, close)
+    latest = price[..., timeperiod - 1:]
+    average = _rolling_sum(price, timeperiod) / timeperiod
+    # Mean absolute deviation, one window offset at a time
+    deviation = np.zeros(average.shape)
+    for offset in range(timeperiod):
+        deviation += np.abs(price[..., offset:offset + average.shape[-1]] - average)
+    deviation /= timeperiod
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cci = (latest - average) / (0.015 * deviation)
+    out[..., timeperiod - 1:] = np.where(_is_zero(deviation), 0.0, cci)
+    return out
+
+
+def ROC(real, timeperiod=10):
+    real, = _as_float(real)
+    previous = _shift(real, timeperiod)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roc = np.where(previous != 0, (real / previous - 1.0) * 100.0, 0.0)
+    roc[np.isnan(previous)] = np.nan
+    return roc
+
+
+def ADX(high, low, close, timeperiod=14):
+    high, low, close = _as_float(high, low, close)
+    dx = directional_index(true_range(high, low, close), *directional_movement(high, low), timeperiod)[3]
+    return adx_from_dx(dx, timeperiod)
+
+
+# Volume
+
+def OBV(real, volume):
+    real, volume = _as_float(real, volume)
+    signed = np.sign(np.diff(real, axis=-1)) * volume[..., 1:]
+    return np.concatenate((volume[..., :1], volume[..., :1] + np.cumsum(signed, axis=-1)), axis=-1)
+
+
+def AD(high, low, close, volume):
+    high, low, close, volume = _as_float(high, low, close, volume)
+    spread = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        flow = np.where(spread > 0, ((close - low) - (high - close)) / spread * volume, 0.0)
+    return np.cumsum(flow, axis=-1)
+
+
+def ADOSC(high, low, close, volume, fastperiod=3, slowperiod=10):
+    return adosc_from_ad(AD(high, low, close, volume), fastperiod, slowperiod)
+
+
+# Volatility
+
+def ATR(high, low, close, timeperiod=14):
+    high, low, close = _as_float(high, low, close)
+    return atr_from_true_range(true_range(high, low, close), timeperiod)
+
+
+def STDDEV(real, timeperiod=5, nbdev=1.0):
+    real, = _as_float(real)
+    return nbdev * stddev(real, timeperiod)
+
+
+# Candlestick patterns
+
+def _real_body(open, close):
+    return np.abs(close - open)
+
+
+def _upper_shadow(open, high, close):
+    return high - np.maximum(open, close)
+
+
+def _lower_shadow(open, low, close):
+    return np.minimum(open, close) - low
+
+
+def _color(open, close):
+    return np.where(close >= open, 1, -1)
+
+
+def _candle_average(setting: str, open, high, low, close) -> np.ndarray:
+    """TA-Lib's TA_CANDLEAVERAGE at every candle: the average range of the preceding candles."""
+    range_type, period, factor = CANDLE_SETTINGS[setting]
+    if range_type == 'real_body':
+        ranges = _real_body(open, close)
+    else:
+        ranges = high - low
+    if period == 0:
+        return factor * ranges
+    return factor * _shift(rolling_mean(ranges, period), 1)
+
+
+def _pattern(signal: np.ndarray, value, lookback: int) -> np.ndarray:
+    out = np.where(signal, value, 0).astype(np.int32)
+    out[..., :lookback] = 0
+    return out
+
+
+def _hammer_shape(open, high, low, close, lower: bool) -> np.ndarray:
+    """Small body, long shadow on one side and almost none on the other."""
+    body = _real_body(open, close)
+    long_shadow = _lower_shadow(open, low, close) if lower else _upper_shadow(open, high, close)
+    short_shadow = _upper_shadow(open, high, close) if lower else _lower_shadow(open, low, close)
+    return (
+        (body < _candle_average('BodyShort', open, high, low, close))
+        & (long_shadow > _candle_average('ShadowLong', open, high, low, close))
+        & (short_shadow < _candle_average('ShadowVeryShort', open, high, low, close))
+    )
+
+
+def CDLHAMMER(open, high, low, close):
+    open, high, low, close = _as_float(open, high, low, close)
+    near = _shift(_candle_average('Near', open, high, low, close), 1)
+    # Body below or near the previous candle's low
+    signal = _hammer_shape(open, high, low, close, lower=True) & (
+        np.minimum(open, close) <= _shift(low, 1) + near
+    )
+    return _pattern(signal, 100, 11)
+
+
+def CDLHANGINGMAN(open, high, low, close):
+    open, high, low, close = _as_float(open, high, low, close)
+    near = _shift(_candle_average('Near', open, high, low, close), 1)
+    # Body above or near the previous candle's high
+    signal = _hammer_shape(open, high, low, close, lower=True) & (
+        np.minimum(open, close) >= _shift(high, 1) - near
+    )
+    return _pattern(signal, -100, 11)
+
+
+def CDLSHOOTINGSTAR(open, high, low, close):
+    open, high, low, close = _as_float(open, high, low, close)
+    # Real body gaps up from the previous candle's body
+    signal = _hammer_shape(open, high, low, close, lower=False) & (
+        np.minimum(open, close) > _shift(np.maximum(open, close), 1)
+    )
+    return _pattern(signal, -100, 11)
+
+
+def CDLENGULFING(open, high, low, close):
+    open, high, low, close = _as_float(open, high, low, close)
+    color = _color(open, close)
+    prev_open, prev_close = _shift(open, 1), _shift(close, 1)
+    prev_color = _shift(color.astype(np.float64), 1)
+    bullish = (color == 1) & (prev_color == -1) & (
+        ((close >= prev_open) & (open < prev_close)) | ((close > prev_open) & (open <= prev_close))
+    )
+    bearish = (color == -1) & (prev_color == 1) & (
+        ((open >= prev_close) & (close < prev_open)) | ((open > prev_close) & (close <= prev_open))
+    )
+    # Engulfing with an equal open or close scores 80 instead of 100
+    strict = (open != prev_close) & (close != prev_open)
+    value = color * np.where(strict, 100, 80)
+    return _pattern(bullish | bearish, value, 2)
+
+
+def _star(open, high, low, close, penetration: float, direction: int) -> np.ndarray:
+    """Morning (direction=1) or evening (direction=-1) star ending at each candle."""
+    body = _real_body(open, close)
+    color = _color(open, close)
+    body_long = _candle_average('BodyLong', open, high, low, close)
+    body_short = _candle_average('BodyShort', open, high, low, close)
+    top = np.maximum(open, close)
+    bottom = np.minimum(open, close)
+
+    first_body = _shift(body, 2)
+    if direction == 1:
+        star_gap = _shift(top, 1) < _shift(bottom, 2)
+        closes_inside = close > _shift(close, 2) + first_body * penetration
+    else:
+        star_gap = _shift(bottom, 1) > _shift(top, 2)
+        closes_inside = close < _shift(close, 2) - first_body * penetration
+    return (
+        (first_body > _shift(body_long, 2))
+        & (_shift(color.astype(np.float64), 2) == -direction)
+        & (_shift(body, 1) <= _shift(body_short, 1))
+        & star_gap
+        & (body > body_short)
+        & (color == direction)
+        & closes_inside
+    )
+
+
+def CDLMORNINGSTAR(open, high, low, close, penetration=0.3):
+    open, high, low, close = _as_float(open, high, low, close)
+    return _pattern(_star(open, high, low, close, penetration, 1), 100, 12)
+
+
+def CDLEVENINGSTAR(open, high, low, close, penetration=0.3):
+    open, high, low, close = _as_float(open, high, low, close)
+    return _pattern(_star(open, high, low, close, penetration, -1), -100, 12)
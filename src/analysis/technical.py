@@ -1,243 +1,429 @@
-import talib
+import copy
+import threading
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 from ..data.processor import DataProcessor
+from .indicators import IndicatorEngine, data_version
+from .levels import detect_levels
+from .parallel import AnalysisPool
+from .patterns import PatternScanner, recent_patterns
+from .timeframes import TIMEFRAMES, confluence, timeframe_frames
+
+# Sections of a full analysis, in report order
+ANALYSIS_SECTIONS = (
+    "basic_info",
+    "trend_indicators",
+    "momentum_indicators",
+    "volume_indicators",
+    "volatility_indicators",
+    "support_resistance",
+    "patterns",
+)
+
+# Sections the summary is built from (enough for /quick)
+SUMMARY_SECTIONS = ANALYSIS_SECTIONS[:5]
+
+# Candlestick patterns reported in the patterns section: name -> TA-Lib function
+CANDLE_PATTERNS = {
+    'hammer': 'CDLHAMMER',
+    'morning_star': 'CDLMORNINGSTAR',
+    'bullish_engulfing': 'CDLENGULFING',
+    'shooting_star': 'CDLSHOOTINGSTAR',
+    'evening_star': 'CDLEVENINGSTAR',
+    'hanging_man': 'CDLHANGINGMAN',
+}
+
+# Readable names of the recent patterns the summary reports; the same on every backend
+SUMMARY_PATTERNS = {
+    'hammer': 'Hammer',
+    'morningstar': 'Morning Star',
+    'engulfing': 'Engulfing',
+    'shootingstar': 'Shooting Star',
+    'eveningstar': 'Evening Star',
+    'hangingman': 'Hanging Man',
+}
+
+# Candles needed to evaluate the patterns on the last candle: they look back
+# at most 12 candles, plus the 10-candle body averages before those
+PATTERN_WINDOW = 32
+
+# Candles whose completed patterns are listed as recent in the patterns section
+RECENT_PATTERN_CANDLES = 5
+
+
+def _rows(values: np.ndarray) -> np.ndarray:
+    """View a single series as a one-row batch; (series x candles) arrays pass through."""
+    return np.atleast_2d(values)
+
+
+def _records(**columns) -> List[Dict]:
+    """Transpose equally long columns into one dict per row."""
+    keys = list(columns)
+    values = [np.asarray(column).tolist() for column in columns.values()]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
 
 class TechnicalAnalyzer:
+    # Results are shared by all analyzer instances so the prewarmer and the
+    # handlers see the same entries; keyed by (coin_id, vs_currency, days),
+    # or (coin_id, vs_currency, timeframes) for analyze_timeframes.
+    # Callers get deep copies, so mutating a result cannot corrupt the cache.
+    RESULT_CACHE_SIZE = 256
+    _result_cache: "OrderedDict[Tuple, Tuple[Tuple, Dict]]" = OrderedDict()
+    _result_cache_lock = threading.Lock()
+    # Worker processes for CPU-bound analysis (ANALYSIS_WORKERS), shared by all analyzers
+    pool = AnalysisPool()
+    # Full-history pattern indexes for charts, cached per coin and data version
+    pattern_scanner = PatternScanner()
+
     def __init__(self):
         self.data_processor = DataProcessor()
 
-    def analyze_coin(self, coin_id: str, vs_currency: str = 'usd', days: int = 30) -> Dict:
-        """Perform enhanced technical analysis"""
-        df = self.data_processor.get_ohlcv_data(coin_id, vs_currency, days)
+    def analyze_coin(
+        self,
+        coin_id: str,
+        vs_currency: str = 'usd',
+        days: int = 30,
+        force_refresh: bool = False,
+        sections: Optional[Tuple[str, ...]] = None
+    ) -> Dict:
+        """
+        Perform enhanced technical analysis.
+
+        The result is reused while the underlying OHLCV data is unchanged;
+        `force_refresh` refetches the data from the API first. `sections`
+        limits the work to a subset of ANALYSIS_SECTIONS (default: all);
+        the summary is always included.
+        """
+        df = self.data_processor.get_ohlcv_data(coin_id, vs_currency, days, force_refresh=force_refresh)
         if df is None:
             return {"error": "Failed to fetch data"}
 
-        analysis = {
-            "basic_info": self._get_basic_info(df),
-            "trend_indicators": self._analyze_trend(df),
-            "momentum_indicators": self._analyze_momentum(df),
-            "volume_indicators": self._analyze_volume(df),
-            "volatility_indicators": self._analyze_volatility(df),
-            "support_resistance": self._find_support_resistance(df),
-            "patterns": self._identify_patterns(df),
-            "summary": {}
-        }
-
-        analysis["summary"] = self._generate_enhanced_summary(analysis)
+        key = (coin_id, vs_currency, days)
+        version = data_version(df)
+        sections = sections or ANALYSIS_SECTIONS
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            hit = cached is not None and cached[0] == version and all(name in cached[1] for name in sections)
+            if hit:
+                self._result_cache.move_to_end(key)
+        if hit:
+            # Cached entries are never mutated, so copying outside the lock is safe
+            return copy.deepcopy(cached[1])
+
+        analysis = self.analyze_dataframe(df, sections)
+        stored = copy.deepcopy(analysis)
+
+        with self._result_cache_lock:
+            self._result_cache[key] = (version, stored)
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
         return analysis
-    
-    def _identify_patterns(self, df: pd.DataFrame) -> Dict:
-        """Identify common candlestick patterns"""
-        open = df['open'].values
-        high = df['high'].values
-        low = df['low'].values
-        close = df['close'].values
-        
-        patterns = {}
-        
-        # Bullish patterns
-        patterns['hammer'] = talib.CDLHAMMER(open, high, low, close)[-1]
-        patterns['morning_star'] = talib.CDLMORNINGSTAR(open, high, low, close)[-1]
-        patterns['bullish_engulfing'] = talib.CDLENGULFING(open, high, low, close)[-1]
-        
-        # Bearish patterns
-        patterns['shooting_star'] = talib.CDLSHOOTINGSTAR(open, high, low, close)[-1]
-        patterns['evening_star'] = talib.CDLEVENINGSTAR(open, high, low, close)[-1]
-        patterns['hanging_man'] = talib.CDLHANGINGMAN(open, high, low, close)[-1]
-        
-        return {
-            "patterns": {k: bool(v) for k, v in patterns.items() if v != 0}
+
+    def analyze_dataframe(self, df: pd.DataFrame, sections: Tuple[str, ...] = ANALYSIS_SECTIONS) -> Dict:
+        """
+        Analyze an OHLCV frame; every indicator is computed at most once across sections.
+
+        Runs in a worker process when the analysis pool is enabled.
+        """
+        if self.pool.enabled:
+            return self.pool.analyze([df], sections)[0]
+        return self._analyze_engine(IndicatorEngine(df), sections)[0]
+
+    def analyze_many(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        sections: Tuple[str, ...] = ANALYSIS_SECTIONS
+    ) -> Dict[str, Dict]:
+        """
+        Analyze many OHLCV frames at once, e.g. for a market-wide scan.
+
+        Frames with the same number of candles are stacked into
+        (coins x candles) arrays, so every indicator and interpretation runs
+        once per group rather than once per coin. Returns {key: analysis},
+        each analysis shaped exactly like analyze_dataframe's; missing or
+        empty frames get an error result. With the analysis pool enabled the
+        groups are split across the worker processes.
+        """
+        results = {}
+        groups: Dict[int, List[str]] = {}
+        for key, df in frames.items():
+            if df is None or df.empty:
+                results[key] = {"error": "Failed to fetch data"}
+            else:
+                groups.setdefault(len(df), []).append(key)
+
+        if self.pool.enabled:
+            keys = [key for group in groups.values() for key in group]
+            results.update(zip(keys, self.pool.analyze([frames[key] for key in keys], sections)))
+            return {key: results[key] for key in frames}
+
+        for keys in groups.values():
+            engine = IndicatorEngine.from_frames([frames[key] for key in keys])
+            results.update(zip(keys, self._analyze_engine(engine, sections)))
+        return {key: results[key] for key in frames}
+
+    def analyze_timeframes(
+        self,
+        coin_id: str,
+        vs_currency: str = 'usd',
+        timeframes: Tuple[int, ...] = TIMEFRAMES,
+        sections: Tuple[str, ...] = ANALYSIS_SECTIONS,
+        force_refresh: bool = False
+    ) -> Dict:
+        """
+        Analyze several timeframes (in days) from shared fetches.
+
+        The finest base series covering the longest timeframe is fetched
+        once and resampled into the bars of each timeframe, all ending at
+        the same candle. Timeframes of a single day use CoinGecko's
+        5-minute series instead, falling back to the shared one. Returns
+        {"timeframes": {days: analysis}, "confluence": {...}, "frames":
+        {days: DataFrame}} where confluence compares the overall sentiment
+        across timeframes and frames are the bars each analysis was built
+        from, for charts that must match it. Like analyze_coin's, the
+        result is reused while the frames are unchanged.
+        """
+        frames = timeframe_frames(self.data_processor, coin_id, vs_currency, timeframes, force_refresh)
+        if frames is None:
+            return {"error": "Failed to fetch data"}
+
+        key = (coin_id, vs_currency, tuple(timeframes))
+        version = tuple(data_version(df) if not df.empty else None for df in frames.values())
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            hit = cached is not None and cached[0] == version and cached[1]["sections"] == tuple(sections)
+            if hit:
+                self._result_cache.move_to_end(key)
+        if hit:
+            return copy.deepcopy(cached[1]["result"])
+
+        analyses = self.analyze_many(frames, sections)
+        result = {"timeframes": analyses, "confluence": confluence(analyses), "frames": frames}
+        stored = {"sections": tuple(sections), "result": copy.deepcopy(result)}
+
+        with self._result_cache_lock:
+            self._result_cache[key] = (version, stored)
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+
+    def _analyze_engine(self, engine: IndicatorEngine, sections: Tuple[str, ...]) -> List[Dict]:
+        """Run the requested sections over every series in the engine; one analysis per series."""
+        builders = {
+            "basic_info": self._get_basic_info,
+            "trend_indicators": self._analyze_trend,
+            "momentum_indicators": self._analyze_momentum,
+            "volume_indicators": self._analyze_volume,
+            "volatility_indicators": self._analyze_volatility,
+            "support_resistance": self._find_support_resistance,
+            "patterns": self._identify_patterns,
         }
-    
-    def _find_support_resistance(self, df: pd.DataFrame, window: int = 20) -> Dict:
-        """Find potential support and resistance levels"""
-        highs = df['high'].rolling(window=window, center=True).max()
-        lows = df['low'].rolling(window=window, center=True).min()
-        
-        current_price = df['close'].iloc[-1]
-        
-        # Find nearest levels
-        resistance_levels = sorted([x for x in highs.unique() if x > current_price][:3])
-        support_levels = sorted([x for x in lows.unique() if x < current_price][-3:])
-        
-        return {
-            "support_levels": support_levels,
-            "resistance_levels": resistance_levels
+        analyses = [{} for _ in range(len(_rows(engine.close)))]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name in ANALYSIS_SECTIONS:
+                if name in sections:
+                    for analysis, section in zip(analyses, builders[name](engine)):
+                        analysis[name] = section
+        for analysis in analyses:
+            analysis["summary"] = self._generate_enhanced_summary(analysis)
+        return analyses
+
+    def _identify_patterns(self, engine: IndicatorEngine) -> List[Dict]:
+        """Identify common candlestick patterns on the last candle, plus every pattern of the last few candles"""
+        # Same window as the recent scan, so both share the engine's pattern outputs
+        window = PATTERN_WINDOW + RECENT_PATTERN_CANDLES
+        latest = {
+            name: _rows(engine.candle_pattern(function, window))[:, -1]
+            for name, function in CANDLE_PATTERNS.items()
         }
-    
-    def _get_basic_info(self, df: pd.DataFrame) -> Dict:
+        recent = recent_patterns(engine, RECENT_PATTERN_CANDLES, PATTERN_WINDOW)
+        return [
+            {
+                "patterns": {name: bool(values[row]) for name, values in latest.items() if values[row] != 0},
+                "recent": recent[row]
+            }
+            for row in range(len(_rows(engine.close)))
+        ]
+
+    def _find_support_resistance(self, engine: IndicatorEngine, window: int = 20) -> List[Dict]:
+        """
+        Find the nearest support and resistance zones from swing points spanning `window` candles.
+
+        The swing shrinks with short histories so they still have pivots; a
+        side without any zone falls back to the lowest low or highest high
+        of the last `window` candles.
+        """
+        swing = max(2, min(window // 2, len(engine) // 8))
+        low, high = _rows(engine.low)[:, -window:], _rows(engine.high)[:, -window:]
+        offset = len(engine) - low.shape[1]
+        lowest, highest = low.argmin(axis=1), high.argmax(axis=1)
+        level_maps = detect_levels(engine, swing=swing)
+        levels = []
+        for row, (level_map, current_price) in enumerate(zip(level_maps, _rows(engine.close)[:, -1])):
+            supports = level_map.supports(current_price, 3)
+            resistances = level_map.resistances(current_price, 3)
+            if not supports and low[row, lowest[row]] < current_price:
+                supports = [self._range_zone(low[row, lowest[row]], offset + lowest[row])]
+            if not resistances and high[row, highest[row]] > current_price:
+                resistances = [self._range_zone(high[row, highest[row]], offset + highest[row])]
+            levels.append({
+                "support_levels": [zone["price"] for zone in supports],
+                "resistance_levels": [zone["price"] for zone in resistances],
+                "zones": supports + resistances
+            })
+        return levels
+
+    def _range_zone(self, price: float, position: int) -> Dict:
+        """Zone of a single extreme of the recent range, shaped like detect_levels' zones."""
+        price = float(price)
+        return {"price": price, "low": price, "high": price, "touches": 1, "last_touch": int(position)}
+
+    def _get_basic_info(self, engine: IndicatorEngine) -> List[Dict]:
         """Calculate basic price information"""
-        current_price = df['close'].iloc[-1]
-        price_change = ((current_price - df['close'].iloc[-2]) / df['close'].iloc[-2]) * 100
-        
-        return {
-            "current_price": current_price,
-            "price_change_24h": price_change,
-            "high_24h": df['high'].iloc[-1],
-            "low_24h": df['low'].iloc[-1],
-            "volume_24h": df['volume'].iloc[-1]
-        }
-
-    def _analyze_momentum(self, df: pd.DataFrame) -> Dict:
+        close = _rows(engine.close)
+        return _records(
+            current_price=close[:, -1],
+            price_change_24h=((close[:, -1] - close[:, -2]) / close[:, -2]) * 100,
+            high_24h=_rows(engine.high)[:, -1],
+            low_24h=_rows(engine.low)[:, -1],
+            volume_24h=_rows(engine.volume)[:, -1]
+        )
+
+    def _analyze_momentum(self, engine: IndicatorEngine) -> List[Dict]:
         """Enhanced momentum analysis"""
-        close = df['close'].values
-        high = df['high'].values
-        low = df['low'].values
-        volume = df['volume'].values
-
+        count = len(_rows(engine.close))
         try:
-            # RSI
-            rsi = talib.RSI(close, timeperiod=14)
-            
-            # Stochastic
-            slowk, slowd = talib.STOCH(high, low, close, 
-                                     fastk_period=14, 
-                                     slowk_period=3, 
-                                     slowd_period=3)
-            
-            # Williams %R
-            willr = talib.WILLR(high, low, close, timeperiod=14)
-            
-            # Money Flow Index
-            mfi = talib.MFI(high, low, close, volume, timeperiod=14)
-            
-            # Commodity Channel Index
-            cci = talib.CCI(high, low, close, timeperiod=20)
-            
-            # Rate of Change
-            roc = talib.ROC(close, timeperiod=10)
-
-            return {
+            indicators = engine.compute(['rsi', 'stochastic', 'williams_r', 'mfi', 'cci', 'roc'])
+            rsi = _rows(indicators['rsi'])
+            slowk, slowd = (_rows(line) for line in indicators['stochastic'])
+            willr = _rows(indicators['williams_r'])
+            mfi = _rows(indicators['mfi'])
+            cci = _rows(indicators['cci'])
+            roc = _rows(indicators['roc'])
+
+            rsi_signals = self._interpret_rsi(rsi[:, -1])
+            stoch_signals = self._interpret_stochastic(slowk[:, -1], slowd[:, -1])
+            willr_signals = self._interpret_williams_r(willr[:, -1])
+            mfi_signals = self._interpret_mfi(mfi[:, -1])
+            cci_signals = self._interpret_cci(cci[:, -1])
+            roc_signals = self._interpret_roc(roc[:, -1])
+
+            return [{
                 "rsi": {
-                    "value": rsi[-1],
-                    "signal": self._interpret_rsi(rsi[-1]),
-                    "previous": rsi[-2],
-                    "all":rsi
+                    "value": rsi[row, -1],
+                    "signal": rsi_signals[row],
+                    "previous": rsi[row, -2],
+                    "all": rsi[row]
                 },
                 "stochastic": {
-                    "k": slowk[-1],
-                    "d": slowd[-1],
-                    "signal": self._interpret_stochastic(slowk[-1], slowd[-1])
+                    "k": slowk[row, -1],
+                    "d": slowd[row, -1],
+                    "signal": stoch_signals[row]
                 },
                 "williams_r": {
-                    "value": willr[-1],
-                    "signal": self._interpret_williams_r(willr[-1])
+                    "value": willr[row, -1],
+                    "signal": willr_signals[row]
                 },
                 "mfi": {
-                    "value": mfi[-1],
-                    "signal": self._interpret_mfi(mfi[-1])
+                    "value": mfi[row, -1],
+                    "signal": mfi_signals[row]
                 },
                 "cci": {
-                    "value": cci[-1],
-                    "signal": self._interpret_cci(cci[-1])
+                    "value": cci[row, -1],
+                    "signal": cci_signals[row]
                 },
                 "roc": {
-                    "value": roc[-1],
-                    "signal": self._interpret_roc(roc[-1])
+                    "value": roc[row, -1],
+                    "signal": roc_signals[row]
                 }
-            }
+            } for row in range(count)]
         except Exception as e:
-            return {"error": f"Momentum analysis failed: {str(e)}"}
+            return [{"error": f"Momentum analysis failed: {str(e)}"}] * count
 
-    def _interpret_roc(self, value: float) -> Dict:
+    def _interpret_roc(self, values: np.ndarray) -> List[Dict]:
         """Interpret Rate of Change (ROC) values"""
-        if value > 5:
-            return {
-                "signal": "Bullish",
-                "strength": min(100, value * 10),
-                "condition": "Strong Momentum"
-            }
-        elif value < -5:
-            return {
-                "signal": "Bearish",
-                "strength": min(100, abs(value * 10)),
-                "condition": "Strong Negative Momentum"
-            }
-        return {
-            "signal": "Neutral",
-            "strength": 0,
-            "condition": "Weak Momentum"
-        }
-
-    def _analyze_trend(self, df: pd.DataFrame) -> Dict:
+        bullish = values > 5
+        bearish = values < -5
+        return _records(
+            signal=np.select([bullish, bearish], ["Bullish", "Bearish"], "Neutral"),
+            strength=np.select([bullish, bearish], [np.fmin(100, values * 10), np.fmin(100, np.abs(values * 10))], 0),
+            condition=np.select([bullish, bearish], ["Strong Momentum", "Strong Negative Momentum"], "Weak Momentum")
+        )
+
+    def _analyze_trend(self, engine: IndicatorEngine) -> List[Dict]:
         """Enhanced trend analysis"""
+        count = len(_rows(engine.close))
         try:
-            close = df['close'].values
-            high = df['high'].values
-            low = df['low'].values
-
-            # Adjust minimum data requirement
-            min_period = 50  # Changed from 200 to allow shorter timeframes
-            if len(close) < min_period:
-                ma_period = len(close) - 1
-                if ma_period < 10:  # Absolute minimum requirement
-                    return {"error": "Not enough data for trend analysis"}
-            else:
-                ma_period = min_period
-
-            # Moving Averages
-            ma20 = talib.SMA(close, timeperiod=min(20, ma_period))
-            ma50 = talib.SMA(close, timeperiod=min(50, ma_period))
-            ema20 = talib.EMA(close, timeperiod=min(20, ma_period))
-            
-            # MACD (requires at least 33 periods)
-            if len(close) >= 33:
-                macd, macd_signal, macd_hist = talib.MACD(close)
-            else:
-                macd = macd_signal = macd_hist = np.array([0])
-            
-            # ADX (requires 14 periods)
-            if len(close) >= 14:
-                adx = talib.ADX(high, low, close, timeperiod=14)
-            else:
-                adx = np.array([0])
-            
-            # Parabolic SAR
-            sar = talib.SAR(high, low)
+            close = _rows(engine.close)
 
-            # Get last valid index
-            last_valid_index = -1
-            while last_valid_index >= -len(close) and (
-                np.isnan(ma20[last_valid_index]) or 
-                np.isnan(ma50[last_valid_index])
-            ):
-                last_valid_index -= 1
+            # Moving-average periods shrink for short histories (changed from 200 to allow shorter timeframes)
+            if engine.ma_period < 10:  # Absolute minimum requirement
+                return [{"error": "Not enough data for trend analysis"}] * count
 
-            if last_valid_index < -len(close):
-                return {"error": "Invalid data in trend analysis"}
+            # MACD is zero below 33 candles
+            indicators = engine.compute(['sma_short', 'sma_long', 'ema_short', 'macd'])
+            ma20 = _rows(indicators['sma_short'])
+            ma50 = _rows(indicators['sma_long'])
+            ema20 = _rows(indicators['ema_short'])
+            macd, macd_signal, macd_hist = (_rows(line) for line in indicators['macd'])
 
-            return {
-                "moving_averages": {
-                    "ma20":ma20,
-                    "ma50":ma50,
-                    "ema20":ema20,
-                    "signal": self._interpret_mas(
-                        close[last_valid_index], 
-                        ma20[last_valid_index], 
-                        ma50[last_valid_index], 
-                        ema20[last_valid_index]
-                    )
-                },
-                "macd": {
-                    "macd": macd,
-                    "signal": macd_signal,
-                    "histogram":macd_hist,
-                    "interpretation": self._interpret_macd(
-                        float(macd[last_valid_index]),
-                        float(macd_signal[last_valid_index]),
-                        float(macd_hist[last_valid_index])
-                    )
-                },
-                "adx": {
-                    "value": float(adx[last_valid_index]),
-                    "strength": self._interpret_adx(float(adx[last_valid_index]))
-                }
-            }
+            # ADX (requires 14 periods)
+            if len(engine) >= 14:
+                adx = _rows(engine.adx(14))
+            else:
+                adx = np.zeros((count, 1))
+
+            # Last candle (as a negative offset) where both moving averages are valid
+            valid = ~(np.isnan(ma20) | np.isnan(ma50))
+            last_valid_index = -1 - np.argmax(valid[:, ::-1], axis=1)
+            rows = np.arange(count)
+
+            ma_signals = self._interpret_mas(
+                close[rows, last_valid_index],
+                ma20[rows, last_valid_index],
+                ma50[rows, last_valid_index],
+                ema20[rows, last_valid_index]
+            )
+            macd_interpretations = self._interpret_macd(
+                macd[rows, last_valid_index],
+                macd_signal[rows, last_valid_index],
+                macd_hist[rows, last_valid_index]
+            )
+            adx_values = adx[rows, last_valid_index]
+            adx_strengths = self._interpret_adx(adx_values)
+
+            results = []
+            for row in rows:
+                if not valid[row].any():
+                    results.append({"error": "Invalid data in trend analysis"})
+                    continue
+                results.append({
+                    "moving_averages": {
+                        "ma20": ma20[row],
+                        "ma50": ma50[row],
+                        "ema20": ema20[row],
+                        "signal": ma_signals[row]
+                    },
+                    "macd": {
+                        "macd": macd[row],
+                        "signal": macd_signal[row],
+                        "histogram": macd_hist[row],
+                        "interpretation": macd_interpretations[row]
+                    },
+                    "adx": {
+                        "value": float(adx_values[row]),
+                        "strength": adx_strengths[row]
+                    }
+                })
+            return results
 
         except Exception as e:
-            return {"error": f"Trend analysis failed: {str(e)}"}
+            return [{"error": f"Trend analysis failed: {str(e)}"}] * count
 
     def _get_signal_from_dict(self, data: Dict, key: str = 'signal') -> str:
         """Safely extract signal string from potentially nested dictionary"""
@@ -349,6 +535,23 @@ class TechnicalAnalyzer:
             elif momentum.get("rsi", {}).get("value", 50) < 30:
                 key_signals.append(("Bullish", "RSI indicates oversold conditions"))
 
+            # Add the most recent directional candlestick pattern among the curated ones
+            recent_patterns = [
+                event for event in analysis.get("patterns", {}).get("recent", [])
+                if event["direction"] != "Neutral" and event["pattern"] in SUMMARY_PATTERNS
+            ]
+            if recent_patterns:
+                latest = recent_patterns[0]
+                candles_ago = latest["candles_ago"]
+                if candles_ago == 0:
+                    when = "on the last candle"
+                else:
+                    when = f"{candles_ago} candle{'s' if candles_ago > 1 else ''} ago"
+                key_signals.append((
+                    latest["direction"],
+                    f"{latest['direction']} {SUMMARY_PATTERNS[latest['pattern']]} pattern {when}"
+                ))
+
             if not key_signals:
                 key_signals.append(("Neutral", "No strong signals detected"))
 
@@ -372,257 +575,186 @@ class TechnicalAnalyzer:
 
     
 
-    def _interpret_mas(self, close: float, ma20, ma50, ma200) -> str:
-        """Interpret Moving Averages"""
-        if close > ma20 and ma20 > ma50 and ma50 > ma200:
-            return "Bullish"
-        elif close < ma20 and ma20 < ma50 and ma50 < ma200:
-            return "Bearish"
-        elif close > ma200:
-            return "Moderately Bullish"
-        elif close < ma200:
-            return "Moderately Bearish"
-        else :
-            return "Neutral"
-
-    def _analyze_volume(self, df: pd.DataFrame) -> Dict:
+    def _analyze_volume(self, engine: IndicatorEngine) -> List[Dict]:
         """Enhanced volume analysis"""
-        close = df['close'].values
-        volume = df['volume'].values
-        high = df['high'].values
-        low = df['low'].values
+        count = len(_rows(engine.close))
+        close = _rows(engine.close)
+        volume = _rows(engine.volume)
 
         try:
-            # On Balance Volume
-            obv = talib.OBV(close, volume)
-            
-            # Money Flow Index (already calculated in momentum)
-            mfi = talib.MFI(high, low, close, volume, timeperiod=14)
-            
-            # Volume SMA
-            vol_sma = talib.SMA(volume, timeperiod=20)
-            
-            # Calculate VWAP
-            vwap = self._calculate_vwap(df)
-            
-            # Accumulation/Distribution Line
-            ad = talib.AD(high, low, close, volume)
-            
-            # Chaikin Money Flow
-            cmf = talib.ADOSC(high, low, close, volume, fastperiod=3, slowperiod=10)
-
-            return {
+            # Chaikin oscillator reuses the A/D line
+            indicators = engine.compute(['obv', 'volume_sma', 'vwap', 'ad', 'adosc'])
+            obv = _rows(indicators['obv'])
+            vol_sma = _rows(indicators['volume_sma'])
+            vwap = _rows(indicators['vwap'])
+            ad = _rows(indicators['ad'])
+            cmf = _rows(indicators['adosc'])
+
+            obv_change = np.where(obv[:, -2] != 0, (obv[:, -1] - obv[:, -2]) / obv[:, -2] * 100, 0)
+            volume_ratio = np.where(vol_sma[:, -1] != 0, volume[:, -1] / vol_sma[:, -1], 0)
+            vwap_missing = np.isnan(vwap[:, -1])
+            obv_signals = self._interpret_obv(obv[:, -3:])
+            vwap_signals = self._interpret_vwap(close[:, -1], vwap[:, -1])
+            ad_signals = self._interpret_ad(ad[:, -3:], close[:, -3:])
+            cmf_signals = self._interpret_cmf(cmf[:, -1])
+
+            return [{
                 "obv": {
-                    "value": obv[-1],
-                    "change": ((obv[-1] - obv[-2]) / obv[-2] * 100) if obv[-2] != 0 else 0,
-                    "signal": self._interpret_obv(obv[-3:])
+                    "value": obv[row, -1],
+                    "change": obv_change[row],
+                    "signal": obv_signals[row]
                 },
                 "volume_sma": {
-                    "current_volume": volume[-1],
-                    "sma": vol_sma[-1],
-                    "ratio": volume[-1] / vol_sma[-1] if vol_sma[-1] != 0 else 0
+                    "current_volume": volume[row, -1],
+                    "sma": vol_sma[row, -1],
+                    "ratio": volume_ratio[row]
                 },
                 "vwap": {
-                    "value": vwap[-1] if not pd.isna(vwap[-1]) else None,
-                    "signal": self._interpret_vwap(close[-1], vwap[-1]) if not pd.isna(vwap[-1]) else None
+                    "value": vwap[row, -1] if not vwap_missing[row] else None,
+                    "signal": vwap_signals[row] if not vwap_missing[row] else None
                 },
                 "accumulation_distribution": {
-                    "value": ad[-1],
-                    "signal": self._interpret_ad(ad[-3:], close[-3:])
+                    "value": ad[row, -1],
+                    "signal": ad_signals[row]
                 },
                 "chaikin_money_flow": {
-                    "value": cmf[-1],
-                    "signal": self._interpret_cmf(cmf[-1])
+                    "value": cmf[row, -1],
+                    "signal": cmf_signals[row]
                 }
-            }
+            } for row in range(count)]
         except Exception as e:
-            return {"error": f"Volume analysis failed: {str(e)}"}
+            return [{"error": f"Volume analysis failed: {str(e)}"}] * count
 
-    def _analyze_volatility(self, df: pd.DataFrame) -> Dict:
+    def _analyze_volatility(self, engine: IndicatorEngine) -> List[Dict]:
         """Enhanced volatility analysis"""
-        close = df['close'].values
-        high = df['high'].values
-        low = df['low'].values
+        count = len(_rows(engine.close))
+        close = _rows(engine.close)
 
         try:
-            # Bollinger Bands
-            upper, middle, lower = talib.BBANDS(close, timeperiod=20)
-            
-            # ATR
-            atr = talib.ATR(high, low, close, timeperiod=14)
-            
-            # Standard Deviation
-            stddev = talib.STDDEV(close, timeperiod=20)
-            
+            # Bollinger Bands share the 20-period SMA and standard deviation
+            indicators = engine.compute(['bollinger_bands', 'atr', 'stddev'])
+            upper, middle, lower = (_rows(band)[:, -1] for band in indicators['bollinger_bands'])
+            atr = _rows(indicators['atr'])[:, -1]
+            stddev = _rows(indicators['stddev'])[:, -1]
+            price = close[:, -1]
+
             # Calculate Historical Volatility
-            returns = np.log(close[1:] / close[:-1])
-            hist_vol = np.std(returns) * np.sqrt(252) * 100  # Annualized
+            returns = np.log(close[:, 1:] / close[:, :-1])
+            hist_vol = np.std(returns, axis=1) * np.sqrt(252) * 100  # Annualized
 
-            return {
+            bband_signals = self._interpret_bbands(price, upper, lower)
+            atr_interpretations = self._interpret_atr(atr, price)
+            volatility_interpretations = self._interpret_volatility(hist_vol)
+
+            return [{
                 "bollinger_bands": {
-                    "upper": upper[-1],
-                    "middle": middle[-1],
-                    "lower": lower[-1],
-                    "bandwidth": (upper[-1] - lower[-1]) / middle[-1] * 100,
-                    "signal": self._interpret_bbands(close[-1], upper[-1], lower[-1])
+                    "upper": upper[row],
+                    "middle": middle[row],
+                    "lower": lower[row],
+                    "bandwidth": (upper[row] - lower[row]) / middle[row] * 100,
+                    "signal": bband_signals[row]
                 },
                 "atr": {
-                    "value": atr[-1],
-                    "percentage": (atr[-1] / close[-1]) * 100,
-                    "interpretation": self._interpret_atr(atr[-1], close[-1])
+                    "value": atr[row],
+                    "percentage": (atr[row] / price[row]) * 100,
+                    "interpretation": atr_interpretations[row]
                 },
                 "historical_volatility": {
-                    "value": hist_vol,
-                    "interpretation": self._interpret_volatility(hist_vol)
+                    "value": hist_vol[row],
+                    "interpretation": volatility_interpretations[row]
                 },
                 "standard_deviation": {
-                    "value": stddev[-1],
-                    "relative": (stddev[-1] / close[-1]) * 100
+                    "value": stddev[row],
+                    "relative": (stddev[row] / price[row]) * 100
                 }
-            }
+            } for row in range(count)]
         except Exception as e:
-            return {"error": f"Volatility analysis failed: {str(e)}"}
+            return [{"error": f"Volatility analysis failed: {str(e)}"}] * count
 
     # Helper methods for calculations and interpretations...
-    def _calculate_vwap(self, df: pd.DataFrame) -> np.ndarray:
-        """Calculate VWAP"""
-        df['typical_price'] = (df['high'] + df['low'] + df['close']) / 3
-        df['vwap'] = (df['typical_price'] * df['volume']).cumsum() / df['volume'].cumsum()
-        return df['vwap'].values
-
     def _calculate_ichimoku_line(self, high: np.ndarray, low: np.ndarray, period: int) -> np.ndarray:
         """Calculate Ichimoku lines"""
         period_high = pd.Series(high).rolling(window=period).max()
         period_low = pd.Series(low).rolling(window=period).min()
         return (period_high + period_low) / 2
 
-    # Interpretation methods will be implemented in the next part...
-    # ... Previous code remains the same until interpretation methods ...
+    # Interpretations are vectorized: they take one value per series and
+    # return one result per series
 
-    def _interpret_rsi(self, value: float) -> Dict:
+    def _interpret_rsi(self, values: np.ndarray) -> List[Dict]:
         """Interpret RSI values"""
-        if value > 70:
-            return {
-                "condition": "Overbought",
-                "signal": "Bearish",
-                "strength": min(100, (value - 70) * 3.33)  # Scale 0-100
-            }
-        elif value < 30:
-            return {
-                "condition": "Oversold",
-                "signal": "Bullish",
-                "strength": min(100, (30 - value) * 3.33)
-            }
-        return {
-            "condition": "Neutral",
-            "signal": "Neutral",
-            "strength": 0
-        }
-
-    def _interpret_stochastic(self, k: float, d: float) -> Dict:
+        overbought = values > 70
+        oversold = values < 30
+        return _records(
+            condition=np.select([overbought, oversold], ["Overbought", "Oversold"], "Neutral"),
+            signal=np.select([overbought, oversold], ["Bearish", "Bullish"], "Neutral"),
+            strength=np.select(
+                [overbought, oversold],
+                [np.fmin(100, (values - 70) * 3.33), np.fmin(100, (30 - values) * 3.33)],
+                0
+            )
+        )
+
+    def _interpret_stochastic(self, k: np.ndarray, d: np.ndarray) -> List[Dict]:
         """Interpret Stochastic oscillator"""
-        signal = "Neutral"
-        strength = 0
-        
-        if k > 80 and d > 80:
-            signal = "Bearish"
-            strength = min(100, (k - 80) * 5)
-        elif k < 20 and d < 20:
-            signal = "Bullish"
-            strength = min(100, (20 - k) * 5)
-        elif k > d:
-            signal = "Bullish"
-            strength = min(100, (k - d) * 2)
-        elif d > k:
-            signal = "Bearish"
-            strength = min(100, (d - k) * 2)
-            
-        return {
-            "signal": signal,
-            "strength": strength,
-            "crossover": "Bullish" if k > d else "Bearish"
-        }
-
-    def _interpret_williams_r(self, value: float) -> Dict:
+        conditions = [(k > 80) & (d > 80), (k < 20) & (d < 20), k > d, d > k]
+        return _records(
+            signal=np.select(conditions, ["Bearish", "Bullish", "Bullish", "Bearish"], "Neutral"),
+            strength=np.select(conditions, [
+                np.fmin(100, (k - 80) * 5),
+                np.fmin(100, (20 - k) * 5),
+                np.fmin(100, (k - d) * 2),
+                np.fmin(100, (d - k) * 2),
+            ], 0),
+            crossover=np.where(k > d, "Bullish", "Bearish")
+        )
+
+    def _interpret_williams_r(self, values: np.ndarray) -> List[Dict]:
         """Interpret Williams %R"""
-        if value > -20:
-            return {
-                "condition": "Overbought",
-                "signal": "Bearish",
-                "strength": min(100, (-value + 20) * 5)
-            }
-        elif value < -80:
-            return {
-                "condition": "Oversold",
-                "signal": "Bullish",
-                "strength": min(100, (-80 - value) * 5)
-            }
-        return {
-            "condition": "Neutral",
-            "signal": "Neutral",
-            "strength": 0
-        }
-
-    def _interpret_macd(self, macd: float, signal: float, hist: float) -> Dict:
+        overbought = values > -20
+        oversold = values < -80
+        return _records(
+            condition=np.select([overbought, oversold], ["Overbought", "Oversold"], "Neutral"),
+            signal=np.select([overbought, oversold], ["Bearish", "Bullish"], "Neutral"),
+            strength=np.select(
+                [overbought, oversold],
+                [np.fmin(100, (-values + 20) * 5), np.fmin(100, (-80 - values) * 5)],
+                0
+            )
+        )
+
+    def _interpret_macd(self, macd: np.ndarray, signal: np.ndarray, hist: np.ndarray) -> List[Dict]:
         """Interpret MACD signals"""
-        crossover = "None"
-        if (macd > signal and hist > 0):
-            crossover = "Bullish"
-        elif (macd < signal and hist < 0):
-            crossover = "Bearish"
-            
-        strength = min(100, abs(hist) * 100)
-            
-        return {
-            "crossover": crossover,
-            "strength": strength,
-            "histogram_direction": "Up" if hist > 0 else "Down"
-        }
-
-    def _interpret_adx(self, value: float) -> Dict:
+        return _records(
+            crossover=np.select(
+                [(macd > signal) & (hist > 0), (macd < signal) & (hist < 0)], ["Bullish", "Bearish"], "None"
+            ),
+            strength=np.fmin(100, np.abs(hist) * 100),
+            histogram_direction=np.where(hist > 0, "Up", "Down")
+        )
+
+    def _interpret_adx(self, values: np.ndarray) -> List[Dict]:
         """Interpret ADX strength"""
-        if value >= 50:
-            strength = "Very Strong"
-            signal_strength = 100
-        elif value >= 25:
-            strength = "Strong"
-            signal_strength = 75
-        elif value >= 20:
-            strength = "Moderate"
-            signal_strength = 50
-        else:
-            strength = "Weak"
-            signal_strength = 25
-            
-        return {
-            "trend_strength": strength,
-            "signal_strength": signal_strength
-        }
+        conditions = [values >= 50, values >= 25, values >= 20]
+        return _records(
+            trend_strength=np.select(conditions, ["Very Strong", "Strong", "Moderate"], "Weak"),
+            signal_strength=np.select(conditions, [100, 75, 50], 25)
+        )
 
-    def _interpret_bbands(self, price: float, upper: float, lower: float) -> Dict:
+    def _interpret_bbands(self, price: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> List[Dict]:
         """Interpret Bollinger Bands"""
         bandwidth = (upper - lower) / ((upper + lower) / 2) * 100
-        
-        if price >= upper:
-            return {
-                "condition": "Overbought",
-                "signal": "Bearish",
-                "volatility": "High" if bandwidth > 20 else "Normal",
-                "strength": min(100, ((price - upper) / upper) * 100)
-            }
-        elif price <= lower:
-            return {
-                "condition": "Oversold",
-                "signal": "Bullish",
-                "volatility": "High" if bandwidth > 20 else "Normal",
-                "strength": min(100, ((lower - price) / lower) * 100)
-            }
-        return {
-            "condition": "Neutral",
-            "signal": "Neutral",
-            "volatility": "High" if bandwidth > 20 else "Normal",
-            "strength": 0
-        }
+        overbought = price >= upper
+        oversold = price <= lower
+        return _records(
+            condition=np.select([overbought, oversold], ["Overbought", "Oversold"], "Neutral"),
+            signal=np.select([overbought, oversold], ["Bearish", "Bullish"], "Neutral"),
+            volatility=np.where(bandwidth > 20, "High", "Normal"),
+            strength=np.select([overbought, oversold], [
+                np.fmin(100, ((price - upper) / upper) * 100),
+                np.fmin(100, ((lower - price) / lower) * 100),
+            ], 0)
+        )
 
     def _interpret_volume(self, current_volume: float, avg_volume: float) -> Dict:
         """Interpret volume signals"""
@@ -731,19 +863,19 @@ class TechnicalAnalyzer:
         risk_factors = []
         
         # Volatility risk
-        volatility = analysis["volatility_indicators"]
+        volatility = analysis.get("volatility_indicators", {"error": "not computed"})
         if "error" not in volatility:
             bb_width = volatility["bollinger_bands"]["bandwidth"]
             risk_factors.append(min(100, bb_width))
             
         # Trend strength risk (inverse of ADX)
-        trend = analysis["trend_indicators"]
+        trend = analysis.get("trend_indicators", {"error": "not computed"})
         if "error" not in trend:
             adx_value = trend["adx"]["value"]
             risk_factors.append(100 - min(100, adx_value))
             
         # Volume risk
-        volume = analysis["volume_indicators"]
+        volume = analysis.get("volume_indicators", {"error": "not computed"})
         if "error" not in volume:
             vol_ratio = volume["volume_sma"]["ratio"]
             risk_factors.append(min(100, vol_ratio * 50))
@@ -757,134 +889,87 @@ class TechnicalAnalyzer:
             "factors": len(risk_factors)
         }
         
-    def _interpret_mas(self, current_price: float, ma20: float, ma50: float, ma200: float) -> str:
+    def _interpret_mas(
+        self,
+        current_price: np.ndarray,
+        ma20: np.ndarray,
+        ma50: np.ndarray,
+        ma200: np.ndarray
+    ) -> List[str]:
         """Interpret Moving Averages"""
-        if current_price > ma20 and ma20 > ma50 and ma50 > ma200:
-            return "Bullish"
-        elif current_price < ma20 and ma20 < ma50 and ma50 < ma200:
-            return "Bearish"
-        elif current_price > ma50 and ma50 > ma200:
-            return "Moderately Bullish"
-        elif current_price < ma50 and ma50 < ma200:
-            return "Moderately Bearish"
-        return "Neutral"
-
-    def _interpret_mfi(self, value: float) -> Dict:
+        return np.select([
+            (current_price > ma20) & (ma20 > ma50) & (ma50 > ma200),
+            (current_price < ma20) & (ma20 < ma50) & (ma50 < ma200),
+            (current_price > ma50) & (ma50 > ma200),
+            (current_price < ma50) & (ma50 < ma200),
+        ], ["Bullish", "Bearish", "Moderately Bullish", "Moderately Bearish"], "Neutral").tolist()
+
+    def _interpret_mfi(self, values: np.ndarray) -> List[Dict]:
         """Interpret Money Flow Index"""
-        if value > 80:
-            return {
-                "condition": "Overbought",
-                "signal": "Bearish",
-                "strength": min(100, (value - 80) * 5)
-            }
-        elif value < 20:
-            return {
-                "condition": "Oversold",
-                "signal": "Bullish",
-                "strength": min(100, (20 - value) * 5)
-            }
-        return {
-            "condition": "Neutral",
-            "signal": "Neutral",
-            "strength": 0
-        }
-
-    def _interpret_obv(self, obv_values: np.ndarray) -> str:
-        """Interpret On Balance Volume"""
-        if len(obv_values) < 2:
-            return "Neutral"
-        
-        obv_change = obv_values[-1] - obv_values[0]
-        
-        if obv_change > 0:
-            return "Bullish"
-        elif obv_change < 0:
-            return "Bearish"
-        return "Neutral"
-
-    def _interpret_ad(self, ad_values: np.ndarray, price_values: np.ndarray) -> str:
-        """Interpret Accumulation/Distribution"""
-        if len(ad_values) < 2 or len(price_values) < 2:
-            return "Neutral"
-            
-        ad_change = ad_values[-1] - ad_values[0]
-        price_change = price_values[-1] - price_values[0]
-        
-        if ad_change > 0 and price_change < 0:
-            return "Bullish"  # Accumulation
-        elif ad_change < 0 and price_change > 0:
-            return "Bearish"  # Distribution
-        return "Neutral"
-
-    def _interpret_cmf(self, value: float) -> str:
+        overbought = values > 80
+        oversold = values < 20
+        return _records(
+            condition=np.select([overbought, oversold], ["Overbought", "Oversold"], "Neutral"),
+            signal=np.select([overbought, oversold], ["Bearish", "Bullish"], "Neutral"),
+            strength=np.select(
+                [overbought, oversold],
+                [np.fmin(100, (values - 80) * 5), np.fmin(100, (20 - values) * 5)],
+                0
+            )
+        )
+
+    def _interpret_obv(self, obv_values: np.ndarray) -> List[str]:
+        """Interpret On Balance Volume (one window of recent values per row)"""
+        obv_change = obv_values[:, -1] - obv_values[:, 0]
+        return np.select([obv_change > 0, obv_change < 0], ["Bullish", "Bearish"], "Neutral").tolist()
+
+    def _interpret_ad(self, ad_values: np.ndarray, price_values: np.ndarray) -> List[str]:
+        """Interpret Accumulation/Distribution (one window of recent values per row)"""
+        ad_change = ad_values[:, -1] - ad_values[:, 0]
+        price_change = price_values[:, -1] - price_values[:, 0]
+        return np.select([
+            (ad_change > 0) & (price_change < 0),  # Accumulation
+            (ad_change < 0) & (price_change > 0),  # Distribution
+        ], ["Bullish", "Bearish"], "Neutral").tolist()
+
+    def _interpret_cmf(self, values: np.ndarray) -> List[str]:
         """Interpret Chaikin Money Flow"""
-        if value > 0.25:
-            return "Bullish"
-        elif value < -0.25:
-            return "Bearish"
-        return "Neutral"
+        return np.select([values > 0.25, values < -0.25], ["Bullish", "Bearish"], "Neutral").tolist()
 
-    def _interpret_atr(self, atr_value: float, current_price: float) -> Dict:
+    def _interpret_atr(self, atr_value: np.ndarray, current_price: np.ndarray) -> List[Dict]:
         """Interpret Average True Range"""
         atr_percentage = (atr_value / current_price) * 100
-        
-        if atr_percentage > 5:
-            volatility = "Very High"
-            risk = "High"
-        elif atr_percentage > 3:
-            volatility = "High"
-            risk = "Moderate to High"
-        elif atr_percentage > 1:
-            volatility = "Moderate"
-            risk = "Moderate"
-        else:
-            volatility = "Low"
-            risk = "Low"
-            
-        return {
-            "volatility": volatility,
-            "risk": risk,
-            "atr_percentage": atr_percentage
-        }
-
-    def _interpret_vwap(self, current_price: float, vwap: float) -> str:
+        conditions = [atr_percentage > 5, atr_percentage > 3, atr_percentage > 1]
+        return _records(
+            volatility=np.select(conditions, ["Very High", "High", "Moderate"], "Low"),
+            risk=np.select(conditions, ["High", "Moderate to High", "Moderate"], "Low"),
+            atr_percentage=atr_percentage
+        )
+
+    def _interpret_vwap(self, current_price: np.ndarray, vwap: np.ndarray) -> List[str]:
         """Interpret VWAP"""
-        if current_price > vwap:
-            return "Bullish"
-        elif current_price < vwap:
-            return "Bearish"
-        return "Neutral"
+        return np.select([current_price > vwap, current_price < vwap], ["Bullish", "Bearish"], "Neutral").tolist()
 
-    def _interpret_volatility(self, volatility: float) -> str:
+    def _interpret_volatility(self, volatility: np.ndarray) -> List[str]:
         """Interpret Historical Volatility"""
-        if volatility > 100:
-            return "Extremely High"
-        elif volatility > 50:
-            return "Very High"
-        elif volatility > 30:
-            return "High"
-        elif volatility > 20:
-            return "Moderate"
-        return "Low"
-    
-    def _interpret_cci(self, value: float) -> Dict:
+        return np.select(
+            [volatility > 100, volatility > 50, volatility > 30, volatility > 20],
+            ["Extremely High", "Very High", "High", "Moderate"],
+            "Low"
+        ).tolist()
+
+    def _interpret_cci(self, values: np.ndarray) -> List[Dict]:
         """Interpret CCI values"""
-        if value > 100:
-            return {
-                "condition": "Overbought",
-                "signal": "Bearish",
-                "strength": min(100, (value - 100))
-            }
-        elif value < -100:
-            return {
-                "condition": "Oversold",
-                "signal": "Bullish",
-                "strength": min(100, abs(value + 100))
-            }
-        return {
-            "condition": "Neutral",
-            "signal": "Neutral",
-            "strength": 0
-        }
-    
+        overbought = values > 100
+        oversold = values < -100
+        return _records(
+            condition=np.select([overbought, oversold], ["Overbought", "Oversold"], "Neutral"),
+            signal=np.select([overbought, oversold], ["Bearish", "Bullish"], "Neutral"),
+            strength=np.select(
+                [overbought, oversold],
+                [np.fmin(100, values - 100), np.fmin(100, np.abs(values + 100))],
+                0
+            )
+        )
+  
   
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Several timeframes from one base series.
+
+The bot's timeframes (1, 7, 30 and 90 days) used to be fetched one by
+one, each with its own CoinGecko granularity. `resample_ohlcv()` derives
+them from fine-grained base series instead: a timeframe takes the last
+`days` of a base and aggregates it into bars of `bar_rule(days)`. The
+longer timeframes share one hourly base; a single day comes from
+CoinGecko's 5-minute points, since 24 hourly bars are too few for MACD
+or ADX.
+Bins are anchored at the last base timestamp, so the final bar of every
+timeframe closes at the same moment and the analyses line up.
+`timeframe_frames()` fetches the bases of a coin and builds every frame.
+
+`confluence()` then compares the overall sentiment across timeframes.
+"""
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+# Timeframes offered by the bot, in days
+TIMEFRAMES = (1, 7, 30, 90)
+
+# How each column of a bar is built from the base candles it covers
+OHLCV_AGGREGATION = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def bar_rule(days: int) -> str:
+    """Bar size for a timeframe: quarter-hourly up to a day, 4-hourly up to a month, daily beyond."""
+    if days <= 1:
+        return '15min'
+    if days <= 30:
+        return '4h'
+    return '24h'
+
+
+def resample_ohlcv(df: pd.DataFrame, rule: str, days: Optional[int] = None) -> pd.DataFrame:
+    """
+    Aggregate OHLCV candles into `rule` bars (a fixed-length pandas offset such as '4h').
+
+    With `days`, only the last `days` of `df` are used. Bars are
+    right-closed and end at the last timestamp of `df`; bars without
+    candles are dropped.
+    """
+    if days is not None:
+        df = df[df.index > df.index[-1] - pd.Timedelta(days=days)]
+    bars = df[list(OHLCV_AGGREGATION)].resample(rule, origin='end', closed='right', label='right')
+    return bars.agg(OHLCV_AGGREGATION).dropna(subset=['close'])
+
+
+def timeframe_frames(
+    data_processor,
+    coin_id: str,
+    vs_currency: str = 'usd',
+    timeframes: Tuple[int, ...] = TIMEFRAMES,
+    force_refresh: bool = False
+) -> Optional[Dict[int, pd.DataFrame]]:
+    """
+    OHLCV frames of a coin for each timeframe (in days), or None if the base series cannot be fetched.
+
+    The longest timeframe's base series is shared by all timeframes;
+    those of a single day use the 5-minute series instead, falling back
+    to the shared one.
+    """
+    base = data_processor.get_base_series(coin_id, vs_currency, max(timeframes), force_refresh=force_refresh)
+    if base is None or base.empty:
+        return None
+
+    bases = {days: base for days in timeframes}
+    if min(timeframes) <= 1 < max(timeframes):
+        fine = data_processor.get_base_series(coin_id, vs_currency, 1, force_refresh=force_refresh)
+        if fine is not None and not fine.empty:
+            bases.update({days: fine for days in timeframes if days <= 1})
+    return {days: resample_ohlcv(bases[days], bar_rule(days), days) for days in timeframes}
+
+
+def confluence(analyses: Dict[int, Dict]) -> Dict:
+    """
+    Agreement of the overall sentiment across timeframes.
+
+    The dominant sentiment is the more frequent of Bullish and Bearish
+    (Neutral on a tie); `agreement` is the share of timeframes that
+    share it, in percent.
+    """
+    sentiments = {
+        days: analysis["summary"]["overall_sentiment"]
+        for days, analysis in analyses.items() if "summary" in analysis
+    }
+    if not sentiments:
+        return {"sentiment": "Neutral", "agreement": 0.0, "aligned": False, "by_timeframe": {}}
+
+    counts = Counter(sentiments.values())
+    if counts["Bullish"] > counts["Bearish"]:
+        dominant = "Bullish"
+    elif counts["Bearish"] > counts["Bullish"]:
+        dominant = "Bearish"
+    else:
+        dominant = "Neutral"
+    return {
+        "sentiment": dominant,
+        "agreement": counts[dominant] / len(sentiments) * 100,
+        "aligned": len(counts) == 1,
+        "by_timeframe": sentiments
+    }
@@ -4,7 +4,10 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from src.services.database_manager import DatabaseManager
-from ...analysis.technical import TechnicalAnalyzer
+from src.services.activity_logger import ActivityLogger
+from src.services.screener import MarketScreener, parse_screen
+from src.services.news_ingest import NewsIngestor
+from ...analysis.technical import TechnicalAnalyzer, SUMMARY_SECTIONS
 from ...utils.formatters import TelegramFormatter
 from ...utils.news_formatters import NewsFormatter
 from ...data.processor import DataProcessor
@@ -16,16 +19,25 @@ from ...analysis.plot_charts_html import (
 )
 import tempfile
 import os
+from typing import Dict, Optional
+import pandas as pd
 
 class AnalysisHandler:
     def __init__(self):
         self.analyzer = TechnicalAnalyzer()
         self.formatter = TelegramFormatter()
         self.data_processor = DataProcessor()
-        self.news_fetcher = CryptoNewsFetcher(os.getenv("CRYPTO_NEWS_TOKEN"),os.getenv("GOOGLE_API_KEY"))
+        self.db_manager = DatabaseManager()
+        self.news_fetcher = CryptoNewsFetcher(
+            os.getenv("CRYPTO_NEWS_TOKEN"), os.getenv("GOOGLE_API_KEY"), db_manager=self.db_manager
+        )
+        # Answers /news from the local article store; its polling loop is started by main
+        self.news_ingestor = NewsIngestor(self.news_fetcher, self.db_manager)
         self.news_formatter = NewsFormatter()
         self.keyboards = reply_keyboards.AnalysisKeyboards()
-        self.db_manager = DatabaseManager()
+        self.activity_logger = ActivityLogger(self.db_manager)
+        # Answers /screen from the snapshot table; its refresh loop is started by main
+        self.screener = MarketScreener(self.db_manager, self.data_processor)
         # Default timeframes
         self.timeframes = {
             '1d': 1,
@@ -52,14 +64,10 @@ class AnalysisHandler:
         )
 
         try:
-            # Get news articles
-            news_df, success = self.news_fetcher.get_news_by_coin(
-                categories=coin_symbol,
-                limit=5,
-                lang="EN"
-            )
+            # Stored articles; off the event loop since an untracked coin is polled first
+            news_df = await asyncio.to_thread(self.news_ingestor.latest, coin_symbol, 5)
             
-            if not success or news_df.empty:
+            if news_df.empty:
                 await loading_message.edit_text(
                          f"❌ {self.formatter._t('no_news_found')}: {coin_symbol}"
                 )
@@ -108,9 +116,13 @@ class AnalysisHandler:
                 )
                 return
 
-            # Get analysis
+            # Every timeframe from shared base series, so switching timeframes refetches nothing;
+            # off the event loop, in a worker process when the analysis pool is enabled
             days = self.timeframes[timeframe]
-            analysis = self.analyzer.analyze_coin(coin_id, days=days)
+            result = await asyncio.to_thread(self.analyzer.analyze_timeframes, coin_id)
+            analysis = result.get("timeframes", {}).get(days, result)
+            if "confluence" in result:
+                analysis["confluence"] = result["confluence"]
             
             # Send text analysis
             formatted_message = self.formatter.format_full_analysis(analysis, coin_id)
@@ -118,16 +130,21 @@ class AnalysisHandler:
 
             # Generate and send charts
             # await self._send_analysis_charts(update, analysis, coin_id,formatted_message)
-            await self._generate_and_send_chart( 
-        update=update, 
-        coin_id= coin_id, 
-        chart_type= 'full', 
-        days=days,
-        loading_message = update.message,
-        intro_text=formatted_message
-    )
+            # from the same bars and analysis as the text, so the PDF cannot contradict it
+            df = result.get("frames", {}).get(days)
+            if df is not None:
+                await self._generate_and_send_chart(
+                    update=update,
+                    coin_id=coin_id,
+                    chart_type='full',
+                    days=days,
+                    loading_message=update.message,
+                    intro_text=formatted_message,
+                    df=df,
+                    analysis=analysis
+                )
             # log the activities in the database
-            self.db_manager.log_user_activity({
+            self.activity_logger.log({
                 'user_id':update.message.from_user.username,
                 'coin_id':coin_id,
                 'activity_type':'full',
@@ -170,7 +187,8 @@ class AnalysisHandler:
                 return
 
             # Get quick analysis
-            analysis = self.analyzer.analyze_coin(coin_id=coin_id,days=1)
+            # Only the summary is shown, so skip the pattern and level scans
+            analysis = self.analyzer.analyze_coin(coin_id=coin_id, days=1, sections=SUMMARY_SECTIONS)
             formatted_message = self.formatter._format_summary(analysis['summary'])
             
             # Send text analysis
@@ -188,7 +206,7 @@ class AnalysisHandler:
     )
             # log the activities in the database
 
-            self.db_manager.log_user_activity({
+            self.activity_logger.log({
                 'user_id':update.message.from_user.username,
                 'coin_id':coin_id,
                 'activity_type':'price',
@@ -198,6 +216,34 @@ class AnalysisHandler:
                 self.formatter.format_error_message(str(e))
             )
 
+    async def cmd_screen(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /screen command"""
+        self.formatter.set_language(context.user_data['language'])
+        if not context.args:
+            await update.message.reply_text(
+                f"{self.formatter._t('screen_prompt')}\n"
+                f"{self.formatter._t('screen_example')}"
+            )
+            return
+
+        try:
+            query = parse_screen(context.args)
+        except ValueError as e:
+            await update.message.reply_text(
+                f"{self.formatter._t('screen_invalid')}: {str(e)}\n"
+                f"{self.formatter._t('screen_example')}"
+            )
+            return
+
+        try:
+            # One indexed query over the snapshot table; no API calls
+            snapshots = await asyncio.to_thread(self.screener.screen, query)
+            await update.message.reply_text(self.formatter.format_screen_results(query, snapshots))
+        except Exception as e:
+            await update.message.reply_text(
+                self.formatter.format_error_message(str(e))
+            )
+
     async def cmd_chart(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         self.formatter.set_language(context.user_data['language'])
         """Handler for /chart command"""
@@ -240,7 +286,7 @@ class AnalysisHandler:
                 loading_message
             )
             # log the activities in the database
-            self.db_manager.log_user_activity({
+            self.activity_logger.log({
                 'user_id':update.message.from_user.username,
                 'coin_id':coin_id,
                 'activity_type':chart_type,
@@ -259,9 +305,16 @@ class AnalysisHandler:
     chart_type: str, 
     days: int,
     loading_message: Update.message,
-    intro_text=None
+    intro_text=None,
+    df: Optional[pd.DataFrame] = None,
+    analysis: Optional[Dict] = None
 ):
-        """Generate and send specific chart type with progress bar."""
+        """
+        Generate and send specific chart type with progress bar.
+
+        `df` and `analysis` chart data the caller already has; otherwise
+        the OHLCV series of `days` is fetched and analyzed.
+        """
         try:
             # Initialize progress
             progress = 0
@@ -299,12 +352,14 @@ class AnalysisHandler:
             self.formatter.format_loading_message()
         )
             await update_progress_bar(progress,loading_message)
-            df = self.data_processor.get_ohlcv_data(coin_id=coin_id, days=days)
+            if df is None:
+                df = self.data_processor.get_ohlcv_data(coin_id=coin_id, days=days)
 
             await update_progress_bar(progress+ 20,loading_message)
 
             # Step 2: Perform analysis
-            analysis = self.analyzer.analyze_coin(coin_id, days=days)
+            if analysis is None:
+                analysis = await asyncio.to_thread(self.analyzer.analyze_coin, coin_id, days=days)
             await update_progress_bar(progress+20,loading_message)
 
             with tempfile.TemporaryDirectory() as temp_dir:
@@ -328,14 +383,21 @@ class AnalysisHandler:
                     ma_data = analysis['trend_indicators']['moving_averages']  
                     macd_data = analysis['trend_indicators']['macd']
                     rsi_data = analysis['momentum_indicators']['rsi']['all']    
+                    # Cached per coin and data version, like the analysis
+                    pattern_events = self.analyzer.pattern_scanner.scan(df, key=(coin_id, 'usd', days)).events
+                    levels = analysis['support_resistance']
                     await save_charts_to_pdf(
                         directory=temp_dir,filename=chart_path,
                         df=df,
                         ma_data=ma_data,
                         macd_data=macd_data,
                         rsi_data=rsi_data,
+                        support_levels=levels['support_levels'],
+                        resistance_levels=levels['resistance_levels'],
+                        zones=levels['zones'],
+                        pattern_events=pattern_events,
                         style=create_plot_style(color_up='blue', color_down='orange', bgcolor='lightgray'),
-                        charts_to_include=['price', 'moving_averages', 'macd', 'rsi', 'volume'],
+                        charts_to_include=['price', 'moving_averages', 'macd', 'rsi', 'support_resistance', 'patterns', 'volume'],
                         intro_text=intro_text
                     )
                 
@@ -389,19 +389,21 @@ class CallbackHandler:
             return await query.edit_message_text(
                     self.formatter._t('error_no_permission'))
         """Handle user tracking selections"""
-        action = query.data.split("_")[1]
+        parts = query.data.split("_")
+        action = parts[1]
+        window = parts[2] if len(parts) > 2 else None
         try:
             if action == "searched":
-                searched_data = await self._get_most_searched_data()
+                searched_data = await self._get_most_searched_data(window)
                 await query.edit_message_text(
                     f"{self.formatter._t('most_searched_stats')}\n{self.formatter.format_popular_results([{'coin': r['coin'], 'count': r['count']} for r in searched_data], headers=('coin', 'count'))}",
-                    reply_markup=self.keyboards.get_user_tracking_menu()
+                    reply_markup=self.keyboards.get_tracking_window_menu(action)
                 )
             elif action == "analysis":
-                analysis_data = await self._get_popular_analysis_data()
+                analysis_data = await self._get_popular_analysis_data(window)
                 await query.edit_message_text(
                     f"{self.formatter._t('popular_analysis_stats')}\n{self.formatter.format_popular_results(analysis_data, ('analysis_type', 'count'))}",
-                    reply_markup=self.keyboards.get_user_tracking_menu()
+                    reply_markup=self.keyboards.get_tracking_window_menu(action)
                 )
         except Exception as e:
             await query.edit_message_text(self.formatter._t('error'))
@@ -428,17 +430,17 @@ class CallbackHandler:
             await query.edit_message_text(self.formatter._t('error'))
 
 
-    async def _get_most_searched_data(self):
+    async def _get_most_searched_data(self, window=None):
         try:
-            return self.db_manager.get_most_popular_coins(10)
+            return self.db_manager.get_most_popular_coins(10, window=window)
             
         except Exception as e:
             return str(e)
 
-    async def _get_popular_analysis_data(self):
+    async def _get_popular_analysis_data(self, window=None):
         try:
 
-            return self.db_manager.get_most_popular_analysis_types(10)
+            return self.db_manager.get_most_popular_analysis_types(10, window=window)
         except Exception as e:
             return await str(e)
 
@@ -12,7 +12,8 @@ from ...utils.formatters import TelegramFormatter
 class CustomMessageHandler:  # Renamed from MessageHandler to CustomMessageHandler
     def __init__(self):
         self.analysis_handler = AnalysisHandler()
-        self.agent = CryptoAnalysisAgent()
+        # Shares the handler's news store reader and its sentiment-scoring fetcher
+        self.agent = CryptoAnalysisAgent(news_ingestor=self.analysis_handler.news_ingestor)
         self.formatter = TelegramFormatter()
         self.db_manager = DatabaseManager()
         self.keyboards = AnalysisKeyboards()
@@ -144,6 +144,19 @@ class AnalysisKeyboards:
         ]
         return InlineKeyboardMarkup(keyboard)
 
+    def get_tracking_window_menu(self, action: str):
+        """Create time window keyboard for a tracking statistic"""
+        keyboard = [
+            [
+                InlineKeyboardButton(text=self.formatter._t('window_hour'), callback_data=f"tracking_{action}_hour"),
+                InlineKeyboardButton(text=self.formatter._t('window_day'), callback_data=f"tracking_{action}_day"),
+                InlineKeyboardButton(text=self.formatter._t('window_week'), callback_data=f"tracking_{action}_week"),
+                InlineKeyboardButton(text=self.formatter._t('window_all'), callback_data=f"tracking_{action}"),
+            ],
+            [InlineKeyboardButton(text=self.formatter._t('back_button'), callback_data="back_tracking")]
+        ]
+        return InlineKeyboardMarkup(keyboard)
+
     def get_users_managing_menu(self):
         """Create users managing menu keyboard"""
         keyboard = [
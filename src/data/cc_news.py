@@ -1,22 +1,67 @@
+import hashlib
 import requests
 import pandas as pd
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
 from ..llm.sentimnet import CryptoSentimentAnalyzer
+from ..services.database_manager import DatabaseManager
+
+
+def article_hash(title: str, body: str) -> str:
+    """SHA-256 of an article's title and body; changes whenever the scored text does."""
+    return hashlib.sha256(f"{title or ''}\n{body or ''}".encode('utf-8')).hexdigest()
+
 
 class CryptoNewsFetcher:
-    def __init__(self, api_key: str, google_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        google_api_key: Optional[str] = None,
+        db_manager: Optional[DatabaseManager] = None
+    ):
         """
         Initialize the CryptoCompare News API client.
         
         Args:
             api_key (str): CryptoCompare API key
+            google_api_key (str): Google API key; enables LLM sentiment scoring
+            db_manager (DatabaseManager): Store for scored sentiments (default: a new manager
+                when sentiment scoring is enabled)
         """
         self.api_key = api_key
         self.base_url = "https://data-api.cryptocompare.com/news/v1/article"
+        self.sentiment_analyzer = None
+        self.db_manager = db_manager
         if google_api_key:
             self.sentiment_analyzer = CryptoSentimentAnalyzer(google_api_key)
+            self.db_manager = db_manager or DatabaseManager()
+
+    def score_sentiments(self, articles: pd.DataFrame) -> List[str]:
+        """
+        LLM sentiments of the articles, scoring only those not seen before.
+
+        Articles are immutable once published, so a sentiment is stored per
+        GUID and content hash and reused on later requests. Articles the LLM
+        could not score in time are neutral and are not stored.
+        """
+        hashes = [article_hash(title, body) for title, body in zip(articles['title'], articles['body'])]
+        keys = list(zip(articles['guid'], hashes))
+        known = self.db_manager.get_article_sentiments(keys)
+
+        unseen = [position for position, key in enumerate(keys) if key not in known]
+        if unseen:
+            scored = self.sentiment_analyzer.score_articles(
+                [(articles['title'].iloc[position], articles['body'].iloc[position]) for position in unseen],
+                default=None
+            )
+            new = {keys[position]: sentiment for position, sentiment in zip(unseen, scored) if sentiment is not None}
+            self.db_manager.bulk_update_article_sentiments([
+                {'guid': guid, 'content_hash': content_hash, 'sentiment': sentiment}
+                for (guid, content_hash), sentiment in new.items()
+            ])
+            known.update(new)
+        return [known.get(key, 'neutral') for key in keys]
     
     def _safe_timestamp_to_datetime(self, timestamp) -> Optional[datetime]:
         """
@@ -36,7 +81,9 @@ class CryptoNewsFetcher:
     def get_news_by_coin(self, 
                         categories: str,
                         limit: int = 10,
-                        lang: str = "EN") -> Tuple[pd.DataFrame, bool]:
+                        lang: str = "EN",
+                        to_ts: Optional[int] = None,
+                        score: bool = True) -> Tuple[pd.DataFrame, bool]:
         """
         Get news articles related to specific cryptocurrency categories.
         
@@ -44,6 +91,8 @@ class CryptoNewsFetcher:
             categories (str): Cryptocurrency categories (e.g., 'BTC,ETH')
             limit (int): Maximum number of news articles to fetch
             lang (str): Language of articles (default: 'EN')
+            to_ts (int): Only articles published up to this Unix timestamp (default: the newest)
+            score (bool): Replace the API sentiments with scored ones, when scoring is enabled
             
         Returns:
             Tuple[pd.DataFrame, bool]: (DataFrame containing news articles, success status)
@@ -54,6 +103,8 @@ class CryptoNewsFetcher:
             'limit': limit,
             'api_key': self.api_key
         }
+        if to_ts is not None:
+            params['to_ts'] = to_ts
         
         headers = {
             'Content-type': 'application/json; charset=UTF-8'
@@ -73,8 +124,9 @@ class CryptoNewsFetcher:
             data = response.json()
             
             if not data.get('Data'):
+                # A valid answer, unlike the failures above: there are no articles
                 print("No news articles found")
-                return pd.DataFrame(), False
+                return pd.DataFrame(), True
             
             articles = []
             
@@ -89,7 +141,8 @@ class CryptoNewsFetcher:
                     
                     articles.append({
                         'id': article.get('ID'),
-                        'guid': article.get('GUID'),
+                        # Articles without a GUID are identified by their content
+                        'guid': article.get('GUID') or article_hash(article.get('TITLE'), article.get('BODY')),
                         'published_on': self._safe_timestamp_to_datetime(article.get('PUBLISHED_ON')),
                         'title': article.get('TITLE', ''),
                         'url': article.get('URL', ''),
@@ -115,8 +168,8 @@ class CryptoNewsFetcher:
                 return pd.DataFrame(), False
             articles = pd.DataFrame(articles)
             
-            if self.sentiment_analyzer:
-                articles = self.sentiment_analyzer.batch_analyze_articles(pd.DataFrame(articles))
+            if score and self.sentiment_analyzer:
+                articles['sentiment'] = self.score_sentiments(articles)
             
             return articles, True
             
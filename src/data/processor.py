@@ -2,13 +2,22 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 import logging
 
 from ..services.coingecko_api import CoinGeckoAPI
 from ..services.cache_manager import CacheManager
+from ..analysis.streaming import StreamingIndicators
 
 class DataProcessor:
+    # Base series for multi-timeframe analysis, kept in memory and shared by all
+    # processors: (coin_id, vs_currency, days) -> (monotonic fetch time, DataFrame)
+    BASE_CACHE_SIZE = 128
+    _base_cache: "OrderedDict[Tuple, Tuple[float, pd.DataFrame]]" = OrderedDict()
+    _base_cache_lock = threading.Lock()
+
     def __init__(self):
         self.api = CoinGeckoAPI()
         # self.cache_manager = CacheManager("sqlite:///crypto_cache.db")
@@ -21,7 +30,8 @@ class DataProcessor:
         coin_id: str, 
         vs_currency: str = 'usd',
         days: int = 30,
-        interval: Optional[str] = 'daily'
+        interval: Optional[str] = 'daily',
+        force_refresh: bool = False
     ) -> Optional[pd.DataFrame]:
         """
         Fetch and process OHLCV (Open, High, Low, Close, Volume) data.
@@ -31,6 +41,7 @@ class DataProcessor:
             vs_currency: The target currency (default: 'usd')
             days: Number of days of data to fetch (default: 30)
             interval: Data interval (default: 'daily')
+            force_refresh: Skip the cache lookup and fetch from the API (used by the prewarmer)
             
         Returns:
             pandas.DataFrame with OHLCV data or None if error occurs
@@ -46,16 +57,17 @@ class DataProcessor:
         start_time = end_time - timedelta(days=days)
         
         # Try to get data from cache
-        cached_data = self.cache_manager.get_ohlcv_data(
-            coin_id=coin_id,
-            vs_currency=vs_currency,
-            interval=days,
-            start_time=start_time,
-            end_time=end_time
-        )
-        
-        if cached_data is not None:
-            return cached_data
+        if not force_refresh:
+            cached_data = self.cache_manager.get_ohlcv_data(
+                coin_id=coin_id,
+                vs_currency=vs_currency,
+                interval=days,
+                start_time=start_time,
+                end_time=end_time
+            )
+
+            if cached_data is not None:
+                return cached_data
 
         try:
             # Get market chart data
@@ -83,6 +95,7 @@ class DataProcessor:
                 interval=days,
                 df=df
             )
+            self.update_streaming_indicators(coin_id, vs_currency, days, df)
             
             return df
 
@@ -91,6 +104,121 @@ class DataProcessor:
             print(str(e))
             return None
 
+    def update_streaming_indicators(
+        self,
+        coin_id: str,
+        vs_currency: str,
+        days: int,
+        df: pd.DataFrame
+    ) -> Optional[StreamingIndicators]:
+        """
+        Advance the saved streaming indicator state of a cached series to `df` and save it.
+
+        The saved state is resumed when `df` still covers its last candle,
+        so only newer candles are folded in; otherwise (no state yet, or a
+        gap since) it is seeded from `df`. Failures are logged, never raised.
+        """
+        if df is None or df.empty:
+            return None
+        try:
+            saved = self.cache_manager.get_indicator_state(coin_id, vs_currency, days)
+            if saved is not None and df.index[0] <= pd.Timestamp(saved[0]):
+                indicators = StreamingIndicators.from_dict(saved[1], pd.Timestamp(saved[0]))
+                indicators.update_many(df)
+            else:
+                indicators = StreamingIndicators.from_dataframe(df)
+            if indicators.last_timestamp is not None:
+                self.cache_manager.save_indicator_state(
+                    coin_id, vs_currency, days,
+                    pd.Timestamp(indicators.last_timestamp).to_pydatetime(),
+                    indicators.to_dict()
+                )
+            return indicators
+        except Exception as e:
+            self.logger.error(f"Error updating indicator state for {coin_id}: {str(e)}")
+            return None
+
+    def get_streaming_indicators(
+        self,
+        coin_id: str,
+        vs_currency: str = 'usd',
+        days: int = 30
+    ) -> Optional[StreamingIndicators]:
+        """Streaming indicator state saved by the last OHLCV refresh of a series, if any; no API calls."""
+        saved = self.cache_manager.get_indicator_state(coin_id, vs_currency, days)
+        if saved is None:
+            return None
+        return StreamingIndicators.from_dict(saved[1], pd.Timestamp(saved[0]))
+
+    def get_base_series(
+        self,
+        coin_id: str,
+        vs_currency: str = 'usd',
+        days: int = 90,
+        force_refresh: bool = False
+    ) -> Optional[pd.DataFrame]:
+        """
+        Fetch the finest OHLCV series covering `days`, to resample into several timeframes.
+
+        One market_chart request without an interval returns hourly points
+        for up to 90 days (5-minute points for a single day). Each point
+        becomes a candle from the previous price to its own. CoinGecko's
+        volumes are rolling 24h totals; they are scaled to the sampling
+        step so that summing them over a bar approximates the bar's volume.
+
+        The series is kept in memory for the cache duration of `days`.
+
+        Returns:
+            pandas.DataFrame with OHLCV data or None if error occurs
+        """
+        key = (coin_id, vs_currency, days)
+        if not force_refresh:
+            with self._base_cache_lock:
+                cached = self._base_cache.get(key)
+                if cached is not None and time.monotonic() - cached[0] < self.cache_manager.cache_duration.get(days, 300):
+                    self._base_cache.move_to_end(key)
+                    return cached[1]
+
+        try:
+            market_data = self.api.get_coin_market_chart(id=coin_id, vs_currency=vs_currency, days=days)
+            df = self._process_base_series(market_data)
+        except Exception as e:
+            self.logger.error(f"Error fetching base series for {coin_id}: {str(e)}")
+            return None
+
+        with self._base_cache_lock:
+            self._base_cache[key] = (time.monotonic(), df)
+            self._base_cache.move_to_end(key)
+            while len(self._base_cache) > self.BASE_CACHE_SIZE:
+                self._base_cache.popitem(last=False)
+        return df
+
+    def get_base_expiry(self, coin_id: str, vs_currency: str = 'usd', days: int = 90) -> Optional[datetime]:
+        """Return when the in-memory base series stops being served, or None if it is not cached."""
+        with self._base_cache_lock:
+            cached = self._base_cache.get((coin_id, vs_currency, days))
+        if cached is None:
+            return None
+        remaining = self.cache_manager.cache_duration.get(days, 300) - (time.monotonic() - cached[0])
+        return datetime.utcnow() + timedelta(seconds=remaining)
+
+    def _process_base_series(self, market_data: Dict) -> pd.DataFrame:
+        """Turn market_chart price and volume points into candles (see get_base_series)."""
+        prices = pd.DataFrame(market_data['prices'], columns=['timestamp', 'close'])
+        volumes = pd.DataFrame(market_data['total_volumes'], columns=['timestamp', 'volume'])
+        df = prices.merge(volumes, on='timestamp', how='left')
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df = df.set_index('timestamp').sort_index()
+        df = df[~df.index.duplicated(keep='last')]
+
+        df['open'] = df['close'].shift(1).fillna(df['close'])
+        df['high'] = df[['open', 'close']].max(axis=1)
+        df['low'] = df[['open', 'close']].min(axis=1)
+        step = df.index.to_series().diff().median()
+        if pd.notna(step):
+            df['volume'] = df['volume'] * (step / pd.Timedelta(hours=24))
+        return df[['open', 'high', 'low', 'close', 'volume']]
+
     def _process_market_data(self, market_data: Dict, ohlc_data: List) -> pd.DataFrame:
         """
         Process raw market data into a pandas DataFrame suitable for technical analysis.
@@ -4,6 +4,9 @@ import pandas as pd
 from typing import List, Dict, Optional, Tuple
 from prawcore.exceptions import ResponseException, OAuthException
 
+from ..llm.lexicon import LexiconSentimentScorer
+
+
 class RedditCryptoScraper:
     def __init__(self, client_id: str, client_secret: str, user_agent: str):
         """
@@ -137,26 +140,18 @@ class RedditCryptoScraper:
     
     def analyze_sentiment(self, df: pd.DataFrame, text_column: str) -> pd.DataFrame:
         """
-        Add basic sentiment analysis to the DataFrame.
+        Add lexicon sentiment to the DataFrame, scoring the whole column at once.
         
         Args:
             df (pd.DataFrame): DataFrame containing text data
             text_column (str): Name of the column containing text to analyze
             
         Returns:
-            pd.DataFrame: DataFrame with added sentiment columns
+            pd.DataFrame: DataFrame with added sentiment columns: 'sentiment'
+                (polarity from -1 to 1, 0 for empty text) and 'sentiment_confidence'
         """
-        try:
-            from textblob import TextBlob
-        except ImportError:
-            raise ImportError("Please install textblob package: pip install textblob")
-            
         df = df.copy()
-        
-        def get_sentiment(text):
-            if pd.isna(text) or text == '':
-                return 0
-            return TextBlob(text).sentiment.polarity
-            
-        df['sentiment'] = df[text_column].apply(get_sentiment)
+        scores = LexiconSentimentScorer().score(df[text_column])
+        df['sentiment'] = scores['score'].to_numpy()
+        df['sentiment_confidence'] = scores['confidence'].to_numpy()
         return df
\ No newline at end of file
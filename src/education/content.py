@@ -76,4 +76,205 @@ def get_module_by_key(key):
     if key in educational_content:
        return educational_content[key]
     else:
-       return None
\ No newline at end of file
+       return None
+
+# Precomputed indicator explanations (purpose, key signals, trading
+# applications, common pitfalls) served to the AI agent without an LLM call;
+# keyed by the indicator names of src/llm/intent.py
+indicator_explanations = {
+    "rsi": {
+        "en": "Relative Strength Index (RSI)\n\n"
+              "Purpose: Measures the speed and size of recent price moves on a 0-100 scale (usually 14 periods).\n"
+              "Key signals: Above 70 is overbought, below 30 is oversold; divergence between price and RSI warns of a weakening trend; crossing 50 confirms momentum.\n"
+              "Trading applications: Time entries in a trend (buy oversold dips in uptrends), confirm breakouts, spot exhaustion.\n"
+              "Common pitfalls: RSI can stay overbought or oversold for long in strong trends; do not trade the levels alone.",
+        "ar": "مؤشر القوة النسبية (RSI)\n\n"
+              "الغرض: يقيس سرعة وحجم تحركات السعر الأخيرة على مقياس من 0 إلى 100 (عادة 14 فترة).\n"
+              "الإشارات الرئيسية: فوق 70 تشبع شرائي وتحت 30 تشبع بيعي؛ الاختلاف بين السعر والمؤشر ينذر بضعف الاتجاه؛ تجاوز مستوى 50 يؤكد الزخم.\n"
+              "الاستخدامات في التداول: توقيت الدخول مع الاتجاه (شراء الانخفاضات المتشبعة بيعاً في الاتجاه الصاعد)، وتأكيد الاختراقات، ورصد الإنهاك.\n"
+              "الأخطاء الشائعة: قد يبقى المؤشر في التشبع طويلاً خلال الاتجاهات القوية؛ لا تتداول على المستويات وحدها.",
+    },
+    "macd": {
+        "en": "Moving Average Convergence Divergence (MACD)\n\n"
+              "Purpose: Tracks trend and momentum from the gap between the 12- and 26-period EMAs, with a 9-period signal line.\n"
+              "Key signals: MACD crossing above the signal line is bullish, below is bearish; the histogram shows momentum growing or fading; zero-line crosses confirm trend changes.\n"
+              "Trading applications: Confirm trend direction, time entries on crossovers, spot divergences before reversals.\n"
+              "Common pitfalls: It lags price and gives many false crossovers in sideways markets.",
+        "ar": "مؤشر تقارب وتباعد المتوسطات المتحركة (MACD)\n\n"
+              "الغرض: يتتبع الاتجاه والزخم من الفرق بين المتوسطين الأسيين 12 و26 مع خط إشارة لـ 9 فترات.\n"
+              "الإشارات الرئيسية: عبور MACD فوق خط الإشارة إيجابي وتحته سلبي؛ يُظهر الهيستوجرام تزايد الزخم أو تراجعه؛ عبور خط الصفر يؤكد تغير الاتجاه.\n"
+              "الاستخدامات في التداول: تأكيد اتجاه السوق، وتوقيت الدخول عند التقاطعات، ورصد الاختلافات قبل الانعكاسات.\n"
+              "الأخطاء الشائعة: متأخر عن السعر ويعطي تقاطعات كاذبة كثيرة في الأسواق العرضية.",
+    },
+    "bollinger_bands": {
+        "en": "Bollinger Bands\n\n"
+              "Purpose: Show volatility with bands two standard deviations above and below a 20-period moving average.\n"
+              "Key signals: Price at the upper band is stretched, at the lower band depressed; a squeeze (narrow bands) often precedes a large move; walking along a band signals a strong trend.\n"
+              "Trading applications: Mean-reversion trades in ranges, breakout trades after squeezes, dynamic stop placement.\n"
+              "Common pitfalls: Touching a band is not a reversal signal by itself, especially in trends.",
+        "ar": "نطاقات بولينجر\n\n"
+              "الغرض: تُظهر التقلب بنطاقين على بعد انحرافين معياريين فوق وتحت متوسط متحرك لـ 20 فترة.\n"
+              "الإشارات الرئيسية: السعر عند النطاق العلوي ممتد وعند السفلي منخفض؛ ضيق النطاقات يسبق غالباً حركة كبيرة؛ سير السعر على النطاق يدل على اتجاه قوي.\n"
+              "الاستخدامات في التداول: صفقات العودة إلى المتوسط في النطاقات، وصفقات الاختراق بعد الضيق، ووضع وقف خسارة متحرك.\n"
+              "الأخطاء الشائعة: ملامسة النطاق ليست إشارة انعكاس بحد ذاتها، خاصة في الاتجاهات.",
+    },
+    "moving_averages": {
+        "en": "Moving Averages (SMA / EMA)\n\n"
+              "Purpose: Smooth price data to reveal the trend; the EMA weights recent prices more than the SMA.\n"
+              "Key signals: Price above a rising average is an uptrend; a short average crossing above a long one (golden cross) is bullish, below (death cross) bearish.\n"
+              "Trading applications: Trend filters, dynamic support and resistance, crossover entries.\n"
+              "Common pitfalls: Averages lag and whipsaw in ranges; the period must suit the timeframe.",
+        "ar": "المتوسطات المتحركة (البسيط / الأسي)\n\n"
+              "الغرض: تنعيم بيانات السعر لإظهار الاتجاه؛ المتوسط الأسي يعطي وزناً أكبر للأسعار الحديثة.\n"
+              "الإشارات الرئيسية: السعر فوق متوسط صاعد يعني اتجاهاً صاعداً؛ عبور المتوسط القصير فوق الطويل (التقاطع الذهبي) إيجابي وتحته (تقاطع الموت) سلبي.\n"
+              "الاستخدامات في التداول: مرشح للاتجاه، ودعم ومقاومة متحركان، ونقاط دخول عند التقاطعات.\n"
+              "الأخطاء الشائعة: المتوسطات متأخرة وتعطي إشارات متذبذبة في النطاقات؛ يجب أن تناسب الفترة الإطار الزمني.",
+    },
+    "stochastic": {
+        "en": "Stochastic Oscillator\n\n"
+              "Purpose: Compares the close with the recent high-low range (%K) and its average (%D), from 0 to 100.\n"
+              "Key signals: Above 80 overbought, below 20 oversold; %K crossing %D gives entry signals, strongest inside those zones.\n"
+              "Trading applications: Timing entries in ranges and pullbacks within trends.\n"
+              "Common pitfalls: Very sensitive, so it gives many signals in trends; confirm with trend tools.",
+        "ar": "مؤشر ستوكاستك\n\n"
+              "الغرض: يقارن سعر الإغلاق بنطاق القمة والقاع الأخير (%K) ومتوسطه (%D) من 0 إلى 100.\n"
+              "الإشارات الرئيسية: فوق 80 تشبع شرائي وتحت 20 تشبع بيعي؛ تقاطع %K مع %D يعطي إشارات دخول أقوى داخل هذه المناطق.\n"
+              "الاستخدامات في التداول: توقيت الدخول في النطاقات والتصحيحات ضمن الاتجاهات.\n"
+              "الأخطاء الشائعة: حساس جداً فيعطي إشارات كثيرة في الاتجاهات؛ أكده بأدوات الاتجاه.",
+    },
+    "adx": {
+        "en": "Average Directional Index (ADX)\n\n"
+              "Purpose: Measures trend strength from 0 to 100, regardless of direction.\n"
+              "Key signals: Below 20 weak or no trend, above 25 a trending market, above 40 a strong trend; a rising ADX means the trend is strengthening.\n"
+              "Trading applications: Choose between trend-following and range strategies; filter crossover signals.\n"
+              "Common pitfalls: ADX does not show direction; pair it with +DI/-DI or price action.",
+        "ar": "مؤشر متوسط الاتجاه (ADX)\n\n"
+              "الغرض: يقيس قوة الاتجاه من 0 إلى 100 بغض النظر عن اتجاهه.\n"
+              "الإشارات الرئيسية: تحت 20 اتجاه ضعيف أو غائب، فوق 25 سوق ذو اتجاه، فوق 40 اتجاه قوي؛ ارتفاع المؤشر يعني تقوي الاتجاه.\n"
+              "الاستخدامات في التداول: الاختيار بين استراتيجيات تتبع الاتجاه والنطاق، وتصفية إشارات التقاطع.\n"
+              "الأخطاء الشائعة: لا يبين الاتجاه؛ استخدمه مع +DI/-DI أو حركة السعر.",
+    },
+    "atr": {
+        "en": "Average True Range (ATR)\n\n"
+              "Purpose: Measures volatility as the average range of recent candles, including gaps.\n"
+              "Key signals: A rising ATR means expanding volatility, a falling ATR quieter markets; ATR as a share of price compares coins.\n"
+              "Trading applications: Set stop-loss distances (e.g. 1.5-2x ATR) and position sizes.\n"
+              "Common pitfalls: ATR has no direction and spikes after large moves, not before them.",
+        "ar": "متوسط المدى الحقيقي (ATR)\n\n"
+              "الغرض: يقيس التقلب كمتوسط مدى الشموع الأخيرة بما فيها الفجوات.\n"
+              "الإشارات الرئيسية: ارتفاع المؤشر يعني تزايد التقلب وانخفاضه يعني هدوء السوق؛ نسبته إلى السعر تسمح بمقارنة العملات.\n"
+              "الاستخدامات في التداول: تحديد مسافة وقف الخسارة (مثلاً 1.5 إلى 2 ضعف ATR) وحجم المركز.\n"
+              "الأخطاء الشائعة: لا يبين الاتجاه ويرتفع بعد الحركات الكبيرة لا قبلها.",
+    },
+    "obv": {
+        "en": "On-Balance Volume (OBV)\n\n"
+              "Purpose: Adds volume on up candles and subtracts it on down candles to track buying and selling pressure.\n"
+              "Key signals: OBV rising with price confirms the trend; OBV diverging from price warns of a reversal.\n"
+              "Trading applications: Confirm breakouts and spot accumulation or distribution.\n"
+              "Common pitfalls: One high-volume candle can distort it; its absolute level means little.",
+        "ar": "مؤشر حجم التوازن (OBV)\n\n"
+              "الغرض: يضيف الحجم في الشموع الصاعدة ويطرحه في الهابطة لتتبع ضغط الشراء والبيع.\n"
+              "الإشارات الرئيسية: صعود المؤشر مع السعر يؤكد الاتجاه؛ اختلافه عن السعر ينذر بانعكاس.\n"
+              "الاستخدامات في التداول: تأكيد الاختراقات ورصد التجميع أو التصريف.\n"
+              "الأخطاء الشائعة: شمعة واحدة عالية الحجم قد تشوهه؛ قيمته المطلقة قليلة الدلالة.",
+    },
+    "vwap": {
+        "en": "Volume-Weighted Average Price (VWAP)\n\n"
+              "Purpose: The average price weighted by volume, a benchmark of the fair price for the period.\n"
+              "Key signals: Price above VWAP shows buyers in control, below it sellers; reclaiming VWAP can mark a shift.\n"
+              "Trading applications: Intraday bias, entries on pullbacks to VWAP, judging execution quality.\n"
+              "Common pitfalls: It lags more the longer the period, and matters most intraday.",
+        "ar": "متوسط السعر المرجح بالحجم (VWAP)\n\n"
+              "الغرض: متوسط السعر مرجحاً بالحجم، وهو مرجع للسعر العادل خلال الفترة.\n"
+              "الإشارات الرئيسية: السعر فوقه يعني سيطرة المشترين وتحته سيطرة البائعين؛ استعادته قد تشير إلى تحول.\n"
+              "الاستخدامات في التداول: تحديد الميل خلال اليوم، والدخول عند الارتداد إليه، وتقييم جودة التنفيذ.\n"
+              "الأخطاء الشائعة: يزداد تأخره كلما طالت الفترة، وأهميته الكبرى خلال اليوم.",
+    },
+    "mfi": {
+        "en": "Money Flow Index (MFI)\n\n"
+              "Purpose: A volume-weighted RSI from 0 to 100 that measures money flowing in and out.\n"
+              "Key signals: Above 80 overbought, below 20 oversold; divergences with price warn of reversals.\n"
+              "Trading applications: Confirm RSI signals with volume and spot exhaustion.\n"
+              "Common pitfalls: Like RSI, it can stay extreme in strong trends.",
+        "ar": "مؤشر تدفق الأموال (MFI)\n\n"
+              "الغرض: مؤشر قوة نسبية مرجح بالحجم من 0 إلى 100 يقيس تدفق الأموال دخولاً وخروجاً.\n"
+              "الإشارات الرئيسية: فوق 80 تشبع شرائي وتحت 20 تشبع بيعي؛ الاختلاف مع السعر ينذر بالانعكاس.\n"
+              "الاستخدامات في التداول: تأكيد إشارات RSI بالحجم ورصد الإنهاك.\n"
+              "الأخطاء الشائعة: مثل RSI قد يبقى في المستويات القصوى خلال الاتجاهات القوية.",
+    },
+    "cci": {
+        "en": "Commodity Channel Index (CCI)\n\n"
+              "Purpose: Measures how far price is from its statistical average.\n"
+              "Key signals: Above +100 strong upward momentum or overbought, below -100 downward momentum or oversold; zero-line crosses show momentum shifts.\n"
+              "Trading applications: Catch new trends early, or fade extremes in ranges.\n"
+              "Common pitfalls: It has no fixed bounds, so extremes differ between coins.",
+        "ar": "مؤشر قناة السلع (CCI)\n\n"
+              "الغرض: يقيس ابتعاد السعر عن متوسطه الإحصائي.\n"
+              "الإشارات الرئيسية: فوق +100 زخم صاعد قوي أو تشبع شرائي، وتحت -100 زخم هابط أو تشبع بيعي؛ عبور الصفر يبين تحول الزخم.\n"
+              "الاستخدامات في التداول: التقاط الاتجاهات الجديدة مبكراً أو عكس الأطراف في النطاقات.\n"
+              "الأخطاء الشائعة: ليس له حدود ثابتة، فتختلف المستويات القصوى بين العملات.",
+    },
+    "williams_r": {
+        "en": "Williams %R\n\n"
+              "Purpose: Shows where the close sits in the recent high-low range, from 0 to -100.\n"
+              "Key signals: Above -20 overbought, below -80 oversold; moves out of those zones signal turns.\n"
+              "Trading applications: Short-term timing of entries and exits.\n"
+              "Common pitfalls: Very fast and noisy; combine it with a trend filter.",
+        "ar": "مؤشر ويليامز %R\n\n"
+              "الغرض: يبين موقع الإغلاق ضمن نطاق القمة والقاع الأخير من 0 إلى -100.\n"
+              "الإشارات الرئيسية: فوق -20 تشبع شرائي وتحت -80 تشبع بيعي؛ الخروج من هذه المناطق يشير إلى التحول.\n"
+              "الاستخدامات في التداول: توقيت الدخول والخروج على المدى القصير.\n"
+              "الأخطاء الشائعة: سريع جداً وكثير الضجيج؛ استخدمه مع مرشح للاتجاه.",
+    },
+    "fibonacci": {
+        "en": "Fibonacci Retracement\n\n"
+              "Purpose: Marks likely pullback levels (23.6%, 38.2%, 50%, 61.8%, 78.6%) of a prior swing.\n"
+              "Key signals: Reactions at 38.2-61.8% often end pullbacks in a trend; a break below 78.6% suggests the trend failed.\n"
+              "Trading applications: Plan entries, stops and targets around confluence with other levels.\n"
+              "Common pitfalls: Levels depend on which swing is chosen; treat them as zones, not exact prices.",
+        "ar": "تصحيحات فيبوناتشي\n\n"
+              "الغرض: يحدد مستويات التصحيح المحتملة (23.6٪ و38.2٪ و50٪ و61.8٪ و78.6٪) لموجة سابقة.\n"
+              "الإشارات الرئيسية: الارتداد عند 38.2٪ إلى 61.8٪ غالباً ما ينهي التصحيح في الاتجاه؛ كسر 78.6٪ يشير إلى فشل الاتجاه.\n"
+              "الاستخدامات في التداول: تخطيط الدخول ووقف الخسارة والأهداف عند توافقها مع مستويات أخرى.\n"
+              "الأخطاء الشائعة: تعتمد المستويات على اختيار الموجة؛ تعامل معها كمناطق لا كأسعار دقيقة.",
+    },
+    "ichimoku": {
+        "en": "Ichimoku Cloud\n\n"
+              "Purpose: An all-in-one system of trend, momentum and support/resistance lines (Tenkan, Kijun, the cloud and Chikou).\n"
+              "Key signals: Price above the cloud is bullish, below bearish; Tenkan crossing Kijun gives entries; cloud thickness shows support strength.\n"
+              "Trading applications: Trend following with built-in stop and target levels.\n"
+              "Common pitfalls: Crowded charts, and it lags in fast crypto moves; defaults come from daily stock charts.",
+        "ar": "سحابة إيشيموكو\n\n"
+              "الغرض: نظام متكامل لخطوط الاتجاه والزخم والدعم والمقاومة (تنكان وكيجون والسحابة وتشيكو).\n"
+              "الإشارات الرئيسية: السعر فوق السحابة إيجابي وتحتها سلبي؛ تقاطع تنكان مع كيجون يعطي نقاط دخول؛ سمك السحابة يبين قوة الدعم.\n"
+              "الاستخدامات في التداول: تتبع الاتجاه مع مستويات وقف وأهداف مدمجة.\n"
+              "الأخطاء الشائعة: رسم مزدحم وتأخر في حركات العملات السريعة؛ إعداداته الافتراضية مأخوذة من رسوم الأسهم اليومية.",
+    },
+    "support_resistance": {
+        "en": "Support and Resistance\n\n"
+              "Purpose: Price zones where buying (support) or selling (resistance) has repeatedly stopped moves.\n"
+              "Key signals: More touches make a zone stronger; a broken resistance often becomes support and vice versa.\n"
+              "Trading applications: Place entries near support, targets near resistance, stops beyond the zone.\n"
+              "Common pitfalls: Levels are zones, not lines; false breakouts are common without volume.",
+        "ar": "الدعم والمقاومة\n\n"
+              "الغرض: مناطق سعرية أوقف فيها الشراء (الدعم) أو البيع (المقاومة) الحركة مراراً.\n"
+              "الإشارات الرئيسية: كثرة الملامسات تقوي المنطقة؛ المقاومة المكسورة تتحول غالباً إلى دعم والعكس.\n"
+              "الاستخدامات في التداول: الدخول قرب الدعم، والأهداف قرب المقاومة، ووقف الخسارة خلف المنطقة.\n"
+              "الأخطاء الشائعة: المستويات مناطق لا خطوط؛ الاختراقات الكاذبة شائعة دون حجم.",
+    },
+}
+
+
+def get_indicator_explanation(indicator, language='en'):
+    """
+    Get the precomputed explanation of an indicator
+    Args:
+         indicator: an indicator name of src/llm/intent.py (e.g. 'rsi', 'bollinger_bands')
+         language: 'en' or 'ar'
+    Returns:
+         str: the explanation, or None if there is none
+    """
+    explanation = indicator_explanations.get(indicator)
+    if explanation is None:
+        return None
+    return explanation.get(language) or explanation.get('en')
@@ -7,13 +7,22 @@ from src.data.processor import DataProcessor
 from src.utils.news_formatters import NewsFormatter
 from src.utils.formatters import TelegramFormatter
 from src.analysis.technical import TechnicalAnalyzer
+from src.llm.digest import analysis_digest
+from src.llm.gateway import AgentBusy, AgentGateway, QueryCancelled
+from src.services.news_ingest import NewsIngestor
+from src.education.content import get_indicator_explanation
+from src.llm.intent import COIN_SYMBOLS, LANGUAGE_NAMES, find_indicator, parse_query
+from src.llm.response_cache import ResponseCache, cache_key, price_version
+from src.utils.message_stream import MessageStreamer
 import asyncio
+import threading
+from contextvars import ContextVar
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import initialize_agent, Tool
 from langchain_core.tools import tool
 from langchain.agents import AgentType
 from langchain.schema import HumanMessage, SystemMessage
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from dotenv import load_dotenv
 import sys
 import os
@@ -36,16 +45,44 @@ from dotenv import load_dotenv
 import sys
 import os
 
+RESPONSE_HEADER = "ANALYSIS SUMMARY:\n"
+RESPONSE_FOOTER = "\n\nNote: This analysis is for informational purposes only and does not constitute financial advice."
+
+# Receives LLM chunks of tool answers as they are generated; set for routed
+# queries only, since agent tool output is not shown to the user directly
+_token_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar('token_sink', default=None)
+
+
 class CryptoAnalysisAgent:
-    def __init__(self, google_api_key: str = None):
-        """Initialize the Crypto Analysis Agent."""
+    def __init__(self, google_api_key: str = None, news_ingestor: Optional[NewsIngestor] = None):
+        """
+        Initialize the Crypto Analysis Agent.
+
+        Args:
+            news_ingestor: Article store reader to share with the bot's handlers (default: a new one)
+        """
         # Initialize all your existing components
         self.analyzer = TechnicalAnalyzer()
         self.formatter = TelegramFormatter()
         self.data_processor = DataProcessor()
-        self.news_fetcher = CryptoNewsFetcher(os.getenv("CRYPTO_NEWS_TOKEN"))
         self.news_formatter = NewsFormatter()
         self.db_manager = DatabaseManager()
+        # Reads the article store the bot's ingestion loop fills; on-demand polls
+        # need a fetcher that scores sentiment, like the handlers' one
+        self.news_ingestor = news_ingestor or NewsIngestor(
+            CryptoNewsFetcher(
+                os.getenv("CRYPTO_NEWS_TOKEN"), os.getenv("GOOGLE_API_KEY"), db_manager=self.db_manager
+            ),
+            self.db_manager
+        )
+        self.news_fetcher = self.news_ingestor.news_fetcher
+        self.response_cache = ResponseCache()
+        # Tool results within and across agent runs: LLM answers keyed by their
+        # prompt (which embeds the analysis or news it was built from), quick
+        # analyses keyed by coin and timeframe, and coin checks
+        self.tool_cache = ResponseCache()
+        # Bounds concurrent agent runs; one queued query per user
+        self.gateway = AgentGateway()
 
         self.timeframes = {
             '1d': 1,
@@ -191,48 +228,101 @@ Remember:
 
     def _format_analysis_response(self, analysis_text: str) -> str:
         """Format the analysis response to ensure it's a simple string."""
-        return f"""ANALYSIS SUMMARY:
-{analysis_text}
-
-Note: This analysis is for informational purposes only and does not constitute financial advice."""
-
-    def _quick_analysis(self, coin: str, timeframe: str) -> str:
-        """Perform technical analysis with structured input."""
+        return f"{RESPONSE_HEADER}{analysis_text}{RESPONSE_FOOTER}"
+
+    def _generate(self, prompt: str) -> str:
+        """
+        Formatted LLM answer to a tool prompt, streamed to the token sink when one is set.
+
+        Answers are memoized by prompt. Prompts embed the analysis digest or
+        the news they were built from, so an answer is reused exactly while
+        its data is unchanged (and within AGENT_CACHE_TTL).
+        """
+        key = ('generate', prompt)
+        cached = self.tool_cache.get(key)
+        if cached is not None:
+            return cached
+
+        messages = [HumanMessage(content=prompt)]
+        on_token = _token_sink.get()
+        if on_token is None:
+            answer = self._format_analysis_response(self.llm.invoke(messages).content)
+        else:
+            on_token(RESPONSE_HEADER)
+            parts = []
+            for chunk in self.llm.stream(messages):
+                parts.append(chunk.content)
+                on_token(chunk.content)
+            answer = self._format_analysis_response("".join(parts))
+        self.tool_cache.put(key, None, answer)
+        return answer
+
+    def _valid_coin(self, coin: str) -> bool:
+        """validate_coin_id, memoized: it lists every cached coin on each call."""
+        key = ('valid_coin', coin.lower())
+        valid = self.tool_cache.get(key)
+        if valid is None:
+            valid = self.data_processor.validate_coin_id(coin)
+            self.tool_cache.put(key, None, valid)
+        return valid
+
+    @staticmethod
+    def _language_instruction(language: Optional[str]) -> str:
+        """Prompt line asking for an answer in `language` (a code or a name); empty when None."""
+        return f"\nRespond in {LANGUAGE_NAMES.get(language, language)}." if language else ""
+
+    def _quick_analysis(self, coin: str, timeframe: str, language: Optional[str] = None) -> str:
+        """
+        Perform technical analysis with structured input.
+
+        Answers are memoized by coin, timeframe and language, versioned by
+        the refresh time of the coin's cached OHLCV data (as in
+        _data_version). A repeated call is answered before the analyzer
+        runs, so it costs neither a data fetch nor an LLM call.
+        """
         if timeframe not in self.timeframes:
             return self.formatter._t('invalid_timeframe_prompt')
 
         try:
-            if not self.data_processor.validate_coin_id(coin):
+            if not self._valid_coin(coin):
                 return f"❌ {self.formatter._t('invalid_symbol_prompt')}: {coin}"
 
             days = self.timeframes[timeframe]
+            key = ('quick_analysis', coin, days, language)
+            version = self.data_processor.cache_manager.get_last_updated(coin, 'usd', days)
+            if version is not None:
+                cached = self.tool_cache.get(key, version)
+                if cached is not None:
+                    return cached
+
             analysis = self.analyzer.analyze_coin(coin, days=days)
-            
+
+            # The raw analysis holds full indicator arrays; prompts get a bounded digest
             analysis_prompt = f"""Based on the technical analysis for {coin} over {timeframe}:
-{analysis}
+{analysis_digest(analysis)}
 
 Provide a concise analysis including:
 1. Current trend direction
 2. Key support/resistance levels
 3. Trading signals
 4. Price targets
-5. Risk levels"""
+5. Risk levels{self._language_instruction(language)}"""
 
-            response = self.llm.invoke([HumanMessage(content=analysis_prompt)])
-            return self._format_analysis_response(response.content)
+            answer = self._generate(analysis_prompt)
+            # The analysis may have refreshed the cache; version the answer by the data it used
+            version = self.data_processor.cache_manager.get_last_updated(coin, 'usd', days)
+            if version is not None and "error" not in analysis:
+                self.tool_cache.put(key, version, answer)
+            return answer
 
         except Exception as e:
             return self.formatter._t('analysis_error').format(error=str(e))
 
-    def _news_analysis(self, coin: str) -> str:
+    def _news_analysis(self, coin: str, language: Optional[str] = None) -> str:
         """Analyze news with structured input."""
-        news_df, success = self.news_fetcher.get_news_by_coin(
-            categories=coin,
-            limit=10,
-            lang="EN"
-        )
+        news_df = self.news_ingestor.latest(coin, limit=10)
         
-        if not success or news_df.empty:
+        if news_df.empty:
             return self.formatter._t('no_news_found').format(symbol=coin)
 
         formatted_news = self.news_formatter.format_news(news_df, coin)
@@ -243,33 +333,136 @@ Provide a concise summary of:
 1. Market sentiment
 2. Key events
 3. Potential price impact
-4. Risks and opportunities"""
+4. Risks and opportunities{self._language_instruction(language)}"""
 
-        response = self.llm.invoke([HumanMessage(content=news_prompt)])
-        return self._format_analysis_response(response.content)
+        return self._generate(news_prompt)
 
-    def _explain_indicator(self, indicator: str) -> str:
+    def _explain_indicator(self, indicator: str, language: Optional[str] = None) -> str:
         """Explain technical indicators with structured input."""
+        # Known indicators have a precomputed explanation in each supported language
+        code = next((code for code, name in LANGUAGE_NAMES.items() if language in (code, name)), 'en')
+        explanation = get_indicator_explanation(find_indicator(indicator), code)
+        if explanation is not None:
+            return explanation
+
         indicator_prompt = f"""Explain {indicator} clearly and concisely:
 1. Purpose
 2. Key signals
 3. Trading applications
-4. Common pitfalls"""
+4. Common pitfalls{self._language_instruction(language)}"""
+
+        return self._generate(indicator_prompt)
+
+    def _route(self, query: Dict, on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Answer a parsed query without the agent's planning calls.
+
+        Price checks are answered from the latest price alone; analysis,
+        news and indicator questions go straight to their tool, whose LLM
+        output is passed to `on_token` chunk by chunk. Returns None for
+        open-ended questions, languages without templates, or a failed
+        price lookup, which are left to the agent.
+        """
+        language = query['language']
+        if language not in LANGUAGE_NAMES:
+            return None
+        intent = query['intent']
+        if intent == 'price':
+            price = self.data_processor.get_latest_price(query['coin'])
+            if price is None:
+                return None
+            return self.formatter.languages[language]['ai_price_answer'].format(
+                coin=query['coin'].replace('-', ' ').title(),
+                price=f"{price:,.2f}" if price >= 1 else f"{price:.6g}"
+            )
 
-        response = self.llm.invoke([HumanMessage(content=indicator_prompt)])
-        return self._format_analysis_response(response.content)
+        sink = _token_sink.set(on_token)
+        try:
+            if intent == 'analysis':
+                return self._quick_analysis(query['coin'], query['timeframe'] or '1d', language)
+            if intent == 'news':
+                return self._news_analysis(COIN_SYMBOLS.get(query['coin'], query['coin']), language)
+            if intent == 'explain':
+                return self._explain_indicator(query['indicator'].replace('_', ' '), language)
+            return None
+        finally:
+            _token_sink.reset(sink)
+
+    def _data_version(self, query: Dict):
+        """
+        Version the answer to a parsed query depends on (see response_cache.py).
+
+        Reads the local caches only: a lookup must not fetch market data
+        ahead of the gateway's concurrency limit.
+        """
+        if query['intent'] == 'explain':
+            return 'static'
+        if query['intent'] == 'price':
+            return price_version()
+        if query['coin'] is None or query['intent'] == 'news':
+            return None
+        days = self.timeframes[query['timeframe'] or '1d']
+        return self.data_processor.cache_manager.get_last_updated(query['coin'], 'usd', days)
+
+    def _answer(self, query: Dict, text: str, on_token: Callable[[str], None]) -> str:
+        """Routed answer to a query, or the agent's when it cannot be routed (blocking)."""
+        output = self._route(query, on_token)
+        if output is None:
+            output = self.agent_executor.invoke({"input": text})['output']
+        return output
 
     async def process_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Process Telegram queries."""
         text = context.args[0]
+        query = parse_query(text)
+        key = cache_key(query)
+        try:
+            version = await asyncio.to_thread(self._data_version, query)
+        except Exception:
+            # Without a version the answer cannot be reused safely
+            version, key = None, None
+        cached = self.response_cache.get(key, version) if key is not None else None
+        if cached is not None:
+            await update.message.reply_text(cached)
+            return
+
         loading_message = await update.message.reply_text(
             self.formatter.format_loading_message()
         )
 
+        # Routed answers appear while they are generated; agent answers arrive whole
+        streamer = MessageStreamer(loading_message)
+        loop = asyncio.get_running_loop()
+        abandoned = threading.Event()
+
+        def on_token(chunk: str) -> None:
+            # Stops generating an answer that was replaced or timed out
+            if abandoned.is_set():
+                raise QueryCancelled()
+            loop.call_soon_threadsafe(streamer.feed, chunk)
+
+        async def on_position(position: int) -> None:
+            await loading_message.edit_text(self.formatter._t('ai_queue_position').format(position=position))
+
         try:
-            result = await asyncio.to_thread(self.agent_executor.invoke, {"input": text})
-            await loading_message.edit_text(result['output'])
+            output = await self.gateway.submit(
+                update.effective_user.id, self._answer, query, text, on_token, on_position=on_position
+            )
+            await streamer.finish(output)
+            # Iteration-limit and parsing failures are not answers worth repeating
+            if key is not None and not output.startswith('Agent stopped'):
+                # The answer may have fetched fresh data; store it under the version it was built from
+                version = await asyncio.to_thread(self._data_version, query)
+                self.response_cache.put(key, version, output)
+        except QueryCancelled:
+            abandoned.set()
+            await streamer.finish(self.formatter._t('ai_query_superseded'))
+        except AgentBusy:
+            await streamer.finish(self.formatter._t('ai_busy'))
+        except asyncio.TimeoutError:
+            abandoned.set()
+            await streamer.finish(self.formatter._t('ai_timeout'))
         except Exception as e:
-            await loading_message.edit_text(
+            await streamer.finish(
                 self.formatter._t('query_error').format(error=str(e))
-            )
\ No newline at end of file
+            )
@@ -0,0 +1,235 @@
+"""
+Compact digests of technical analyses for LLM prompts.
+
+An `analyze_coin` result carries full indicator arrays (MAs, MACD lines,
+RSI history), so printing it into a prompt sends thousands of numbers.
+`analysis_digest` reduces it to short "key: value" lines. Each line holds
+latest values, the change over the last DELTA_CANDLES candles, levels or
+signals. Lines are added in priority order (summary, price, trend,
+momentum, levels, volatility, volume, patterns) while the estimated
+token count stays within the budget.
+
+Configuration (environment variables):
+    AGENT_DIGEST_TOKENS: Token budget of a digest (default: 350)
+"""
+import math
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Candles over which short-window changes are reported
+DELTA_CANDLES = 5
+
+# Rough characters per token of English/number text, for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def _num(value) -> str:
+    """Short rendering of a number; 'n/a' for missing values."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 'n/a'
+    if not math.isfinite(value):
+        return 'n/a'
+    if abs(value) >= 1000:
+        return f"{value:.0f}"
+    if abs(value) >= 1:
+        return f"{value:.2f}"
+    return f"{value:.4g}"
+
+
+def _pct(value) -> str:
+    text = _num(value)
+    return text if text == 'n/a' else f"{float(value):+.2f}%"
+
+
+def _last(values) -> Optional[float]:
+    """Latest finite value of an indicator (array or scalar)."""
+    values = np.asarray(values, dtype=np.float64).ravel()
+    values = values[np.isfinite(values)]
+    return float(values[-1]) if len(values) else None
+
+
+def _delta(values, window: int = DELTA_CANDLES) -> Optional[float]:
+    """Change of an indicator array over its last `window` finite candles."""
+    values = np.asarray(values, dtype=np.float64).ravel()
+    values = values[np.isfinite(values)]
+    return float(values[-1] - values[-1 - window]) if len(values) > window else None
+
+
+def _signal(data) -> str:
+    """The signal label of a section entry, however it is nested."""
+    if isinstance(data, dict):
+        signal = data.get('signal')
+        return _signal(signal) if isinstance(signal, dict) else str(signal or 'n/a')
+    return str(data or 'n/a')
+
+
+def _section(analysis: Dict, name: str) -> Optional[Dict]:
+    section = analysis.get(name)
+    return section if isinstance(section, dict) and 'error' not in section else None
+
+
+def _summary_lines(analysis: Dict) -> List[str]:
+    summary = analysis.get('summary') or {}
+    if not summary:
+        return []
+    distribution = summary.get('signal_distribution') or {}
+    risk = summary.get('risk_level') or {}
+    lines = [
+        f"sentiment: {summary.get('overall_sentiment', 'n/a')} (confidence {_num(summary.get('confidence'))}%, "
+        f"bullish {distribution.get('Bullish', 0)}/bearish {distribution.get('Bearish', 0)}/"
+        f"neutral {distribution.get('Neutral', 0)})",
+        f"risk: {risk.get('category', 'n/a')} ({_num(risk.get('level'))})",
+    ]
+    signals = summary.get('key_signals') or []
+    if signals:
+        lines.append("key signals: " + "; ".join(f"{direction} - {reason}" for direction, reason in signals[:3]))
+    return lines
+
+
+def _price_lines(analysis: Dict) -> List[str]:
+    info = _section(analysis, 'basic_info')
+    if info is None:
+        return []
+    return [
+        f"price: {_num(info.get('current_price'))} (24h {_pct(info.get('price_change_24h'))}, "
+        f"high {_num(info.get('high_24h'))}, low {_num(info.get('low_24h'))}, volume {_num(info.get('volume_24h'))})"
+    ]
+
+
+def _trend_lines(analysis: Dict, price: Optional[float]) -> List[str]:
+    trend = _section(analysis, 'trend_indicators')
+    if trend is None:
+        return ["trend: unavailable"]
+    lines = []
+    mas = trend.get('moving_averages') or {}
+    if mas:
+        parts = []
+        for key in ('ma20', 'ma50', 'ema20'):
+            value = _last(mas.get(key, []))
+            gap = f" ({_pct((price - value) / value * 100)} away)" if price and value else ""
+            parts.append(f"{key} {_num(value)}{gap}")
+        slope = _delta(mas.get('ma20', []))
+        lines.append(f"moving averages: {', '.join(parts)}; ma20 {DELTA_CANDLES}-candle change {_num(slope)}; "
+                     f"signal {_signal(mas)}")
+    macd = trend.get('macd') or {}
+    if macd:
+        interpretation = macd.get('interpretation') or {}
+        lines.append(
+            f"macd: {_num(_last(macd.get('macd', [])))} vs signal {_num(_last(macd.get('signal', [])))}, "
+            f"histogram {_num(_last(macd.get('histogram', [])))} "
+            f"({DELTA_CANDLES}-candle change {_num(_delta(macd.get('histogram', [])))}); "
+            f"crossover {interpretation.get('crossover', 'n/a')}"
+        )
+    adx = trend.get('adx') or {}
+    if adx:
+        lines.append(f"adx: {_num(adx.get('value'))} ({(adx.get('strength') or {}).get('trend_strength', 'n/a')} trend)")
+    return lines
+
+
+def _momentum_lines(analysis: Dict) -> List[str]:
+    momentum = _section(analysis, 'momentum_indicators')
+    if momentum is None:
+        return ["momentum: unavailable"]
+    lines = []
+    rsi = momentum.get('rsi') or {}
+    if rsi:
+        lines.append(f"rsi: {_num(rsi.get('value'))} (previous {_num(rsi.get('previous'))}, "
+                     f"{DELTA_CANDLES}-candle change {_num(_delta(rsi.get('all', [])))}) {_signal(rsi)}")
+    stochastic = momentum.get('stochastic') or {}
+    if stochastic:
+        lines.append(f"stochastic: k {_num(stochastic.get('k'))}, d {_num(stochastic.get('d'))} {_signal(stochastic)}")
+    others = [
+        f"{key} {_num(momentum[key].get('value'))} {_signal(momentum[key])}"
+        for key in ('williams_r', 'mfi', 'cci', 'roc') if isinstance(momentum.get(key), dict)
+    ]
+    if others:
+        lines.append("oscillators: " + ", ".join(others))
+    return lines
+
+
+def _level_lines(analysis: Dict) -> List[str]:
+    levels = _section(analysis, 'support_resistance')
+    if levels is None:
+        return []
+    return [
+        f"support: {', '.join(_num(level) for level in levels.get('support_levels', [])) or 'none'}; "
+        f"resistance: {', '.join(_num(level) for level in levels.get('resistance_levels', [])) or 'none'}"
+    ]
+
+
+def _volatility_lines(analysis: Dict) -> List[str]:
+    volatility = _section(analysis, 'volatility_indicators')
+    if volatility is None:
+        return []
+    lines = []
+    atr = volatility.get('atr') or {}
+    if atr:
+        lines.append(f"atr: {_num(atr.get('value'))} ({_num(atr.get('percentage'))}% of price, "
+                     f"{(atr.get('interpretation') or {}).get('volatility', 'n/a')} volatility)")
+    bands = volatility.get('bollinger_bands') or {}
+    if bands:
+        lines.append(f"bollinger: upper {_num(bands.get('upper'))}, middle {_num(bands.get('middle'))}, "
+                     f"lower {_num(bands.get('lower'))}, bandwidth {_num(bands.get('bandwidth'))} {_signal(bands)}")
+    return lines
+
+
+def _volume_lines(analysis: Dict) -> List[str]:
+    volume = _section(analysis, 'volume_indicators')
+    if volume is None:
+        return []
+    parts = [
+        f"{key} {_signal(volume[key])}"
+        for key in ('obv', 'vwap', 'chaikin_money_flow', 'accumulation_distribution')
+        if isinstance(volume.get(key), dict)
+    ]
+    ratio = (volume.get('volume_sma') or {}).get('ratio')
+    if ratio is not None:
+        parts.append(f"volume/average {_num(ratio)}")
+    return ["volume: " + ", ".join(parts)] if parts else []
+
+
+def _pattern_lines(analysis: Dict) -> List[str]:
+    patterns = _section(analysis, 'patterns')
+    if patterns is None:
+        return []
+    current = list(patterns.get('patterns') or {})
+    recent = [
+        f"{pattern['pattern']} {pattern['direction']} ({pattern['candles_ago']} candles ago)"
+        for pattern in (patterns.get('recent') or [])[:3]
+    ]
+    if not current and not recent:
+        return []
+    return [f"patterns: {', '.join(current) or 'none'} now; recent: {', '.join(recent) or 'none'}"]
+
+
+def analysis_digest(analysis: Dict, max_tokens: Optional[int] = None) -> str:
+    """
+    Bounded text summary of a TechnicalAnalyzer analysis.
+
+    Lines are kept in priority order while the estimate (characters /
+    CHARS_PER_TOKEN) stays within `max_tokens` (default:
+    AGENT_DIGEST_TOKENS).
+    """
+    if 'error' in analysis:
+        return f"analysis unavailable: {analysis['error']}"
+    max_tokens = max_tokens or int(os.getenv('AGENT_DIGEST_TOKENS', 350))
+
+    price = (_section(analysis, 'basic_info') or {}).get('current_price')
+    lines = (
+        _summary_lines(analysis) + _price_lines(analysis) + _trend_lines(analysis, price)
+        + _momentum_lines(analysis) + _level_lines(analysis) + _volatility_lines(analysis)
+        + _volume_lines(analysis) + _pattern_lines(analysis)
+    )
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    kept, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > budget:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return "\n".join(kept)
@@ -0,0 +1,159 @@
+"""
+Bounded, fair execution of blocking AI agent jobs.
+
+Agent runs block a thread for seconds and call the LLM several times.
+`AgentGateway.submit` runs at most AGENT_CONCURRENCY of them at once on
+its own thread pool; the rest wait in a queue.
+
+The queue is fair because each user has at most one job in it: a newer
+query from the same user cancels the older one, whether waiting or
+running, and rejoins at the back. Waiters are told their queue position
+whenever it changes. Every job has a deadline of AGENT_DEADLINE seconds
+from submission, including the wait. Beyond AGENT_QUEUE_SIZE waiting
+jobs, new ones are rejected at once instead of piling up.
+
+A thread that is already running cannot be interrupted. A cancelled or
+timed-out job keeps its slot until the thread returns, and its result
+is discarded. Jobs that stream output can stop early by raising from
+their token callback once the caller has given up on them.
+
+Configuration (environment variables):
+    AGENT_CONCURRENCY: Agent jobs running at once (default: 4)
+    AGENT_DEADLINE: Seconds a query may take, queueing included (default: 60)
+    AGENT_QUEUE_SIZE: Jobs allowed to wait (default: 100)
+"""
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AgentBusy(Exception):
+    """The queue is full."""
+
+
+class QueryCancelled(Exception):
+    """The job was replaced by a newer query of the same user."""
+
+
+class _Job:
+    __slots__ = ('user_id', 'func', 'args', 'future', 'deadline', 'on_position', 'position')
+
+    def __init__(self, user_id, func, args, future, deadline, on_position):
+        self.user_id = user_id
+        self.func = func
+        self.args = args
+        self.future = future
+        self.deadline = deadline
+        self.on_position = on_position
+        self.position = 0
+
+
+class AgentGateway:
+    def __init__(self, max_concurrency: int = None, deadline: float = None, max_queue: int = None):
+        self.max_concurrency = max_concurrency or int(os.getenv('AGENT_CONCURRENCY', 4))
+        self.deadline = deadline or float(os.getenv('AGENT_DEADLINE', 60))
+        self.max_queue = max_queue or int(os.getenv('AGENT_QUEUE_SIZE', 100))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="agent")
+        # user -> waiting job, in arrival order; user -> latest running job
+        self._queue: "OrderedDict[Hashable, _Job]" = OrderedDict()
+        self._active: Dict[Hashable, _Job] = {}
+        # Includes cancelled jobs whose thread has not returned yet
+        self.running = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    async def submit(
+        self,
+        user_id: Hashable,
+        func: Callable,
+        *args,
+        on_position: Optional[Callable[[int], Awaitable[None]]] = None
+    ):
+        """
+        Run `func(*args)` in the pool on behalf of `user_id` and return its result.
+
+        `on_position(position)` is awaited in the background each time the
+        job's position in the queue changes (1 = next to run); it is never
+        called for a job that runs at once. Raises QueryCancelled when a
+        newer query of the same user replaces this one, AgentBusy when the
+        queue is full, and asyncio.TimeoutError past the deadline.
+        """
+        loop = asyncio.get_running_loop()
+        self._cancel_user(user_id)
+        if len(self._queue) >= self.max_queue:
+            raise AgentBusy()
+
+        job = _Job(user_id, func, args, loop.create_future(), loop.time() + self.deadline, on_position)
+        self._queue[user_id] = job
+        self._dispatch()
+        try:
+            # Shielded so a timeout leaves the future for _finished to find done
+            return await asyncio.wait_for(asyncio.shield(job.future), timeout=job.deadline - loop.time())
+        finally:
+            if not job.future.done():
+                job.future.cancel()
+            if self._queue.get(user_id) is job:
+                del self._queue[user_id]
+                self._report_positions()
+
+    def _cancel_user(self, user_id: Hashable) -> None:
+        """Fail the user's waiting and running jobs with QueryCancelled."""
+        for job in (self._queue.pop(user_id, None), self._active.get(user_id)):
+            if job is not None and not job.future.done():
+                job.future.set_exception(QueryCancelled())
+                # Retrieved here so an unawaited cancellation is not logged as an error
+                job.future.exception()
+
+    def _dispatch(self) -> None:
+        """Start waiting jobs while slots are free, dropping those no longer wanted."""
+        loop = asyncio.get_running_loop()
+        while self._queue and self.running < self.max_concurrency:
+            _, job = self._queue.popitem(last=False)
+            if job.future.done():
+                continue
+            self.running += 1
+            self._active[job.user_id] = job
+            execution = loop.run_in_executor(self._executor, job.func, *job.args)
+            execution.add_done_callback(partial(self._finished, job))
+        self._report_positions()
+
+    def _finished(self, job: _Job, execution: asyncio.Future) -> None:
+        self.running -= 1
+        if self._active.get(job.user_id) is job:
+            del self._active[job.user_id]
+        if execution.cancelled():
+            # Only at shutdown
+            if not job.future.done():
+                job.future.cancel()
+        elif not job.future.done():
+            if execution.exception() is not None:
+                job.future.set_exception(execution.exception())
+            else:
+                job.future.set_result(execution.result())
+        elif execution.exception() is not None and not isinstance(execution.exception(), QueryCancelled):
+            logger.warning(f"Discarded agent job failed: {str(execution.exception())}")
+        self._dispatch()
+
+    def _report_positions(self) -> None:
+        for position, job in enumerate(self._queue.values(), 1):
+            if job.position != position and job.on_position is not None:
+                job.position = position
+                asyncio.ensure_future(self._notify(job, position))
+
+    @staticmethod
+    async def _notify(job: _Job, position: int) -> None:
+        try:
+            await job.on_position(position)
+        except Exception as e:
+            logger.warning(f"Queue position update failed: {str(e)}")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,193 @@
+"""
+Rule-based intent and entity extraction for AI queries (English and Arabic).
+
+`parse_query` reads the intent (price, analysis, news, explain or open),
+the coin, the timeframe and the indicator from keyword tables, and the
+language from the script. It needs no model call and takes microseconds,
+so it can run in front of every agent query: the response cache keys on
+its result (see response_cache.py).
+
+Arabic text is normalized first (hamza forms, taa marbuta, alef maqsura
+and diacritics), and a leading article ('ال', 'بال', 'وال', 'لل') is
+ignored when looking words up.
+"""
+import re
+from typing import Dict, FrozenSet, Optional, Tuple
+
+INTENTS = ('price', 'analysis', 'news', 'explain', 'open')
+
+# Alias -> CoinGecko id (Arabic aliases in normalized form, without the article)
+COIN_ALIASES: Dict[str, str] = {
+    'bitcoin': 'bitcoin', 'btc': 'bitcoin', 'بيتكوين': 'bitcoin', 'بتكوين': 'bitcoin',
+    'ethereum': 'ethereum', 'eth': 'ethereum', 'ether': 'ethereum',
+    'ايثيريوم': 'ethereum', 'ايثريوم': 'ethereum', 'اثيريوم': 'ethereum', 'اثريوم': 'ethereum',
+    'tether': 'tether', 'usdt': 'tether', 'تيثر': 'tether',
+    'bnb': 'binancecoin', 'binancecoin': 'binancecoin',
+    'solana': 'solana', 'sol': 'solana', 'سولانا': 'solana',
+    'ripple': 'ripple', 'xrp': 'ripple', 'ريبل': 'ripple',
+    'cardano': 'cardano', 'ada': 'cardano', 'كاردانو': 'cardano',
+    'dogecoin': 'dogecoin', 'doge': 'dogecoin', 'دوجكوين': 'dogecoin', 'دوج': 'dogecoin',
+    'tron': 'tron', 'trx': 'tron', 'ترون': 'tron',
+    'polkadot': 'polkadot', 'بولكادوت': 'polkadot',
+    'litecoin': 'litecoin', 'ltc': 'litecoin', 'لايتكوين': 'litecoin',
+    'chainlink': 'chainlink', 'تشين لينك': 'chainlink',
+    'avalanche': 'avalanche-2', 'avax': 'avalanche-2', 'افالانش': 'avalanche-2',
+    'shiba': 'shiba-inu', 'shib': 'shiba-inu', 'شيبا': 'shiba-inu',
+    'toncoin': 'the-open-network', 'ton': 'the-open-network',
+    'usdc': 'usd-coin', 'polygon': 'matic-network', 'matic': 'matic-network',
+    'stellar': 'stellar', 'xlm': 'stellar', 'uniswap': 'uniswap',
+}
+
+# CoinGecko id -> ticker (CryptoCompare news categories)
+COIN_SYMBOLS: Dict[str, str] = {
+    'bitcoin': 'BTC', 'ethereum': 'ETH', 'tether': 'USDT', 'binancecoin': 'BNB', 'solana': 'SOL',
+    'ripple': 'XRP', 'cardano': 'ADA', 'dogecoin': 'DOGE', 'tron': 'TRX', 'polkadot': 'DOT',
+    'litecoin': 'LTC', 'chainlink': 'LINK', 'avalanche-2': 'AVAX', 'shiba-inu': 'SHIB',
+    'the-open-network': 'TON', 'usd-coin': 'USDC', 'matic-network': 'MATIC', 'stellar': 'XLM',
+    'uniswap': 'UNI',
+}
+
+# Languages answers can be given in without the agent
+LANGUAGE_NAMES = {'en': 'English', 'ar': 'Arabic'}
+
+# Word or phrase -> timeframe key of the agent's QuickAnalysis tool
+TIMEFRAME_ALIASES: Dict[str, str] = {
+    'today': '1d', 'daily': '1d', '24h': '1d', '1d': '1d', 'day': '1d', 'يوم': '1d', 'يومي': '1d', 'اليوم': '1d',
+    'week': '1w', 'weekly': '1w', '7d': '1w', '1w': '1w', 'اسبوع': '1w', 'اسبوعي': '1w',
+    'month': '1m', 'monthly': '1m', '30d': '1m', '1m': '1m', 'شهر': '1m', 'شهري': '1m',
+    '3 months': '3m', 'quarter': '3m', '90d': '3m', '3m': '3m', '3 اشهر': '3m', 'ثلاث اشهر': '3m', 'ربع سنه': '3m',
+}
+
+# Word or phrase -> canonical indicator name (Arabic phrases without articles)
+INDICATOR_ALIASES: Dict[str, str] = {
+    'rsi': 'rsi', 'relative strength': 'rsi', 'قوه نسبيه': 'rsi',
+    'macd': 'macd', 'ماكد': 'macd',
+    'bollinger': 'bollinger_bands', 'بولنجر': 'bollinger_bands', 'بولينجر': 'bollinger_bands',
+    'moving average': 'moving_averages', 'moving averages': 'moving_averages', 'ma': 'moving_averages',
+    'sma': 'moving_averages', 'ema': 'moving_averages', 'متوسط متحرك': 'moving_averages',
+    'متوسطات متحركه': 'moving_averages',
+    'stochastic': 'stochastic', 'ستوكاستك': 'stochastic', 'adx': 'adx', 'atr': 'atr',
+    'obv': 'obv', 'vwap': 'vwap', 'mfi': 'mfi', 'cci': 'cci', 'williams': 'williams_r',
+    'fibonacci': 'fibonacci', 'فيبوناتشي': 'fibonacci', 'ichimoku': 'ichimoku', 'ايشيموكو': 'ichimoku',
+    'support': 'support_resistance', 'resistance': 'support_resistance',
+}
+
+# Intent -> cue words or phrases, checked in this order
+INTENT_CUES: Tuple[Tuple[str, FrozenSet[str]], ...] = (
+    ('explain', frozenset({
+        'explain', 'meaning', 'what is', "what's a", 'what are', 'how does', 'how do i read', 'define',
+        'اشرح', 'شرح', 'ما هو', 'ماهو', 'ما هي', 'معنى', 'ماذا يعني', 'كيف يعمل',
+    })),
+    ('news', frozenset({
+        'news', 'headlines', 'happening', 'announcement', 'اخبار', 'خبر', 'جديد',
+    })),
+    ('analysis', frozenset({
+        'analysis', 'analyze', 'analyse', 'outlook', 'forecast', 'predict', 'prediction', 'trend', 'signal',
+        'signals', 'buy', 'sell', 'bullish', 'bearish', 'target', 'targets', 'technical', 'should i',
+        'تحليل', 'حلل', 'توقع', 'توقعات', 'اتجاه', 'شراء', 'بيع', 'اشتري', 'ابيع', 'هدف', 'اهداف', 'اشاره',
+    })),
+    ('price', frozenset({
+        'price', 'prices', 'cost', 'worth', 'how much', 'trading at', 'quote',
+        'سعر', 'اسعار', 'بكم', 'كم يساوي', 'قيمه',
+    })),
+)
+
+# Words ignored when keying open-ended questions
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'of', 'for', 'to', 'in', 'on', 'at', 'me', 'my', 'i', 'you', 'please',
+    'what', "what's", 'whats', 'can', 'could', 'tell', 'about', 'now', 'current', 'currently', 'right',
+    'هل', 'ما', 'في', 'من', 'على', 'عن', 'الى', 'هو', 'هي', 'لي', 'الان', 'حاليا',
+})
+
+_ARABIC = re.compile(r'[؀-ۿ]')
+_DIACRITICS = re.compile(r'[ً-ْـ]')
+_WORD = re.compile(r"[\w']+")
+_ARTICLES = ('بال', 'وال', 'لل', 'ال')
+
+
+def normalize(text: str) -> str:
+    """Lower-cased text with unified Arabic letter forms and single spaces."""
+    text = _DIACRITICS.sub('', (text or '').lower())
+    text = text.translate(str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ة': 'ه', 'ى': 'ي', '؟': ' '}))
+    return ' '.join(_WORD.findall(text))
+
+
+def _strip_article(word: str) -> str:
+    for article in _ARTICLES:
+        if word.startswith(article) and len(word) > len(article) + 2:
+            return word[len(article):]
+    return word
+
+
+def _terms(text: str) -> Tuple[Tuple[str, ...], str]:
+    """Words without Arabic articles, plus the same words joined for phrase lookups."""
+    words = tuple(_strip_article(word) for word in text.split())
+    return words, f" {' '.join(words)} "
+
+
+def _lookup(words: Tuple[str, ...], joined: str, aliases) -> Optional[str]:
+    """First alias found as a word, or as a phrase for multi-word aliases."""
+    for word in words:
+        if word in aliases:
+            return aliases[word] if isinstance(aliases, dict) else word
+    for alias in aliases:
+        if ' ' in alias and f" {alias} " in joined:
+            return aliases[alias] if isinstance(aliases, dict) else alias
+    return None
+
+
+def find_indicator(text: str) -> Optional[str]:
+    """Canonical indicator name mentioned in `text` ('RSI', 'Bollinger Bands', ...), or None."""
+    return _lookup(*_terms(normalize(text)), INDICATOR_ALIASES)
+
+
+def language(text: str) -> str:
+    """'ar' for Arabic script, 'en' for plain ASCII text, 'other' otherwise."""
+    text = text or ''
+    if _ARABIC.search(text):
+        return 'ar'
+    return 'en' if all(char.isascii() for char in text if char.isalpha()) else 'other'
+
+
+def parse_query(text: str) -> Dict:
+    """
+    Intent and entities of a free-text question.
+
+    Returns {"intent", "coin", "timeframe", "indicator", "language",
+    "terms"}: coin is a CoinGecko id, timeframe one of 1d/1w/1m/3m,
+    language 'ar', 'en' or 'other', and terms the sorted content words
+    (used to key open-ended questions). Unrecognized entities are None.
+    """
+    normalized = normalize(text)
+    words, joined = _terms(normalized)
+    # Phrases like "what is" are matched before the article is stripped
+    raw_joined = f" {normalized} "
+
+    coin = _lookup(words, joined, COIN_ALIASES)
+    indicator = _lookup(words, joined, INDICATOR_ALIASES)
+
+    intent = 'open'
+    for name, cues in INTENT_CUES:
+        if _lookup(words, joined, cues) or _lookup(tuple(normalized.split()), raw_joined, cues):
+            intent = name
+            break
+    # "what's bitcoin at" asks for a price without saying so
+    if intent == 'open' and coin is not None and normalized.endswith(' at'):
+        intent = 'price'
+    # Explanations need an indicator; "what is the price" is a price question
+    if intent == 'explain' and indicator is None:
+        intent = next(
+            (name for name, cues in INTENT_CUES[1:] if _lookup(words, joined, cues)),
+            'open'
+        )
+    if intent in ('price', 'analysis', 'news') and coin is None:
+        intent = 'open'
+
+    return {
+        "intent": intent,
+        "coin": coin,
+        "timeframe": _lookup(words, joined, TIMEFRAME_ALIASES) if intent == 'analysis' else None,
+        "indicator": indicator if intent in ('explain', 'analysis') else None,
+        "language": language(text),
+        "terms": tuple(sorted({word for word in words if word not in STOPWORDS})),
+    }
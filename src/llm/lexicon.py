@@ -0,0 +1,150 @@
+"""
+Local crypto-tuned lexicon sentiment, scored a whole column at once.
+
+Texts are lower-cased, multi-word phrases ("rug pull", "all time high")
+are joined into single tokens, and all tokens of all texts are exploded
+into one flat array. Weights come from one dictionary lookup over that
+array. A negation within the two previous tokens flips a weight, and a
+booster right before it strengthens it. Both are found by comparing the
+array with itself shifted. Per-text sums come from `np.bincount`.
+
+The score is normalized to (-1, 1) like VADER's compound score. The
+confidence is the score's magnitude times how one-sided the hits are, so
+texts without sentiment words, or with evenly mixed ones, have a low
+confidence. Callers escalate those to an LLM (see
+CryptoSentimentAnalyzer.score_articles).
+
+Usage:
+    LexiconSentimentScorer().score(df['title'])  # columns: score, sentiment, confidence
+"""
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Token weights, roughly -3 (very bearish) to 3 (very bullish)
+CRYPTO_LEXICON: Dict[str, float] = {
+    # Market direction
+    'bullish': 2.5, 'bull': 1.5, 'bulls': 1.5, 'rally': 2.0, 'rallies': 2.0, 'rallied': 2.0,
+    'surge': 2.2, 'surges': 2.2, 'surged': 2.2, 'soar': 2.5, 'soars': 2.5, 'soared': 2.5,
+    'jump': 1.5, 'jumps': 1.5, 'jumped': 1.5, 'climb': 1.3, 'climbs': 1.3, 'climbed': 1.3,
+    'gain': 1.3, 'gains': 1.3, 'gained': 1.3, 'rise': 1.2, 'rises': 1.2, 'rising': 1.2, 'rose': 1.2,
+    'rebound': 1.5, 'rebounds': 1.5, 'recovery': 1.5, 'recovers': 1.5, 'recovered': 1.5,
+    'breakout': 2.0, 'moon': 2.5, 'mooning': 2.5, 'pump': 1.0, 'pumps': 1.0, 'pumping': 1.0,
+    'uptrend': 2.0, 'outperform': 1.5, 'outperforms': 1.5, 'record': 1.0, 'high': 0.5, 'higher': 1.0,
+    'bearish': -2.5, 'bear': -1.5, 'bears': -1.5, 'crash': -3.0, 'crashes': -3.0, 'crashed': -3.0,
+    'plunge': -2.5, 'plunges': -2.5, 'plunged': -2.5, 'plummet': -2.8, 'plummets': -2.8, 'plummeted': -2.8,
+    'dump': -2.0, 'dumps': -2.0, 'dumping': -2.0, 'slump': -2.0, 'slumps': -2.0, 'slumped': -2.0,
+    'drop': -1.3, 'drops': -1.3, 'dropped': -1.3, 'fall': -1.3, 'falls': -1.3, 'fell': -1.3,
+    'decline': -1.3, 'declines': -1.3, 'declined': -1.3, 'sell-off': -2.0, 'selloff': -2.0,
+    'downtrend': -2.0, 'correction': -1.2, 'capitulation': -2.5, 'liquidated': -2.0, 'liquidations': -1.8,
+    'lower': -1.0, 'low': -0.5, 'losses': -1.8, 'loss': -1.5, 'lose': -1.5, 'loses': -1.5, 'lost': -1.5,
+    'underperform': -1.5, 'underperforms': -1.5, 'volatile': -0.5, 'volatility': -0.3,
+    # Adoption and fundamentals
+    'adoption': 1.8, 'adopts': 1.8, 'approve': 2.0, 'approval': 2.2, 'approved': 2.2, 'approves': 2.2,
+    'launch': 1.0, 'launches': 1.0, 'launched': 1.0, 'partnership': 1.8, 'partners': 1.2,
+    'integration': 1.2, 'upgrade': 1.3, 'upgrades': 1.3, 'milestone': 1.5, 'growth': 1.5,
+    'inflows': 1.8, 'inflow': 1.8, 'accumulation': 1.5, 'accumulate': 1.3, 'accumulating': 1.3,
+    'institutional': 0.8, 'etf': 0.5, 'halving': 0.8, 'staking': 0.5, 'listing': 1.2, 'listed': 1.0,
+    'profit': 1.5, 'profits': 1.5, 'profitable': 1.8, 'strong': 1.5, 'strength': 1.3, 'support': 0.8,
+    'optimism': 2.0, 'optimistic': 2.0, 'confidence': 1.3, 'positive': 1.8, 'boost': 1.8, 'boosts': 1.8,
+    'win': 1.5, 'wins': 1.5, 'success': 1.8, 'successful': 1.8, 'secure': 1.0,
+    'outflows': -1.8, 'outflow': -1.8, 'rejection': -1.5, 'rejected': -1.8, 'rejects': -1.8,
+    'delay': -1.2, 'delays': -1.2, 'delayed': -1.2, 'delisting': -2.2, 'delisted': -2.2, 'delist': -2.2,
+    'weak': -1.5, 'weakness': -1.5, 'resistance': -0.5, 'fear': -2.0, 'fears': -2.0, 'panic': -2.5,
+    'uncertainty': -1.5, 'concern': -1.3, 'concerns': -1.3, 'worries': -1.5, 'worry': -1.5, 'risk': -0.8,
+    'risks': -0.8, 'warning': -1.5, 'warns': -1.5, 'negative': -1.8, 'pessimism': -2.0, 'pessimistic': -2.0,
+    # Security and regulation
+    'hack': -3.0, 'hacked': -3.0, 'hacks': -3.0, 'exploit': -2.8, 'exploited': -2.8, 'breach': -2.5,
+    'scam': -3.0, 'scams': -3.0, 'fraud': -3.0, 'ponzi': -3.0, 'theft': -2.8, 'stolen': -2.8,
+    'lawsuit': -2.0, 'sues': -2.0, 'sued': -2.0, 'charges': -1.5, 'charged': -1.8, 'indicted': -2.5,
+    'ban': -2.5, 'bans': -2.5, 'banned': -2.5, 'crackdown': -2.5, 'investigation': -1.5, 'probe': -1.3,
+    'fine': -1.0, 'fined': -1.8, 'penalty': -1.5, 'sanctions': -1.5, 'bankruptcy': -3.0, 'bankrupt': -3.0,
+    'insolvent': -3.0, 'collapse': -3.0, 'collapses': -3.0, 'collapsed': -3.0, 'fud': -1.5,
+    'settlement': 0.5, 'cleared': 1.5, 'dismissed': 1.0, 'legal': 0.3, 'regulated': 0.5,
+    # Multi-word phrases, matched with spaces in the text
+    'all_time_high': 2.5, 'new_high': 2.0, 'record_high': 2.5, 'short_squeeze': 1.8, 'golden_cross': 2.0,
+    'buy_the_dip': 1.5, 'to_the_moon': 2.5, 'rug_pull': -3.0, 'death_cross': -2.0, 'bear_market': -2.0,
+    'bull_market': 2.0, 'sell_pressure': -1.5, 'selling_pressure': -1.5, 'buying_pressure': 1.5,
+    'price_drop': -1.5, 'record_low': -2.5, 'new_low': -2.0, 'exit_scam': -3.0, 'pump_and_dump': -2.5,
+}
+
+# A negation flips the weight of a sentiment word up to two tokens later
+NEGATIONS = frozenset({
+    'not', 'no', 'never', 'neither', 'nor', 'without', "isn't", 'isnt', "aren't", 'arent', "wasn't", 'wasnt',
+    "don't", 'dont', "doesn't", 'doesnt', "didn't", 'didnt', "won't", 'wont', "can't", 'cant', 'cannot',
+    'fails', 'failed', 'unlikely', 'avoids', 'avoided',
+})
+NEGATION_FACTOR = -0.75
+
+# A booster right before a sentiment word scales it
+BOOSTERS = frozenset({
+    'very', 'extremely', 'massive', 'massively', 'huge', 'major', 'sharp', 'sharply', 'significant',
+    'significantly', 'strongly', 'biggest', 'largest', 'historic', 'record-breaking',
+})
+BOOSTER_FACTOR = 1.5
+
+# Normalization constant of the score (VADER uses 15)
+ALPHA = 15.0
+
+# Scores beyond this magnitude are positive/negative rather than neutral
+NEUTRAL_BAND = 0.05
+
+_TOKEN = re.compile(r"[a-z][a-z0-9_'-]*")
+
+
+class LexiconSentimentScorer:
+    """
+    Vectorized lexicon sentiment.
+
+    Extra or overriding token weights can be passed as `lexicon`; phrase
+    entries use '_' between words.
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None):
+        self.lexicon = {**CRYPTO_LEXICON, **(lexicon or {})}
+        phrases = sorted((token.replace('_', ' ') for token in self.lexicon if '_' in token), key=len, reverse=True)
+        self._phrases = re.compile(r'\b(?:' + '|'.join(map(re.escape, phrases)) + r')\b') if phrases else None
+
+    def score(self, texts: Iterable[str]) -> pd.DataFrame:
+        """
+        Sentiment of every text, one row per text in order.
+
+        Columns: score in (-1, 1), sentiment ('positive', 'negative' or
+        'neutral') and confidence in [0, 1).
+        """
+        texts = pd.Series(list(texts), dtype=object).fillna('').astype(str).str.lower()
+        if self._phrases is not None:
+            texts = texts.str.replace(self._phrases, lambda match: match.group(0).replace(' ', '_'), regex=True)
+        count = len(texts)
+
+        tokens = texts.str.findall(_TOKEN).explode().dropna()
+        documents = tokens.index.to_numpy(dtype=np.int64)
+        words = tokens.to_numpy(dtype=object)
+        weights = tokens.map(self.lexicon).fillna(0.0).to_numpy(dtype=np.float64)
+
+        negation = np.fromiter((word in NEGATIONS for word in words), dtype=bool, count=len(words))
+        booster = np.fromiter((word in BOOSTERS for word in words), dtype=bool, count=len(words))
+        negated = np.zeros(len(words), dtype=bool)
+        boosted = np.zeros(len(words), dtype=bool)
+        for lag in (1, 2):
+            # Modifiers only apply within the same text
+            same_text = documents[lag:] == documents[:-lag]
+            negated[lag:] |= negation[:-lag] & same_text
+            if lag == 1:
+                boosted[lag:] = booster[:-lag] & same_text
+        weights = weights * np.where(negated, NEGATION_FACTOR, 1.0) * np.where(boosted, BOOSTER_FACTOR, 1.0)
+
+        positive = np.bincount(documents, weights=np.clip(weights, 0, None), minlength=count)
+        negative = np.bincount(documents, weights=np.clip(-weights, 0, None), minlength=count)
+        total = positive - negative
+        score = total / np.sqrt(total ** 2 + ALPHA)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            one_sided = np.where(positive + negative > 0, np.abs(total) / (positive + negative), 0.0)
+
+        return pd.DataFrame({
+            'score': score,
+            'sentiment': np.select([score > NEUTRAL_BAND, score < -NEUTRAL_BAND], ['positive', 'negative'], 'neutral'),
+            'confidence': np.abs(score) * one_sided,
+        })
@@ -0,0 +1,72 @@
+"""
+Response cache for the AI agent.
+
+Near-duplicate questions ("btc price?", "what's bitcoin at") parse to the
+same intent and entities (see intent.py), so they share one cache key and
+one agent run. An entry is served while it is younger than the TTL and
+the data version it was answered from is unchanged. The version is the
+refresh time of the coin's cached OHLCV data for market questions, a
+window of AGENT_PRICE_TTL seconds for price checks, a constant for
+indicator explanations, and None (TTL only) otherwise. Versions are read
+from local caches only, so a cache hit never calls an API. The least
+recently used entries are dropped beyond the size bound.
+
+Configuration (environment variables):
+    AGENT_CACHE_TTL: Seconds an answer stays valid (default: 300)
+    AGENT_CACHE_SIZE: Answers kept (default: 512)
+    AGENT_PRICE_TTL: Seconds a price answer stays valid (default: 60)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def cache_key(query: Dict) -> Tuple:
+    """
+    Key of a parsed query (see intent.parse_query).
+
+    Structured intents key on their entities only; open-ended questions
+    also key on their content words.
+    """
+    key = (query['intent'], query['coin'], query['timeframe'], query['indicator'], query['language'])
+    return key + (query['terms'] if query['intent'] == 'open' else ())
+
+
+def price_version(ttl: float = None, now: Optional[float] = None) -> Tuple:
+    """Version of price answers: changes every `ttl` seconds, so they are reused within that window only."""
+    ttl = ttl or float(os.getenv('AGENT_PRICE_TTL', 60))
+    return ('price', int((now if now is not None else time.time()) // ttl))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = max_entries or int(os.getenv('AGENT_CACHE_SIZE', 512))
+        self.ttl = ttl or float(os.getenv('AGENT_CACHE_TTL', 300))
+        # key -> (stored at, data version, response)
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, version: Any = None) -> Optional[str]:
+        """Cached response for `key` if still fresh and answered from `version`; None otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, stored_version, response = entry
+            if time.monotonic() - stored_at > self.ttl or stored_version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: Tuple, version: Any, response: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), version, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
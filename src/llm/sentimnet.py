@@ -1,69 +1,231 @@
+"""
+Sentiment scoring of crypto news articles.
+
+Articles are first scored locally, all at once, with the crypto lexicon
+(see lexicon.py). Only articles whose lexicon confidence is below
+SENTIMENT_MIN_CONFIDENCE are escalated to the LLM. For those,
+`score_articles` packs several articles into one prompt that asks
+for a JSON array of sentiments, and sends the packed prompts concurrently
+from a bounded thread pool. Articles missing from a batch response, or in
+a batch whose response cannot be parsed, are scored one by one. The whole
+batch shares one timeout budget: articles still unscored when it runs
+out are reported as neutral. News latency is therefore about one round
+trip, whatever the number of articles.
+
+Configuration (environment variables):
+    SENTIMENT_BATCH_SIZE: Articles per packed prompt (default: 5)
+    SENTIMENT_CONCURRENCY: Prompts in flight at once (default: 4)
+    SENTIMENT_TIMEOUT: Seconds allowed for scoring one batch of articles (default: 15)
+    SENTIMENT_MIN_CONFIDENCE: Lexicon confidence at which the LLM is skipped;
+        0 never calls it, above 1 always does (default: 0.5)
+"""
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import HumanMessage, SystemMessage
-from typing import Dict, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 from dotenv import load_dotenv
+import json
 import os
+import re
 import requests
+import time
+
+from .lexicon import LexiconSentimentScorer
+
+SENTIMENTS = ('positive', 'negative', 'neutral')
+
+# Article bodies are cut to this many characters in prompts
+MAX_BODY_CHARS = 2000
+
+SYSTEM_PROMPT = "You are a crypto market sentiment analyzer. Analyze the given text and return only 'positive', 'negative', or 'neutral'."
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a crypto market sentiment analyzer. You will receive several numbered crypto news articles. "
+    "Return only a JSON array with one object per article, in the format "
+    '[{"id": <article number>, "sentiment": "positive" | "negative" | "neutral"}].'
+)
+
+
+def parse_batch_response(content: str, count: int) -> List[Optional[str]]:
+    """
+    Sentiments of articles 0..count-1 from a JSON array response.
+
+    Articles the response leaves out, or labels with anything but a known
+    sentiment, are None. A response that is not a JSON array gives all None.
+    """
+    # Models often wrap JSON in a markdown code fence
+    match = re.search(r'\[.*\]', content, re.DOTALL)
+    sentiments: List[Optional[str]] = [None] * count
+    if match is None:
+        return sentiments
+    try:
+        items = json.loads(match.group(0))
+    except ValueError:
+        return sentiments
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        position, sentiment = item.get('id'), str(item.get('sentiment', '')).strip().lower()
+        if isinstance(position, int) and 0 <= position < count and sentiment in SENTIMENTS:
+            sentiments[position] = sentiment
+    return sentiments
+
 
 class CryptoSentimentAnalyzer:
-    def __init__(self, google_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        google_api_key: Optional[str] = None,
+        batch_size: int = None,
+        max_concurrency: int = None,
+        timeout: float = None,
+        min_confidence: float = None
+    ):
         """Initialize the sentiment analyzer with Google's Gemini model."""
         if google_api_key:
             self.api_key = google_api_key
         else:
             load_dotenv()
             self.api_key = os.getenv("GOOGLE_API_KEY")
-            
+
         if not self.api_key:
             raise ValueError("Google API key is required.")
 
+        self.batch_size = batch_size or int(os.getenv('SENTIMENT_BATCH_SIZE', 5))
+        self.max_concurrency = max_concurrency or int(os.getenv('SENTIMENT_CONCURRENCY', 4))
+        self.timeout = timeout or float(os.getenv('SENTIMENT_TIMEOUT', 15))
+        self.min_confidence = (
+            min_confidence if min_confidence is not None else float(os.getenv('SENTIMENT_MIN_CONFIDENCE', 0.5))
+        )
+        self.lexicon = LexiconSentimentScorer()
+        # Shared by all batches; calls abandoned at a timeout finish in the background
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="sentiment")
+
         try:
             self.llm = ChatGoogleGenerativeAI(
-                model="gemini-2.0-flash-exp", 
+                model="gemini-2.0-flash-exp",
                 google_api_key=self.api_key
             )
         except Exception as e:
             print(f"Error initializing Gemini model: {str(e)}")
             raise
 
+    @staticmethod
+    def _article_text(title: str, body: str) -> str:
+        return f"Title: {title}\n\nBody: {(body or '')[:MAX_BODY_CHARS]}"
+
     def analyze_sentiment(self, title: str, body: str) -> str:
         """
         Analyze the sentiment of a crypto news article.
         Returns: 'positive', 'negative', or 'neutral'
         """
-        combined_text = f"Title: {title}\n\nBody: {body}"
-        
+        return self._classify(title, body) or 'neutral'
+
+    def _classify(self, title: str, body: str) -> Optional[str]:
+        """Sentiment of one article; None if the call fails or the answer is not a sentiment."""
+        combined_text = self._article_text(title, body)
+
         messages = [
-            SystemMessage(content="You are a crypto market sentiment analyzer. Analyze the given text and return only 'positive', 'negative', or 'neutral'."),
+            SystemMessage(content=SYSTEM_PROMPT),
             HumanMessage(content=f"""
             Analyze the sentiment of this crypto news article and return only one word (positive, negative, or neutral):
 
             {combined_text}
             """)
         ]
-        
+
         try:
             response = self.llm.invoke(messages)
             sentiment = response.content.strip().lower()
-            
+
             # Ensure valid response
-            if sentiment not in ['positive', 'negative', 'neutral']:
-                return 'neutral'
-                
+            if sentiment not in SENTIMENTS:
+                return None
+
             return sentiment
         except Exception as e:
             print(f"Error analyzing sentiment: {str(e)}")
-            return 'neutral'
+            return None
+
+    def analyze_sentiments(self, articles: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """
+        Score several (title, body) articles with one packed prompt.
+
+        Returns one sentiment per article, None where the response did not
+        give a valid one.
+        """
+        numbered = "\n\n".join(
+            f"Article {position}:\n{self._article_text(title, body)}"
+            for position, (title, body) in enumerate(articles)
+        )
+        messages = [
+            SystemMessage(content=BATCH_SYSTEM_PROMPT),
+            HumanMessage(content=f"Classify the sentiment of each of these {len(articles)} crypto news articles:\n\n{numbered}")
+        ]
+        try:
+            response = self.llm.invoke(messages)
+        except Exception as e:
+            print(f"Error analyzing batch sentiment: {str(e)}")
+            return [None] * len(articles)
+        return parse_batch_response(response.content, len(articles))
+
+    def score_articles(
+        self,
+        articles: List[Tuple[str, str]],
+        timeout: Optional[float] = None,
+        default: Optional[str] = 'neutral'
+    ) -> List[Optional[str]]:
+        """
+        Sentiments of (title, body) articles, in order, within `timeout` seconds overall.
+
+        Articles the lexicon scores with at least `min_confidence` keep its
+        sentiment. The rest go to the LLM: packed prompts of `batch_size`
+        articles run concurrently, and articles a batch response misses are
+        rescored individually while time remains. Escalated articles
+        without a sentiment at the deadline, or whose individual call
+        failed too, get `default`.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        results: List[Optional[str]] = [None] * len(articles)
+
+        local = self.lexicon.score(f"{title or ''}. {(body or '')[:MAX_BODY_CHARS]}" for title, body in articles)
+        escalated = []
+        for position, (sentiment, confidence) in enumerate(zip(local['sentiment'], local['confidence'])):
+            if confidence >= self.min_confidence:
+                results[position] = sentiment
+            else:
+                escalated.append(position)
+
+        # future -> (positions of the articles it scores, whether it is a packed prompt)
+        pending: Dict = {}
+        for start in range(0, len(escalated), self.batch_size):
+            positions = escalated[start:start + self.batch_size]
+            if len(positions) == 1:
+                pending[self._executor.submit(self._classify, *articles[positions[0]])] = (positions, False)
+            else:
+                batch = [articles[position] for position in positions]
+                pending[self._executor.submit(self.analyze_sentiments, batch)] = (positions, True)
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"Sentiment timeout: {sum(len(p) for p, _ in pending.values())} articles left unscored")
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                positions, packed = pending.pop(future)
+                sentiments = future.result() if packed else [future.result()]
+                for position, sentiment in zip(positions, sentiments):
+                    if sentiment is not None:
+                        results[position] = sentiment
+                    elif packed:
+                        # Per-article fallback for items the batch response missed
+                        pending[self._executor.submit(self._classify, *articles[position])] = ([position], False)
+
+        return [sentiment or default for sentiment in results]
 
     def batch_analyze_articles(self, df: pd.DataFrame) -> pd.DataFrame:
         """Analyze sentiment for multiple articles in a DataFrame."""
         df = df.copy()
-        sentiments = []
-        
-        for _, row in df.iterrows():
-            sentiment = self.analyze_sentiment(row['title'], row['body'])
-            sentiments.append(sentiment)
-            
-        df['sentiment'] = sentiments
+        df['sentiment'] = self.score_articles(list(zip(df['title'], df['body'])))
         return df
@@ -0,0 +1,209 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from queue import Queue, Empty, Full
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError, SQLAlchemyError
+
+from .database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the database is unreachable rather than that the events are bad
+CONNECTION_ERRORS = (OperationalError, InterfaceError, DisconnectionError)
+
+# Wakes the worker on close
+_STOP = object()
+
+# Longest wait between writes while the database is unreachable, in seconds
+MAX_BACKOFF = 60.0
+
+
+class ActivityLogger:
+    """
+    Non-blocking sink for user activity events.
+
+    Handlers enqueue events with `log()`, which never touches the database.
+    A background thread drains the queue and writes the events with one bulk
+    insert whenever `batch_size` events are waiting or `flush_interval`
+    seconds have passed. While the database is unreachable, batches stay in
+    a bounded retry buffer and writes are retried with exponential backoff;
+    the oldest events are dropped once that buffer is full. A batch the
+    database rejects is split until the offending events are isolated,
+    and those are dropped. Pending events are flushed on shutdown.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(ActivityLogger, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(
+        self,
+        db_manager: Optional[DatabaseManager] = None,
+        batch_size: int = None,
+        flush_interval: float = None,
+        max_queue_size: int = 10000,
+        max_retry_buffer: int = 5000
+    ):
+        if self._initialized:
+            return
+        self.db_manager = db_manager or DatabaseManager()
+        self.batch_size = batch_size or int(os.getenv('ACTIVITY_BATCH_SIZE', 100))
+        self.flush_interval = flush_interval or float(os.getenv('ACTIVITY_FLUSH_INTERVAL', 2.0))
+        self.queue = Queue(maxsize=max_queue_size)
+        self.retry_buffer = deque(maxlen=max_retry_buffer)
+        self.dropped_count = 0
+        self._dropped_lock = threading.Lock()
+        # Monotonic time before which the worker does not write, and the next wait
+        self._retry_at = 0.0
+        self._backoff = self.flush_interval
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.close)
+        self._initialized = True
+
+    def _ensure_worker(self) -> None:
+        """Start the background flush thread on first use."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop_event.clear()
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="activity-logger",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def log(self, activity_data: Dict) -> bool:
+        """
+        Enqueue a user activity without blocking.
+
+        The event time is recorded here rather than when the batch is written.
+        Returns False if the queue is full and the event was dropped.
+        """
+        self._ensure_worker()
+        event = dict(activity_data)
+        event.setdefault('created_at', datetime.utcnow())
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except Full:
+            self._count_dropped(1)
+            logger.warning("Activity queue full, dropping event for user %s", activity_data.get('user_id'))
+            return False
+
+    def _count_dropped(self, count: int) -> None:
+        with self._dropped_lock:
+            self.dropped_count += count
+
+    def _drain(self, max_items: int) -> List[Dict]:
+        """Take up to `max_items` events off the queue without waiting."""
+        items = []
+        while len(items) < max_items:
+            try:
+                item = self.queue.get_nowait()
+            except Empty:
+                break
+            if item is not _STOP:
+                items.append(item)
+        return items
+
+    def _run(self) -> None:
+        """Worker loop: flush when the batch is full or the interval elapses."""
+        last_flush = time.monotonic()
+        while not self._stop_event.is_set():
+            next_flush = max(last_flush + self.flush_interval, self._retry_at)
+            try:
+                item = self.queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+                self._buffer(([] if item is _STOP else [item]) + self._drain(self.batch_size - 1))
+            except Empty:
+                pass
+
+            now = time.monotonic()
+            if now < self._retry_at:
+                continue
+            if len(self.retry_buffer) >= self.batch_size or now - last_flush >= self.flush_interval:
+                self._flush_buffer()
+                last_flush = time.monotonic()
+
+    def _buffer(self, items: List[Dict]) -> None:
+        """Append events to the pending buffer, counting any that fall off the front."""
+        with self._flush_lock:
+            overflow = len(self.retry_buffer) + len(items) - self.retry_buffer.maxlen
+            if overflow > 0:
+                self._count_dropped(overflow)
+                logger.warning(f"Activity retry buffer full, dropping {overflow} oldest events")
+            self.retry_buffer.extend(items)
+
+    def _write(self, batch: List[Dict]) -> Tuple[int, List[Dict]]:
+        """
+        Write a batch; return the number of events written and those left for a retry.
+
+        A batch the database rejects is written in halves, down to single
+        events, which are dropped. On a connection error the events not yet
+        written are left for a retry.
+        """
+        try:
+            return self.db_manager.bulk_log_user_activities(batch), []
+        except CONNECTION_ERRORS as e:
+            logger.error(f"Error flushing {len(batch)} activities, will retry: {str(e)}")
+            return 0, batch
+        except SQLAlchemyError as e:
+            if len(batch) == 1:
+                self._count_dropped(1)
+                logger.error(f"Dropping activity for user {batch[0].get('user_id')}: {str(e)}")
+                return 0, []
+            middle = len(batch) // 2
+            written, left = self._write(batch[:middle])
+            if left:
+                return written, left + batch[middle:]
+            more, left = self._write(batch[middle:])
+            return written + more, left
+
+    def _flush_buffer(self) -> int:
+        """Write everything in the retry buffer; on a connection error keep the rest and back off."""
+        with self._flush_lock:
+            written = 0
+            while self.retry_buffer:
+                batch = [self.retry_buffer.popleft() for _ in range(min(self.batch_size, len(self.retry_buffer)))]
+                batch_written, left = self._write(batch)
+                written += batch_written
+                if left:
+                    # Nothing was added since the batch was popped, so it always fits back in
+                    self.retry_buffer.extendleft(reversed(left))
+                    self._retry_at = time.monotonic() + self._backoff
+                    self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+                    break
+            else:
+                self._retry_at = 0.0
+                self._backoff = self.flush_interval
+            return written
+
+    def flush(self) -> int:
+        """Synchronously write all queued and buffered events."""
+        self._buffer(self._drain(self.queue.qsize()))
+        return self._flush_buffer()
+
+    def close(self) -> None:
+        """Stop the worker thread and flush whatever is left."""
+        self._stop_event.set()
+        if self._worker is not None and self._worker.is_alive():
+            try:
+                self.queue.put_nowait(_STOP)
+            except Full:
+                # A full queue wakes the worker anyway
+                pass
+            self._worker.join(timeout=self.flush_interval + 1)
+        self.flush()
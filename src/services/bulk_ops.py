@@ -0,0 +1,158 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import insert, select, and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    """Yield successive slices of `items` with at most `size` elements."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def upsert(
+    session: Session,
+    model,
+    rows: List[Dict],
+    index_elements: List[str],
+    update_columns: Optional[Iterable[str]] = None,
+    increment_columns: Optional[Iterable[str]] = None
+) -> int:
+    """
+    Insert `rows` into `model`'s table, updating rows that collide on `index_elements`.
+
+    Uses a single INSERT ... ON CONFLICT statement on PostgreSQL and SQLite.
+    Columns in `update_columns` are overwritten with the incoming value and
+    columns in `increment_columns` are added to the stored value.
+
+    Args:
+        session: Active session; the caller owns the transaction
+        model: Declarative model class
+        rows: Column dictionaries, all with the same keys
+        index_elements: Columns of the unique constraint to conflict on
+        update_columns: Columns to overwrite (default: every non-key column in the rows)
+        increment_columns: Columns to accumulate instead of overwrite
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+
+    increment_columns = list(increment_columns or [])
+    if update_columns is None:
+        update_columns = [
+            key for key in rows[0]
+            if key not in index_elements and key not in increment_columns
+        ]
+    table = model.__table__
+    dialect = session.get_bind().dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = dialect_insert(table).values(rows)
+        set_ = {col: stmt.excluded[col] for col in update_columns}
+        set_.update({col: table.c[col] + stmt.excluded[col] for col in increment_columns})
+        if set_:
+            stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        session.execute(stmt)
+        return len(rows)
+
+    # Generic fallback: one lookup per row
+    for row in rows:
+        condition = and_(*[table.c[col] == row[col] for col in index_elements])
+        existing = session.execute(select(table).where(condition)).first()
+        if existing is None:
+            session.execute(insert(table).values(**row))
+        else:
+            values = {col: row[col] for col in update_columns}
+            values.update({col: getattr(existing, col) + row[col] for col in increment_columns})
+            if values:
+                session.execute(table.update().where(condition).values(**values))
+    return len(rows)
+
+
+def dedupe_rows(rows: List[Dict], index_elements: List[str]) -> List[Dict]:
+    """
+    Keep only the last row for each conflict key.
+
+    PostgreSQL rejects an INSERT ... ON CONFLICT DO UPDATE that touches the
+    same row twice, so API payloads with repeated keys must be collapsed.
+    """
+    latest = {}
+    for row in rows:
+        latest[tuple(row[col] for col in index_elements)] = row
+    return list(latest.values())
+
+
+def upsert_in_chunks(
+    session_factory: sessionmaker,
+    model,
+    rows: List[Dict],
+    index_elements: List[str],
+    batch_size: int,
+    update_columns: Optional[Iterable[str]] = None,
+    on_error: Optional[Callable[[SQLAlchemyError, Sequence[Dict]], None]] = None,
+    atomic: bool = False
+) -> int:
+    """
+    Upsert `rows` in chunks of `batch_size`, committing each chunk separately.
+
+    Keeping transactions short avoids holding locks on the whole table for
+    the duration of a large sync. The price is that a failure leaves a
+    partial write: chunks committed before the failed one stay written.
+    With `atomic`, all chunks run in one transaction that is rolled back
+    as a whole instead. Rows are deduplicated on `index_elements` and
+    grouped by their key set, since a multi-row INSERT needs every row to
+    name the same columns.
+
+    Args:
+        session_factory: Session maker; one session is opened per chunk, or per call if atomic
+        on_error: Called with the error and the failed chunk (every row if atomic), after
+            which the remaining chunks are still written. Without it the error is raised.
+        atomic: Write all rows or none
+
+    Returns:
+        Number of rows written
+    """
+    groups: Dict[tuple, List[Dict]] = {}
+    for row in dedupe_rows(rows, index_elements):
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    if atomic:
+        session = session_factory()
+        try:
+            written = sum(
+                upsert(session, model, chunk, index_elements, update_columns)
+                for group in groups.values() for chunk in chunked(group, batch_size)
+            )
+            session.commit()
+            return written
+        except SQLAlchemyError as e:
+            session.rollback()
+            if on_error is None:
+                raise
+            on_error(e, [row for group in groups.values() for row in group])
+            return 0
+        finally:
+            session.close()
+
+    written = 0
+    for group in groups.values():
+        for chunk in chunked(group, batch_size):
+            session = session_factory()
+            try:
+                written += upsert(session, model, chunk, index_elements, update_columns)
+                session.commit()
+            except SQLAlchemyError as e:
+                session.rollback()
+                if on_error is None:
+                    raise
+                on_error(e, chunk)
+            finally:
+                session.close()
+    return written
@@ -1,15 +1,17 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, func
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import select
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import pandas as pd
 import logging
-from typing import Optional, Dict, List
-from .database import Base, OHLC, TimeInterval, Coin
+from typing import Optional, Dict, List, Tuple
+from .database import Base, OHLC, TimeInterval, Coin, IndicatorState
+from .bulk_ops import upsert, upsert_in_chunks
 import os
 
 class CacheManager:
-    def __init__(self, database_url: str = None, cache_duration: Dict[str, int] = None):
+    def __init__(self, database_url: str = None, cache_duration: Dict[str, int] = None, batch_size: int = None):
         """Initialize the cache manager."""
         if database_url is None:
             database_url = self._construct_database_url()   
@@ -23,6 +25,7 @@ class CacheManager:
              30: 1800,  # 30 minutes for 30-day data
              90: 3600   # 1 hour for 90-day data
         }
+        self.batch_size = batch_size or int(os.getenv('DB_BATCH_SIZE', 1000))
         self.logger = logging.getLogger(__name__)
 
     def _construct_database_url(self) -> str:
@@ -33,6 +36,19 @@ class CacheManager:
         else:
             return f"postgresql://{os.getenv('POSTGRES_USER', 'postgres')}:{os.getenv('POSTGRES_PASSWORD', '')}@{os.getenv('POSTGRES_HOST', 'localhost')}:{os.getenv('POSTGRES_PORT', '5432')}/{os.getenv('POSTGRES_DB', 'crypto_analytics')}"
     
+    @contextmanager
+    def session_scope(self):
+        """Session that commits on success and rolls back on error."""
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     def get_ohlcv_data(
         self, 
         coin_id: str, 
@@ -83,6 +99,28 @@ class CacheManager:
         finally:
             session.close()
 
+    def get_last_updated(self, coin_id: str, vs_currency: str, interval: int) -> Optional[datetime]:
+        """Return when the cached OHLCV data for this coin and interval was last refreshed, if ever."""
+        session = self.Session()
+        try:
+            return session.query(func.max(OHLC.last_updated)).filter(
+                OHLC.coin_id == coin_id,
+                OHLC.vs_currency == vs_currency,
+                OHLC.interval == TimeInterval(interval)
+            ).scalar()
+        except Exception as e:
+            self.logger.error(f"Error reading cache age: {str(e)}")
+            return None
+        finally:
+            session.close()
+
+    def get_expiry(self, coin_id: str, vs_currency: str, interval: int) -> Optional[datetime]:
+        """Return when the cached OHLCV data stops being served, or None if nothing is cached."""
+        last_updated = self.get_last_updated(coin_id, vs_currency, interval)
+        if last_updated is None:
+            return None
+        return last_updated + timedelta(seconds=self.cache_duration.get(interval, 300))
+
     def update_ohlcv_data(
     self,
     coin_id: str,
@@ -90,12 +128,12 @@ class CacheManager:
     interval: str,
     df: pd.DataFrame
 ):
-        """Update OHLCV data in the cache."""
-        session = self.Session()
+        """Update OHLCV data in the cache; the series is written completely or not at all."""
         try:
             # First, ensure the coin exists
-            coin = session.query(Coin).filter(Coin.id == coin_id).first()
-            if not coin:
+            with self.session_scope() as session:
+                coin_exists = session.query(Coin.id).filter(Coin.id == coin_id).first() is not None
+            if not coin_exists:
                 self.logger.error(f"Coin {coin_id} not found in database")
                 raise ValueError(f"Coin {coin_id} not found in database")
             
@@ -109,56 +147,72 @@ class CacheManager:
             interval_enum = interval_map.get(str(interval))
             if not interval_enum:
                 raise ValueError(f"Invalid interval: {interval}")
-    
-            # Instead of raw SQL, use SQLAlchemy ORM for the upsert operation
-            for timestamp, row in df.iterrows():
+
+            # One multi-row upsert per chunk instead of a lookup per candle
+            now = datetime.utcnow()
+            rows = [{
+                'coin_id': coin_id,
+                'vs_currency': vs_currency,
+                'interval': interval_enum,
+                'timestamp': timestamp.to_pydatetime() if isinstance(timestamp, pd.Timestamp) else timestamp,
+                'open': row.open,
+                'high': row.high,
+                'low': row.low,
+                'close': row.close,
                 # Replace NaN values with None
-                volume = None if pd.isna(row['volume']) else row['volume']
-                market_cap = None if pd.isna(row['market_cap']) else row['market_cap']
-                
-                # Try to find existing record
-                existing = session.query(OHLC).filter(
-                    OHLC.coin_id == coin_id,
-                    OHLC.timestamp == timestamp
-                ).first()
-                
-                if existing:
-                    # Update existing record
-                    existing.vs_currency = vs_currency
-                    existing.interval = interval_enum
-                    existing.open = row['open']
-                    existing.high = row['high']
-                    existing.low = row['low']
-                    existing.close = row['close']
-                    existing.volume = volume
-                    existing.market_cap = market_cap
-                    existing.last_updated = datetime.utcnow()
-                else:
-                    # Create new record
-                    new_record = OHLC(
-                        coin_id=coin_id,
-                        vs_currency=vs_currency,
-                        interval=interval_enum,
-                        timestamp=timestamp,
-                        open=row['open'],
-                        high=row['high'],
-                        low=row['low'],
-                        close=row['close'],
-                        volume=volume,
-                        market_cap=market_cap,
-                        last_updated=datetime.utcnow()
-                    )
-                    session.add(new_record)
+                'volume': None if pd.isna(row.volume) else row.volume,
+                'market_cap': None if pd.isna(row.market_cap) else row.market_cap,
+                'last_updated': now
+            } for timestamp, row in zip(df.index, df.itertuples(index=False))]
+            upsert_in_chunks(self.Session, OHLC, rows, ['coin_id', 'timestamp'], self.batch_size, atomic=True)
             
-            session.commit()
+        except Exception as e:
+            self.logger.error(f"Error updating cache: {str(e)}")
+            raise
             
+    def get_indicator_state(self, coin_id: str, vs_currency: str, interval: int) -> Optional[Tuple[datetime, Dict]]:
+        """Return (last candle timestamp, serialized state) of the streaming indicators, if saved."""
+        session = self.Session()
+        try:
+            row = session.query(IndicatorState).filter(
+                IndicatorState.coin_id == coin_id,
+                IndicatorState.vs_currency == vs_currency,
+                IndicatorState.interval == TimeInterval(interval)
+            ).first()
+            return (row.last_timestamp, row.state) if row else None
+        except Exception as e:
+            self.logger.error(f"Error loading indicator state: {str(e)}")
+            return None
+        finally:
+            session.close()
+
+    def save_indicator_state(
+        self,
+        coin_id: str,
+        vs_currency: str,
+        interval: int,
+        last_timestamp: datetime,
+        state: Dict
+    ):
+        """Store the serialized streaming indicator state for a cached series."""
+        session = self.Session()
+        try:
+            upsert(session, IndicatorState, [{
+                'coin_id': coin_id,
+                'vs_currency': vs_currency,
+                'interval': TimeInterval(interval),
+                'last_timestamp': last_timestamp,
+                'state': state,
+                'last_updated': datetime.utcnow()
+            }], index_elements=['coin_id', 'vs_currency', 'interval'])
+            session.commit()
         except Exception as e:
             session.rollback()
-            self.logger.error(f"Error updating cache: {str(e)}")
+            self.logger.error(f"Error saving indicator state: {str(e)}")
             raise
         finally:
             session.close()
-            
+
     def update_coin_metadata(self, coin_data: Dict):
         """Update coin metadata in the cache."""
         session = self.Session()
@@ -237,35 +291,20 @@ class CacheManager:
 
     def update_coins_list(self, coins: List[Dict]):
         """Update all coins metadata in cache."""
-        session = self.Session()
+        now = datetime.utcnow()
+        rows = [{
+            'id': coin['id'],
+            'symbol': coin.get('symbol'),
+            'name': coin.get('name'),
+            'platforms': coin.get('platforms', {}),
+            'extra_data': coin,
+            'last_updated': now
+        } for coin in coins]
         try:
-            for coin in coins:
-                existing = session.query(Coin).filter_by(id=coin['id']).first()
-                
-                if existing:
-                    existing.symbol = coin.get('symbol')
-                    existing.name = coin.get('name')
-                    existing.platforms = coin.get('platforms', {})
-                    existing.extra_data = coin
-                    existing.last_updated = datetime.utcnow()
-                else:
-                    entry = Coin(
-                        id=coin['id'],
-                        symbol=coin.get('symbol'),
-                        name=coin.get('name'),
-                        platforms=coin.get('platforms', {}),
-                        extra_data=coin,
-                        last_updated=datetime.utcnow()
-                    )
-                    session.add(entry)
-            
-            session.commit()
+            upsert_in_chunks(self.Session, Coin, rows, ['id'], self.batch_size)
         except Exception as e:
-            session.rollback()
             self.logger.error(f"Error updating coins list: {str(e)}")
             raise
-        finally:
-            session.close()
 
     def get_all_coins(self) -> List[Dict]:
         """Get all coins from cache."""
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, create_engine, Column, Integer, String, Float, JSON, DateTime, ForeignKey, UniqueConstraint, Enum
+from sqlalchemy import Boolean, create_engine, Column, Integer, String, Text, Float, JSON, DateTime, ForeignKey, UniqueConstraint, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime
@@ -74,8 +74,18 @@ class OHLC(Base):
     # Relationship
     coin = relationship("Coin", back_populates="ohlc_data")
 
-    # Unique constraint for coin_id and timestamp combination
-    __table_args__ = (UniqueConstraint('coin_id', 'timestamp', name='unique_coin_timestamp'),)
+    __table_args__ = (
+        # Unique constraint for coin_id and timestamp combination
+        UniqueConstraint('coin_id', 'timestamp', name='unique_coin_timestamp'),
+        # Matches the CacheManager lookup (equality on coin/currency/interval, range on timestamp);
+        # on PostgreSQL the price columns are included so the read is an index-only scan
+        Index(
+            'idx_ohlc_coin_currency_interval_timestamp',
+            'coin_id', 'vs_currency', 'interval', 'timestamp',
+            postgresql_include=['open', 'high', 'low', 'close', 'volume', 'market_cap', 'last_updated']
+        ),
+        Index('idx_ohlc_timestamp', 'timestamp'),
+    )
 
     def __repr__(self):
         return f"<OHLC(coin_id={self.coin_id}, timestamp={self.timestamp}, close={self.close})>"
@@ -129,12 +139,162 @@ class UserActivity(Base):
     user_id = Column(String, ForeignKey('users.telegram_id', ondelete='CASCADE'), nullable=False)
     coin_id = Column(String, ForeignKey('coins.id', ondelete='CASCADE'), nullable=False)
     activity_type = Column(String, nullable=False)  # 'search', 'price_check', 'analysis', etc.
-    timestamp = Column(Integer,nullable=False)
+    timestamp = Column(Integer,nullable=False)  # Timeframe of the request in days, not a point in time
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # When the activity happened
     details = Column(JSON)  # For storing any additional activity data
     
     # Relationship
     user = relationship("User", back_populates="activities")
 
+    __table_args__ = (
+        Index('idx_activity_coin_created', 'coin_id', 'created_at'),
+        Index('idx_activity_type_created', 'activity_type', 'created_at'),
+        Index('idx_activity_created', 'created_at'),
+    )
+
+class ActivityRollup(Base):
+    """Hourly activity counters, maintained incrementally as activities are logged."""
+    __tablename__ = 'activity_rollups'
+
+    id = Column(Integer, primary_key=True)
+    dimension = Column(String, nullable=False)  # 'coin' or 'analysis_type'
+    key = Column(String, nullable=False)  # e.g., "bitcoin" or "full"
+    bucket_start = Column(DateTime, nullable=False)  # Start of the hour the events fall in
+    count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('dimension', 'key', 'bucket_start', name='unique_rollup_bucket'),
+        Index('idx_rollup_dimension_bucket', 'dimension', 'bucket_start'),
+    )
+
+    def __repr__(self):
+        return f"<ActivityRollup(dimension={self.dimension}, key={self.key}, bucket_start={self.bucket_start}, count={self.count})>"
+
+class IndicatorState(Base):
+    """Serialized streaming indicator state for a cached OHLCV series (see analysis.streaming)."""
+    __tablename__ = 'indicator_states'
+
+    id = Column(Integer, primary_key=True)
+    coin_id = Column(String, ForeignKey('coins.id', ondelete='CASCADE'), nullable=False)
+    vs_currency = Column(String, nullable=False)
+    interval = Column(Enum(TimeInterval), nullable=False)
+    last_timestamp = Column(DateTime, nullable=False)  # Last candle folded into the state
+    state = Column(JSON, nullable=False)
+    last_updated = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('coin_id', 'vs_currency', 'interval', name='unique_indicator_state'),
+    )
+
+    def __repr__(self):
+        return f"<IndicatorState(coin_id={self.coin_id}, interval={self.interval}, last_timestamp={self.last_timestamp})>"
+
+class IndicatorSnapshot(Base):
+    """Latest indicator readings per coin and timeframe, refreshed in the background for /screen."""
+    __tablename__ = 'indicator_snapshots'
+
+    id = Column(Integer, primary_key=True)
+    # No foreign key: the screener covers the top coins by market cap, synced into coins or not
+    coin_id = Column(String, nullable=False)
+    vs_currency = Column(String, nullable=False)
+    interval = Column(Enum(TimeInterval), nullable=False)
+    symbol = Column(String)
+    rank = Column(Integer)  # Market cap rank
+    market_cap = Column(Float)
+    price = Column(Float)
+    change_24h = Column(Float)  # Percent
+    change = Column(Float)  # Percent change over the timeframe
+    rsi = Column(Float)
+    macd = Column(Float)
+    macd_signal = Column(Float)
+    macd_hist = Column(Float)
+    ma20 = Column(Float)
+    ma50 = Column(Float)
+    ema20 = Column(Float)
+    stoch_k = Column(Float)
+    stoch_d = Column(Float)
+    adx = Column(Float)
+    atr_pct = Column(Float)  # ATR as a percent of the price
+    bb_upper = Column(Float)
+    bb_lower = Column(Float)
+    candle_time = Column(DateTime)  # Last candle the readings are taken from
+    last_updated = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('coin_id', 'vs_currency', 'interval', name='unique_indicator_snapshot'),
+        # Every screen filters on currency and timeframe; these cover the default sort and common filters
+        Index('idx_snapshot_interval_rank', 'vs_currency', 'interval', 'rank'),
+        Index('idx_snapshot_interval_rsi', 'vs_currency', 'interval', 'rsi'),
+        Index('idx_snapshot_interval_change', 'vs_currency', 'interval', 'change_24h'),
+    )
+
+    def __repr__(self):
+        return f"<IndicatorSnapshot(coin_id={self.coin_id}, interval={self.interval}, rsi={self.rsi})>"
+
+class ArticleSentiment(Base):
+    """LLM sentiment of a news article, scored once per GUID and content."""
+    __tablename__ = 'article_sentiments'
+
+    id = Column(Integer, primary_key=True)
+    guid = Column(String, nullable=False)  # Source GUID, or the content hash for articles without one
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of title and body
+    sentiment = Column(String, nullable=False)  # 'positive', 'negative' or 'neutral'
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('guid', 'content_hash', name='unique_article_sentiment'),
+    )
+
+    def __repr__(self):
+        return f"<ArticleSentiment(guid={self.guid}, sentiment={self.sentiment})>"
+
+class NewsArticle(Base):
+    """A CryptoCompare news article, stored once per category it was ingested for."""
+    __tablename__ = 'news_articles'
+
+    id = Column(Integer, primary_key=True)
+    category = Column(String, nullable=False)  # Category polled, e.g. 'BTC'
+    guid = Column(String, nullable=False)  # Source GUID, or the content hash for articles without one
+    article_id = Column(Integer)  # CryptoCompare ID
+    published_on = Column(DateTime, nullable=False)
+    title = Column(String)
+    url = Column(String)
+    image_url = Column(String)
+    body = Column(Text)
+    tags = Column(String)
+    categories = Column(String)  # All categories of the article, '|'-separated
+    language = Column(String)
+    source_name = Column(String)
+    source_url = Column(String)
+    upvotes = Column(Integer)
+    downvotes = Column(Integer)
+    sentiment = Column(String)
+    created_on = Column(DateTime)
+    updated_on = Column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint('category', 'guid', name='unique_category_article'),
+        # Reads take the newest articles of a category; retention deletes by age
+        Index('idx_news_category_published', 'category', 'published_on'),
+        Index('idx_news_published', 'published_on'),
+    )
+
+    def __repr__(self):
+        return f"<NewsArticle(category={self.category}, guid={self.guid}, published_on={self.published_on})>"
+
+class NewsCursor(Base):
+    """Ingestion progress of a news category."""
+    __tablename__ = 'news_cursors'
+
+    category = Column(String, primary_key=True)
+    last_published = Column(DateTime)  # Newest stored article; later polls stop there
+    last_polled = Column(DateTime, nullable=False)  # UTC, of the last successful poll
+    last_read = Column(DateTime)  # UTC, of the last /news or agent read; idle categories stop being polled
+    resume_before = Column(DateTime)  # Oldest article of a poll cut short; the next poll continues below it
+
+    def __repr__(self):
+        return f"<NewsCursor(category={self.category}, last_published={self.last_published})>"
+
 class AdminTypes(enum.Enum):
     MASTER = "master"
     NORMAL = "normal"
@@ -1,25 +1,47 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Union, Tuple
-from sqlalchemy import String, create_engine, and_, desc, func
+from sqlalchemy import String, create_engine, and_, desc, func, insert
 from sqlalchemy.orm import sessionmaker, Session, joinedload
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.orm.exc import DetachedInstanceError
 from contextlib import contextmanager
 import logging
 from typing import List, Dict, Optional, Union, Tuple
-from .database import User, UserType, UserActivity, Admin, AdminActivity, Base, Coin, CoinPrice, OHLC, TrendingCoin
+from .database import User, UserType, UserActivity, ActivityRollup, Admin, AdminActivity, Base, Coin, CoinPrice, OHLC, TrendingCoin, IndicatorSnapshot, ArticleSentiment, NewsArticle, NewsCursor
+from .bulk_ops import upsert, upsert_in_chunks
+from .migrations import maintain_schema, upgrade_schema
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import os
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Time windows accepted by the popularity queries
+ROLLUP_WINDOWS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1)
+}
+
+# Rollup bucket of activities whose event time is unknown; outside every window
+ALL_TIME_BUCKET = datetime(1970, 1, 1)
+
 class DatabaseManager:
-    def __init__(self, database_url: str = None):
-        """Initialize database connection and session maker."""
+    def __init__(self, database_url: str = None, batch_size: int = None):
+        """
+        Initialize database connection and session maker.
+
+        Args:
+            database_url: SQLAlchemy URL (default: built from environment variables)
+            batch_size: Rows per upsert statement and transaction in the bulk_* methods
+                (default: DB_BATCH_SIZE environment variable, or 1000)
+        """
         if database_url is None:
             database_url = self._construct_database_url()
         self.engine = create_engine(database_url)
         Base.metadata.create_all(self.engine)
         self.SessionMaker = sessionmaker(bind=self.engine)
+        self.batch_size = batch_size or int(os.getenv('DB_BATCH_SIZE', 1000))
 
     def _construct_database_url(self) -> str:
         """Construct PostgreSQL database URL from environment variables, prioritizing DATABASE_URL."""
@@ -32,6 +54,12 @@ class DatabaseManager:
     def init_db(self) -> None:
         """Initialize the database and create all tables."""
         Base.metadata.create_all(self.engine)
+        upgrade_schema(self.engine)
+        self._backfill_activity_rollups()
+
+    def maintain_schema(self) -> None:
+        """Create upcoming monthly partitions and apply retention; long-lived processes run this daily."""
+        maintain_schema(self.engine)
 
     @contextmanager
     def session_scope(self) -> Session:
@@ -66,28 +94,23 @@ class DatabaseManager:
             logger.error(f"Error updating coin {coin_data.get('id')}: {str(e)}")
             return None
 
+    def _bulk_upsert(self, model, rows: List[Dict], index_elements: List[str]) -> int:
+        """Upsert rows chunk by chunk; failed chunks are logged and skipped."""
+        now = datetime.utcnow()
+        if 'last_updated' in model.__table__.c:
+            # ON CONFLICT DO UPDATE bypasses column onupdate hooks, so stamp rows explicitly
+            rows = [{'last_updated': now, **row} for row in rows]
+
+        def log_error(error: SQLAlchemyError, chunk: List[Dict]) -> None:
+            logger.error(f"Error upserting {len(chunk)} rows into {model.__tablename__}: {str(error)}")
+
+        return upsert_in_chunks(
+            self.SessionMaker, model, rows, index_elements, self.batch_size, on_error=log_error
+        )
+
     def bulk_update_coins(self, coins_data: List[Dict]) -> int:
         """Bulk update or insert coins."""
-        success_count = 0
-        try:
-            with self.session_scope() as session:
-                for coin_data in coins_data:
-                    try:
-                        coin = session.query(Coin).filter_by(id=coin_data['id']).first()
-                        if coin:
-                            for key, value in coin_data.items():
-                                setattr(coin, key, value)
-                        else:
-                            coin = Coin(**coin_data)
-                            session.add(coin)
-                        success_count += 1
-                    except SQLAlchemyError as e:
-                        logger.error(f"Error processing coin {coin_data.get('id')}: {str(e)}")
-                        continue
-                session.flush()
-        except SQLAlchemyError as e:
-            logger.error(f"Bulk update error: {str(e)}")
-        return success_count
+        return self._bulk_upsert(Coin, coins_data, ['id'])
 
     def update_coin_price(self, price_data: Dict) -> Optional[CoinPrice]:
         """Add or update a coin price entry."""
@@ -110,85 +133,210 @@ class DatabaseManager:
             logger.error(f"Error updating price for coin {price_data.get('coin_id')}: {str(e)}")
             return None
 
+    def bulk_update_coin_prices(self, prices_data: List[Dict]) -> int:
+        """Bulk update or insert coin prices."""
+        return self._bulk_upsert(CoinPrice, prices_data, ['coin_id', 'currency'])
+
     def bulk_update_ohlc(self, ohlc_data_list: List[Dict]) -> int:
         """Bulk update or insert OHLC data."""
-        success_count = 0
-        try:
-            with self.session_scope() as session:
-                for ohlc_data in ohlc_data_list:
-                    try:
-                        ohlc = session.query(OHLC).filter_by(
-                            coin_id=ohlc_data['coin_id'],
-                            timestamp=ohlc_data['timestamp']
-                        ).first()
-                        
-                        if ohlc:
-                            for key, value in ohlc_data.items():
-                                setattr(ohlc, key, value)
-                        else:
-                            ohlc = OHLC(**ohlc_data)
-                            session.add(ohlc)
-                        success_count += 1
-                    except SQLAlchemyError as e:
-                        logger.error(f"Error processing OHLC data: {str(e)}")
-                        continue
-                session.flush()
-        except SQLAlchemyError as e:
-            logger.error(f"Bulk OHLC update error: {str(e)}")
-        return success_count
+        return self._bulk_upsert(OHLC, ohlc_data_list, ['coin_id', 'timestamp'])
 
     def update_trending_coins(self, trending_data: List[Dict]) -> int:
         """Update trending coins list."""
-        success_count = 0
         try:
             with self.session_scope() as session:
-                # Clear existing trending data
+                # Replace the whole list in one transaction
                 session.query(TrendingCoin).delete()
-                
-                # Add new trending data
-                for trend_data in trending_data:
-                    try:
-                        trending = TrendingCoin(**trend_data)
-                        session.add(trending)
-                        success_count += 1
-                    except SQLAlchemyError as e:
-                        logger.error(f"Error processing trending coin: {str(e)}")
-                        continue
-                session.flush()
+                if trending_data:
+                    session.execute(insert(TrendingCoin), trending_data)
+            return len(trending_data)
         except SQLAlchemyError as e:
             logger.error(f"Trending coins update error: {str(e)}")
-        return success_count
+            return 0
 
-    def sync_with_api(self, api_fetcher) -> Tuple[int, int, int, int]:
+    def bulk_update_indicator_snapshots(self, snapshots: List[Dict]) -> int:
+        """Bulk update or insert indicator snapshots, one per coin, currency and timeframe."""
+        return self._bulk_upsert(IndicatorSnapshot, snapshots, ['coin_id', 'vs_currency', 'interval'])
+
+    def delete_indicator_snapshots_except(self, vs_currency: str, coin_ids: List[str]) -> int:
+        """Delete the `vs_currency` snapshots of coins not in `coin_ids`; return the number deleted."""
+        try:
+            with self.session_scope() as session:
+                return session.query(IndicatorSnapshot).filter(
+                    IndicatorSnapshot.vs_currency == vs_currency,
+                    IndicatorSnapshot.coin_id.notin_(coin_ids)
+                ).delete(synchronize_session=False)
+        except SQLAlchemyError as e:
+            logger.error(f"Error pruning indicator snapshots: {str(e)}")
+            return 0
+
+    def query_indicator_snapshots(self, conditions: List, order_by: List, limit: int) -> List[Dict]:
         """
-        Sync database with latest data from API.
-        Returns tuple of (coins_updated, prices_updated, ohlc_updated, trending_updated)
+        Indicator snapshots matching every SQL expression in `conditions`.
+
+        Args:
+            conditions: Filter expressions on IndicatorSnapshot columns
+            order_by: Ordering expressions, applied in order
+            limit: Maximum number of rows to return
         """
         try:
-            # Update coins
-            coins_data = api_fetcher.fetch_coins()
-            coins_updated = self.bulk_update_coins(coins_data)
+            with self.session_scope() as session:
+                snapshots = session.query(IndicatorSnapshot).filter(
+                    *conditions
+                ).order_by(*order_by).limit(limit).all()
+                return self._clone_object_list(snapshots)
+        except SQLAlchemyError as e:
+            logger.error(f"Error querying indicator snapshots: {str(e)}")
+            return []
+
+    def get_article_sentiments(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """
+        Stored sentiments of news articles.
 
-            # Update prices
-            prices_data = api_fetcher.fetch_prices()
-            prices_updated = 0
-            for price_data in prices_data:
-                if self.update_coin_price(price_data):
-                    prices_updated += 1
+        Args:
+            keys: (guid, content_hash) pairs
+
+        Returns:
+            {(guid, content_hash): sentiment} for the pairs that are stored
+        """
+        if not keys:
+            return {}
+        try:
+            with self.session_scope() as session:
+                rows = session.query(
+                    ArticleSentiment.guid, ArticleSentiment.content_hash, ArticleSentiment.sentiment
+                ).filter(ArticleSentiment.guid.in_({guid for guid, _ in keys})).all()
+                wanted = set(keys)
+                return {
+                    (guid, content_hash): sentiment
+                    for guid, content_hash, sentiment in rows
+                    if (guid, content_hash) in wanted
+                }
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching article sentiments: {str(e)}")
+            return {}
 
-            # Update OHLC
-            ohlc_data = api_fetcher.fetch_ohlc()
-            ohlc_updated = self.bulk_update_ohlc(ohlc_data)
+    def bulk_update_article_sentiments(self, sentiments: List[Dict]) -> int:
+        """Bulk update or insert article sentiments, one per GUID and content hash."""
+        return self._bulk_upsert(ArticleSentiment, sentiments, ['guid', 'content_hash'])
 
-            # Update trending
-            trending_data = api_fetcher.fetch_trending()
-            trending_updated = self.update_trending_coins(trending_data)
+    def bulk_update_news_articles(self, articles: List[Dict]) -> int:
+        """Bulk update or insert news articles, one per category and GUID."""
+        return self._bulk_upsert(NewsArticle, articles, ['category', 'guid'])
 
-            return coins_updated, prices_updated, ohlc_updated, trending_updated
+    def get_news_articles(self, category: str, limit: int = 10) -> List[Dict]:
+        """Newest stored articles of a news category."""
+        try:
+            with self.session_scope() as session:
+                articles = session.query(NewsArticle).filter(
+                    NewsArticle.category == category
+                ).order_by(desc(NewsArticle.published_on)).limit(limit).all()
+                return self._clone_object_list(articles)
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching news articles for {category}: {str(e)}")
+            return []
 
-        except Exception as e:
-            logger.error(f"API sync error: {str(e)}")
-            return 0, 0, 0, 0
+    def get_news_guids(self, category: str, guids: List[str]) -> set:
+        """Those of `guids` already stored for a news category."""
+        if not guids:
+            return set()
+        try:
+            with self.session_scope() as session:
+                rows = session.query(NewsArticle.guid).filter(
+                    NewsArticle.category == category,
+                    NewsArticle.guid.in_(set(guids))
+                ).all()
+                return {guid for guid, in rows}
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching news GUIDs for {category}: {str(e)}")
+            return set()
+
+    def delete_news_before(self, cutoff: datetime) -> int:
+        """Delete articles published before `cutoff`; return the number deleted."""
+        try:
+            with self.session_scope() as session:
+                return session.query(NewsArticle).filter(
+                    NewsArticle.published_on < cutoff
+                ).delete(synchronize_session=False)
+        except SQLAlchemyError as e:
+            logger.error(f"Error deleting old news articles: {str(e)}")
+            return 0
+
+    def get_news_cursors(self) -> Dict[str, Dict]:
+        """Ingestion cursors of all news categories, by category."""
+        try:
+            with self.session_scope() as session:
+                return {cursor.category: self._clone_object(cursor) for cursor in session.query(NewsCursor).all()}
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching news cursors: {str(e)}")
+            return {}
+
+    def get_news_cursor(self, category: str) -> Optional[Dict]:
+        """Ingestion cursor of a news category, or None if it was never polled."""
+        try:
+            with self.session_scope() as session:
+                return self._clone_object(session.query(NewsCursor).filter_by(category=category).first())
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching news cursor for {category}: {str(e)}")
+            return None
+
+    def update_news_cursor(
+        self,
+        category: str,
+        last_published: Optional[datetime],
+        last_polled: datetime,
+        resume_before: Optional[datetime] = None
+    ) -> int:
+        """Store the ingestion cursor of a news category."""
+        return self._bulk_upsert(NewsCursor, [{
+            'category': category, 'last_published': last_published, 'last_polled': last_polled,
+            'resume_before': resume_before
+        }], ['category'])
+
+    def mark_news_read(self, category: str, read_at: datetime) -> int:
+        """Record a read of a news category; categories without a cursor are left untracked."""
+        try:
+            with self.session_scope() as session:
+                return session.query(NewsCursor).filter_by(category=category).update(
+                    {'last_read': read_at}, synchronize_session=False
+                )
+        except SQLAlchemyError as e:
+            logger.error(f"Error recording news read for {category}: {str(e)}")
+            return 0
+
+    def sync_with_api(self, api_fetcher) -> Tuple[int, int, int, int]:
+        """
+        Sync database with latest data from API.
+
+        The four datasets are fetched concurrently and written once all
+        requests have finished, coins first since the other tables reference
+        them. A failed fetch only skips its own dataset.
+        Returns tuple of (coins_updated, prices_updated, ohlc_updated, trending_updated)
+        """
+        fetchers = {
+            'coins': api_fetcher.fetch_coins,
+            'prices': api_fetcher.fetch_prices,
+            'ohlc': api_fetcher.fetch_ohlc,
+            'trending': api_fetcher.fetch_trending
+        }
+        with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+            futures = {name: executor.submit(fetch) for name, fetch in fetchers.items()}
+
+        data = {}
+        for name, future in futures.items():
+            try:
+                data[name] = future.result()
+            except Exception as e:
+                logger.error(f"API sync error fetching {name}: {str(e)}")
+                data[name] = None
+
+        coins_updated = self.bulk_update_coins(data['coins']) if data['coins'] else 0
+        prices_updated = self.bulk_update_coin_prices(data['prices']) if data['prices'] else 0
+        ohlc_updated = self.bulk_update_ohlc(data['ohlc']) if data['ohlc'] else 0
+        # An empty trending list is not written, so a failed fetch keeps the previous one
+        trending_updated = self.update_trending_coins(data['trending']) if data['trending'] else 0
+
+        return coins_updated, prices_updated, ohlc_updated, trending_updated
 
     def _clone_object(self, obj):
         """Create a dictionary of object attributes, excluding SQLAlchemy internal attributes."""
@@ -415,11 +563,103 @@ class DatabaseManager:
                 activity = UserActivity(**activity_data)
                 session.add(activity)
                 session.flush()
+                bucket_start = activity.created_at.replace(minute=0, second=0, microsecond=0)
+                self._increment_rollups(session, Counter({
+                    ('coin', activity.coin_id, bucket_start): 1,
+                    ('analysis_type', activity.activity_type, bucket_start): 1
+                }))
                 return self._clone_object(activity)
         except SQLAlchemyError as e:
             logger.error(f"Error logging activity for user {activity_data.get('user_id')}: {str(e)}")
             return None
 
+    def bulk_log_user_activities(self, activities: List[Dict]) -> int:
+        """
+        Insert a batch of user activities with a single multi-row INSERT.
+
+        The hourly popularity rollups are updated in the same transaction.
+        Rows that violate a constraint (unknown user or coin) are isolated and
+        skipped so they cannot block the rest of the batch. Connection errors
+        are re-raised so the caller can retry the batch later.
+        """
+        if not activities:
+            return 0
+        rows = [{**activity, 'user_id': str(activity.get('user_id'))} for activity in activities]
+        try:
+            with self.session_scope() as session:
+                self._insert_activities(session, rows)
+            return len(rows)
+        except IntegrityError:
+            inserted = 0
+            for row in rows:
+                try:
+                    with self.session_scope() as session:
+                        self._insert_activities(session, [row])
+                    inserted += 1
+                except IntegrityError as e:
+                    logger.error(f"Skipping activity for user {row.get('user_id')}: {str(e)}")
+            return inserted
+
+    def _insert_activities(self, session: Session, rows: List[Dict]) -> None:
+        """Insert activity rows and add them to the hourly rollup counters."""
+        now = datetime.utcnow()
+        rows = [{**row, 'created_at': row.get('created_at') or now} for row in rows]
+        session.execute(insert(UserActivity), rows)
+
+        counts = Counter()
+        for row in rows:
+            bucket_start = row['created_at'].replace(minute=0, second=0, microsecond=0)
+            counts[('coin', row['coin_id'], bucket_start)] += 1
+            counts[('analysis_type', row['activity_type'], bucket_start)] += 1
+        self._increment_rollups(session, counts)
+
+    def _increment_rollups(self, session: Session, counts: Counter) -> None:
+        """Add `counts` keyed by (dimension, key, bucket_start) to the hourly rollup table."""
+        upsert(
+            session,
+            ActivityRollup,
+            [
+                {'dimension': dimension, 'key': key, 'bucket_start': bucket_start, 'count': count}
+                for (dimension, key, bucket_start), count in counts.items()
+            ],
+            index_elements=['dimension', 'key', 'bucket_start'],
+            increment_columns=['count']
+        )
+
+    def _backfill_activity_rollups(self) -> None:
+        """Seed the rollup table from existing activities the first time it is created, as all-time totals."""
+        try:
+            with self.session_scope() as session:
+                if session.query(ActivityRollup.id).first() is not None:
+                    return
+                if session.query(UserActivity.id).first() is None:
+                    return
+
+                # Activities logged before the event-time column existed carry the
+                # upgrade time, not their own. They only count toward all-time totals.
+                bucket_start = ALL_TIME_BUCKET
+                counts = Counter()
+                for column, dimension in ((UserActivity.coin_id, 'coin'), (UserActivity.activity_type, 'analysis_type')):
+                    for key, count in session.query(column, func.count(UserActivity.id)).group_by(column):
+                        counts[(dimension, key, bucket_start)] += count
+                self._increment_rollups(session, counts)
+        except SQLAlchemyError as e:
+            logger.error(f"Error backfilling activity rollups: {str(e)}")
+
+    def _get_top_rollup_keys(self, dimension: str, limit: int, window: Optional[str]) -> List[Tuple[str, int]]:
+        """Sum rollup buckets for one dimension and return the `limit` largest keys."""
+        with self.session_scope() as session:
+            total = func.sum(ActivityRollup.count).label('total')
+            query = session.query(ActivityRollup.key, total).filter(ActivityRollup.dimension == dimension)
+            if window is not None:
+                if window not in ROLLUP_WINDOWS:
+                    raise ValueError(f"Invalid window: {window}")
+                since = datetime.utcnow() - ROLLUP_WINDOWS[window]
+                # Buckets are hourly, so include the bucket the window starts in
+                query = query.filter(ActivityRollup.bucket_start >= since.replace(minute=0, second=0, microsecond=0))
+            rows = query.group_by(ActivityRollup.key).order_by(desc('total')).limit(limit).all()
+            return [(row.key, int(row.total)) for row in rows]
+
     def create_admin(self, admin_data: Dict) -> Optional[Dict]:
         """
         Create a new admin with specified role.
@@ -510,82 +750,49 @@ class DatabaseManager:
             logger.error(f"Error fetching admin for user {user_id}: {str(e)}")
             return None
 
-    def get_most_popular_coins(self, limit: int = 10) -> List[Dict]:
+    def get_most_popular_coins(self, limit: int = 10, window: Optional[str] = None) -> List[Dict]:
         """
         Retrieve the most popular searches across all users.
+
+        Served from the hourly rollup table, so the cost does not grow with
+        the number of logged activities.
         
         Args:
             limit: Maximum number of results to return (default: 10)
+            window: Optional time window: 'hour', 'day' or 'week' (default: all time)
             
         Returns:
             List of dictionaries containing search term and count
-            Example: [{'search_term': 'BTC', 'count': 150}, ...]
+            Example: [{'coin': 'bitcoin', 'count': 150}, ...]
         """
         try:
-            with self.session_scope() as session:
-                popular_coins = (
-                    session.query(
-                        UserActivity.coin_id,
-                        func.count(UserActivity.coin_id).label('search_count')
-                    )
-                    .group_by(UserActivity.coin_id)
-                    .order_by(desc('search_count'))
-                    .limit(limit)
-                    .all()
-                )
-                
-                # Convert to list of dictionaries
-                return [
-                    {
-                        'coin': search.coin_id,
-                        'count': search.search_count
-                    }
-                    for search in popular_coins
-                ]
+            return [
+                {'coin': coin_id, 'count': count}
+                for coin_id, count in self._get_top_rollup_keys('coin', limit, window)
+            ]
         except SQLAlchemyError as e:
             logger.error(f"Error fetching popular searches: {str(e)}")
             return []
         
-    def get_most_popular_analysis_types(self, limit: int = 10) -> List[Dict]:
+    def get_most_popular_analysis_types(self, limit: int = 10, window: Optional[str] = None) -> List[Dict]:
         """
         Retrieve the most frequently performed analysis types across all users.
-        Each unique combination of activity type and timestamp is counted as a separate analysis.
+
+        Served from the hourly rollup table; every logged activity counts once.
         
         Args:
             limit: Maximum number of results to return (default: 10)
+            window: Optional time window: 'hour', 'day' or 'week' (default: all time)
             
         Returns:
             List of dictionaries containing analysis type and its frequency
-            Example: [{'analysis_type': 'quick_analysis', 'count': 120}, ...]
+            Example: [{'analysis_type': 'full', 'count': 120}, ...]
         """
         try:
-            with self.session_scope() as session:
-                popular_analyses = (
-                    session.query(
-                        UserActivity.activity_type,
-                        func.count(
-                            func.distinct(
-                                func.concat(
-                                    UserActivity.activity_type,
-                                    func.cast(UserActivity.timestamp, String)
-                                )
-                            )
-                        ).label('activity_count')
-                    )
-                    .group_by(UserActivity.activity_type)
-                    .order_by(desc('activity_count'))
-                    .limit(limit)
-                    .all()
-                )
-                
-                # Convert to list of dictionaries with meaningful names
-                return [
-                    {
-                        'analysis_type': activity.activity_type,
-                        'count': activity.activity_count,
-                    }
-                    for activity in popular_analyses
-                ]
+            return [
+                {'analysis_type': activity_type, 'count': count}
+                for activity_type, count in self._get_top_rollup_keys('analysis_type', limit, window)
+            ]
         except SQLAlchemyError as e:
             logger.error(f"Error fetching popular analysis types: {str(e)}")
             return []
@@ -0,0 +1,273 @@
+"""
+Schema upgrade path for databases created before the current models.
+
+`Base.metadata.create_all` only creates missing tables, so columns and
+indexes added to existing tables are applied here. Monthly range
+partitioning and retention for the two unbounded tables (`ohlc` and
+`user_activities`) are opt-in and PostgreSQL only; on other databases the
+retention policy falls back to a plain DELETE.
+
+Partitions are created a few months ahead, and `maintain_schema` must run
+periodically (the bot runs it daily) so a long-lived process never writes
+past them. Rows that did land in the default partition are moved into
+their month's partition when it is created. On PostgreSQL, indexes
+missing from existing tables are built CONCURRENTLY so writes continue.
+
+Configuration (environment variables):
+    DB_PARTITIONING: "1" to convert the tables to monthly partitions
+    OHLC_RETENTION_MONTHS: Months of OHLC data to keep (unset: keep everything)
+    ACTIVITY_RETENTION_MONTHS: Months of user activities to keep (unset: keep everything)
+"""
+from datetime import datetime
+from typing import List, Optional
+import logging
+import os
+import re
+
+from sqlalchemy import ForeignKeyConstraint, UniqueConstraint, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from .database import Base, OHLC, UserActivity
+
+logger = logging.getLogger(__name__)
+
+# Tables that grow without bound, with the column they are partitioned on
+PARTITIONED_TABLES = {
+    OHLC.__tablename__: 'timestamp',
+    UserActivity.__tablename__: 'created_at',
+}
+
+# Columns added after the first release: table -> {column: (DDL type, value for existing rows)}
+ADDED_COLUMNS = {
+    UserActivity.__tablename__: {
+        'created_at': ('TIMESTAMP', 'CURRENT_TIMESTAMP'),
+    },
+}
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Add missing columns and indexes, then run partitioning and retention."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table_name, columns in ADDED_COLUMNS.items():
+            if table_name not in existing_tables:
+                continue
+            existing_columns = {col['name'] for col in inspector.get_columns(table_name)}
+            for column_name, (ddl, backfill) in columns.items():
+                if column_name not in existing_columns:
+                    logger.info(f"Adding column {table_name}.{column_name}")
+                    conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl}'))
+                    conn.execute(text(f'UPDATE {table_name} SET {column_name} = {backfill}'))
+
+    create_missing_indexes(engine)
+
+    if engine.dialect.name == 'postgresql' and os.getenv('DB_PARTITIONING') == '1':
+        for table_name, column in PARTITIONED_TABLES.items():
+            if not _is_partitioned(engine, table_name):
+                partition_by_month(engine, table_name, column)
+
+    maintain_schema(engine)
+
+
+def maintain_schema(engine: Engine) -> None:
+    """Create upcoming monthly partitions and apply retention; run at startup and then daily."""
+    if engine.dialect.name == 'postgresql':
+        for table_name in PARTITIONED_TABLES:
+            if _is_partitioned(engine, table_name):
+                ensure_monthly_partitions(engine, table_name)
+
+    apply_retention(engine, OHLC.__tablename__, _retention_months('OHLC_RETENTION_MONTHS'))
+    apply_retention(engine, UserActivity.__tablename__, _retention_months('ACTIVITY_RETENTION_MONTHS'))
+
+
+def create_missing_indexes(engine: Engine) -> None:
+    """
+    Create the model indexes missing from existing tables.
+
+    On PostgreSQL they are built CONCURRENTLY, outside a transaction, so
+    a large live table stays writable. Partitioned tables do not support
+    that and get a plain CREATE INDEX.
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            logger.info(f"Creating index {index.name}")
+            if engine.dialect.name == 'postgresql' and not _is_partitioned(engine, table.name):
+                ddl = str(CreateIndex(index).compile(dialect=engine.dialect))
+                ddl = re.sub(r'^CREATE (UNIQUE )?INDEX', r'CREATE \1INDEX CONCURRENTLY', ddl)
+                with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                    conn.execute(text(ddl))
+            else:
+                index.create(engine, checkfirst=True)
+
+
+def _retention_months(env_var: str) -> Optional[int]:
+    value = os.getenv(env_var)
+    return int(value) if value else None
+
+
+def _month_start(moment: datetime, offset: int = 0) -> datetime:
+    """First instant of the month `offset` months after `moment`."""
+    month_index = moment.year * 12 + (moment.month - 1) + offset
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _partition_name(table_name: str, month_start: datetime) -> str:
+    return f"{table_name}_y{month_start.year}m{month_start.month:02d}"
+
+
+def _is_partitioned(engine: Engine, table_name: str) -> bool:
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :name"),
+            {'name': table_name}
+        ).first() is not None
+
+
+def _list_partitions(engine: Engine, table_name: str) -> List[str]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :name"
+            ),
+            {'name': table_name}
+        )
+        return [row[0] for row in rows]
+
+
+def partition_by_month(engine: Engine, table_name: str, column: str) -> None:
+    """
+    Rebuild `table_name` as a table range-partitioned by month on `column`.
+
+    Existing rows are copied into monthly partitions and the original
+    table is dropped in the same transaction. The primary key becomes
+    (id, column) because PostgreSQL requires the partition key in every
+    unique constraint. Run this during a maintenance window: the table is
+    locked for the duration of the copy.
+    """
+    table = Base.metadata.tables[table_name]
+    new_name = f"{table_name}_partitioned"
+    sequence = f"{table_name}_id_seq"
+
+    with engine.begin() as conn:
+        bounds = conn.execute(text(f'SELECT min("{column}"), max("{column}") FROM {table_name}')).first()
+        first = _month_start(bounds[0] or datetime.utcnow())
+        last = _month_start(bounds[1] or datetime.utcnow(), 1)
+
+        conn.execute(text(
+            f'CREATE TABLE {new_name} (LIKE {table_name} INCLUDING DEFAULTS) PARTITION BY RANGE ("{column}")'
+        ))
+        # Partitions get their final names now; only the parent is renamed below
+        conn.execute(text(f'CREATE TABLE {table_name}_default PARTITION OF {new_name} DEFAULT'))
+        month = first
+        while month <= last:
+            _create_partition(conn, new_name, month, partition_prefix=table_name)
+            month = _month_start(month, 1)
+
+        conn.execute(text(f'INSERT INTO {new_name} SELECT * FROM {table_name}'))
+        conn.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY NONE'))
+        conn.execute(text(f'DROP TABLE {table_name}'))
+        conn.execute(text(f'ALTER TABLE {new_name} RENAME TO {table_name}'))
+        conn.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY {table_name}.id'))
+        conn.execute(text(f'ALTER TABLE {table_name} ADD PRIMARY KEY (id, "{column}")'))
+
+        for constraint in table.constraints:
+            columns = [col.name for col in constraint.columns]
+            if isinstance(constraint, UniqueConstraint):
+                conn.execute(text(
+                    f'ALTER TABLE {table_name} ADD CONSTRAINT {constraint.name} '
+                    f'UNIQUE ({", ".join(columns)})'
+                ))
+            elif isinstance(constraint, ForeignKeyConstraint):
+                target = constraint.elements[0].column.table.name
+                target_columns = [element.column.name for element in constraint.elements]
+                on_delete = f' ON DELETE {constraint.ondelete}' if constraint.ondelete else ''
+                conn.execute(text(
+                    f'ALTER TABLE {table_name} ADD FOREIGN KEY ({", ".join(columns)}) '
+                    f'REFERENCES {target} ({", ".join(target_columns)}){on_delete}'
+                ))
+
+    for index in table.indexes:
+        index.create(engine, checkfirst=True)
+    logger.info(f"Converted {table_name} to monthly partitions on {column}")
+
+
+def _create_partition(conn, table_name: str, month_start: datetime, partition_prefix: Optional[str] = None) -> None:
+    """
+    Create the partition of `table_name` for one month, if missing.
+
+    A month without a partition is written to the default partition, and
+    PostgreSQL refuses to add a partition whose range the default already
+    holds rows of. Those rows are moved into the new partition: the default
+    is detached, the rows are copied and deleted, and it is attached again.
+    """
+    prefix = partition_prefix or table_name
+    name = _partition_name(prefix, month_start)
+    if conn.execute(text('SELECT to_regclass(:name)'), {'name': name}).scalar() is not None:
+        return
+
+    column = PARTITIONED_TABLES[prefix]
+    default = f'{prefix}_default'
+    month_end = _month_start(month_start, 1)
+    bounds = f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{month_end.isoformat()}')"
+    in_month = f"""WHERE "{column}" >= '{month_start.isoformat()}' AND "{column}" < '{month_end.isoformat()}'"""
+    stranded = conn.execute(text(f'SELECT 1 FROM {default} {in_month} LIMIT 1')).first() is not None
+
+    if not stranded:
+        conn.execute(text(f'CREATE TABLE {name} PARTITION OF {table_name} {bounds}'))
+        return
+    logger.info(f"Moving {month_start:%Y-%m} rows of {table_name} out of the default partition")
+    conn.execute(text(f'ALTER TABLE {table_name} DETACH PARTITION {default}'))
+    conn.execute(text(f'CREATE TABLE {name} PARTITION OF {table_name} {bounds}'))
+    conn.execute(text(f'INSERT INTO {name} SELECT * FROM {default} {in_month}'))
+    conn.execute(text(f'DELETE FROM {default} {in_month}'))
+    conn.execute(text(f'ALTER TABLE {table_name} ATTACH PARTITION {default} DEFAULT'))
+
+
+def ensure_monthly_partitions(engine: Engine, table_name: str, months_ahead: int = 3) -> None:
+    """Create the partitions for the current month and the next `months_ahead` months."""
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for offset in range(months_ahead + 1):
+            _create_partition(conn, table_name, _month_start(now, offset))
+
+
+def apply_retention(engine: Engine, table_name: str, retention_months: Optional[int]) -> None:
+    """
+    Drop data older than `retention_months` whole months.
+
+    Partitioned tables lose whole partitions, which is instant; other tables
+    fall back to a DELETE on the partition column.
+    """
+    if not retention_months or table_name not in inspect(engine).get_table_names():
+        return
+    column = PARTITIONED_TABLES[table_name]
+    cutoff = _month_start(datetime.utcnow(), -retention_months)
+
+    if engine.dialect.name == 'postgresql' and _is_partitioned(engine, table_name):
+        with engine.begin() as conn:
+            for partition in _list_partitions(engine, table_name):
+                suffix = partition[len(table_name) + 1:]
+                if not (len(suffix) == 8 and suffix[0] == 'y' and suffix[5] == 'm'):
+                    continue  # The default partition
+                month_start = datetime(int(suffix[1:5]), int(suffix[6:8]), 1)
+                if month_start < cutoff:
+                    logger.info(f"Dropping expired partition {partition}")
+                    conn.execute(text(f'DROP TABLE {partition}'))
+        return
+
+    with engine.begin() as conn:
+        result = conn.execute(text(f'DELETE FROM {table_name} WHERE "{column}" < :cutoff'), {'cutoff': cutoff})
+        if result.rowcount:
+            logger.info(f"Deleted {result.rowcount} rows older than {cutoff:%Y-%m} from {table_name}")
@@ -0,0 +1,302 @@
+"""
+Incremental news ingestion into a local article store.
+
+`/news` and the agent's news tool read the newest articles of a category
+from `news_articles`, one indexed query on (category, published_on),
+instead of calling CryptoCompare for each request.
+
+The store is filled in the background. Each tracked category is polled
+once every NEWS_POLL_SECONDS. A poll fetches the newest page of articles,
+then older pages (through `to_ts`) until it reaches the category's cursor,
+the publication time of its newest stored article. Articles whose GUID is
+already stored are dropped before sentiment scoring, so every article is
+scored once.
+
+A cursor only moves once a poll has reached it. A poll cut short by the
+budget or NEWS_MAX_PAGES stores what it fetched but keeps the cursor and
+records where it stopped; the next polls continue from there down to the
+cursor before paging from the newest articles again. A failed poll
+changes nothing, and the category stays due.
+
+Tracked categories are NEWS_CATEGORIES plus every category with a cursor
+read within NEWS_TRACK_DAYS. A read of an untracked category polls it on
+the spot; a cursor is only created when that poll finds articles, so
+typos are never tracked. From then on the loop keeps it fresh until
+nobody reads it. A category the loop has not polled for two intervals
+(the loop is disabled or failing) is also polled on read. API usage
+shares the prewarmer's rate-limited budget type.
+
+Configuration (environment variables):
+    NEWS_INGEST_ENABLED: "0" to disable background polling (default: enabled)
+    NEWS_CATEGORIES: Comma-separated categories always polled (default: BTC,ETH)
+    NEWS_POLL_SECONDS: Seconds between polls of a category (default: 300)
+    NEWS_PAGE_SIZE: Articles requested per API call (default: 50)
+    NEWS_MAX_PAGES: API calls per poll at most (default: 5)
+    NEWS_RETENTION_DAYS: Days stored articles are kept (default: 30)
+    NEWS_TRACK_DAYS: Days a category read on demand keeps being polled (default: 7)
+    NEWS_CALLS_PER_MINUTE: API calls per minute ingestion may use (default: 10)
+    NEWS_DAILY_CALLS: API calls per UTC day ingestion may use (default: 5000)
+"""
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .database_manager import DatabaseManager
+from .prewarm import ApiBudget
+
+logger = logging.getLogger(__name__)
+
+# Fetcher columns -> NewsArticle columns, where they differ
+COLUMN_NAMES = {'id': 'article_id'}
+
+
+class NewsIngestor:
+    """
+    Serve news from the article store and keep it filled.
+
+    `latest()` reads the database, polling only categories the loop does
+    not cover. Run the polling loop as a standalone asyncio task with
+    `start()`; API calls, sentiment scoring and database writes run in
+    worker threads.
+    """
+
+    def __init__(
+        self,
+        news_fetcher,
+        db_manager: Optional[DatabaseManager] = None,
+        categories: Optional[List[str]] = None,
+        poll_seconds: int = None,
+        page_size: int = None,
+        max_pages: int = None,
+        retention_days: int = None,
+        track_days: int = None,
+        calls_per_minute: int = None,
+        daily_calls: int = None,
+        lang: str = 'EN'
+    ):
+        """
+        Args:
+            news_fetcher: CryptoNewsFetcher used for polls and sentiment scoring
+            db_manager: Article store (default: a new manager)
+        """
+        self.news_fetcher = news_fetcher
+        self.db_manager = db_manager or DatabaseManager()
+        self.categories = categories or [
+            category.strip().upper() for category in os.getenv('NEWS_CATEGORIES', 'BTC,ETH').split(',')
+            if category.strip()
+        ]
+        self.poll_interval = timedelta(seconds=poll_seconds or int(os.getenv('NEWS_POLL_SECONDS', 300)))
+        self.page_size = page_size or int(os.getenv('NEWS_PAGE_SIZE', 50))
+        self.max_pages = max_pages or int(os.getenv('NEWS_MAX_PAGES', 5))
+        self.retention = timedelta(days=retention_days or int(os.getenv('NEWS_RETENTION_DAYS', 30)))
+        self.track_window = timedelta(days=track_days or int(os.getenv('NEWS_TRACK_DAYS', 7)))
+        self.budget = ApiBudget(
+            calls_per_minute or int(os.getenv('NEWS_CALLS_PER_MINUTE', 10)),
+            daily_calls or int(os.getenv('NEWS_DAILY_CALLS', 5000))
+        )
+        self.lang = lang
+        # One poll per category at a time, whether from the loop or a read
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def latest(self, category: str, limit: int = 10) -> pd.DataFrame:
+        """Newest stored articles of `category`, polling it first if the loop does not keep it fresh."""
+        category = category.upper()
+        self.poll(category, max_age=2 * self.poll_interval)
+        self.db_manager.mark_news_read(category, datetime.utcnow())
+        return pd.DataFrame(self.db_manager.get_news_articles(category, limit))
+
+    def poll(self, category: str, max_age: Optional[timedelta] = None) -> int:
+        """
+        Ingest `category` unless it was polled within `max_age`; return the number of new articles.
+
+        Concurrent polls of the same category wait for each other, so the
+        later one finds the category fresh and returns at once.
+        """
+        with self._locks_guard:
+            lock = self._locks.setdefault(category, threading.Lock())
+        with lock:
+            cursor = self.db_manager.get_news_cursor(category)
+            max_age = max_age if max_age is not None else self.poll_interval
+            if cursor is not None and datetime.utcnow() - cursor['last_polled'] < max_age:
+                return 0
+            if cursor is None:
+                return self.ingest(category)
+            return self.ingest(category, cursor['last_published'], cursor['resume_before'])
+
+    def fetch_since(
+        self,
+        category: str,
+        since: Optional[datetime],
+        before: Optional[datetime] = None
+    ) -> Tuple[Optional[pd.DataFrame], bool]:
+        """
+        Articles of `category` published at or after `since` (and up to `before`), newest pages first.
+
+        A category without a cursor gets one page. Returns (articles,
+        complete): complete is False when the budget, NEWS_MAX_PAGES or a
+        failed call stopped paging before `since` was reached. Articles
+        are None when no call succeeded.
+        """
+        pages = []
+        complete = False
+        # Publication times are naive local times (see CryptoNewsFetcher)
+        to_ts = int(before.timestamp()) if before is not None else None
+        for _ in range(self.max_pages if since is not None else 1):
+            if not self.budget.try_acquire():
+                logger.info(f"News API budget used up, deferring the rest of the {category} poll")
+                break
+            page, success = self.news_fetcher.get_news_by_coin(
+                categories=category, limit=self.page_size, lang=self.lang, to_ts=to_ts, score=False
+            )
+            if not success:
+                break
+            pages.append(page)
+            oldest = None if page.empty else page['published_on'].min()
+            if (page.empty or len(page) < self.page_size or pd.isna(oldest)
+                    or since is None or oldest <= since):
+                complete = True
+                break
+            to_ts = int(oldest.to_pydatetime().timestamp())
+        if not pages:
+            return None, False
+
+        articles = pd.concat([page for page in pages if not page.empty] or [pd.DataFrame()], ignore_index=True)
+        if articles.empty:
+            return articles, complete
+        articles = articles[articles['published_on'].notna()]
+        if since is not None:
+            articles = articles[articles['published_on'] >= since]
+        # Consecutive pages overlap on their boundary timestamp
+        return articles.drop_duplicates('guid'), complete
+
+    def ingest(self, category: str, since: Optional[datetime] = None, resume_before: Optional[datetime] = None) -> int:
+        """
+        Fetch, score and store the articles of `category` newer than `since`; return the number stored.
+
+        With `resume_before`, only the gap between `since` and that time
+        is fetched. The cursor is written after a successful poll only,
+        and created only when the poll found articles (or the category is
+        configured). It advances only once the poll has reached `since`;
+        otherwise the oldest article fetched becomes the resume point.
+        """
+        polled_at = datetime.utcnow()
+        articles, complete = self.fetch_since(category, since, resume_before)
+        if articles is None:
+            return 0
+        if since is None and articles.empty and category not in self.categories:
+            # Nothing to track: most likely a typo or an unknown coin
+            return 0
+
+        cursor, resume = since, None
+        if complete:
+            newest = [since]
+            if not articles.empty:
+                newest.append(articles['published_on'].max().to_pydatetime())
+            if resume_before is not None:
+                # The gap is closed; the poll that opened it stored the newer articles
+                stored_newest = self.db_manager.get_news_articles(category, 1)
+                newest.extend(article['published_on'] for article in stored_newest)
+            cursor = max(filter(None, newest), default=None)
+        elif not articles.empty:
+            resume = articles['published_on'].min().to_pydatetime()
+
+        if not articles.empty:
+            known = self.db_manager.get_news_guids(category, articles['guid'].tolist())
+            articles = articles[~articles['guid'].isin(known)].reset_index(drop=True)
+        if not articles.empty and getattr(self.news_fetcher, 'sentiment_analyzer', None):
+            articles['sentiment'] = self.news_fetcher.score_sentiments(articles)
+
+        stored = 0
+        if not articles.empty:
+            # Object columns so missing values are stored as NULL and numbers as Python types
+            articles = articles.rename(columns=COLUMN_NAMES).astype(object)
+            rows = articles.where(articles.notna(), None).to_dict('records')
+            stored = self.db_manager.bulk_update_news_articles([{'category': category, **row} for row in rows])
+        self.db_manager.update_news_cursor(category, cursor, polled_at, resume)
+        return stored
+
+    def tracked_categories(self, now: Optional[datetime] = None) -> Dict[str, Optional[datetime]]:
+        """Categories to keep fresh, with the time of their last poll (None: never polled)."""
+        now = now or datetime.utcnow()
+        cursors = self.db_manager.get_news_cursors()
+        tracked = {category: None for category in self.categories}
+        tracked.update({
+            category: cursor['last_polled'] for category, cursor in cursors.items()
+            if category in tracked or (cursor['last_read'] is not None and now - cursor['last_read'] < self.track_window)
+        })
+        return tracked
+
+    def due_categories(self, now: Optional[datetime] = None) -> List[str]:
+        """Tracked categories not polled within the interval, never polled or least recent first."""
+        now = now or datetime.utcnow()
+        due = [
+            (polled or datetime.min, category) for category, polled in self.tracked_categories(now).items()
+            if polled is None or now - polled >= self.poll_interval
+        ]
+        return [category for _, category in sorted(due)]
+
+    def run_once(self) -> int:
+        """Poll the due categories the budget allows and drop expired articles; return the number stored."""
+        stored = 0
+        for category in self.due_categories():
+            if self.budget.exhausted_today:
+                break
+            try:
+                stored += self.poll(category)
+            except Exception as e:
+                logger.error(f"Error ingesting {category} news: {str(e)}")
+        self.db_manager.delete_news_before(datetime.now() - self.retention)
+        return stored
+
+    def next_wakeup(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next category is due."""
+        now = now or datetime.utcnow()
+        if self.due_categories(now):
+            return max(1.0, self.budget.seconds_until())
+        due = [
+            (polled + self.poll_interval - now).total_seconds()
+            for polled in self.tracked_categories(now).values() if polled is not None
+        ]
+        return max(1.0, min(due, default=self.poll_interval.total_seconds()))
+
+    async def run(self) -> None:
+        """Polling loop; runs until cancelled."""
+        while True:
+            try:
+                stored = await asyncio.to_thread(self.run_once)
+                if stored:
+                    logger.info(f"Ingested {stored} news articles")
+                delay = await asyncio.to_thread(self.next_wakeup)
+                if self.budget.exhausted_today:
+                    delay = max(delay, 3600.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"News ingestion cycle failed: {str(e)}")
+                delay = 60.0
+            await asyncio.sleep(delay)
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Start the polling loop on the running event loop, unless disabled by NEWS_INGEST_ENABLED=0."""
+        if os.getenv('NEWS_INGEST_ENABLED', '1') == '0':
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="news-ingest")
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the loop and wait for it to finish."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
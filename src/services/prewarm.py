@@ -0,0 +1,288 @@
+"""
+Background cache prewarming for popular coins.
+
+Interactive requests for a coin whose cached data has expired pay for
+API calls and a full indicator run. The prewarmer refreshes the hottest
+coins (most requested plus trending) shortly before their cache entries
+expire, so those requests are served from the cache:
+
+- the in-memory base series behind /analyze (DataProcessor.get_base_series,
+  hourly plus 5-minute points), followed by TechnicalAnalyzer.analyze_timeframes
+  so its result is cached too;
+- the OHLCV cache and analysis of every timeframe, used by /quick, /chart
+  and the agent.
+
+API usage is capped by a per-minute rate and a daily call budget. When
+the budget runs out, the remaining refreshes wait for the next cycle and
+the most popular coins are refreshed first.
+
+Configuration (environment variables):
+    PREWARM_ENABLED: "0" to disable the prewarmer (default: enabled)
+    PREWARM_TOP_N: Number of coins to keep warm (default: 10)
+    PREWARM_LEAD_SECONDS: Refresh this long before expiry (default: 60)
+    PREWARM_CALLS_PER_MINUTE: API calls per minute the prewarmer may use (default: 10)
+    PREWARM_DAILY_CALLS: API calls per UTC day the prewarmer may use (default: 2000)
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from .database_manager import DatabaseManager
+from ..analysis.technical import TechnicalAnalyzer
+from ..analysis.timeframes import TIMEFRAMES
+
+logger = logging.getLogger(__name__)
+
+# Each OHLCV refresh costs one market_chart and one ohlc request
+CALLS_PER_REFRESH = 2
+
+# Base series analyze_timeframes reads, by days covered; one market_chart request each
+BASE_SERIES = (max(TIMEFRAMES), 1)
+
+# How long to leave a coin/timeframe alone after a failed refresh
+FAILURE_BACKOFF = timedelta(minutes=30)
+
+
+class ApiBudget:
+    """
+    Token bucket with a daily cap.
+
+    Tokens refill continuously at `calls_per_minute`, up to one minute's
+    worth. Independently, no more than `daily_calls` are handed out per
+    UTC day.
+    """
+
+    def __init__(self, calls_per_minute: int, daily_calls: int):
+        self.calls_per_minute = calls_per_minute
+        self.daily_calls = daily_calls
+        self._tokens = float(calls_per_minute)
+        self._last_refill = time.monotonic()
+        self._day = datetime.utcnow().date()
+        self._used_today = 0
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.calls_per_minute),
+            self._tokens + (now - self._last_refill) * self.calls_per_minute / 60.0
+        )
+        self._last_refill = now
+        today = datetime.utcnow().date()
+        if today != self._day:
+            self._day = today
+            self._used_today = 0
+
+    def try_acquire(self, calls: int = 1) -> bool:
+        """Take `calls` tokens if available, without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens < calls or self._used_today + calls > self.daily_calls:
+                return False
+            self._tokens -= calls
+            self._used_today += calls
+            return True
+
+    def seconds_until(self, calls: int = 1) -> float:
+        """How long until `calls` tokens are available under the per-minute rate."""
+        with self._lock:
+            self._refill()
+            missing = calls - self._tokens
+            return max(0.0, missing * 60.0 / self.calls_per_minute)
+
+    @property
+    def exhausted_today(self) -> bool:
+        with self._lock:
+            self._refill()
+            return self._used_today + CALLS_PER_REFRESH > self.daily_calls
+
+
+class CachePrewarmer:
+    """
+    Keep base series, OHLCV data and analysis results for popular coins warm.
+
+    Run it as a standalone asyncio task with `start()`, for example from
+    the Application's post_init hook. Blocking work (database, API and
+    indicator calculations) runs in worker threads.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DatabaseManager] = None,
+        analyzer: Optional[TechnicalAnalyzer] = None,
+        top_n: int = None,
+        lead_seconds: int = None,
+        calls_per_minute: int = None,
+        daily_calls: int = None,
+        vs_currency: str = 'usd'
+    ):
+        self.db_manager = db_manager or DatabaseManager()
+        self.analyzer = analyzer or TechnicalAnalyzer()
+        self.data_processor = self.analyzer.data_processor
+        self.cache_manager = self.data_processor.cache_manager
+        self.top_n = top_n or int(os.getenv('PREWARM_TOP_N', 10))
+        self.lead_time = timedelta(seconds=lead_seconds or int(os.getenv('PREWARM_LEAD_SECONDS', 60)))
+        self.budget = ApiBudget(
+            calls_per_minute or int(os.getenv('PREWARM_CALLS_PER_MINUTE', 10)),
+            daily_calls or int(os.getenv('PREWARM_DAILY_CALLS', 2000))
+        )
+        self.vs_currency = vs_currency
+        self._failed_until = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def hot_coins(self) -> List[str]:
+        """Most requested coins of the last day, topped up with trending coins."""
+        coins = [row['coin'] for row in self.db_manager.get_most_popular_coins(limit=self.top_n, window='day')]
+        for trending in self.db_manager.get_trending_coins(limit=self.top_n):
+            if len(coins) >= self.top_n:
+                break
+            if trending['coin_id'] not in coins:
+                coins.append(trending['coin_id'])
+        return coins[:self.top_n]
+
+    def due_refreshes(self, now: Optional[datetime] = None) -> List[Tuple[datetime, str, int]]:
+        """
+        Return (expiry, coin_id, days) for cache entries that expire within the lead time.
+
+        Entries are ordered by coin popularity so the most requested coins
+        are refreshed first when the budget is short. Entries that failed
+        recently are skipped until their back-off ends.
+        """
+        now = now or datetime.utcnow()
+        due = []
+        for coin_id in self.hot_coins():
+            for days in TIMEFRAMES:
+                if self._failed_until.get((coin_id, days), now) > now:
+                    continue
+                expiry = self.cache_manager.get_expiry(coin_id, self.vs_currency, days)
+                if expiry is None or expiry - self.lead_time <= now:
+                    due.append((expiry or now, coin_id, days))
+        return due
+
+    def due_base_refreshes(self, now: Optional[datetime] = None) -> List[Tuple[datetime, str, Tuple[int, ...]]]:
+        """
+        Return (earliest expiry, coin_id, stale base series) for hot coins.
+
+        A base series is stale when it expires within the lead time or is
+        not cached; the tuple lists the days it covers. Ordered and backed
+        off like due_refreshes.
+        """
+        now = now or datetime.utcnow()
+        due = []
+        for coin_id in self.hot_coins():
+            if self._failed_until.get((coin_id, BASE_SERIES), now) > now:
+                continue
+            expiries = {days: self.data_processor.get_base_expiry(coin_id, self.vs_currency, days) for days in BASE_SERIES}
+            stale = tuple(days for days, expiry in expiries.items() if expiry is None or expiry - self.lead_time <= now)
+            if stale:
+                due.append((min(expiries[days] or now for days in stale), coin_id, stale))
+        return due
+
+    def next_wakeup(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next cache entry of a hot coin enters the lead window."""
+        now = now or datetime.utcnow()
+        wakeups = []
+        for coin_id in self.hot_coins():
+            for days in TIMEFRAMES:
+                if self._failed_until.get((coin_id, days), now) > now:
+                    continue
+                expiry = self.cache_manager.get_expiry(coin_id, self.vs_currency, days)
+                if expiry is not None:
+                    wakeups.append((expiry - self.lead_time - now).total_seconds())
+            if self._failed_until.get((coin_id, BASE_SERIES), now) <= now:
+                for days in BASE_SERIES:
+                    expiry = self.data_processor.get_base_expiry(coin_id, self.vs_currency, days)
+                    if expiry is not None:
+                        wakeups.append((expiry - self.lead_time - now).total_seconds())
+        # Re-check at least every 5 minutes so newly popular coins are picked up
+        return min([300.0] + [max(1.0, seconds) for seconds in wakeups])
+
+    def refresh(self, coin_id: str, days: int) -> bool:
+        """Refetch OHLCV data from the API and recompute the analysis."""
+        analysis = self.analyzer.analyze_coin(coin_id, self.vs_currency, days, force_refresh=True)
+        if 'error' in analysis:
+            logger.warning(f"Prewarm of {coin_id} ({days}d) failed: {analysis['error']}")
+            self._failed_until[(coin_id, days)] = datetime.utcnow() + FAILURE_BACKOFF
+            return False
+        self._failed_until.pop((coin_id, days), None)
+        return True
+
+    def refresh_base(self, coin_id: str, stale: Tuple[int, ...]) -> bool:
+        """Refetch the stale base series of a coin and recompute its multi-timeframe analysis."""
+        for days in stale:
+            if self.data_processor.get_base_series(coin_id, self.vs_currency, days, force_refresh=True) is None:
+                error = "Failed to fetch data"
+                break
+        else:
+            # Reads the refreshed series and caches the result /analyze serves
+            error = self.analyzer.analyze_timeframes(coin_id, self.vs_currency).get('error')
+        if error:
+            logger.warning(f"Prewarm of {coin_id} (base series) failed: {error}")
+            self._failed_until[(coin_id, BASE_SERIES)] = datetime.utcnow() + FAILURE_BACKOFF
+            return False
+        self._failed_until.pop((coin_id, BASE_SERIES), None)
+        return True
+
+    def run_once(self) -> int:
+        """Refresh every due entry the budget allows, base series first; return the number refreshed."""
+        refreshed = 0
+        for _, coin_id, stale in self.due_base_refreshes():
+            if not self.budget.try_acquire(len(stale)):
+                logger.info("Prewarm API budget used up, deferring remaining refreshes")
+                return refreshed
+            try:
+                if self.refresh_base(coin_id, stale):
+                    refreshed += 1
+            except Exception as e:
+                logger.error(f"Error prewarming {coin_id} (base series): {str(e)}")
+        for _, coin_id, days in self.due_refreshes():
+            if not self.budget.try_acquire(CALLS_PER_REFRESH):
+                logger.info("Prewarm API budget used up, deferring remaining refreshes")
+                break
+            try:
+                if self.refresh(coin_id, days):
+                    refreshed += 1
+            except Exception as e:
+                logger.error(f"Error prewarming {coin_id} ({days}d): {str(e)}")
+        return refreshed
+
+    async def run(self) -> None:
+        """Prewarm loop; runs until cancelled."""
+        while True:
+            try:
+                refreshed = await asyncio.to_thread(self.run_once)
+                if refreshed:
+                    logger.info(f"Prewarmed {refreshed} cache entries")
+                delay = await asyncio.to_thread(self.next_wakeup)
+                if self.budget.exhausted_today:
+                    delay = max(delay, 3600.0)
+                else:
+                    delay = max(delay, self.budget.seconds_until(CALLS_PER_REFRESH))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Prewarm cycle failed: {str(e)}")
+                delay = 60.0
+            await asyncio.sleep(delay)
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Start the loop on the running event loop, unless disabled by PREWARM_ENABLED=0."""
+        if os.getenv('PREWARM_ENABLED', '1') == '0':
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="cache-prewarmer")
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the loop and wait for it to finish."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
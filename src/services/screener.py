@@ -0,0 +1,382 @@
+"""
+Market screener over a precomputed indicator snapshot table.
+
+Screens such as "top-100 coins with RSI < 30 and price above MA50" are
+answered from `indicator_snapshots`: one row per coin and timeframe with
+the latest readings of the key indicators. A screen is a filter plus a
+sort on that table, so it costs one indexed query and no API calls.
+
+The table is kept fresh in the background. Each cycle lists the top
+coins by market cap (one markets call); rows of coins that left the list
+are deleted. Each coin is then refreshed from its base series (hourly,
+plus 5-minute points for a single day), resampled into every timeframe
+(see analysis.timeframes). Indicators are computed for all coins of a
+cycle at once, stacked by series length. Readings whose period does not
+fit a timeframe's candles, such as MA50 over 42 weekly bars, are stored
+as NULL rather than as a shorter average. API usage shares the
+prewarmer's rate-limited budget type.
+
+Screen syntax (arguments of /screen, in any order):
+    rsi<30 price>ma50       conditions: <field> <op> <number or field>, op one of < <= > >= =
+    tf:1w                   timeframe: 1d, 1w, 1m or 3m (default: 1d)
+    top:50                  only coins ranked this high by market cap (default: all)
+    sort:-change_24h        sort field, '-' for descending (default: rank)
+    limit:20                number of results (default: 10, at most 50)
+
+Configuration (environment variables):
+    SCREENER_ENABLED: "0" to disable snapshot refreshes (default: enabled)
+    SCREENER_TOP_N: Number of coins by market cap to snapshot (default: 100)
+    SCREENER_REFRESH_SECONDS: Age at which a coin's snapshot is refreshed (default: 1800)
+    SCREENER_CALLS_PER_MINUTE: API calls per minute the refresh may use (default: 10)
+    SCREENER_DAILY_CALLS: API calls per UTC day the refresh may use (default: 5000)
+"""
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .database import IndicatorSnapshot, TimeInterval
+from .database_manager import DatabaseManager
+from .prewarm import ApiBudget
+from ..analysis.indicators import MA_LONG_PERIOD, MA_SHORT_PERIOD, MACD_MIN_CANDLES, IndicatorEngine
+from ..analysis.timeframes import TIMEFRAMES, timeframe_frames
+from ..data.processor import DataProcessor
+
+logger = logging.getLogger(__name__)
+
+# Screen field names -> IndicatorSnapshot columns
+SCREEN_FIELDS = {
+    'price': 'price',
+    'rank': 'rank',
+    'market_cap': 'market_cap',
+    'change_24h': 'change_24h',
+    'change': 'change',
+    'rsi': 'rsi',
+    'macd': 'macd',
+    'macd_signal': 'macd_signal',
+    'macd_hist': 'macd_hist',
+    'ma20': 'ma20',
+    'ma50': 'ma50',
+    'ema20': 'ema20',
+    'stoch_k': 'stoch_k',
+    'stoch_d': 'stoch_d',
+    'adx': 'adx',
+    'atr': 'atr_pct',
+    'bb_upper': 'bb_upper',
+    'bb_lower': 'bb_lower',
+}
+
+# Timeframe arguments, as in /analyze
+TIMEFRAME_KEYS = {'1d': 1, '1w': 7, '1m': 30, '3m': 90}
+
+OPERATORS = {
+    '<': lambda column, value: column < value,
+    '<=': lambda column, value: column <= value,
+    '>': lambda column, value: column > value,
+    '>=': lambda column, value: column >= value,
+    '=': lambda column, value: column == value,
+}
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_CONDITION = re.compile(r'(\w+)\s*(<=|>=|<|>|=)\s*(-?\d+(?:\.\d+)?|\w+)')
+_OPTION = re.compile(r'(tf|top|sort|limit):(-?\w+)')
+
+# Base series fetched per coin: hourly for the longer timeframes, 5-minute for a single day
+CALLS_PER_COIN = 2
+
+# Indicators read into a snapshot
+SNAPSHOT_INDICATORS = ['rsi', 'macd', 'sma_short', 'sma_long', 'ema_short', 'stochastic', 'adx', 'atr', 'bollinger_bands']
+
+
+def parse_screen(args: Sequence[str]) -> Dict:
+    """
+    Parse /screen arguments into {"conditions", "days", "top", "sort", "descending", "limit"}.
+
+    Conditions are (field, operator, number or field) tuples. Raises
+    ValueError naming the first argument that is not understood.
+    """
+    text = ' '.join(args)
+    query = {"conditions": [], "days": 1, "top": None, "sort": 'rank', "descending": False, "limit": DEFAULT_LIMIT}
+    position = 0
+    while position < len(text):
+        if text[position].isspace():
+            position += 1
+            continue
+        option = _OPTION.match(text, position)
+        condition = None if option else _CONDITION.match(text, position)
+        match = option or condition
+        if match is None:
+            raise ValueError(f"Cannot parse '{text[position:].split()[0]}'")
+        position = match.end()
+
+        if condition:
+            field, operator, value = condition.groups()
+            if field not in SCREEN_FIELDS:
+                raise ValueError(f"Unknown field '{field}'")
+            if value not in SCREEN_FIELDS:
+                try:
+                    value = float(value)
+                except ValueError:
+                    raise ValueError(f"Unknown field '{value}'") from None
+            query["conditions"].append((field, operator, value))
+            continue
+
+        name, value = option.groups()
+        if name == 'tf':
+            if value not in TIMEFRAME_KEYS:
+                raise ValueError(f"Unknown timeframe '{value}'")
+            query["days"] = TIMEFRAME_KEYS[value]
+        elif name == 'sort':
+            field = value.lstrip('-')
+            if field not in SCREEN_FIELDS:
+                raise ValueError(f"Unknown field '{field}'")
+            query["sort"], query["descending"] = field, value.startswith('-')
+        elif not value.isdigit() or int(value) < 1:
+            raise ValueError(f"'{name}' needs a positive number")
+        elif name == 'top':
+            query["top"] = int(value)
+        else:
+            query["limit"] = min(int(value), MAX_LIMIT)
+    return query
+
+
+def _latest(values: np.ndarray) -> List[Optional[float]]:
+    """Last value of each row, None where it is not a number."""
+    last = np.atleast_2d(values)[:, -1]
+    return [float(value) if np.isfinite(value) else None for value in last]
+
+
+def snapshot_rows(frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+    """
+    Latest indicator readings of each OHLCV frame, keyed like `frames`.
+
+    Frames with the same number of candles are stacked and computed
+    together. Empty frames are skipped. Readings a frame is too short
+    for are None, including moving averages the engine would shorten.
+    """
+    groups: Dict[int, List[str]] = {}
+    for key, df in frames.items():
+        if df is not None and not df.empty:
+            groups.setdefault(len(df), []).append(key)
+
+    snapshots = {}
+    for keys in groups.values():
+        engine = IndicatorEngine.from_frames([frames[key] for key in keys])
+        indicators = engine.compute(SNAPSHOT_INDICATORS)
+        close = np.atleast_2d(engine.close)
+        nan = np.full(close.shape, np.nan)
+        macd, macd_signal, macd_hist = indicators['macd']
+        if len(engine) < MACD_MIN_CANDLES:
+            # Zero placeholders, not readings
+            macd = macd_signal = macd_hist = nan
+        # Averages over shortened periods would not be what the column names say
+        ma20 = indicators['sma_short'] if engine.ma_short == MA_SHORT_PERIOD else nan
+        ema20 = indicators['ema_short'] if engine.ma_short == MA_SHORT_PERIOD else nan
+        ma50 = indicators['sma_long'] if engine.ma_long == MA_LONG_PERIOD else nan
+        slowk, slowd = indicators['stochastic']
+        bb_upper, _, bb_lower = indicators['bollinger_bands']
+        columns = {
+            'price': _latest(close),
+            'change': _latest((close[:, -1:] / close[:, :1] - 1) * 100),
+            'rsi': _latest(indicators['rsi']),
+            'macd': _latest(macd),
+            'macd_signal': _latest(macd_signal),
+            'macd_hist': _latest(macd_hist),
+            'ma20': _latest(ma20),
+            'ma50': _latest(ma50),
+            'ema20': _latest(ema20),
+            'stoch_k': _latest(slowk),
+            'stoch_d': _latest(slowd),
+            'adx': _latest(indicators['adx']),
+            'atr_pct': _latest(np.atleast_2d(indicators['atr']) / close * 100),
+            'bb_upper': _latest(bb_upper),
+            'bb_lower': _latest(bb_lower),
+        }
+        for row, key in enumerate(keys):
+            snapshots[key] = {name: values[row] for name, values in columns.items()}
+            snapshots[key]['candle_time'] = frames[key].index[-1].to_pydatetime()
+    return snapshots
+
+
+class MarketScreener:
+    """
+    Answer screens from the snapshot table and keep it refreshed.
+
+    `screen()` only reads the database. Run the refresh loop as a
+    standalone asyncio task with `start()`; blocking work (API, indicator
+    calculations and database writes) runs in worker threads.
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DatabaseManager] = None,
+        data_processor: Optional[DataProcessor] = None,
+        top_n: int = None,
+        refresh_seconds: int = None,
+        calls_per_minute: int = None,
+        daily_calls: int = None,
+        vs_currency: str = 'usd'
+    ):
+        self.db_manager = db_manager or DatabaseManager()
+        self.data_processor = data_processor or DataProcessor()
+        self.top_n = top_n or int(os.getenv('SCREENER_TOP_N', 100))
+        self.refresh_interval = timedelta(seconds=refresh_seconds or int(os.getenv('SCREENER_REFRESH_SECONDS', 1800)))
+        self.budget = ApiBudget(
+            calls_per_minute or int(os.getenv('SCREENER_CALLS_PER_MINUTE', 10)),
+            daily_calls or int(os.getenv('SCREENER_DAILY_CALLS', 5000))
+        )
+        self.vs_currency = vs_currency
+        self._markets: List[Dict] = []
+        self._markets_fetched: Optional[datetime] = None
+        self._refreshed_at: Dict[str, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def screen(self, query: Dict) -> List[Dict]:
+        """Snapshots matching a parsed query (see parse_screen), in its sort order."""
+        conditions = [
+            IndicatorSnapshot.vs_currency == self.vs_currency,
+            IndicatorSnapshot.interval == TimeInterval(query["days"]),
+        ]
+        if query["top"] is not None:
+            conditions.append(IndicatorSnapshot.rank <= query["top"])
+        for field, operator, value in query["conditions"]:
+            column = getattr(IndicatorSnapshot, SCREEN_FIELDS[field])
+            if isinstance(value, str):
+                value = getattr(IndicatorSnapshot, SCREEN_FIELDS[value])
+            conditions.append(OPERATORS[operator](column, value))
+
+        sort_column = getattr(IndicatorSnapshot, SCREEN_FIELDS[query["sort"]])
+        order_by = [
+            (sort_column.desc() if query["descending"] else sort_column.asc()).nullslast(),
+            IndicatorSnapshot.rank.asc().nullslast(),
+        ]
+        return self.db_manager.query_indicator_snapshots(conditions, order_by, query["limit"])
+
+    def top_coins(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Market data of the top coins by market cap, refetched once per refresh interval.
+
+        After each fetch, snapshots of coins no longer in the list are deleted.
+        """
+        now = now or datetime.utcnow()
+        stale = self._markets_fetched is None or now - self._markets_fetched >= self.refresh_interval
+        if stale and self.budget.try_acquire():
+            try:
+                self._markets = self.data_processor.api.get_coins_markets(self.vs_currency, per_page=self.top_n) or []
+                self._markets_fetched = now
+            except Exception as e:
+                logger.error(f"Error fetching top coins for the screener: {str(e)}")
+            else:
+                if self._markets:
+                    # Coins that left the top N would otherwise keep matching screens with old readings
+                    listed = {coin['id'] for coin in self._markets}
+                    self.db_manager.delete_indicator_snapshots_except(self.vs_currency, list(listed))
+                    self._refreshed_at = {
+                        coin_id: refreshed for coin_id, refreshed in self._refreshed_at.items() if coin_id in listed
+                    }
+        return self._markets
+
+    def due_coins(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Top coins whose snapshots are older than the refresh interval, highest ranked first."""
+        now = now or datetime.utcnow()
+        return [
+            coin for coin in self.top_coins(now)
+            if now - self._refreshed_at.get(coin['id'], datetime.min) >= self.refresh_interval
+        ]
+
+    def build_snapshots(self, coins: List[Dict]) -> List[Dict]:
+        """Snapshot rows for every timeframe of `coins` (entries of the markets response)."""
+        frames = {}
+        for coin in coins:
+            coin_frames = timeframe_frames(self.data_processor, coin['id'], self.vs_currency)
+            for days, df in (coin_frames or {}).items():
+                frames[(coin['id'], days)] = df
+
+        readings = snapshot_rows(frames)
+        rows = []
+        for coin in coins:
+            for days in TIMEFRAMES:
+                if (coin['id'], days) not in readings:
+                    continue
+                rows.append({
+                    'coin_id': coin['id'],
+                    'vs_currency': self.vs_currency,
+                    'interval': TimeInterval(days),
+                    'symbol': coin.get('symbol'),
+                    'rank': coin.get('market_cap_rank'),
+                    'market_cap': coin.get('market_cap'),
+                    'change_24h': coin.get('price_change_percentage_24h'),
+                    **readings[(coin['id'], days)],
+                })
+        return rows
+
+    def run_once(self) -> int:
+        """Refresh the due coins the budget allows; return the number refreshed."""
+        now = datetime.utcnow()
+        coins = []
+        for coin in self.due_coins(now):
+            if not self.budget.try_acquire(CALLS_PER_COIN):
+                break
+            coins.append(coin)
+        if not coins:
+            return 0
+
+        rows = self.build_snapshots(coins)
+        self.db_manager.bulk_update_indicator_snapshots(rows)
+        for coin in coins:
+            # Coins without data wait a full interval too, rather than retrying every cycle
+            self._refreshed_at[coin['id']] = now
+        return len(coins)
+
+    def next_wakeup(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next refresh can make progress."""
+        now = now or datetime.utcnow()
+        if self.due_coins(now):
+            return max(1.0, self.budget.seconds_until())
+        due = [
+            (refreshed + self.refresh_interval - now).total_seconds()
+            for refreshed in self._refreshed_at.values()
+        ]
+        return max(1.0, min(due, default=self.refresh_interval.total_seconds()))
+
+    async def run(self) -> None:
+        """Refresh loop; runs until cancelled."""
+        while True:
+            try:
+                refreshed = await asyncio.to_thread(self.run_once)
+                if refreshed:
+                    logger.info(f"Refreshed screener snapshots of {refreshed} coins")
+                delay = await asyncio.to_thread(self.next_wakeup)
+                if self.budget.exhausted_today:
+                    delay = max(delay, 3600.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Screener refresh failed: {str(e)}")
+                delay = 60.0
+            await asyncio.sleep(delay)
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Start the refresh loop on the running event loop, unless disabled by SCREENER_ENABLED=0."""
+        if os.getenv('SCREENER_ENABLED', '1') == '0':
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="screener-refresh")
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the loop and wait for it to finish."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -109,6 +109,10 @@ class TelegramFormatter:
                 summary = self._format_summary(analysis['summary'])
                 sections.append(summary)
 
+            # Agreement across timeframes
+            if 'confluence' in analysis:
+                sections.append(self._format_confluence(analysis['confluence']))
+
             return "\n\n".join(filter(None, sections))  # Filter out empty sections
 
         except Exception as e:
@@ -275,6 +279,19 @@ class TelegramFormatter:
         
         return "\n".join(summary_text)
 
+    def _format_confluence(self, confluence: Dict) -> str:
+        """Format the overall sentiment of every timeframe and how far they agree"""
+        labels = {1: '1d', 7: '1w', 30: '1m', 90: '3m'}
+        by_timeframe = " | ".join(
+            f"{labels.get(days, f'{days}d')}: {self._get_sentiment_emoji(sentiment)}"
+            for days, sentiment in confluence['by_timeframe'].items()
+        )
+        return (
+            f"🧭 {self._t('timeframe_confluence')}: {self._get_sentiment_emoji(confluence['sentiment'])} "
+            f"{confluence['sentiment']} ({confluence['agreement']:.0f}%)\n"
+            f"• {by_timeframe}"
+        )
+
     # Helper formatting methods
     def _format_rsi(self, rsi_data: Dict) -> str:
         value = rsi_data['value']
@@ -824,4 +841,42 @@ class TelegramFormatter:
 
     
     
-    
\ No newline at end of file
+    
+    def format_screen_results(self, query: Dict, snapshots: List[Dict]) -> str:
+        """
+        Format /screen matches, one line per coin.
+
+        Besides price, 24h change and RSI, each line shows the fields the
+        screen filters or sorts on.
+        """
+        if not snapshots:
+            return self._t('screen_no_results')
+
+        # Screen field names -> snapshot keys (see services.screener.SCREEN_FIELDS)
+        fields = ['rsi']
+        for field, _, value in query.get('conditions', []):
+            fields.extend(name for name in (field, value) if isinstance(name, str))
+        fields.append(query.get('sort', 'rank'))
+        fields = [field for field in dict.fromkeys(fields) if field not in ('price', 'change_24h', 'rank')]
+
+        lines = [self._t('screen_results'), f"{'═' * 32}"]
+        for snapshot in snapshots:
+            change = snapshot.get('change_24h')
+            parts = [f"${snapshot['price']:,.4g}" if snapshot.get('price') is not None else "-"]
+            if change is not None:
+                parts.append(f"24h {'🔺' if change > 0 else '🔻'} {abs(change):.2f}%")
+            for field in fields:
+                value = snapshot.get('atr_pct' if field == 'atr' else field)
+                if value is None:
+                    continue
+                parts.append(
+                    f"{field.upper()} {self._format_large_number(value)}"
+                    if field == 'market_cap' else f"{field.upper()} {value:,.4g}"
+                )
+            rank = f"#{snapshot['rank']} " if snapshot.get('rank') else ""
+            lines.append(f"• {rank}{(snapshot.get('symbol') or snapshot['coin_id']).upper()}: " + " | ".join(parts))
+
+        updated = min((snapshot['last_updated'] for snapshot in snapshots if snapshot.get('last_updated')), default=None)
+        if updated is not None:
+            lines.append(f"{'─' * 32}\n🕒 {self._t('updated')}: {updated:%Y-%m-%d %H:%M} UTC")
+        return "\n".join(lines)
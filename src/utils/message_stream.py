@@ -0,0 +1,86 @@
+"""
+Progressive Telegram message edits for streamed LLM output.
+
+`MessageStreamer.feed` collects chunks as they arrive and edits the
+message only when two conditions hold: STREAM_MIN_CHARS new characters
+have arrived, and STREAM_EDIT_INTERVAL seconds have passed since the last
+edit. At most one edit is in flight at a time. This keeps within
+Telegram's edit rate limits while users see the answer grow from its
+first tokens. A flood-control error (RetryAfter) postpones the next edit
+by the time Telegram asks for. `finish` shows the final text once the
+edit in flight is done.
+
+Configuration (environment variables):
+    STREAM_EDIT_INTERVAL: Minimum seconds between edits (default: 1.0)
+    STREAM_MIN_CHARS: New characters needed before an edit (default: 40)
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+# Telegram rejects longer message texts
+MAX_MESSAGE_LENGTH = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def fit_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> str:
+    """Text cut to Telegram's message length, marking the cut."""
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+class MessageStreamer:
+    def __init__(self, message, min_interval: float = None, min_chars: int = None):
+        """
+        Args:
+            message: Telegram message to edit (anything with an async `edit_text`)
+            min_interval (float): Minimum seconds between edits
+            min_chars (int): New characters needed before an edit
+        """
+        self.message = message
+        self.min_interval = min_interval if min_interval is not None else float(os.getenv('STREAM_EDIT_INTERVAL', 1.0))
+        self.min_chars = min_chars if min_chars is not None else int(os.getenv('STREAM_MIN_CHARS', 40))
+        self.edits = 0
+        self._text = ''
+        self._shown = ''
+        # Monotonic time before which no edit is sent
+        self._next_edit = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def feed(self, chunk: str) -> None:
+        """Append streamed text, scheduling an edit when one is due. Call on the event loop."""
+        self._text += chunk
+        if self._task is not None and not self._task.done():
+            return
+        if len(self._text) - len(self._shown) >= self.min_chars and time.monotonic() >= self._next_edit:
+            self._task = asyncio.ensure_future(self._edit(self._text))
+
+    async def _edit(self, text: str, final: bool = False) -> None:
+        text = fit_message(text)
+        while text != self._shown and text.strip():
+            try:
+                await self.message.edit_text(text)
+                self._shown = text
+                self.edits += 1
+                self._next_edit = time.monotonic() + self.min_interval
+            except Exception as e:
+                retry_after = getattr(e, 'retry_after', None)
+                if retry_after is None:
+                    if final:
+                        raise
+                    logger.warning(f"Streaming edit failed: {str(e)}")
+                    return
+                # Flood control: newer library versions give a timedelta
+                seconds = retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else float(retry_after)
+                self._next_edit = time.monotonic() + seconds
+                if not final:
+                    return
+                await asyncio.sleep(seconds)
+
+    async def finish(self, text: str) -> None:
+        """Show the final text once the edit in flight is done, waiting out flood control."""
+        if self._task is not None:
+            await self._task
+        await self._edit(text, final=True)
@@ -0,0 +1,121 @@
+"""Batched, non-blocking user-activity logging."""
+import time
+
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+
+from src.services.activity_logger import ActivityLogger
+
+
+class ActivityStore:
+    """Database manager recording written batches; fails as configured."""
+
+    def __init__(self):
+        self.batches = []
+        self.down = False
+
+    def bulk_log_user_activities(self, activities):
+        if self.down:
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+        if any(activity.get('bad') for activity in activities):
+            raise DataError("INSERT", {}, Exception("value too long"))
+        self.batches.append(list(activities))
+        return len(activities)
+
+    @property
+    def written(self):
+        return [activity['user_id'] for batch in self.batches for activity in batch]
+
+
+@pytest.fixture
+def make_logger():
+    """Fresh loggers (the class is a singleton), closed after the test."""
+    loggers = []
+
+    def make(store, **kwargs):
+        ActivityLogger._instance = None
+        activity_logger = ActivityLogger(store, **kwargs)
+        loggers.append(activity_logger)
+        return activity_logger
+
+    yield make
+    for activity_logger in loggers:
+        activity_logger.close()
+    ActivityLogger._instance = None
+
+
+def test_full_batches_are_written_without_waiting(make_logger):
+    store = ActivityStore()
+    activity_logger = make_logger(store, batch_size=3, flush_interval=60)
+    for user in range(3):
+        assert activity_logger.log({'user_id': user, 'coin_id': 'bitcoin'})
+
+    deadline = time.monotonic() + 5
+    while not store.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.written == [0, 1, 2]
+    assert all('created_at' in activity for activity in store.batches[0])
+
+
+def test_close_flushes_pending_events(make_logger):
+    store = ActivityStore()
+    activity_logger = make_logger(store, batch_size=100, flush_interval=60)
+    activity_logger.log({'user_id': 1})
+    activity_logger.log({'user_id': 2})
+    activity_logger.close()
+    assert store.written == [1, 2]
+
+
+def test_overflowing_events_are_dropped_and_counted(make_logger):
+    store = ActivityStore()
+    activity_logger = make_logger(store, batch_size=10, flush_interval=60, max_queue_size=2, max_retry_buffer=3)
+    # Keep the worker from draining the queue
+    activity_logger._ensure_worker = lambda: None
+    assert activity_logger.log({'user_id': 1})
+    assert activity_logger.log({'user_id': 2})
+    assert not activity_logger.log({'user_id': 3})
+    assert activity_logger.dropped_count == 1
+
+    # The retry buffer keeps the newest events while the database is down
+    store.down = True
+    activity_logger.flush()
+    for user in (4, 5):
+        activity_logger.log({'user_id': user})
+    assert activity_logger.flush() == 0
+    assert [activity['user_id'] for activity in activity_logger.retry_buffer] == [2, 4, 5]
+    assert activity_logger.dropped_count == 2
+
+    store.down = False
+    assert activity_logger.flush() == 3
+    assert store.written == [2, 4, 5]
+
+
+def test_rejected_events_are_isolated_and_dropped(make_logger):
+    store = ActivityStore()
+    activity_logger = make_logger(store, batch_size=8, flush_interval=60)
+    activity_logger._ensure_worker = lambda: None
+    for user in range(8):
+        activity_logger.log({'user_id': user, 'bad': user == 5})
+
+    assert activity_logger.flush() == 7
+    assert sorted(store.written) == [0, 1, 2, 3, 4, 6, 7]
+    assert activity_logger.dropped_count == 1
+    assert not activity_logger.retry_buffer
+
+
+def test_connection_errors_back_off_exponentially(make_logger):
+    store = ActivityStore()
+    store.down = True
+    activity_logger = make_logger(store, batch_size=10, flush_interval=1)
+    activity_logger._ensure_worker = lambda: None
+    activity_logger.log({'user_id': 1})
+
+    activity_logger.flush()
+    first_wait = activity_logger._retry_at - time.monotonic()
+    activity_logger.flush()
+    second_wait = activity_logger._retry_at - time.monotonic()
+    assert 0.5 < first_wait <= 1.0 < second_wait <= 2.0
+
+    store.down = False
+    assert activity_logger.flush() == 1
+    assert activity_logger._retry_at == 0.0 and activity_logger._backoff == 1
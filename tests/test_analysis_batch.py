@@ -0,0 +1,76 @@
+"""TechnicalAnalyzer.analyze_many must match per-frame analysis."""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.parallel import AnalysisPool
+from src.analysis.technical import TechnicalAnalyzer
+
+
+def make_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open = np.roll(close, 1)
+    open[0] = close[0]
+    return pd.DataFrame({
+        'open': open,
+        'high': np.maximum(open, close) * (1 + np.abs(rng.normal(0, 0.01, n))),
+        'low': np.minimum(open, close) * (1 - np.abs(rng.normal(0, 0.01, n))),
+        'close': close,
+        'volume': rng.uniform(1e3, 1e5, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+def assert_equivalent(expected, actual, path=''):
+    if isinstance(expected, dict):
+        assert expected.keys() == actual.keys(), path
+        for key in expected:
+            assert_equivalent(expected[key], actual[key], f'{path}.{key}')
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual), path
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            assert_equivalent(e, a, f'{path}[{i}]')
+    elif isinstance(expected, np.ndarray):
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=path)
+    elif isinstance(expected, (float, np.floating)):
+        assert math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-9) or (
+            math.isnan(expected) and math.isnan(actual)
+        ), path
+    else:
+        assert expected == actual, path
+
+
+@pytest.fixture
+def analyzer():
+    # No data processor needed for in-memory frames
+    return TechnicalAnalyzer.__new__(TechnicalAnalyzer)
+
+
+def test_analyze_many_matches_single_frames(analyzer):
+    frames = {f'coin{i}': make_frame(n, i) for i, n in enumerate([720, 720, 720, 168, 168, 40, 12])}
+    results = analyzer.analyze_many(frames)
+    assert list(results) == list(frames)
+    for key, df in frames.items():
+        assert_equivalent(analyzer.analyze_dataframe(df), results[key], key)
+
+
+def test_analyze_many_sections_and_missing_frames(analyzer):
+    frames = {'a': make_frame(200, 1), 'missing': None, 'b': make_frame(200, 2)}
+    results = analyzer.analyze_many(frames, sections=('momentum_indicators',))
+    assert results['missing'] == {"error": "Failed to fetch data"}
+    assert set(results['a']) == {'momentum_indicators', 'summary'}
+
+
+def test_process_pool_matches_in_process(analyzer):
+    frames = {f'coin{i}': make_frame(n, i) for i, n in enumerate([300, 300, 300, 120, 60])}
+    frames['missing'] = None
+    expected = analyzer.analyze_many(frames)
+    pool = AnalysisPool(workers=2)
+    try:
+        analyzer.pool = pool
+        assert_equivalent(expected, analyzer.analyze_many(frames))
+        assert_equivalent(expected['coin4'], analyzer.analyze_dataframe(frames['coin4']))
+    finally:
+        pool.shutdown()
@@ -0,0 +1,71 @@
+"""Vectorized backtests of the summary signal rules."""
+import numpy as np
+import pytest
+
+from src.analysis.backtest import DEFAULT_PARAMETERS, Backtester, _evaluate, positions, sentiment
+from src.analysis.technical import TechnicalAnalyzer
+
+from tests.test_analysis_batch import make_frame
+
+SENTIMENTS = {"Bullish": 1, "Bearish": -1, "Neutral": 0}
+
+
+def reference_trades(close, position, fee):
+    """Loop version of the accounting in _evaluate: final equity and the growth factor of each trade."""
+    equity, trades = 1.0, []
+    for t in range(1, len(close)):
+        previous, now = position[t - 1], position[t]
+        step = 1 + previous * (close[t] / close[t - 1] - 1) - fee * abs(now - previous)
+        equity *= step
+        if previous == 0 and now != 0:
+            trades.append(1.0)
+        if trades and (previous != 0 or now != 0):
+            trades[-1] *= step
+        if previous != 0 and now not in (0, previous):
+            trades.append(1.0)
+    return equity, trades
+
+
+def parameter_arrays(**overrides):
+    return {name: np.array([[value]]) for name, value in {**DEFAULT_PARAMETERS, **overrides}.items()}
+
+
+def test_sentiment_matches_analysis_summary():
+    df = make_frame(400, 11)
+    backtester = Backtester(df)
+    signals = sentiment(backtester.indicators, parameter_arrays())[0]
+    analyzer = TechnicalAnalyzer.__new__(TechnicalAnalyzer)
+    checked = range(backtester.start, len(df))
+    assert {-1, 1} <= set(signals[list(checked)].tolist())
+    for end in checked:
+        summary = analyzer.analyze_dataframe(df.iloc[:end + 1])["summary"]
+        assert SENTIMENTS[summary["overall_sentiment"]] == signals[end], end
+
+
+@pytest.mark.parametrize("allow_short,hold", [(False, False), (True, False), (True, True)])
+def test_metrics_match_loop(allow_short, hold):
+    df = make_frame(600, 12)
+    backtester = Backtester(df)
+    result = backtester.run(allow_short=allow_short, hold=hold, consensus=50)
+
+    parameters = parameter_arrays(allow_short=allow_short, hold=hold, consensus=50)
+    position = positions(sentiment(backtester.indicators, parameters), parameters, backtester.start)[0]
+    equity, trades = reference_trades(df['close'].to_numpy(), position, DEFAULT_PARAMETERS['fee'])
+
+    assert result["total_return"] == pytest.approx((equity - 1) * 100)
+    assert result["trades"] == len(trades)
+    assert result["hit_rate"] == pytest.approx(sum(trade > 1 for trade in trades) / len(trades) * 100)
+
+
+def test_sweep_covers_grid_in_order():
+    backtester = Backtester(make_frame(300, 13))
+    grid = {'rsi_oversold': [20, 30], 'consensus': [50, 60, 70]}
+    results = backtester.sweep(grid)
+    assert [(r["parameters"]["rsi_oversold"], r["parameters"]["consensus"]) for r in results] == [
+        (20, 50), (20, 60), (20, 70), (30, 50), (30, 60), (30, 70)
+    ]
+    single = _evaluate(backtester.indicators, [results[4]["parameters"]], backtester.start)[0]
+    assert single == results[4]
+    assert all(0 <= r["max_drawdown"] <= 100 for r in results)
+    with pytest.raises(ValueError):
+        backtester.sweep({'unknown': [1]})
@@ -0,0 +1,25 @@
+"""Analysis digests for LLM prompts."""
+from src.llm.digest import CHARS_PER_TOKEN, analysis_digest
+
+from tests.test_analysis_batch import analyzer, make_frame  # noqa: F401 (fixture)
+
+
+def test_digest_is_bounded_and_keeps_latest_values(analyzer):
+    analysis = analyzer.analyze_dataframe(make_frame(300, 1))
+    digest = analysis_digest(analysis, max_tokens=1000)
+    assert len(digest) < len(str(analysis)) / 10
+    rsi = analysis['momentum_indicators']['rsi']['value']
+    assert f"rsi: {rsi:.2f}" in digest
+    assert digest.splitlines()[0].startswith(f"sentiment: {analysis['summary']['overall_sentiment']}")
+
+    short = analysis_digest(analysis, max_tokens=60)
+    assert len(short) <= 60 * CHARS_PER_TOKEN
+    assert digest.startswith(short)
+
+
+def test_digest_of_failed_sections(analyzer):
+    analysis = analyzer.analyze_dataframe(make_frame(300, 2))
+    analysis['trend_indicators'] = {"error": "Trend analysis failed"}
+    digest = analysis_digest(analysis, max_tokens=1000)
+    assert "trend: unavailable" in digest and "macd:" not in digest
+    assert analysis_digest({"error": "Failed to fetch data"}) == "analysis unavailable: Failed to fetch data"
@@ -0,0 +1,62 @@
+"""Bounded, fair agent job execution."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.llm.gateway import AgentBusy, AgentGateway, QueryCancelled
+
+
+def test_concurrency_cap_and_queue_positions():
+    gateway = AgentGateway(max_concurrency=2, deadline=5, max_queue=10)
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+    positions = {}
+
+    def work(value):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+        return value * 2
+
+    async def run():
+        async def on_position(user, position):
+            positions.setdefault(user, []).append(position)
+
+        jobs = [
+            gateway.submit(user, work, user, on_position=lambda position, user=user: on_position(user, position))
+            for user in range(5)
+        ]
+        return await asyncio.gather(*jobs)
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert state["peak"] == 2
+    # Users 0 and 1 start at once; the others wait and move up
+    assert 0 not in positions and 1 not in positions
+    assert positions[2] == [1] and positions[4] == [3, 2, 1]
+    assert gateway.running == 0 and gateway.queued == 0
+
+
+def test_newer_query_cancels_and_deadline_and_busy():
+    gateway = AgentGateway(max_concurrency=1, deadline=0.2, max_queue=1)
+
+    async def run():
+        blocker = asyncio.ensure_future(gateway.submit('a', time.sleep, 0.1))
+        await asyncio.sleep(0.01)
+        older = asyncio.ensure_future(gateway.submit('b', lambda: 'older'))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AgentBusy):
+            await gateway.submit('c', lambda: 'rejected')
+        newer = await gateway.submit('b', lambda: 'newer')
+        with pytest.raises(QueryCancelled):
+            await older
+        await blocker
+        with pytest.raises(asyncio.TimeoutError):
+            await gateway.submit('a', time.sleep, 0.5)
+        return newer
+
+    assert asyncio.run(run()) == 'newer'
@@ -0,0 +1,77 @@
+"""IndicatorEngine results against direct TA-Lib calls, and memoization of shared nodes."""
+import numpy as np
+import pytest
+
+from src.analysis import indicators, ta_numpy
+from src.analysis.indicators import INDICATORS, IndicatorEngine
+
+from tests.test_analysis_batch import make_frame
+
+talib = pytest.importorskip('talib')
+
+
+def expected_indicators(df):
+    o, h, l, c, v = (df[column].to_numpy(dtype=np.float64) for column in ('open', 'high', 'low', 'close', 'volume'))
+    typical = (h + l + c) / 3
+    return {
+        'sma_short': talib.SMA(c, timeperiod=20),
+        'sma_long': talib.SMA(c, timeperiod=50),
+        'ema_short': talib.EMA(c, timeperiod=20),
+        'macd': talib.MACD(c),
+        'adx': talib.ADX(h, l, c, timeperiod=14),
+        'sar': talib.SAR(h, l),
+        'rsi': talib.RSI(c, timeperiod=14),
+        'stochastic': talib.STOCH(h, l, c, fastk_period=14, slowk_period=3, slowd_period=3),
+        'williams_r': talib.WILLR(h, l, c, timeperiod=14),
+        'mfi': talib.MFI(h, l, c, v, timeperiod=14),
+        'cci': talib.CCI(h, l, c, timeperiod=20),
+        'roc': talib.ROC(c, timeperiod=10),
+        'obv': talib.OBV(c, v),
+        'volume_sma': talib.SMA(v, timeperiod=20),
+        'vwap': np.cumsum(typical * v) / np.cumsum(v),
+        'ad': talib.AD(h, l, c, v),
+        'adosc': talib.ADOSC(h, l, c, v, fastperiod=3, slowperiod=10),
+        'bollinger_bands': talib.BBANDS(c, timeperiod=20, nbdevup=2, nbdevdn=2),
+        'atr': talib.ATR(h, l, c, timeperiod=14),
+        'stddev': talib.STDDEV(c, timeperiod=20),
+    }
+
+
+def assert_same(expected, actual, name):
+    if isinstance(expected, tuple):
+        assert len(expected) == len(actual), name
+        for e, a in zip(expected, actual):
+            assert_same(e, a, name)
+        return
+    np.testing.assert_array_equal(np.isnan(expected), np.isnan(actual), err_msg=name)
+    np.testing.assert_allclose(actual, expected, rtol=1e-7, atol=1e-6, equal_nan=True, err_msg=name)
+
+
+def test_compute_matches_talib():
+    df = make_frame(400, 3)
+    expected = expected_indicators(df)
+    assert expected.keys() == INDICATORS.keys()
+    computed = IndicatorEngine(df).compute(INDICATORS)
+    for name in INDICATORS:
+        assert_same(expected[name], computed[name], name)
+
+
+def test_shared_nodes_are_computed_once(monkeypatch):
+    calls = []
+
+    def counted(function):
+        def wrapper(*args):
+            calls.append(function.__name__)
+            return function(*args)
+        wrapper.__name__ = function.__name__
+        return wrapper
+
+    for name in ('true_range', 'rolling_max', 'rolling_min'):
+        monkeypatch.setattr(ta_numpy, name, counted(getattr(ta_numpy, name)))
+    assert indicators.ta_numpy is ta_numpy
+
+    engine = IndicatorEngine(make_frame(200, 4))
+    engine.compute(['atr', 'adx', 'stochastic', 'williams_r'])
+    engine.compute(['atr', 'stochastic'])
+    assert sorted(calls) == ['rolling_max', 'rolling_min', 'true_range']
+    assert engine.rolling_high(14) is engine.rolling_high(14)
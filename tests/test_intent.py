@@ -0,0 +1,54 @@
+"""Query intents and the agent response cache."""
+import time
+
+from src.education.content import get_indicator_explanation
+from src.llm.intent import COIN_ALIASES, COIN_SYMBOLS, INDICATOR_ALIASES, find_indicator, parse_query
+from src.llm.response_cache import ResponseCache, cache_key, price_version
+
+
+def test_near_duplicates_share_a_key():
+    price = {cache_key(parse_query(text)) for text in ("btc price?", "what's bitcoin at", "What is the price of Bitcoin")}
+    assert len(price) == 1
+    arabic = {cache_key(parse_query(text)) for text in ("ما هو سعر البيتكوين الحالي؟", "كم سعر البتكوين")}
+    assert len(arabic) == 1 and arabic != price
+
+    query = parse_query("should I buy ETH for the next 3 months")
+    assert (query['intent'], query['coin'], query['timeframe']) == ('analysis', 'ethereum', '3m')
+    query = parse_query("اشرح مؤشر القوة النسبية")
+    assert (query['intent'], query['indicator'], query['language']) == ('explain', 'rsi', 'ar')
+    assert parse_query("latest news on xrp")['intent'] == 'news'
+    # Every recognized coin can be routed to the news tool
+    assert set(COIN_ALIASES.values()) <= set(COIN_SYMBOLS)
+    # Open questions only match their own wording
+    assert cache_key(parse_query("is crypto a good investment")) != cache_key(parse_query("is crypto a scam"))
+
+
+def test_every_indicator_has_static_explanations():
+    for indicator in set(INDICATOR_ALIASES.values()):
+        assert get_indicator_explanation(indicator, 'en') != get_indicator_explanation(indicator, 'ar')
+        assert get_indicator_explanation(indicator, 'ar')
+    assert find_indicator("Bollinger Bands") == 'bollinger_bands'
+    assert find_indicator("المتوسط المتحرك") == 'moving_averages'
+    assert find_indicator("Parabolic SAR") is None and get_indicator_explanation(None) is None
+
+
+def test_response_cache_bounds():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.put('a', 1, 'first')
+    assert cache.get('a', 1) == 'first'
+    assert cache.get('a', 2) is None and cache.get('a', 1) is None  # new data version evicts
+    cache.put('a', 1, 'first')
+    cache.put('b', 1, 'second')
+    cache.get('a', 1)
+    cache.put('c', 1, 'third')
+    assert cache.get('b', 1) is None and cache.get('a', 1) == 'first' and len(cache) == 2
+
+    cache = ResponseCache(ttl=0.01)
+    cache.put('a', None, 'first')
+    time.sleep(0.02)
+    assert cache.get('a') is None
+
+
+def test_price_answers_expire_with_their_window():
+    assert price_version(60, now=600.0) == price_version(60, now=659.9)
+    assert price_version(60, now=660.0) != price_version(60, now=659.9)
@@ -0,0 +1,58 @@
+"""Swing-point support/resistance zones."""
+import numpy as np
+
+from src.analysis.indicators import IndicatorEngine
+from src.analysis.levels import LevelMap, detect_levels, swing_points
+
+from tests.test_analysis_batch import analyzer, make_frame  # noqa: F401 (fixture)
+
+
+def test_swing_points_match_brute_force():
+    df = make_frame(1500, 4)
+    highs, lows = swing_points(IndicatorEngine(df), 10)
+    high, low = df['high'].to_numpy(), df['low'].to_numpy()
+    for i in range(len(df)):
+        left, right = max(0, i - 10), i + 11
+        complete = i >= 10 and right <= len(df)
+        assert highs[0, i] == (complete and high[i] == high[left:right].max() and (high[left:i] < high[i]).all())
+        assert lows[0, i] == (complete and low[i] == low[left:right].min() and (low[left:i] > low[i]).all())
+
+
+def test_zones_cover_every_pivot_within_width():
+    engine = IndicatorEngine(make_frame(2000, 6))
+    level_map = detect_levels(engine, swing=5)[0]
+    highs, lows = swing_points(engine, 5)
+    width = engine.atr(14)[-1]
+    assert sum(zone['touches'] for zone in level_map.zones) == highs.sum() + lows.sum()
+    assert all(zone['high'] - zone['low'] <= width for zone in level_map.zones)
+    prices = [zone['price'] for zone in level_map.zones]
+    assert prices == sorted(prices)
+
+
+def test_nearest_levels_by_bisection():
+    level_map = LevelMap([{'price': price} for price in (90.0, 95.0, 100.0, 110.0)])
+    assert [zone['price'] for zone in level_map.supports(100.0, 2)] == [90.0, 95.0]
+    assert [zone['price'] for zone in level_map.resistances(100.0)] == [110.0]
+    assert level_map.nearest_support(96.0)['price'] == 95.0
+    assert level_map.nearest_resistance(111.0) is None
+
+
+def test_stacked_series_match_single_series():
+    frames = [make_frame(600, seed) for seed in range(3)]
+    batch = detect_levels(IndicatorEngine.from_frames(frames))
+    for df, level_map in zip(frames, batch):
+        single = detect_levels(IndicatorEngine(df))[0]
+        assert [zone['touches'] for zone in single.zones] == [zone['touches'] for zone in level_map.zones]
+        np.testing.assert_allclose([z['price'] for z in level_map.zones], [z['price'] for z in single.zones])
+
+
+def test_short_histories_still_get_both_sides(analyzer):
+    for candles in (25, 40):
+        for seed in range(5):
+            engine = IndicatorEngine(make_frame(candles, seed))
+            price = engine.close[-1]
+            levels = analyzer._find_support_resistance(engine)[0]
+            assert levels['support_levels'] or price <= engine.low[-20:].min()
+            assert levels['resistance_levels'] or price >= engine.high[-20:].max()
+            assert all(level < price for level in levels['support_levels'])
+            assert all(level > price for level in levels['resistance_levels'])
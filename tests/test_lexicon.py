@@ -0,0 +1,31 @@
+"""Lexicon sentiment scoring."""
+import pytest
+
+from src.llm.lexicon import LexiconSentimentScorer
+
+
+def test_labels_and_confidence():
+    scores = LexiconSentimentScorer().score([
+        "Bitcoin surges to new all time high as ETF inflows boost optimism",
+        "Exchange hacked, $200M stolen in massive exploit",
+        "Bitcoin price today",
+        None,
+        "Rally fades as bears take over",
+    ])
+    assert list(scores['sentiment'][:4]) == ['positive', 'negative', 'neutral', 'neutral']
+    assert scores['confidence'][0] > 0.5 and scores['confidence'][1] > 0.5
+    # No sentiment words, or mixed ones, leave the text for the LLM
+    assert scores['confidence'][2] == scores['confidence'][3] == 0
+    assert scores['confidence'][4] < 0.5
+
+
+def test_negation_boosters_and_text_boundaries():
+    scorer = LexiconSentimentScorer()
+    plain, negated, boosted = scorer.score(["it is bearish", "it is not bearish", "extremely bearish"])['score']
+    assert negated > 0 > boosted
+    assert plain == pytest.approx(scorer.score(["bearish"])['score'][0])
+    assert boosted < plain
+    # A negation ending one text does not reach into the next
+    batched = scorer.score(["never", "crash", "rug pull", "a rug that pulls"])
+    assert batched['score'][1] == pytest.approx(scorer.score(["crash"])['score'][0])
+    assert batched['sentiment'][2] == 'negative' and batched['sentiment'][3] == 'neutral'
@@ -0,0 +1,57 @@
+"""Throttled message edits for streamed text."""
+import asyncio
+
+import pytest
+
+from src.utils.message_stream import MAX_MESSAGE_LENGTH, MessageStreamer
+
+
+class RetryAfter(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Flood control exceeded")
+        self.retry_after = retry_after
+
+
+class Message:
+    def __init__(self, failures=()):
+        self.texts = []
+        self.failures = list(failures)
+
+    async def edit_text(self, text):
+        await asyncio.sleep(0)
+        if self.failures:
+            raise self.failures.pop(0)
+        self.texts.append(text)
+
+
+def test_edits_are_throttled_and_final_text_wins():
+    async def run():
+        message = Message()
+        streamer = MessageStreamer(message, min_interval=0.05, min_chars=10)
+        for _ in range(50):
+            streamer.feed("token ")
+            await asyncio.sleep(0.005)
+        await streamer.finish("final " * 50)
+        return message
+
+    message = asyncio.run(run())
+    # 250 ms of tokens at one edit per 50 ms at most, plus the final edit
+    assert 2 <= len(message.texts) <= 7
+    assert all(earlier != later for earlier, later in zip(message.texts, message.texts[1:]))
+    assert message.texts[-1] == "final " * 50
+
+
+def test_flood_control_and_length_limit():
+    async def run(message):
+        streamer = MessageStreamer(message, min_interval=0, min_chars=1)
+        streamer.feed("partial")
+        await asyncio.sleep(0.01)
+        await streamer.finish("x" * (MAX_MESSAGE_LENGTH + 10))
+        return streamer
+
+    message = Message([RetryAfter(0.01)])
+    streamer = asyncio.run(run(message))
+    assert streamer.edits == 1 and len(message.texts[-1]) == MAX_MESSAGE_LENGTH
+
+    with pytest.raises(ValueError):
+        asyncio.run(run(Message([ValueError("partial edit fails quietly"), ValueError("final edit fails")])))
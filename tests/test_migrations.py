@@ -0,0 +1,49 @@
+"""Schema upgrades and maintenance (SQLite paths)."""
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+
+from src.services.database import Base, UserActivity
+from src.services.migrations import maintain_schema, upgrade_schema
+
+
+def test_upgrade_adds_event_time_and_indexes_to_old_tables():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE user_activities (id INTEGER PRIMARY KEY, user_id VARCHAR NOT NULL, '
+            'coin_id VARCHAR NOT NULL, activity_type VARCHAR NOT NULL, timestamp INTEGER NOT NULL, details JSON)'
+        ))
+        conn.execute(text("INSERT INTO user_activities VALUES (1, 'u', 'bitcoin', 'full', 1, NULL)"))
+
+    upgrade_schema(engine)
+    # Running it again changes nothing
+    upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    assert 'created_at' in {column['name'] for column in inspector.get_columns('user_activities')}
+    assert {index['name'] for index in inspector.get_indexes('user_activities')} == {
+        index.name for index in UserActivity.__table__.indexes
+    }
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT created_at FROM user_activities')).scalar() is not None
+
+
+def test_maintenance_applies_retention(monkeypatch):
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(UserActivity.__table__.insert(), [
+            {'user_id': 'u', 'coin_id': 'bitcoin', 'activity_type': 'full', 'timestamp': 1, 'created_at': created_at}
+            for created_at in (datetime(2020, 1, 1), now)
+        ])
+
+    maintain_schema(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT count(*) FROM user_activities')).scalar() == 2
+
+    monkeypatch.setenv('ACTIVITY_RETENTION_MONTHS', '2')
+    maintain_schema(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT count(*) FROM user_activities')).scalar() == 1
@@ -0,0 +1,155 @@
+"""Incremental news ingestion and local /news reads."""
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.services.database_manager import DatabaseManager
+from src.services.news_ingest import NewsIngestor
+
+START = datetime(2024, 5, 1, 12, 0)
+
+
+class Feed:
+    """News fetcher serving a fixed feed, newest first, like CryptoCompare's list endpoint."""
+
+    def __init__(self):
+        self.articles = []
+        self.calls = []
+        self.scored = []
+        self.sentiment_analyzer = True
+        self.categories = {'BTC', 'ETH'}
+        self.down = False
+
+    def publish(self, count):
+        for _ in range(count):
+            number = len(self.articles)
+            self.articles.append({
+                'id': number, 'guid': f'guid-{number}', 'published_on': START + timedelta(minutes=number),
+                'title': f'Article {number}', 'url': f'https://news/{number}', 'body': 'text',
+                'categories': 'BTC', 'source_name': 'wire', 'upvotes': 0, 'sentiment': 'NEUTRAL',
+            })
+
+    def get_news_by_coin(self, categories, limit=10, lang="EN", to_ts=None, score=True):
+        self.calls.append(to_ts)
+        if self.down:
+            return pd.DataFrame(), False
+        if categories not in self.categories:
+            return pd.DataFrame(), True
+        articles = sorted(self.articles, key=lambda article: article['published_on'], reverse=True)
+        if to_ts is not None:
+            articles = [article for article in articles if article['published_on'].timestamp() <= to_ts]
+        return pd.DataFrame(articles[:limit]), True
+
+    def score_sentiments(self, articles):
+        self.scored.extend(articles['guid'])
+        return ['positive'] * len(articles)
+
+
+def test_incremental_polls_store_each_article_once():
+    feed = Feed()
+    feed.publish(30)
+    db_manager = DatabaseManager('sqlite://')
+    ingestor = NewsIngestor(feed, db_manager, categories=['BTC'], page_size=10, max_pages=5, poll_seconds=60)
+
+    # A new category gets one page
+    assert ingestor.ingest('BTC') == 10
+    assert len(feed.calls) == 1
+
+    # Later polls page back to the cursor, then stop
+    feed.publish(25)
+    assert ingestor.ingest('BTC', db_manager.get_news_cursor('BTC')['last_published']) == 25
+    assert len(feed.calls) == 4
+    assert ingestor.ingest('BTC', db_manager.get_news_cursor('BTC')['last_published']) == 0
+
+    assert sorted(feed.scored) == sorted(f'guid-{number}' for number in range(20, 55))
+    assert db_manager.get_news_cursor('BTC')['last_published'] == START + timedelta(minutes=54)
+
+    stored = db_manager.get_news_articles('BTC', limit=5)
+    assert [article['guid'] for article in stored] == [f'guid-{number}' for number in range(54, 49, -1)]
+    assert {article['sentiment'] for article in stored} == {'positive'}
+
+
+def test_reads_poll_only_untracked_or_stale_categories():
+    feed = Feed()
+    feed.publish(3)
+    db_manager = DatabaseManager('sqlite://')
+    ingestor = NewsIngestor(feed, db_manager, categories=['BTC'], page_size=10, poll_seconds=60)
+
+    assert ingestor.due_categories() == ['BTC']
+    news = ingestor.latest('eth', limit=2)
+    assert list(news['title']) == ['Article 2', 'Article 1']
+    assert len(feed.calls) == 1
+
+    # Fresh categories are read locally; the loop now tracks ETH too
+    ingestor.latest('ETH')
+    assert len(feed.calls) == 1
+    assert ingestor.due_categories() == ['BTC']
+    assert ingestor.run_once() == 3
+    assert ingestor.due_categories() == []
+    assert 1.0 <= ingestor.next_wakeup() <= 60.0
+
+
+def test_unknown_categories_and_failed_polls_leave_no_trace():
+    feed = Feed()
+    feed.publish(3)
+    db_manager = DatabaseManager('sqlite://')
+    ingestor = NewsIngestor(feed, db_manager, categories=['BTC'], page_size=10, poll_seconds=60)
+
+    # A typo finds nothing and is never tracked
+    assert ingestor.latest('BTCC').empty
+    assert db_manager.get_news_cursor('BTCC') is None
+    assert 'BTCC' not in ingestor.tracked_categories()
+
+    # A failed poll keeps the category due
+    feed.down = True
+    assert ingestor.run_once() == 0
+    assert db_manager.get_news_cursor('BTC') is None
+    assert ingestor.due_categories() == ['BTC']
+
+    feed.down = False
+    assert ingestor.run_once() == 3
+    polled = db_manager.get_news_cursor('BTC')['last_polled']
+    feed.down = True
+    assert ingestor.poll('BTC', max_age=timedelta(0)) == 0
+    assert db_manager.get_news_cursor('BTC')['last_polled'] == polled
+
+
+def test_polls_cut_short_resume_before_moving_the_cursor():
+    feed = Feed()
+    feed.publish(30)
+    db_manager = DatabaseManager('sqlite://')
+    ingestor = NewsIngestor(feed, db_manager, categories=['BTC'], page_size=10, max_pages=2, poll_seconds=60)
+    assert ingestor.ingest('BTC') == 10
+
+    # Two pages do not reach the cursor: the articles are kept, the cursor is not.
+    # Pages overlap on their boundary article.
+    feed.publish(40)
+    assert ingestor.poll('BTC', max_age=timedelta(0)) == 19
+    cursor = db_manager.get_news_cursor('BTC')
+    assert cursor['last_published'] == START + timedelta(minutes=29)
+    assert cursor['resume_before'] == START + timedelta(minutes=51)
+
+    # Later polls continue below the resume point until the gap is filled
+    assert ingestor.poll('BTC', max_age=timedelta(0)) == 18
+    assert db_manager.get_news_cursor('BTC')['resume_before'] == START + timedelta(minutes=33)
+    assert ingestor.poll('BTC', max_age=timedelta(0)) == 3
+    cursor = db_manager.get_news_cursor('BTC')
+    assert cursor['last_published'] == START + timedelta(minutes=69)
+    assert cursor['resume_before'] is None
+    assert len(db_manager.get_news_articles('BTC', 100)) == 50
+
+    # Back to paging from the newest articles
+    feed.publish(5)
+    assert ingestor.poll('BTC', max_age=timedelta(0)) == 5
+
+
+def test_categories_nobody_reads_stop_being_polled():
+    feed = Feed()
+    feed.publish(3)
+    db_manager = DatabaseManager('sqlite://')
+    ingestor = NewsIngestor(feed, db_manager, categories=['BTC'], page_size=10, poll_seconds=60, track_days=7)
+
+    ingestor.latest('ETH')
+    now = datetime.utcnow()
+    assert set(ingestor.tracked_categories(now)) == {'BTC', 'ETH'}
+    assert set(ingestor.tracked_categories(now + timedelta(days=8))) == {'BTC'}
@@ -0,0 +1,57 @@
+"""Full-history pattern index and the recent patterns of the analysis."""
+import numpy as np
+
+from src.analysis.indicators import IndicatorEngine
+from src.analysis.patterns import PatternScanner, recent_patterns
+
+from tests.test_analysis_batch import analyzer, make_frame  # noqa: F401 (fixture)
+
+
+def test_events_match_pattern_outputs():
+    df = make_frame(500, 3)
+    events = PatternScanner().scan(df).events
+    engine = IndicatorEngine(df)
+    for function in engine.pattern_functions():
+        values = engine.candle_pattern(function)
+        hits = events[events['pattern'] == function[3:].lower()]
+        np.testing.assert_array_equal(hits['position'], np.flatnonzero(values))
+        np.testing.assert_array_equal(hits['strength'], np.abs(values[values != 0]))
+        assert (hits['timestamp'] == df.index[hits['position']]).all()
+    assert events['position'].is_monotonic_increasing
+
+
+def test_recent_patterns_match_full_history():
+    frames = [make_frame(400, seed) for seed in range(4)]
+    batch = recent_patterns(IndicatorEngine.from_frames(frames), 5, 32)
+    for df, recent in zip(frames, batch):
+        expected = PatternScanner().scan(df).recent(5)
+        assert sorted((e['candles_ago'], e['pattern'], e['direction']) for e in recent) == sorted(
+            zip(expected['candles_ago'], expected['pattern'], expected['direction'])
+        )
+        assert [e['candles_ago'] for e in recent] == sorted(e['candles_ago'] for e in recent)
+
+
+def test_scans_are_cached_per_data_version():
+    scanner = PatternScanner()
+    df = make_frame(300, 5)
+    events = scanner.scan(df, key=('test', 'usd', 30))
+    assert scanner.scan(df.copy(), key=('test', 'usd', 30)) is events
+    assert scanner.scan(make_frame(301, 5), key=('test', 'usd', 30)) is not events
+
+
+def test_summary_reports_curated_patterns_only(analyzer):
+    recent = [
+        {"pattern": "3whitesoldiers", "direction": "Bullish", "candles_ago": 0},
+        {"pattern": "doji", "direction": "Neutral", "candles_ago": 0},
+        {"pattern": "engulfing", "direction": "Bearish", "candles_ago": 1},
+        {"pattern": "hammer", "direction": "Bullish", "candles_ago": 3},
+    ]
+    analysis = analyzer.analyze_dataframe(make_frame(200, 8))
+    analysis["patterns"]["recent"] = recent
+    summary = analyzer._generate_enhanced_summary(analysis)
+    assert ("Bearish", "Bearish Engulfing pattern 1 candle ago") in summary["key_signals"]
+    assert not any('3whitesoldiers' in text or 'Hammer' in text for _, text in summary["key_signals"])
+
+    analysis["patterns"]["recent"] = recent[:2]
+    summary = analyzer._generate_enhanced_summary(analysis)
+    assert not any('pattern' in text for _, text in summary["key_signals"])
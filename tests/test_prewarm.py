@@ -0,0 +1,139 @@
+"""Prewarmer scheduling, its API budget, and the shared analysis result cache."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.analysis.technical import TechnicalAnalyzer
+from src.analysis.timeframes import TIMEFRAMES
+from src.services.prewarm import ApiBudget, CachePrewarmer
+
+from tests.test_analysis_batch import make_frame
+from tests.test_timeframes import BaseSeries
+
+
+def test_api_budget_rate_and_daily_cap():
+    budget = ApiBudget(calls_per_minute=4, daily_calls=6)
+    assert budget.try_acquire(3)
+    assert not budget.try_acquire(2)
+    assert budget.seconds_until(2) == pytest.approx(15.0, abs=0.5)
+
+    # A full bucket still cannot exceed the daily cap
+    budget._tokens = 4.0
+    assert budget.try_acquire(3)
+    assert not budget.try_acquire(1)
+    assert budget.exhausted_today
+    budget._day -= timedelta(days=1)
+    assert budget.try_acquire(1)
+
+
+class Popularity:
+    def get_most_popular_coins(self, limit, window):
+        return [{'coin': 'bitcoin'}, {'coin': 'ethereum'}]
+
+    def get_trending_coins(self, limit):
+        return [{'coin_id': 'ethereum'}, {'coin_id': 'pepe'}]
+
+
+class Expiries:
+    """Data processor and cache manager reporting fixed expiries; base series never expire."""
+
+    def __init__(self, expiries):
+        self.expiries = expiries
+        self.cache_manager = self
+
+    def get_expiry(self, coin_id, vs_currency, days):
+        return self.expiries.get((coin_id, days))
+
+    def get_base_expiry(self, coin_id, vs_currency, days):
+        return datetime.max
+
+
+def test_due_refreshes_follow_popularity_and_expiry():
+    now = datetime(2024, 1, 1, 12)
+    expiries = {(coin, days): now + timedelta(hours=1) for coin in ('bitcoin', 'ethereum', 'pepe') for days in TIMEFRAMES}
+    expiries[('ethereum', 7)] = now + timedelta(seconds=30)
+    del expiries[('pepe', 1)]
+    analyzer = SimpleNamespace(data_processor=Expiries(expiries))
+    prewarmer = CachePrewarmer(Popularity(), analyzer, top_n=3, lead_seconds=60)
+
+    assert prewarmer.hot_coins() == ['bitcoin', 'ethereum', 'pepe']
+    assert [(coin, days) for _, coin, days in prewarmer.due_refreshes(now)] == [('ethereum', 7), ('pepe', 1)]
+
+    # Failed refreshes back off
+    prewarmer._failed_until[('pepe', 1)] = now + timedelta(minutes=5)
+    assert [(coin, days) for _, coin, days in prewarmer.due_refreshes(now)] == [('ethereum', 7)]
+    assert prewarmer.next_wakeup(now) == 1.0
+
+
+class WarmBases(BaseSeries):
+    """Base series with in-memory expiries; OHLCV cache entries never expire."""
+
+    def __init__(self, expiries):
+        super().__init__()
+        self.expiries = expiries
+        self.cache_manager = self
+        self.refetched = []
+
+    def get_base_series(self, coin_id, vs_currency='usd', days=90, force_refresh=False):
+        if force_refresh:
+            self.refetched.append((coin_id, days))
+        return super().get_base_series(coin_id, vs_currency, days, force_refresh)
+
+    def get_base_expiry(self, coin_id, vs_currency, days):
+        return self.expiries.get((coin_id, days))
+
+    def get_expiry(self, coin_id, vs_currency, days):
+        return datetime.max
+
+
+def test_stale_base_series_are_refetched_and_analyze_timeframes_is_cached(monkeypatch):
+    monkeypatch.setattr(TechnicalAnalyzer, '_result_cache', type(TechnicalAnalyzer._result_cache)())
+    now = datetime.utcnow()
+    expiries = {(coin, days): now + timedelta(hours=1) for coin in ('bitcoin', 'ethereum', 'pepe') for days in (1, 90)}
+    del expiries[('bitcoin', 1)]
+    expiries[('pepe', 90)] = now + timedelta(seconds=30)
+    analyzer = TechnicalAnalyzer.__new__(TechnicalAnalyzer)
+    analyzer.data_processor = WarmBases(expiries)
+    prewarmer = CachePrewarmer(Popularity(), analyzer, top_n=3, lead_seconds=60)
+
+    assert [(coin, stale) for _, coin, stale in prewarmer.due_base_refreshes(now)] == [('bitcoin', (1,)), ('pepe', (90,))]
+    assert prewarmer.run_once() == 2
+    assert analyzer.data_processor.refetched == [('bitcoin', 1), ('pepe', 90)]
+
+    # /analyze is then served from the cached result
+    analyzer.analyze_many = None
+    assert set(analyzer.analyze_timeframes('bitcoin')["timeframes"]) == set(TIMEFRAMES)
+
+
+class Frames:
+    def __init__(self, df):
+        self.df = df
+
+    def get_ohlcv_data(self, coin_id, vs_currency, days, force_refresh=False):
+        return self.df
+
+
+def test_result_cache_follows_data_version_and_hands_out_copies(monkeypatch):
+    monkeypatch.setattr(TechnicalAnalyzer, '_result_cache', type(TechnicalAnalyzer._result_cache)())
+    analyzer = TechnicalAnalyzer.__new__(TechnicalAnalyzer)
+    analyzer.data_processor = Frames(make_frame(200, 1))
+    runs = []
+    analyze_dataframe = analyzer.analyze_dataframe
+
+    def counting(df, sections):
+        runs.append(len(df))
+        return analyze_dataframe(df, sections)
+
+    analyzer.analyze_dataframe = counting
+
+    first = analyzer.analyze_coin('bitcoin')
+    first['basic_info'] = 'mutated'
+    second = analyzer.analyze_coin('bitcoin')
+    assert runs == [200]
+    assert second['basic_info'] != 'mutated'
+
+    # New candles change the data version
+    analyzer.data_processor = Frames(make_frame(201, 1))
+    analyzer.analyze_coin('bitcoin')
+    assert runs == [200, 201]
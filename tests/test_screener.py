@@ -0,0 +1,125 @@
+"""Indicator snapshots and /screen queries."""
+import numpy as np
+import pytest
+
+from src.analysis.indicators import IndicatorEngine
+from src.analysis.timeframes import timeframe_frames
+from src.services.database_manager import DatabaseManager
+from src.services.screener import MarketScreener, parse_screen, snapshot_rows
+
+from tests.test_analysis_batch import make_frame
+
+
+class Markets:
+    """CoinGecko client serving a fixed markets list."""
+
+    def __init__(self, coins):
+        self.coins = coins
+
+    def get_coins_markets(self, vs_currency, per_page=100):
+        return self.coins[:per_page]
+
+
+class BaseSeries:
+    """Data processor serving fixed hourly base series, and 5-minute points for a single day."""
+
+    def __init__(self, bases, coins=()):
+        self.bases = bases
+        self.five_minute = {}
+        for seed, (coin_id, hourly) in enumerate(bases.items()):
+            fine = make_frame(288, 100 + seed)
+            fine.index = hourly.index[-1] - (fine.index[-1] - fine.index) / 12
+            self.five_minute[coin_id] = fine
+        self.api = Markets(list(coins))
+
+    def get_base_series(self, coin_id, vs_currency, days, force_refresh=False):
+        return (self.five_minute if days == 1 else self.bases).get(coin_id)
+
+
+def test_parse_screen():
+    query = parse_screen(['rsi<30', 'price', '>', 'ma50', 'tf:1w', 'top:100', 'sort:-change_24h', 'limit:500'])
+    assert query == {
+        "conditions": [('rsi', '<', 30.0), ('price', '>', 'ma50')],
+        "days": 7, "top": 100, "sort": 'change_24h', "descending": True, "limit": 50,
+    }
+    for args in (['volume>5'], ['rsi<abc'], ['tf:2d'], ['top:0'], ['rsi~3']):
+        with pytest.raises(ValueError):
+            parse_screen(args)
+
+
+def test_snapshot_rows_match_single_series():
+    frames = {key: make_frame(300, seed) for seed, key in enumerate('abc')}
+    frames['short'] = make_frame(60, 9)
+    snapshots = snapshot_rows(frames)
+    for key, df in frames.items():
+        engine = IndicatorEngine.from_frames([df])
+        assert snapshots[key]['rsi'] == pytest.approx(engine.rsi(14)[0, -1])
+        assert snapshots[key]['ma50'] == pytest.approx(engine.sma(engine.ma_long)[0, -1])
+        assert snapshots[key]['price'] == df['close'].iloc[-1]
+
+    # Too short for MACD: no reading rather than the engine's zero placeholder
+    short = snapshot_rows({'tiny': make_frame(24, 3)})['tiny']
+    assert short['macd'] is short['macd_signal'] is short['macd_hist'] is None
+    assert short['rsi'] is not None
+
+
+def test_moving_averages_are_full_period_or_null():
+    coins = [{'id': 'coin1', 'symbol': 'c1', 'market_cap_rank': 1}]
+    data_processor = BaseSeries({'coin1': make_frame(24 * 90, 4)})
+    rows = MarketScreener(DatabaseManager('sqlite://'), data_processor).build_snapshots(coins)
+    frames = timeframe_frames(data_processor, 'coin1')
+
+    for row in rows:
+        close = frames[row['interval'].value]['close']
+        for column, period in (('ma20', 20), ('ma50', 50)):
+            if len(close) < period:
+                assert row[column] is None
+            else:
+                assert row[column] == pytest.approx(close.iloc[-period:].mean())
+    # 96 quarter-hourly bars for a day; a week has only 42 four-hourly bars
+    daily, weekly = (next(row for row in rows if row['interval'].value == days) for days in (1, 7))
+    assert daily['ma50'] is not None and daily['macd'] is not None and daily['adx'] is not None
+    assert weekly['ma50'] is None and weekly['ma20'] is not None
+
+
+def test_screen_filters_and_sorts_snapshots():
+    coins = [
+        {'id': f'coin{rank}', 'symbol': f'c{rank}', 'market_cap_rank': rank, 'price_change_percentage_24h': rank - 5.0}
+        for rank in range(1, 11)
+    ]
+    bases = {coin['id']: make_frame(24 * 90, rank) for rank, coin in enumerate(coins)}
+    db_manager = DatabaseManager('sqlite://')
+    screener = MarketScreener(db_manager, BaseSeries(bases), refresh_seconds=60)
+    rows = screener.build_snapshots(coins)
+    assert len(rows) == 40
+    db_manager.bulk_update_indicator_snapshots(rows)
+
+    daily = {row['coin_id']: row for row in rows if row['interval'].value == 1}
+    results = screener.screen(parse_screen(['rsi>40', 'price>ma20', 'top:8', 'sort:-rsi']))
+    expected = sorted(
+        (row for row in daily.values() if row['rank'] <= 8 and row['rsi'] > 40 and row['price'] > row['ma20']),
+        key=lambda row: -row['rsi']
+    )
+    assert len(expected) > 1
+    assert [row['coin_id'] for row in results] == [row['coin_id'] for row in expected]
+
+    results = screener.screen(parse_screen(['tf:3m', 'sort:-change_24h', 'limit:3']))
+    assert [row['coin_id'] for row in results] == ['coin10', 'coin9', 'coin8']
+    assert all(np.isfinite(row['rsi']) for row in results)
+
+
+def test_coins_leaving_the_top_list_are_pruned():
+    coins = [{'id': f'coin{rank}', 'symbol': f'c{rank}', 'market_cap_rank': rank} for rank in range(1, 4)]
+    bases = {coin['id']: make_frame(24 * 90, rank) for rank, coin in enumerate(coins)}
+    db_manager = DatabaseManager('sqlite://')
+    data_processor = BaseSeries(bases, coins)
+    screener = MarketScreener(db_manager, data_processor, refresh_seconds=60)
+    assert screener.run_once() == 3
+    assert len(screener.screen(parse_screen([]))) == 3
+
+    # coin2 drops out of the list at the next markets fetch
+    data_processor.api.coins = [coins[0], coins[2]]
+    screener._markets_fetched -= screener.refresh_interval
+    screener.top_coins()
+    assert [row['coin_id'] for row in screener.screen(parse_screen(['tf:1w']))] == ['coin1', 'coin3']
+    assert set(screener._refreshed_at) == {'coin1', 'coin3'}
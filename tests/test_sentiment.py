@@ -0,0 +1,85 @@
+"""Batched LLM sentiment scoring with per-article fallback and a shared timeout."""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('langchain_google_genai')
+
+from src.llm.lexicon import LexiconSentimentScorer  # noqa: E402
+from src.llm.sentimnet import BATCH_SYSTEM_PROMPT, CryptoSentimentAnalyzer, parse_batch_response  # noqa: E402
+
+ARTICLES = [(f'a{position}', 'text') for position in range(4)]
+
+# Answers to single-article prompts, by title
+SINGLE = {'a0': 'positive', 'a1': 'negative', 'a2': 'neutral', 'a3': 'Positive'}
+
+
+class ScriptedLLM:
+    """Chat model giving a fixed reply to packed prompts and SINGLE answers to single-article ones."""
+
+    def __init__(self, batch_reply, delay=0.0):
+        self.batch_reply = batch_reply
+        self.delay = delay
+        self.single_calls = []
+
+    def invoke(self, messages):
+        time.sleep(self.delay)
+        if messages[0].content == BATCH_SYSTEM_PROMPT:
+            return SimpleNamespace(content=self.batch_reply)
+        title = re.search(r'Title: (\w+)', messages[1].content).group(1)
+        self.single_calls.append(title)
+        return SimpleNamespace(content=SINGLE[title])
+
+
+@pytest.fixture
+def make_analyzer():
+    """Analyzers without a Gemini client; every article goes to the scripted LLM."""
+    analyzers = []
+
+    def make(llm, timeout=5.0):
+        analyzer = CryptoSentimentAnalyzer.__new__(CryptoSentimentAnalyzer)
+        analyzer.batch_size = len(ARTICLES)
+        analyzer.max_concurrency = 2
+        analyzer.timeout = timeout
+        analyzer.min_confidence = 2.0
+        analyzer.lexicon = LexiconSentimentScorer()
+        analyzer._executor = ThreadPoolExecutor(max_workers=2)
+        analyzer.llm = llm
+        analyzers.append(analyzer)
+        return analyzer
+
+    yield make
+    for analyzer in analyzers:
+        analyzer._executor.shutdown(wait=False)
+
+
+def test_parse_batch_response():
+    content = '```json\n[{"id": 2, "sentiment": " Negative"}, {"id": 0, "sentiment": "bullish"}, {"id": 7}, 3]\n```'
+    assert parse_batch_response(content, 3) == [None, None, 'negative']
+    assert parse_batch_response('{"id": 0, "sentiment": "positive"}', 1) == [None]
+    assert parse_batch_response('[{"id": 0, "sentiment": "positive"', 1) == [None]
+
+
+def test_items_missing_from_the_batch_are_scored_one_by_one(make_analyzer):
+    llm = ScriptedLLM('[{"id": 0, "sentiment": "positive"}, {"id": 2, "sentiment": "neutral"}]')
+    analyzer = make_analyzer(llm)
+    assert analyzer.score_articles(ARTICLES) == ['positive', 'negative', 'neutral', 'positive']
+    assert sorted(llm.single_calls) == ['a1', 'a3']
+
+
+def test_malformed_batch_response_falls_back_to_single_calls(make_analyzer):
+    llm = ScriptedLLM('[{"id": 0, "sentiment": positive}, {"id": 1')
+    analyzer = make_analyzer(llm)
+    assert analyzer.score_articles(ARTICLES) == ['positive', 'negative', 'neutral', 'positive']
+    assert sorted(llm.single_calls) == ['a0', 'a1', 'a2', 'a3']
+
+
+def test_timeout_returns_the_default_for_unscored_articles(make_analyzer):
+    analyzer = make_analyzer(ScriptedLLM('[]', delay=1.0), timeout=0.2)
+    started = time.monotonic()
+    assert analyzer.score_articles(ARTICLES) == ['neutral'] * len(ARTICLES)
+    assert analyzer.score_articles(ARTICLES, timeout=0.1, default=None) == [None] * len(ARTICLES)
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,118 @@
+"""Database-backed stores of the services layer."""
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.services.bulk_ops import dedupe_rows, upsert, upsert_in_chunks
+from src.services.database import ActivityRollup, UserActivity
+from src.services.database_manager import DatabaseManager
+
+
+def test_article_sentiments_are_keyed_by_guid_and_content():
+    db_manager = DatabaseManager('sqlite://')
+    db_manager.bulk_update_article_sentiments([
+        {'guid': 'a', 'content_hash': 'h1', 'sentiment': 'positive'},
+        {'guid': 'b', 'content_hash': 'h2', 'sentiment': 'negative'},
+    ])
+    # Rescoring the same article overwrites its sentiment
+    db_manager.bulk_update_article_sentiments([{'guid': 'a', 'content_hash': 'h1', 'sentiment': 'neutral'}])
+
+    found = db_manager.get_article_sentiments([('a', 'h1'), ('b', 'edited'), ('c', 'h3')])
+    assert found == {('a', 'h1'): 'neutral'}
+    assert db_manager.get_article_sentiments([]) == {}
+
+
+def test_upsert_increments_counters_of_existing_rows():
+    db_manager = DatabaseManager('sqlite://')
+    bucket = datetime(2024, 1, 1, 10)
+    rows = [
+        {'dimension': 'coin', 'key': 'bitcoin', 'bucket_start': bucket, 'count': 2},
+        {'dimension': 'coin', 'key': 'ethereum', 'bucket_start': bucket, 'count': 1},
+    ]
+    with db_manager.session_scope() as session:
+        upsert(session, ActivityRollup, rows, ['dimension', 'key', 'bucket_start'], increment_columns=['count'])
+        upsert(session, ActivityRollup, rows[:1], ['dimension', 'key', 'bucket_start'], increment_columns=['count'])
+    with db_manager.session_scope() as session:
+        counts = {rollup.key: rollup.count for rollup in session.query(ActivityRollup)}
+    assert counts == {'bitcoin': 4, 'ethereum': 1}
+
+
+def test_rollup_windows_only_sum_their_buckets():
+    db_manager = DatabaseManager('sqlite://')
+    hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    counts = Counter({
+        ('coin', 'bitcoin', hour): 1,
+        ('coin', 'ethereum', hour - timedelta(hours=3)): 2,
+        ('coin', 'solana', hour - timedelta(days=3)): 4,
+        ('coin', 'dogecoin', hour - timedelta(weeks=3)): 8,
+    })
+    with db_manager.session_scope() as session:
+        db_manager._increment_rollups(session, counts)
+
+    assert db_manager._get_top_rollup_keys('coin', 10, 'hour') == [('bitcoin', 1)]
+    assert db_manager._get_top_rollup_keys('coin', 10, 'day') == [('ethereum', 2), ('bitcoin', 1)]
+    assert [key for key, _ in db_manager._get_top_rollup_keys('coin', 10, 'week')] == ['solana', 'ethereum', 'bitcoin']
+    assert db_manager._get_top_rollup_keys('coin', 2, None) == [('dogecoin', 8), ('solana', 4)]
+    with pytest.raises(ValueError):
+        db_manager._get_top_rollup_keys('coin', 10, 'year')
+
+
+def test_backfilled_activities_only_count_all_time():
+    db_manager = DatabaseManager('sqlite://')
+    with db_manager.session_scope() as session:
+        session.add_all([
+            UserActivity(user_id='u', coin_id='bitcoin', activity_type='full', timestamp=1)
+            for _ in range(3)
+        ])
+    db_manager._backfill_activity_rollups()
+
+    assert db_manager._get_top_rollup_keys('coin', 10, 'week') == []
+    assert db_manager._get_top_rollup_keys('coin', 10, None) == [('bitcoin', 3)]
+    assert db_manager._get_top_rollup_keys('analysis_type', 10, None) == [('full', 3)]
+
+
+def test_dedupe_rows_keeps_the_last_row_per_key():
+    rows = [{'id': 'a', 'v': 1}, {'id': 'b', 'v': 2}, {'id': 'a', 'v': 3}]
+    assert dedupe_rows(rows, ['id']) == [{'id': 'a', 'v': 3}, {'id': 'b', 'v': 2}]
+
+
+def _rollup_rows(count, bad=None):
+    bucket = datetime(2024, 1, 1)
+    return [
+        {'dimension': 'coin', 'key': f'coin{number}', 'bucket_start': bucket, 'count': None if number == bad else 1}
+        for number in range(count)
+    ]
+
+
+def _stored_keys(db_manager):
+    with db_manager.session_scope() as session:
+        return sorted(key for key, in session.query(ActivityRollup.key))
+
+
+def test_upsert_in_chunks_writes_every_chunk():
+    db_manager = DatabaseManager('sqlite://')
+    rows = _rollup_rows(7) + _rollup_rows(2)
+    written = upsert_in_chunks(db_manager.SessionMaker, ActivityRollup, rows, ['dimension', 'key', 'bucket_start'], 3)
+    assert written == 7
+    assert len(_stored_keys(db_manager)) == 7
+
+
+def test_upsert_in_chunks_failures_are_partial_unless_atomic():
+    index = ['dimension', 'key', 'bucket_start']
+    failed = []
+
+    # The failed chunk is skipped; the chunks around it are committed
+    db_manager = DatabaseManager('sqlite://')
+    written = upsert_in_chunks(
+        db_manager.SessionMaker, ActivityRollup, _rollup_rows(7, bad=4), index, 3,
+        on_error=lambda error, chunk: failed.append(len(chunk))
+    )
+    assert (written, failed) == (4, [3])
+    assert _stored_keys(db_manager) == ['coin0', 'coin1', 'coin2', 'coin6']
+
+    db_manager = DatabaseManager('sqlite://')
+    with pytest.raises(SQLAlchemyError):
+        upsert_in_chunks(db_manager.SessionMaker, ActivityRollup, _rollup_rows(7, bad=4), index, 3, atomic=True)
+    assert _stored_keys(db_manager) == []
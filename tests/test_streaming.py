@@ -0,0 +1,90 @@
+"""Incremental indicator states against batch TA-Lib results, and their persistence."""
+import logging
+
+import numpy as np
+import pytest
+
+from src.analysis.streaming import StreamingIndicators
+from src.data.processor import DataProcessor
+from src.services.cache_manager import CacheManager
+
+from tests.test_analysis_batch import make_frame
+
+talib = pytest.importorskip('talib')
+
+
+def batch_values(df):
+    h, l, c = (df[column].to_numpy(dtype=np.float64) for column in ('high', 'low', 'close'))
+    return {
+        'rsi': talib.RSI(c, timeperiod=14)[-1],
+        'atr': talib.ATR(h, l, c, timeperiod=14)[-1],
+        'adx': talib.ADX(h, l, c, timeperiod=14)[-1],
+        'ema': talib.EMA(c, timeperiod=20)[-1],
+        'obv': talib.OBV(c, df['volume'].to_numpy(dtype=np.float64))[-1],
+    }
+
+
+def assert_matches_batch(indicators, df, names=None):
+    values = indicators.values()
+    for name, expected in batch_values(df).items():
+        if names is not None and name not in names:
+            continue
+        assert values[name] == pytest.approx(expected, rel=1e-9), name
+
+
+@pytest.mark.parametrize('seed_candles', [200, 10, 1])
+def test_states_match_batch_after_long_and_short_seeds(seed_candles):
+    df = make_frame(300, 5)
+    indicators = StreamingIndicators.from_dataframe(df.iloc[:seed_candles])
+    indicators.update_many(df.iloc[:250])
+    assert_matches_batch(indicators, df.iloc[:250])
+    indicators.update_many(df)
+    assert_matches_batch(indicators, df)
+
+
+def test_short_seeds_keep_warming_up_across_serialization():
+    df = make_frame(60, 6)
+    indicators = StreamingIndicators.from_dataframe(df.iloc[:6])
+    assert indicators.values()['rsi'] is None and indicators.values()['adx'] is None
+
+    for end in range(8, 61, 4):
+        indicators = StreamingIndicators.from_dict(indicators.to_dict(), indicators.last_timestamp)
+        indicators.update_many(df.iloc[:end])
+    assert indicators.states['adx'].warmup is None
+    assert_matches_batch(indicators, df, names=('rsi', 'atr', 'adx'))
+
+
+def test_revised_last_candle_replaces_the_pending_one():
+    df = make_frame(120, 7)
+    forming = df.iloc[:100].copy()
+    forming.iloc[-1, forming.columns.get_loc('close')] *= 1.05
+    indicators = StreamingIndicators.from_dataframe(forming)
+    assert indicators.last_timestamp == df.index[98]
+    assert_matches_batch(indicators, forming)
+
+    # The candle closed at a different price; the state never saw the provisional one
+    indicators.update_many(df)
+    assert indicators.last_timestamp == df.index[-2]
+    assert_matches_batch(indicators, df)
+
+
+def test_cache_refreshes_resume_the_saved_state(monkeypatch):
+    df = make_frame(300, 8)
+    processor = DataProcessor.__new__(DataProcessor)
+    processor.cache_manager = CacheManager('sqlite://')
+    processor.logger = logging.getLogger(__name__)
+    assert processor.get_streaming_indicators('bitcoin', 'usd', 30) is None
+
+    processor.update_streaming_indicators('bitcoin', 'usd', 30, df.iloc[:200])
+    assert processor.get_streaming_indicators('bitcoin', 'usd', 30).last_timestamp == df.index[198]
+
+    # The next refresh (a sliding window of the history) folds in only the new candles
+    def reseed(df):
+        raise AssertionError('state reseeded instead of resumed')
+
+    monkeypatch.setattr(StreamingIndicators, 'from_dataframe', reseed)
+    indicators = processor.update_streaming_indicators('bitcoin', 'usd', 30, df.iloc[60:260])
+    assert_matches_batch(indicators, df.iloc[:260])
+    saved = processor.get_streaming_indicators('bitcoin', 'usd', 30)
+    assert saved.last_timestamp == df.index[258]
+    assert saved.to_dict() == indicators.to_dict()
@@ -0,0 +1,90 @@
+"""Parity of the NumPy indicator backend with TA-Lib."""
+import numpy as np
+import pytest
+
+from src.analysis import ta_numpy
+
+talib = pytest.importorskip('talib')
+
+
+def make_ohlcv(n=1500, seed=7):
+    """Random-walk candles with a few flat stretches and zero-volume candles."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open = np.roll(close, 1) * (1 + rng.normal(0, 0.005, n))
+    open[0] = close[0]
+    high = np.maximum(open, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low = np.minimum(open, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    volume = rng.uniform(1e3, 1e5, n)
+    for start in (n // 7, n // 2):
+        open[start:start + 30] = high[start:start + 30] = low[start:start + 30] = close[start:start + 30] = close[start]
+    volume[n // 4:n // 4 + 10] = 0.0
+    return open, high, low, close, volume
+
+
+OHLCV = make_ohlcv()
+SHORT = tuple(values[:20] for values in OHLCV)
+
+
+def assert_same(expected, actual):
+    if isinstance(expected, tuple):
+        assert len(expected) == len(actual)
+        for e, a in zip(expected, actual):
+            assert_same(e, a)
+        return
+    np.testing.assert_array_equal(np.isnan(expected), np.isnan(actual))
+    np.testing.assert_allclose(actual, expected, rtol=1e-7, atol=1e-6, equal_nan=True)
+
+
+CASES = [
+    ('SMA', lambda o, h, l, c, v: (c,), {'timeperiod': 20}),
+    ('EMA', lambda o, h, l, c, v: (c,), {'timeperiod': 20}),
+    ('MACD', lambda o, h, l, c, v: (c,), {}),
+    ('RSI', lambda o, h, l, c, v: (c,), {'timeperiod': 14}),
+    ('STOCH', lambda o, h, l, c, v: (h, l, c), {'fastk_period': 14, 'slowk_period': 3, 'slowd_period': 3}),
+    ('WILLR', lambda o, h, l, c, v: (h, l, c), {'timeperiod': 14}),
+    ('MFI', lambda o, h, l, c, v: (h, l, c, v), {'timeperiod': 14}),
+    ('CCI', lambda o, h, l, c, v: (h, l, c), {'timeperiod': 20}),
+    ('ROC', lambda o, h, l, c, v: (c,), {'timeperiod': 10}),
+    ('ADX', lambda o, h, l, c, v: (h, l, c), {'timeperiod': 14}),
+    ('SAR', lambda o, h, l, c, v: (h, l), {}),
+    ('OBV', lambda o, h, l, c, v: (c, v), {}),
+    ('AD', lambda o, h, l, c, v: (h, l, c, v), {}),
+    ('ADOSC', lambda o, h, l, c, v: (h, l, c, v), {'fastperiod': 3, 'slowperiod': 10}),
+    ('BBANDS', lambda o, h, l, c, v: (c,), {'timeperiod': 20}),
+    ('ATR', lambda o, h, l, c, v: (h, l, c), {'timeperiod': 14}),
+    ('STDDEV', lambda o, h, l, c, v: (c,), {'timeperiod': 20}),
+]
+
+PATTERNS = ['CDLHAMMER', 'CDLHANGINGMAN', 'CDLSHOOTINGSTAR', 'CDLENGULFING', 'CDLMORNINGSTAR', 'CDLEVENINGSTAR']
+
+
+@pytest.mark.parametrize('name,inputs,kwargs', CASES, ids=[case[0] for case in CASES])
+@pytest.mark.parametrize('data', [OHLCV, SHORT], ids=['long', 'short'])
+def test_indicator_parity(name, inputs, kwargs, data):
+    args = inputs(*data)
+    assert_same(getattr(talib, name)(*args, **kwargs), getattr(ta_numpy, name)(*args, **kwargs))
+
+
+@pytest.mark.parametrize('name', PATTERNS)
+def test_pattern_parity(name):
+    open, high, low, close, _ = make_ohlcv(n=20000, seed=11)
+    expected = getattr(talib, name)(open, high, low, close)
+    actual = getattr(ta_numpy, name)(open, high, low, close)
+    assert np.count_nonzero(expected) > 0
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize('name,inputs,kwargs', CASES, ids=[case[0] for case in CASES])
+def test_rows_match_single_series(name, inputs, kwargs):
+    """2-D input computes every row as its own series."""
+    series = [make_ohlcv(n=300, seed=seed) for seed in range(3)]
+    stacked = [np.stack(column) for column in zip(*series)]
+    batch = getattr(ta_numpy, name)(*inputs(*stacked), **kwargs)
+    for row, data in enumerate(series):
+        single = getattr(ta_numpy, name)(*inputs(*data), **kwargs)
+        if isinstance(single, tuple):
+            for b, s in zip(batch, single):
+                np.testing.assert_allclose(b[row], s, rtol=1e-9, atol=1e-9, equal_nan=True)
+        else:
+            np.testing.assert_allclose(batch[row], single, rtol=1e-9, atol=1e-9, equal_nan=True)
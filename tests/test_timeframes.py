@@ -0,0 +1,74 @@
+"""Multi-timeframe resampling and confluence."""
+import math
+
+import numpy as np
+
+from src.analysis.timeframes import TIMEFRAMES, bar_rule, confluence, resample_ohlcv
+
+from tests.test_analysis_batch import analyzer, make_frame  # noqa: F401 (fixture)
+
+
+class BaseSeries:
+    """Data processor serving hourly points for long ranges and 5-minute points for a single day."""
+
+    def __init__(self):
+        self.hourly = make_frame(24 * 90, 10)
+        self.five_minute = make_frame(288, 11)
+        self.five_minute.index = self.hourly.index[-1] - (self.five_minute.index[-1] - self.five_minute.index) / 12
+        self.calls = []
+
+    def get_base_series(self, coin_id, vs_currency='usd', days=90, force_refresh=False):
+        self.calls.append(days)
+        return self.five_minute if days == 1 else self.hourly
+
+
+def test_resampled_bars_aggregate_candles():
+    base = make_frame(24 * 90, 8)
+    bars = resample_ohlcv(base, '4h', days=30)
+    assert bars.index[-1] == base.index[-1]
+    assert len(bars) == 30 * 6
+    # Right-closed bars: the last bar holds the last four hourly candles
+    last = base.iloc[-4:]
+    np.testing.assert_allclose(
+        bars.iloc[-1][['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float),
+        [last['open'].iloc[0], last['high'].max(), last['low'].min(), last['close'].iloc[-1], last['volume'].sum()]
+    )
+
+
+def test_timeframes_end_on_the_same_candle():
+    base = make_frame(24 * 90, 9)
+    frames = [resample_ohlcv(base, bar_rule(days), days) for days in TIMEFRAMES]
+    assert {df.index[-1] for df in frames} == {base.index[-1]}
+    assert [len(df) for df in frames] == [24, 42, 180, 90]
+
+
+def test_confluence():
+    analyses = {
+        days: {"summary": {"overall_sentiment": sentiment}}
+        for days, sentiment in zip(TIMEFRAMES, ["Bullish", "Bullish", "Neutral", "Bearish"])
+    }
+    analyses[365] = {"error": "Failed to fetch data"}
+    result = confluence(analyses)
+    assert result["sentiment"] == "Bullish"
+    assert result["agreement"] == 50.0
+    assert not result["aligned"]
+    assert result["by_timeframe"] == {1: "Bullish", 7: "Bullish", 30: "Neutral", 90: "Bearish"}
+
+
+def test_single_day_uses_the_five_minute_series(analyzer):
+    analyzer.data_processor = BaseSeries()
+    result = analyzer.analyze_timeframes('bitcoin')
+    assert sorted(analyzer.data_processor.calls) == [1, 90]
+    day = result["timeframes"][1]
+    # 96 quarter-hourly bars: enough for MACD and ADX
+    assert np.any(np.asarray(day["trend_indicators"]["macd"]["macd"]) != 0.0)
+    assert math.isfinite(day["trend_indicators"]["adx"]["value"])
+    assert set(result["confluence"]["by_timeframe"]) == set(TIMEFRAMES)
+
+
+def test_analyses_come_with_the_bars_they_were_built_from(analyzer):
+    analyzer.data_processor = BaseSeries()
+    result = analyzer.analyze_timeframes('bitcoin')
+    for days, df in result["frames"].items():
+        assert len(df) == [96, 42, 180, 90][TIMEFRAMES.index(days)]
+        assert result["timeframes"][days]["basic_info"]["current_price"] == df['close'].iloc[-1]